@@ -1,18 +1,47 @@
+from typing import AsyncIterator, Callable
+
 from dependency_injector import containers, providers
 
 from ai_gateway.abuse_detection.detector import AbuseDetector
 from ai_gateway.models.anthropic import KindAnthropicModel
+from ai_gateway.scheduling import PriorityLimiter
+
+
+async def _run_abuse_detector(
+    enabled: bool, abuse_detector: Callable[[], AbuseDetector]
+) -> AsyncIterator[None]:
+    # The detector isn't created when disabled, its model needs the Anthropic API key
+    if not enabled:
+        yield
+        return
+
+    detector = abuse_detector()
+    yield
+    await detector.stop()
 
 
 class ContainerAbuseDetection(containers.DeclarativeContainer):
     config = providers.Configuration(strict=True)
     models = providers.DependenciesContainer()
+    request_limiter = providers.Dependency(instance_of=PriorityLimiter)
 
     abuse_detector = providers.Singleton(
         AbuseDetector,
         enabled=config.enabled,
         sampling_rate=config.sampling_rate,
+        queue_size=config.queue_size,
+        batch_size=config.batch_size,
+        batch_timeout_s=config.batch_timeout_s,
+        cache_size=config.cache_size,
         model=providers.Factory(
             models.anthropic_claude_chat, KindAnthropicModel.CLAUDE_3_HAIKU
         ),
+        request_limiter=request_limiter,
+    )
+
+    # Stops the worker scoring the samples when the application shuts down
+    abuse_detector_worker = providers.Resource(
+        _run_abuse_detector,
+        enabled=config.enabled,
+        abuse_detector=abuse_detector.provider,
     )
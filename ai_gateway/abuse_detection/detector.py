@@ -1,9 +1,15 @@
+import asyncio
+import contextlib
+import hashlib
 import random
+import re
 import textwrap
+from collections import OrderedDict
+from typing import NamedTuple, Optional
 
 import structlog
 from fastapi import Request
-from prometheus_client import Histogram
+from prometheus_client import Counter, Histogram
 from pydantic import BaseModel
 
 from ai_gateway.api.feature_category import X_GITLAB_UNIT_PRIMITIVE
@@ -11,24 +17,36 @@ from ai_gateway.api.middleware import (
     X_GITLAB_GLOBAL_USER_ID_HEADER,
     X_GITLAB_INSTANCE_ID_HEADER,
 )
-from ai_gateway.models.anthropic import AnthropicChatModel
-from ai_gateway.models.base_chat import Message, Role
+from ai_gateway.instrumentators.cardinality import BoundedMetric
+from ai_gateway.models.base_chat import ChatModelBase, Message, Role
 from ai_gateway.models.base_text import TextGenModelOutput
+from ai_gateway.scheduling import PriorityLimiter, WorkloadClass
 from ai_gateway.tracking import log_exception
 
 log = structlog.stdlib.get_logger("abuse_detection")
 
 METRIC_LABELS = ["instance_id", "global_user_id", "unit_primitive"]
 
-ABUSE_SCORE = Histogram(
-    "abuse_request_scores",
-    "Score of the abuse requests",
-    METRIC_LABELS,
-    buckets=(0.0, 0.3, 0.5, 0.7, 1.0),
+# The unit primitive header is validated by the endpoints, but the instance and user ids
+# are unbounded
+ABUSE_SCORE = BoundedMetric(
+    Histogram(
+        "abuse_request_scores",
+        "Score of the abuse requests",
+        METRIC_LABELS,
+        buckets=(0.0, 0.3, 0.5, 0.7, 1.0),
+    ),
+    capped_labels=["instance_id", "global_user_id"],
+    max_values=1_000,
+)
+
+ABUSE_DETECTION_DROPPED_SAMPLES = Counter(
+    "abuse_detection_dropped_samples",
+    "Sampled requests dropped because the abuse detection queue was full",
 )
 
 
-__all__ = ["AbuseDetector"]
+__all__ = ["AbuseDetector", "AbuseSample"]
 
 
 class ModelRequest(BaseModel):
@@ -38,58 +56,128 @@ class ModelRequest(BaseModel):
     max_tokens: int
 
 
+class AbuseSample(NamedTuple):
+    url: str
+    body: str
+    expected_usecase: str
+    instance_id: str
+    global_user_id: str
+    unit_primitive: str
+
+    @classmethod
+    def from_request(
+        cls, request: Request, body: str, expected_usecase: str
+    ) -> "AbuseSample":
+        # Only keep what's needed to score the request, not the request itself
+        return cls(
+            url=str(request.url),
+            body=body,
+            expected_usecase=expected_usecase,
+            instance_id=request.headers.get(X_GITLAB_INSTANCE_ID_HEADER, "unknown"),
+            global_user_id=request.headers.get(
+                X_GITLAB_GLOBAL_USER_ID_HEADER, "unknown"
+            ),
+            unit_primitive=request.headers.get(X_GITLAB_UNIT_PRIMITIVE, "unknown"),
+        )
+
+    @property
+    def content_hash(self) -> bytes:
+        content = "\0".join([self.url, self.body, self.expected_usecase])
+
+        return hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+
+
 class AbuseDetector:
+    """Scores the sampled requests in the background.
+
+    Requests are put in a bounded queue without waiting, samples are dropped when it's
+    full. A single worker task scores up to `batch_size` samples with one model call, so
+    that scoring never competes with the user requests for the model connections. Identical
+    samples are scored once and their score is reused from the cache.
+    """
+
     SYSTEM_PROMPT = textwrap.dedent(
         """
-    You're an abuse detector that evaluates if a user request is aligned with the expected use case.
+    You're an abuse detector that evaluates if user requests are aligned with the expected use case.
     """
     ).strip()
 
-    SCORE_TAG_START = "<score>"
-    SCORE_TAG_END = "</score>"
+    SCORES_TAG_START = "<scores>"
+    SCORES_TAG_END = "</scores>"
 
     # https://docs.anthropic.com/en/docs/use-examples
     QUERY_TEMPLATE = textwrap.dedent(
         """
+    <user_request id="{request_id}">
     <user_request_url>{user_request_url}</user_request_url>
     <user_request_body>{user_request_body}</user_request_body>
     <expected_usecase>{expected_usecase}</expected_usecase>
+    </user_request>
     """
     ).strip()
 
-    EXAMPLE_TEMPLATE = QUERY_TEMPLATE + "\n<score>{score}</score>"
-    EXAMPLES = [
-        EXAMPLE_TEMPLATE.format(
+    SCORE_TEMPLATE = '<score id="{request_id}">{score}</score>'
+    EXAMPLE = (
+        QUERY_TEMPLATE.format(
+            request_id=0,
             user_request_url="http://0.0.0.0:5052/v1/proxy/anthropic/v1/messages",
             user_request_body='{"messages": [{ "role": "user", "content": "How can I create an issue in GitLab?" }]}',
             expected_usecase="Asking a question about how to use GitLab.",
-            score=0.1,
-        ),
-        EXAMPLE_TEMPLATE.format(
+        )
+        + "\n"
+        + QUERY_TEMPLATE.format(
+            request_id=1,
             user_request_url="http://0.0.0.0:5052/v1/proxy/anthropic/v1/messages",
             user_request_body='{"messages": [{ "role": "user", "content": "How can I fork a repository in GitLab?" }]}',
             expected_usecase="Asking about how to resolve a security vulnerability in the given CVE or code.",
-            score=1.0,
-        ),
-    ]
-    EXAMPLE_PROMPT = "".join([f"\n<example>\n{e}\n</example>\n" for e in EXAMPLES])
+        )
+        + "\n"
+        + SCORES_TAG_START
+        + SCORE_TEMPLATE.format(request_id=0, score=0.1)
+        + SCORE_TEMPLATE.format(request_id=1, score=1.0)
+        + SCORES_TAG_END
+    )
+    EXAMPLE_PROMPT = f"\n<example>\n{EXAMPLE}\n</example>\n"
 
     BASE_USER_PROMPT = (
         textwrap.dedent(
             """
-    Evaluate if the user request is aligned with the expected use case.
+    Evaluate if each user request is aligned with its expected use case.
     Give a score between 0.0-1.0 (higher is more misaligned) for the criteria.
 
-    The evaluation score should be placed in the XML tag <score></score>.
+    The evaluation score of each request should be placed in the XML tag <score id=""></score>
+    with the id of the request, and all the scores in the XML tag <scores></scores>.
     """
         ).strip()
         + EXAMPLE_PROMPT
     )
 
-    def __init__(self, enabled: bool, sampling_rate: float, model: AnthropicChatModel):
+    _RE_SCORE = re.compile(r'<score id="(\d+)">([^<]*)</score>')
+
+    def __init__(
+        self,
+        enabled: bool,
+        sampling_rate: float,
+        model: ChatModelBase,
+        queue_size: int = 1_000,
+        batch_size: int = 10,
+        batch_timeout_s: float = 1.0,
+        cache_size: int = 10_000,
+        request_limiter: Optional[PriorityLimiter] = None,
+    ):
         self.enabled = enabled
         self.sampling_rate = sampling_rate
         self.model = model
+        self.batch_size = batch_size
+        self.batch_timeout_s = batch_timeout_s
+        self.cache_size = cache_size
+        self.request_limiter = request_limiter or PriorityLimiter(
+            "requests", capacity=1, enabled=False
+        )
+
+        self.queue: asyncio.Queue[AbuseSample] = asyncio.Queue(maxsize=queue_size)
+        self.scores: OrderedDict[bytes, float] = OrderedDict()
+        self._worker: Optional[asyncio.Task] = None
 
     def should_detect(self) -> bool:
         if not self.enabled:
@@ -97,30 +185,93 @@ class AbuseDetector:
 
         return random.random() < self.sampling_rate
 
-    async def detect(
-        self,
-        request: Request,
-        body: str,
-        expected_usecase: str,
-    ) -> None:
-        result = await self._eval(request, body, expected_usecase)
+    def enqueue(self, request: Request, body: str, expected_usecase: str) -> bool:
+        """Queue the request to be scored in the background, returns False if it was
+        dropped."""
+        sample = AbuseSample.from_request(request, body, expected_usecase)
 
-        if result is not None:
-            self._report(result, request)
+        try:
+            self.queue.put_nowait(sample)
+        except asyncio.QueueFull:
+            ABUSE_DETECTION_DROPPED_SAMPLES.inc()
+            return False
 
-    async def _eval(
-        self,
-        request: Request,
-        body: str,
-        expected_usecase: str,
-    ) -> float | None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+        return True
+
+    async def stop(self):
+        """Cancel the worker, the samples left in the queue aren't scored."""
+        if self._worker is None:
+            return
+
+        self._worker.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._worker
+
+        self._worker = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            samples = [await self.queue.get()]
+
+            deadline = loop.time() + self.batch_timeout_s
+            while len(samples) < self.batch_size:
+                try:
+                    samples.append(
+                        await asyncio.wait_for(
+                            self.queue.get(), timeout=deadline - loop.time()
+                        )
+                    )
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._process(samples)
+            except Exception as e:
+                log_exception(e)
+
+    async def _process(self, samples: list[AbuseSample]) -> None:
+        pending: dict[bytes, list[AbuseSample]] = {}
+
+        for sample in samples:
+            content_hash = sample.content_hash
+
+            if (score := self._cached_score(content_hash)) is not None:
+                self._report(score, sample)
+            else:
+                pending.setdefault(content_hash, []).append(sample)
+
+        if not pending:
+            return
+
+        # Scoring yields the upstream slots to the requests waited for by the users
+        async with self.request_limiter.slot(WorkloadClass.BACKGROUND):
+            scores = await self._eval([group[0] for group in pending.values()])
+
+        for (content_hash, group), score in zip(pending.items(), scores):
+            if score is None:
+                continue
+
+            self._cache_score(content_hash, score)
+            for sample in group:
+                self._report(score, sample)
+
+    async def _eval(self, samples: list[AbuseSample]) -> list[float | None]:
         prompt = (
             self.BASE_USER_PROMPT
             + "\n"
-            + self.QUERY_TEMPLATE.format(
-                user_request_url=request.url,
-                user_request_body=body,
-                expected_usecase=expected_usecase,
+            + "\n".join(
+                self.QUERY_TEMPLATE.format(
+                    request_id=request_id,
+                    user_request_url=sample.url,
+                    user_request_body=sample.body,
+                    expected_usecase=sample.expected_usecase,
+                )
+                for request_id, sample in enumerate(samples)
             )
         )
 
@@ -129,34 +280,50 @@ class AbuseDetector:
             messages=[
                 Message(role=Role.USER, content=prompt),
                 # Prefilling JSON format https://docs.anthropic.com/en/docs/control-output-format
-                Message(role=Role.ASSISTANT, content=AbuseDetector.SCORE_TAG_START),
+                Message(role=Role.ASSISTANT, content=AbuseDetector.SCORES_TAG_START),
             ],
-            stop_sequences=[AbuseDetector.SCORE_TAG_END],
-            max_tokens=8,
+            stop_sequences=[AbuseDetector.SCORES_TAG_END],
+            max_tokens=16 * len(samples),
         )
 
         log.debug("abuse detector call:", **model_request.model_dump())
         response = await self.model.generate(**dict(model_request))
         assert isinstance(response, TextGenModelOutput)
 
-        score = None
+        scores: list[float | None] = [None] * len(samples)
 
-        try:
-            score = float(response.text)
-        except Exception as e:
-            log_exception(e)
+        for request_id, score in self._RE_SCORE.findall(response.text):
+            try:
+                scores[int(request_id)] = float(score)
+            except (IndexError, ValueError) as e:
+                log_exception(e)
+
+        if None in scores:
+            log.warning(
+                "abuse detector missing scores",
+                missing=scores.count(None),
+                samples=len(samples),
+            )
+
+        return scores
+
+    def _cached_score(self, content_hash: bytes) -> float | None:
+        score = self.scores.get(content_hash)
+        if score is not None:
+            self.scores.move_to_end(content_hash)
 
         return score
 
-    def _report(self, score: float, request: Request):
-        instance_id = request.headers.get(X_GITLAB_INSTANCE_ID_HEADER, "unknown")
-        global_user_id = request.headers.get(X_GITLAB_GLOBAL_USER_ID_HEADER, "unknown")
-        unit_primitive = request.headers.get(X_GITLAB_UNIT_PRIMITIVE, "unknown")
+    def _cache_score(self, content_hash: bytes, score: float):
+        self.scores[content_hash] = score
+        if len(self.scores) > self.cache_size:
+            self.scores.popitem(last=False)
 
+    def _report(self, score: float, sample: AbuseSample):
         detail_labels = {
-            "instance_id": instance_id,
-            "global_user_id": global_user_id,
-            "unit_primitive": unit_primitive,
+            "instance_id": sample.instance_id,
+            "global_user_id": sample.global_user_id,
+            "unit_primitive": sample.unit_primitive,
         }
 
         log.info("abuse request score", score=score, **detail_labels)
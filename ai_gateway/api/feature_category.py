@@ -1,25 +1,132 @@
 import functools
 import typing
+from contextlib import AsyncExitStack, asynccontextmanager
 
+from dependency_injector.wiring import Provide, inject
 from fastapi import HTTPException, Request, status
 from gitlab_cloud_connector import (
     FEATURE_CATEGORIES_FOR_PROXY_ENDPOINTS,
     GitLabFeatureCategory,
     GitLabUnitPrimitive,
 )
+from sse_starlette.sse import EventSourceResponse
+from starlette.responses import Response, StreamingResponse
+from starlette.types import Receive, Scope, Send
 from starlette_context import context
 
+from ai_gateway.scheduling import PriorityLimiter, WorkloadClass, classify_workload
+
 X_GITLAB_UNIT_PRIMITIVE = "x-gitlab-unit-primitive"
 
 _CATEGORY_CONTEXT_KEY = "meta.feature_category"
 _UNIT_PRIMITIVE_CONTEXT_KEY = "meta.unit_primitive"
 _UNKNOWN_FEATURE_CATEGORY = "unknown"
+_RATE_LIMIT_KEY_ATTRIBUTE = "rate_limit_key"
+
+# Classifies the workload of an endpoint from its arguments
+WorkloadClassifier = typing.Callable[..., WorkloadClass]
+# Gives the key an endpoint is rate limited by from the request, before its body is read
+RateLimitKey = typing.Callable[[Request], typing.Optional[str]]
+
+
+@inject
+async def _get_request_limiter(
+    # Provided by name, the application container imports the modules using this one
+    request_limiter: PriorityLimiter = Provide["request_limiter"],
+) -> PriorityLimiter:
+    return request_limiter
+
+
+@asynccontextmanager
+async def _admit(
+    workload: WorkloadClass, unit_primitive: typing.Optional[str]
+) -> typing.AsyncIterator[WorkloadClass]:
+    """
+    Wait for a request slot, shared fairly between the users of the workload class and
+    weighted by the unit primitive.
+    """
+    request_limiter = await _get_request_limiter()
+    async with request_limiter.slot(
+        workload, unit_primitive=unit_primitive
+    ) as slot_workload:
+        yield slot_workload
+
+
+class _AdmittedResponse(Response):
+    """
+    Send a streamed response holding its request slot. The slot is released once the
+    response is sent, or fails to be, also when the client disconnects before the body
+    is iterated.
+    """
+
+    def __init__(self, response: Response, stack: AsyncExitStack):
+        # The wrapped response is sent as is, only its background task can be set
+        self.response = response
+        self.stack = stack
+        self.status_code = response.status_code
+        self.raw_headers = response.raw_headers
+        self.background = response.background
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # The background tasks don't need the slot
+        self.response.background = None
+
+        async with self.stack:
+            await self.response(scope, receive, send)
+
+        if self.background is not None:
+            await self.background()
+
+
+async def _call_admitted(
+    func: typing.Callable,
+    workload: WorkloadClass,
+    unit_primitive: typing.Optional[str],
+    *args: typing.Any,
+    **kwargs: typing.Any,
+) -> typing.Any:
+    """
+    Call the endpoint once admitted. A streamed response holds the request slot until
+    its body is sent, or the client disconnects.
+    """
+    async with AsyncExitStack() as stack:
+        await stack.enter_async_context(_admit(workload, unit_primitive))
+        response = await func(*args, **kwargs)
+
+        if isinstance(response, (StreamingResponse, EventSourceResponse)):
+            return _AdmittedResponse(response, stack.pop_all())
+
+        return response
+
+
+def _set_rate_limit_key(wrapper: typing.Callable, limit_key: RateLimitKey):
+    # Copied to the decorators wrapping this one by `functools.wraps`
+    setattr(wrapper, _RATE_LIMIT_KEY_ATTRIBUTE, limit_key)
 
 
-def feature_category(name: GitLabFeatureCategory):
+def rate_limit_key(endpoint: typing.Callable, request: Request) -> typing.Optional[str]:
+    """
+    Get the key a request to the endpoint is rate limited by, the unit primitive or the
+    feature category of the endpoint. None if the endpoint isn't rate limited.
+    """
+    limit_key: typing.Optional[RateLimitKey] = getattr(
+        endpoint, _RATE_LIMIT_KEY_ATTRIBUTE, None
+    )
+
+    return limit_key(request) if limit_key else None
+
+
+def feature_category(
+    name: GitLabFeatureCategory,
+    workload: typing.Optional[WorkloadClass | WorkloadClassifier] = None,
+):
     """
     Track a feature category in a single purpose endpoint.
 
+    The endpoint is rate limited by the feature category, see `RateLimitMiddleware`,
+    and waits for a request slot by its workload class, unless another class is given, or a function classifying
+    the request from the arguments of the endpoint.
+
     Example:
 
     ```
@@ -35,7 +142,17 @@ def feature_category(name: GitLabFeatureCategory):
         @functools.wraps(func)
         async def wrapper(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
             context[_CATEGORY_CONTEXT_KEY] = name
-            return await func(*args, **kwargs)
+            if callable(workload):
+                request_workload = workload(*args, **kwargs)
+            else:
+                request_workload = workload or classify_workload(name)
+
+            return await _call_admitted(
+                func, request_workload, limit_key, *args, **kwargs
+            )
+
+        limit_key = GitLabFeatureCategory(name).value
+        _set_rate_limit_key(wrapper, lambda _request: limit_key)
 
         return wrapper
 
@@ -87,7 +204,21 @@ def feature_categories(mapping: dict[GitLabUnitPrimitive, GitLabFeatureCategory]
 
             context[_CATEGORY_CONTEXT_KEY] = feature_category
             context[_UNIT_PRIMITIVE_CONTEXT_KEY] = unit_primitive
-            return await func(request, *args, **kwargs)
+            return await _call_admitted(
+                func,
+                classify_workload(feature_category),
+                unit_primitive,
+                request,
+                *args,
+                **kwargs,
+            )
+
+        def limit_key(request: Request) -> typing.Optional[str]:
+            # The header is validated by the endpoint
+            unit_primitive = request.headers.get(X_GITLAB_UNIT_PRIMITIVE)
+            return unit_primitive if unit_primitive in mapping else None
+
+        _set_rate_limit_key(wrapper, limit_key)
 
         return wrapper
 
@@ -117,17 +248,32 @@ def track_metadata(request_param: str, mapping: dict[str, GitLabUnitPrimitive]):
             request: Request, *args: typing.Any, **kwargs: typing.Any
         ) -> typing.Any:
             request_param_val = request.path_params[request_param]
+            workload = WorkloadClass.STANDARD
+            unit_primitive: typing.Optional[GitLabUnitPrimitive] = None
 
             if request_param_val in mapping:
                 unit_primitive = mapping[request_param_val]
                 feature_category = FEATURE_CATEGORIES_FOR_PROXY_ENDPOINTS[
                     unit_primitive
                 ]
+                workload = classify_workload(feature_category)
 
                 context[_CATEGORY_CONTEXT_KEY] = feature_category.value
                 context[_UNIT_PRIMITIVE_CONTEXT_KEY] = unit_primitive.value
 
-            return await func(request, *args, **kwargs)
+            return await _call_admitted(
+                func, workload, unit_primitive, request, *args, **kwargs
+            )
+
+        def limit_key(request: Request) -> typing.Optional[str]:
+            request_param_val = request.path_params.get(request_param)
+
+            if request_param_val in mapping:
+                return mapping[request_param_val].value
+
+            return _UNKNOWN_FEATURE_CATEGORY
+
+        _set_rate_limit_key(wrapper, limit_key)
 
         return wrapper
 
@@ -1,11 +1,14 @@
+import asyncio
 import logging
 import time
 import traceback
+import tracemalloc
 from datetime import datetime, timezone
 from typing import Optional, Tuple
 
 import structlog
 from asgi_correlation_id.context import correlation_id
+from dependency_injector.wiring import Provide, inject
 from fastapi.encoders import jsonable_encoder
 from gitlab_cloud_connector import (
     X_GITLAB_DUO_SEAT_COUNT_HEADER,
@@ -21,6 +24,7 @@ from starlette.authentication import (
     HTTPConnection,
 )
 from starlette.datastructures import CommaSeparatedStrings, MutableHeaders
+from starlette.exceptions import HTTPException
 from starlette.middleware import Middleware
 from starlette.middleware.authentication import (
     AuthenticationBackend,
@@ -28,21 +32,31 @@ from starlette.middleware.authentication import (
 )
 from starlette.middleware.base import Request
 from starlette.responses import JSONResponse
+from starlette.routing import Match
 from starlette_context import context as starlette_context
 from uvicorn.protocols.utils import get_path_with_query_string
 
 from ai_gateway.api.auth_utils import StarletteUser
+from ai_gateway.api.feature_category import rate_limit_key
 from ai_gateway.api.timing import timing
 from ai_gateway.feature_flags import current_feature_flag_context
+from ai_gateway.instrumentators.memory import MemoryProfiler
 from ai_gateway.internal_events import (
     EventContext,
     current_event_context,
     tracked_internal_events,
 )
+from ai_gateway.rate_limiting import RateLimiter, RateLimitExceeded
+from ai_gateway.scheduling import Tenant, current_tenant
 from ai_gateway.tracking.errors import log_exception
 
 __all__ = [
     "MiddlewareAuthentication",
+    "ClientDisconnectMiddleware",
+    "MemoryProfilingMiddleware",
+    "RateLimitMiddleware",
+    "RequestSizeLimitMiddleware",
+    "TenantMiddleware",
 ]
 
 log = logging.getLogger("codesuggestions")
@@ -148,6 +162,13 @@ class AccessLogMiddleware:
         finally:
             elapsed_time = time.perf_counter() - start_time_total
             cpu_time = time.process_time() - start_time_cpu
+
+            if (
+                starlette_context.data.get("cancelled")
+                and not response_start_duration_s
+            ):
+                # The client went away before we started responding (Client Closed Request)
+                status_code = 499
             url = get_path_with_query_string(request.scope)
             client_host = request.client.host
             client_port = request.client.port
@@ -437,3 +458,290 @@ class FeatureFlagMiddleware:
         starlette_context["enabled_feature_flags"] = ",".join(enabled_feature_flags)
 
         await self.app(scope, receive, send)
+
+
+class TenantMiddleware:
+    """Middleware identifying the GitLab instance and user sending the request.
+
+    The request slots are shared fairly between the instances, and the requests are
+    rate limited by instance and user. Both are taken from the authenticated user, not
+    from the headers any client can set, so it must run after the authentication.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        user = scope.get("user")
+        tenant = Tenant(client_id=request.client.host if request.client else None)
+
+        if isinstance(user, StarletteUser) and user.is_authenticated and user.claims:
+            tenant = Tenant(
+                instance_id=getattr(user.claims, "gitlab_instance_id", None) or None,
+                global_user_id=user.global_user_id,
+                client_id=user.claims.subject or tenant.client_id,
+            )
+
+        current_tenant.set(tenant)
+
+        await self.app(scope, receive, send)
+
+
+@inject
+async def _get_rate_limiter(
+    # Provided by name, the application container imports the modules using this one
+    rate_limiter: RateLimiter = Provide["rate_limiter"],
+) -> RateLimiter:
+    return rate_limiter
+
+
+class RateLimitMiddleware:
+    """Middleware rate limiting the requests by instance and user, see `TenantMiddleware`.
+
+    The request is checked before its body is read and validated, by the key given by
+    the feature category of the matched endpoint. Endpoints without a feature category
+    aren't limited.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (limit_key := self._limit_key(scope)) is None:
+            await self.app(scope, receive, send)
+            return
+
+        rate_limiter = await _get_rate_limiter()
+
+        try:
+            await rate_limiter.check(limit_key)
+        except RateLimitExceeded as ex:
+            starlette_context["rate_limited"] = ex.scope.value
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": f"Too many requests from this {ex.scope.value}"},
+                headers={"Retry-After": ex.retry_after} if ex.retry_after else None,
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def _limit_key(scope) -> Optional[str]:
+        # The router matches the request again, only the endpoint is needed here
+        for route in scope["app"].router.routes:
+            match, child_scope = route.matches(scope)
+
+            if match == Match.FULL:
+                request = Request({**scope, **child_scope})
+                return rate_limit_key(getattr(route, "endpoint", None), request)
+
+        return None
+
+
+class ClientDisconnectMiddleware:
+    """Middleware for cancelling in-flight requests when the client disconnects.
+
+    IDE clients drop completion requests as soon as the user keeps typing. Without this
+    middleware the endpoint keeps awaiting the vendor call (or streaming into a dead
+    socket) until it completes. Here, the endpoint runs in its own task and the task is
+    cancelled as soon as `http.disconnect` is received before the response is complete.
+    The cancellation propagates down to the upstream httpx/gRPC/LiteLLM call, which
+    closes the vendor connection and records a `cancelled` outcome in the model metrics.
+    """
+
+    def __init__(self, app, skip_endpoints):
+        self.app = app
+        self.path_resolver = _PathResolver.from_optional_list(skip_endpoints)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+
+        if self.path_resolver.skip_path(request.url.path):
+            await self.app(scope, receive, send)
+            return
+
+        disconnected = asyncio.Event()
+        request_complete = False
+        response_complete = False
+        watcher_task = None
+
+        async def watch_disconnect():
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    disconnected.set()
+                    return
+
+        async def receive_wrapper():
+            nonlocal request_complete, watcher_task
+
+            # Once the body has been consumed, the only message left is the disconnect
+            # one, which is read by the watcher task and replayed here.
+            if request_complete:
+                await disconnected.wait()
+                return {"type": "http.disconnect"}
+
+            message = await receive()
+
+            if message["type"] == "http.disconnect":
+                disconnected.set()
+            elif not message.get("more_body", False):
+                request_complete = True
+                watcher_task = asyncio.create_task(watch_disconnect())
+
+            return message
+
+        async def send_wrapper(message):
+            nonlocal response_complete
+
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                response_complete = True
+
+            await send(message)
+
+        app_task = asyncio.create_task(self.app(scope, receive_wrapper, send_wrapper))
+        disconnect_task = asyncio.create_task(disconnected.wait())
+
+        try:
+            await asyncio.wait(
+                {app_task, disconnect_task}, return_when=asyncio.FIRST_COMPLETED
+            )
+
+            cancelled = not app_task.done() and not response_complete
+            if cancelled:
+                app_task.cancel()
+                starlette_context["cancelled"] = True
+
+            try:
+                await app_task
+            except asyncio.CancelledError:
+                # Only swallow the cancellation issued above, not the one targeting this task.
+                if not cancelled or asyncio.current_task().cancelling():
+                    raise
+        finally:
+            for task in (app_task, disconnect_task, watcher_task):
+                if task and not task.done():
+                    task.cancel()
+
+
+class RequestSizeLimitMiddleware:
+    """Middleware rejecting the request bodies larger than the limit of their path.
+
+    Requests announcing a larger `Content-Length` are answered with a 413 before their
+    body is read. The body of the other requests is counted as it's received, so that
+    chunked requests are stopped as soon as they cross the limit instead of being
+    buffered entirely by the endpoint first.
+    """
+
+    def __init__(
+        self,
+        app,
+        skip_endpoints,
+        enabled: bool,
+        max_body_bytes: int,
+        route_max_body_bytes: Optional[dict[str, int]] = None,
+    ):
+        self.app = app
+        self.enabled = enabled
+        self.path_resolver = _PathResolver.from_optional_list(skip_endpoints)
+        self.max_body_bytes = max_body_bytes
+        self.route_max_body_bytes = route_max_body_bytes or {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+
+        if self.path_resolver.skip_path(request.url.path):
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.route_max_body_bytes.get(request.url.path, self.max_body_bytes)
+
+        try:
+            content_length = int(request.headers.get("content-length", ""))
+        except ValueError:
+            content_length = None
+
+        if content_length is not None and content_length > limit:
+            response = JSONResponse(
+                status_code=413, content={"detail": "Request body too large"}
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def receive_wrapper():
+            nonlocal received
+
+            message = await receive()
+
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(
+                        status_code=413, detail="Request body too large"
+                    )
+
+            return message
+
+        await self.app(scope, receive_wrapper, send)
+
+
+@inject
+async def _get_memory_profiler(
+    memory_profiler: MemoryProfiler = Provide["memory_profiler"],
+) -> MemoryProfiler:
+    return memory_profiler
+
+
+class MemoryProfilingMiddleware:
+    """Middleware sampling the memory allocated by the requests, by route.
+
+    Only samples while the memory profiler is tracing, see `/monitoring/memory`.
+    """
+
+    def __init__(self, app, skip_endpoints):
+        self.app = app
+        self.path_resolver = _PathResolver.from_optional_list(skip_endpoints)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.path_resolver.skip_path(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = await _get_memory_profiler()
+
+        if not profiler.should_sample():
+            await self.app(scope, receive, send)
+            return
+
+        traced_before, _ = tracemalloc.get_traced_memory()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            # The snapshots may have been cleared in the meantime
+            if profiler.tracing:
+                traced_after, _ = tracemalloc.get_traced_memory()
+                # Set by the router once the request is matched
+                route = scope.get("route")
+                profiler.record_route(
+                    getattr(route, "path", "unmatched"), traced_after - traced_before
+                )
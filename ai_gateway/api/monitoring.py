@@ -1,149 +1,130 @@
-import functools
-from typing import Any, Awaitable, Callable
+import asyncio
 
-from dependency_injector.providers import Factory
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi_health import health
 
-from ai_gateway.async_dependency_resolver import (
-    get_code_suggestions_completions_litellm_factory_provider,
-    get_code_suggestions_completions_vertex_legacy_provider,
-    get_code_suggestions_generations_anthropic_chat_factory_provider,
-)
-from ai_gateway.code_suggestions import (
-    CodeCompletions,
-    CodeCompletionsLegacy,
-    CodeGenerations,
-)
-from ai_gateway.code_suggestions.processing import MetadataPromptBuilder, Prompt
-from ai_gateway.code_suggestions.processing.typing import MetadataCodeContent
-from ai_gateway.models import (
-    KindAnthropicModel,
-    KindLiteLlmModel,
-    KindModelProvider,
-    Message,
-)
+from ai_gateway.api.auth_utils import StarletteUser, get_current_user
+from ai_gateway.async_dependency_resolver import get_health_checker, get_memory_profiler
+from ai_gateway.health import HealthChecker
+from ai_gateway.instrumentators.memory import MemoryProfiler
+from ai_gateway.models import KindModelProvider
 
 __all__ = [
+    "MEMORY_DIAGNOSTICS_SCOPE",
     "router",
 ]
 
+# Scope of the tokens allowed to read the memory diagnostics, besides the debug users
+MEMORY_DIAGNOSTICS_SCOPE = "memory_diagnostics"
+
 router = APIRouter(
     prefix="/monitoring",
     tags=["monitoring"],
 )
 
-# Avoid calling out to the models multiple times from this public, unauthenticated endpoint.
-# this is not threadsafe, but that should be fine, we aren't issuing multiple of
-# these calls in parallel. When the instance is marked as ready, we won't be modifying
-# the list anymore.
-validated: set[KindModelProvider] = set()
+# The providers are probed in the background by the health checker, these endpoints
+# only read its cached state and never call out to the models.
 
 
-def single_validation(
-    key: KindModelProvider,
-):
-    def _decorator(
-        func: Callable[[Any], Awaitable[bool]]
-    ) -> Callable[[Any, Any], Awaitable[bool]]:
+def probes_alive(health_checker: HealthChecker = Depends(get_health_checker)) -> bool:
+    return health_checker.alive()
 
-        @functools.wraps(func)
-        async def _wrapper(*args, **kwargs) -> bool:
-            if key in validated:
-                return True
 
-            result = await func(*args, **kwargs)
-            validated.add(key)
-
-            return result
+def vertex_ready(
+    health_checker: HealthChecker = Depends(get_health_checker),
+) -> bool:
+    return health_checker.provider_ready(KindModelProvider.VERTEX_AI)
 
-        return _wrapper
 
-    return _decorator
+def anthropic_ready(
+    health_checker: HealthChecker = Depends(get_health_checker),
+) -> bool:
+    return health_checker.provider_ready(KindModelProvider.ANTHROPIC)
 
 
-@single_validation(KindModelProvider.VERTEX_AI)
-async def validate_vertex_available(
-    completions_legacy_vertex_factory: Factory[CodeCompletionsLegacy] = Depends(
-        get_code_suggestions_completions_vertex_legacy_provider
-    ),
+def fireworks_ready(
+    health_checker: HealthChecker = Depends(get_health_checker),
 ) -> bool:
-    code_completions = completions_legacy_vertex_factory()
-    await code_completions.execute(
-        prefix="def hello_world():",
-        suffix="",
-        file_name="monitoring.py",
-        editor_lang="python",
-    )
-    return True
-
-
-@single_validation(KindModelProvider.ANTHROPIC)
-async def validate_anthropic_available(
-    generations_anthropic_chat_factory: Factory[CodeGenerations] = Depends(
-        get_code_suggestions_generations_anthropic_chat_factory_provider
-    ),
-) -> bool:
-    prompt = Prompt(
-        prefix=[
-            Message(content="Complete this code: def hello_world()", role="user"),
-            Message(content="<new_code>", role="assistant"),
-        ],
-        metadata=MetadataPromptBuilder(
-            components={
-                "prefix": MetadataCodeContent(length=10, length_tokens=2),
-            },
-        ),
-        suffix="# End of function",
-    )
-
-    code_generations = generations_anthropic_chat_factory(
-        model__name=KindAnthropicModel.CLAUDE_3_HAIKU.value,
-        model__stop_sequences=["</new_code>"],
-    )
-
-    # Assign the prompt to the code generations object
-    code_generations.prompt = prompt
-
-    # The generation prompt is currently built in rails, so include a minimal one
-    # here to replace that
-    await code_generations.execute(
-        prefix="",
-        file_name="monitoring.py",
-        editor_lang="python",
-        model_provider=KindModelProvider.ANTHROPIC.value,
-    )
-
-    return True
-
-
-@single_validation(KindModelProvider.FIREWORKS)
-async def validate_fireworks_available(
-    completions_litellm_factory: Factory[CodeCompletions] = Depends(
-        get_code_suggestions_completions_litellm_factory_provider
-    ),
-) -> bool:
-    code_completions = completions_litellm_factory(
-        model__name=KindLiteLlmModel.QWEN_2_5,
-        model__provider=KindModelProvider.FIREWORKS,
-    )
-    await code_completions.execute(
-        prefix="def hello_world():",
-        suffix="",
-        file_name="monitoring.py",
-        editor_lang="python",
-    )
-    return True
-
-
-router.add_api_route("/healthz", health([]))
+    return health_checker.provider_ready(KindModelProvider.FIREWORKS)
+
+
+router.add_api_route("/healthz", health([probes_alive]))
 router.add_api_route(
     "/ready",
     health(
         [
-            validate_vertex_available,
-            validate_anthropic_available,
-            validate_fireworks_available,
+            vertex_ready,
+            anthropic_ready,
+            fireworks_ready,
         ]
     ),
 )
+
+
+# Memory diagnostics of the worker serving the request. They expose the code and the
+# prompts held in memory, so they're only available when enabled in the config, and to
+# the debug users or the tokens granted `MEMORY_DIAGNOSTICS_SCOPE`.
+
+
+async def memory_diagnostics_enabled(
+    current_user: StarletteUser = Depends(get_current_user),
+    profiler: MemoryProfiler = Depends(get_memory_profiler),
+):
+    if not profiler.enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    if not current_user.is_authenticated:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized"
+        )
+
+    scopes = current_user.claims.scopes if current_user.claims else []
+    if not current_user.is_debug and MEMORY_DIAGNOSTICS_SCOPE not in (scopes or []):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+
+@router.get("/memory", dependencies=[Depends(memory_diagnostics_enabled)])
+async def memory(profiler: MemoryProfiler = Depends(get_memory_profiler)):
+    # Walking the heap takes a while on large heaps, let the event loop run meanwhile
+    return await asyncio.to_thread(profiler.summary)
+
+
+@router.post("/memory/snapshots", dependencies=[Depends(memory_diagnostics_enabled)])
+async def take_memory_snapshot(
+    limit: int = 20, profiler: MemoryProfiler = Depends(get_memory_profiler)
+):
+    snapshot_id, _ = await asyncio.to_thread(profiler.take_snapshot)
+
+    return {"id": snapshot_id, "top": profiler.top(snapshot_id, limit)}
+
+
+@router.delete(
+    "/memory/snapshots",
+    dependencies=[Depends(memory_diagnostics_enabled)],
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+async def clear_memory_snapshots(
+    profiler: MemoryProfiler = Depends(get_memory_profiler),
+):
+    profiler.clear()
+
+
+@router.get("/memory/diff", dependencies=[Depends(memory_diagnostics_enabled)])
+async def diff_memory_snapshots(
+    base: int,
+    target: int,
+    limit: int = 20,
+    profiler: MemoryProfiler = Depends(get_memory_profiler),
+):
+    for snapshot_id in (base, target):
+        if snapshot_id not in profiler.snapshots:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Unknown snapshot {snapshot_id}",
+            )
+
+    return {
+        "base": base,
+        "target": target,
+        "diff": await asyncio.to_thread(profiler.diff, base, target, limit),
+    }
@@ -0,0 +1,93 @@
+import email.message
+from typing import Annotated, Any, AsyncGenerator, Callable, Coroutine, Optional
+
+from fastapi import Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter, ValidationError
+
+__all__ = [
+    "JSONValidationRoute",
+]
+
+
+def _is_json(content_type: Optional[str]) -> bool:
+    # Same rules as FastAPI, bodies without a content type are parsed as JSON
+    if not content_type:
+        return True
+
+    message = email.message.Message()
+    message["content-type"] = content_type
+    subtype = message.get_content_subtype()
+
+    return message.get_content_maintype() == "application" and (
+        subtype == "json" or subtype.endswith("+json")
+    )
+
+
+class _ValidatedJSONRequest(Request):
+    """Request handed to FastAPI once the route has validated its JSON body.
+
+    FastAPI reads the body with `body()` then `json()`, which return the bytes read by
+    the route and the model validated from them instead of decoding the JSON again.
+    """
+
+    def __init__(self, request: Request, body: bytes, validated_body: Any):
+        super().__init__(request.scope, request.receive)
+        self._body_bytes = body
+        self._validated_body = validated_body
+
+    async def stream(self) -> AsyncGenerator[bytes, None]:
+        yield self._body_bytes
+        yield b""
+
+    async def body(self) -> bytes:
+        return self._body_bytes
+
+    async def json(self) -> Any:
+        return self._validated_body
+
+
+class JSONValidationRoute(APIRoute):
+    """Route validating its JSON body while it's parsed.
+
+    FastAPI decodes the whole body into Python objects before validating them against
+    the body model. Here, pydantic-core validates the body straight from its bytes, so
+    that the fields exceeding their constraints are rejected without building the
+    intermediate objects first. The validated model is then handed over to FastAPI,
+    which doesn't validate it again. Invalid JSON goes through the default path to keep
+    the same error responses.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[None, None, Response]]:
+        handler = super().get_route_handler()
+
+        # Bodies made of several parameters are embedded in an object built by FastAPI
+        if self.body_field is None or self._embed_body_fields:
+            return handler
+
+        field_info = self.body_field.field_info
+        body_adapter = TypeAdapter(Annotated[field_info.annotation, field_info])
+
+        async def route_handler(request: Request) -> Response:
+            if _is_json(request.headers.get("content-type")):
+                body = await request.body()
+                if body:
+                    try:
+                        request = _ValidatedJSONRequest(
+                            request, body, body_adapter.validate_json(body)
+                        )
+                    except ValidationError as ex:
+                        errors = ex.errors(include_url=False)
+                        if not any(error["type"] == "json_invalid" for error in errors):
+                            raise RequestValidationError(
+                                [
+                                    {**error, "loc": ("body", *error["loc"])}
+                                    for error in errors
+                                ],
+                                body=body,
+                            )
+
+            return await handler(request)
+
+        return route_handler
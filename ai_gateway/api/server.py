@@ -2,7 +2,6 @@ import asyncio
 import os
 from contextlib import asynccontextmanager
 
-import litellm
 import structlog
 from fastapi import APIRouter, FastAPI
 from fastapi.exception_handlers import http_exception_handler
@@ -21,35 +20,48 @@ from starlette_context.middleware import RawContextMiddleware
 
 from ai_gateway.api.middleware import (
     AccessLogMiddleware,
+    ClientDisconnectMiddleware,
     DistributedTraceMiddleware,
     FeatureFlagMiddleware,
     InternalEventMiddleware,
+    MemoryProfilingMiddleware,
     MiddlewareAuthentication,
+    RateLimitMiddleware,
+    RequestSizeLimitMiddleware,
+    TenantMiddleware,
 )
 from ai_gateway.api.monitoring import router as http_monitoring_router
 from ai_gateway.api.v1 import api_router as http_api_router_v1
 from ai_gateway.api.v2 import api_router as http_api_router_v2
 from ai_gateway.api.v3 import api_router as http_api_router_v3
 from ai_gateway.api.v4 import api_router as http_api_router_v4
+from ai_gateway.code_suggestions.prompts.parsers import compile_queries
 from ai_gateway.config import Config
 from ai_gateway.container import ContainerApplication
 from ai_gateway.instrumentators.threads import monitor_threads
-from ai_gateway.models import ModelAPIError
+from ai_gateway.models import CircuitBreakerOpenError, ModelAPIError
 from ai_gateway.profiling import setup_profiling
+from ai_gateway.serialization import JSONResponse
+from ai_gateway.startup import StartupTimings, lazy_import, load_lazy_imports
 from ai_gateway.structured_logging import setup_app_logging
 
 __all__ = [
     "create_fast_api_server",
+    "setup_container",
 ]
 
 _SKIP_ENDPOINTS = ["/monitoring/healthz", "/monitoring/ready", "/metrics"]
 
+litellm = lazy_import("litellm")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     config = app.extra["extra"]["config"]
-    container_application = ContainerApplication()
-    container_application.config.from_dict(config.model_dump())
+    timings = StartupTimings()
+
+    with timings.measure("container"):
+        container_application = setup_container(app)
 
     if config.instrumentator.thread_monitoring_enabled:
         loop = asyncio.get_running_loop()
@@ -59,10 +71,42 @@ async def lifespan(app: FastAPI):
             )
         )
 
+    # Settings are applied when LiteLLM is imported if integrations are deferred
     setup_litellm(config)
 
+    if not config.startup.lazy_integrations:
+        with timings.measure("integrations"):
+            load_lazy_imports()
+
+    # Compile the tree-sitter queries used to parse code suggestions requests
+    with timings.measure("tree_sitter_queries"):
+        compile_queries()
+
+    # Start the background services of the container, they are stopped on shutdown
+    await container_application.init_resources()
+
+    timings.log()
+
     yield
 
+    await container_application.shutdown_resources()
+
+
+def setup_container(app: FastAPI) -> ContainerApplication:
+    """Create the application container once per process.
+
+    In pre-fork mode, the master process creates it before forking the workers so that they
+    share the state it has loaded.
+    """
+    extra = app.extra["extra"]
+
+    if "container_application" not in extra:
+        container_application = ContainerApplication()
+        container_application.config.from_dict(extra["config"].model_dump())
+        extra["container_application"] = container_application
+
+    return extra["container_application"]
+
 
 def create_fast_api_server(config: Config):
     fastapi_app = FastAPI(
@@ -72,6 +116,7 @@ def create_fast_api_server(config: Config):
         docs_url=config.fastapi.docs_url,
         redoc_url=config.fastapi.redoc_url,
         swagger_ui_parameters={"defaultModelsExpandDepth": -1},
+        default_response_class=JSONResponse,
         lifespan=lifespan,
         middleware=[
             Middleware(RawContextMiddleware),
@@ -85,6 +130,17 @@ def create_fast_api_server(config: Config):
                 AccessLogMiddleware,
                 skip_endpoints=[],
             ),
+            Middleware(
+                RequestSizeLimitMiddleware,
+                skip_endpoints=_SKIP_ENDPOINTS,
+                enabled=config.request_limits.enabled,
+                max_body_bytes=config.request_limits.max_body_bytes,
+                route_max_body_bytes=config.request_limits.route_max_body_bytes,
+            ),
+            Middleware(
+                ClientDisconnectMiddleware,
+                skip_endpoints=_SKIP_ENDPOINTS,
+            ),
             Middleware(
                 DistributedTraceMiddleware,
                 skip_endpoints=_SKIP_ENDPOINTS,
@@ -117,12 +173,15 @@ def create_fast_api_server(config: Config):
                 FeatureFlagMiddleware,
                 disallowed_flags=config.feature_flags.disallowed_flags,
             ),
+            Middleware(TenantMiddleware),
+            Middleware(RateLimitMiddleware),
             Middleware(
                 InternalEventMiddleware,
                 skip_endpoints=_SKIP_ENDPOINTS,
                 enabled=config.internal_event.enabled,
                 environment=config.environment,
             ),
+            Middleware(MemoryProfilingMiddleware, skip_endpoints=_SKIP_ENDPOINTS),
         ],
         extra={"config": config},
     )
@@ -142,7 +201,9 @@ async def custom_http_exception_handler(request: Request, exc: StarletteHTTPExce
     return await http_exception_handler(request, exc)
 
 
-async def model_api_exception_handler(request: Request, exc: ModelAPIError):
+async def model_api_exception_handler(
+    request: Request, exc: ModelAPIError | CircuitBreakerOpenError
+):
     wrapped_exception = StarletteHTTPException(
         status_code=503,
         detail="Inference failed",
@@ -153,6 +214,7 @@ async def model_api_exception_handler(request: Request, exc: ModelAPIError):
 def setup_custom_exception_handlers(app: FastAPI):
     app.add_exception_handler(StarletteHTTPException, custom_http_exception_handler)
     app.add_exception_handler(ModelAPIError, model_api_exception_handler)
+    app.add_exception_handler(CircuitBreakerOpenError, model_api_exception_handler)
 
 
 def setup_litellm(config: Config):
@@ -19,15 +19,18 @@ from ai_gateway.async_dependency_resolver import (
     get_chat_anthropic_claude_factory_provider,
     get_chat_litellm_factory_provider,
     get_internal_event_client,
+    get_stream_coalescer,
 )
 from ai_gateway.internal_events import InternalEventsClient
 from ai_gateway.models import (
     AnthropicAPIConnectionError,
     AnthropicAPIStatusError,
     AnthropicAPITimeoutError,
+    CircuitBreakerOpenError,
     KindModelProvider,
 )
 from ai_gateway.models.base_text import TextGenModelChunk, TextGenModelOutput
+from ai_gateway.streaming import StreamCoalescer
 from ai_gateway.tracking import log_exception
 
 __all__ = [
@@ -75,6 +78,7 @@ async def chat(
     ),
     litellm_factory: Factory = Depends(get_chat_litellm_factory_provider),
     internal_event_client: InternalEventsClient = Depends(get_internal_event_client),
+    stream_coalescer: StreamCoalescer = Depends(get_stream_coalescer),
 ):
     prompt_component = chat_request.prompt_components[0]
     payload = prompt_component.payload
@@ -104,7 +108,7 @@ async def chat(
             )
 
         if isinstance(completion, AsyncIterator):
-            return await _handle_stream(completion)
+            return await _handle_stream(completion, stream_coalescer)
         return ChatResponse(
             response=completion.text,
             metadata=ChatResponseMetadata(
@@ -131,6 +135,12 @@ async def chat(
             status_code=status.HTTP_502_BAD_GATEWAY,
             detail="Anthropic API Connection Error.",
         )
+    except CircuitBreakerOpenError as ex:
+        log_exception(ex)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Model API is unavailable.",
+        )
 
 
 async def _generate_completion(
@@ -139,6 +149,7 @@ async def _generate_completion(
     stream: bool = False,
 ) -> Union[TextGenModelOutput, AsyncIterator[TextGenModelChunk]]:
     opts = prompt.params.dict() if prompt.params else {}
+    cache_prompt = opts.pop("cache_prompt", False)
 
     if isinstance(prompt.content, str):
         factory_type = (
@@ -151,6 +162,9 @@ async def _generate_completion(
         )
         opts.update({"messages": prompt.content, "stream": stream})
 
+        if cache_prompt:
+            opts["cache_prompt"] = True
+
         # Hack: Anthropic renamed the `max_tokens_to_sample` arg to `max_tokens` for the new Message API
         if max_tokens := opts.pop("max_tokens_to_sample", None):
             opts["max_tokens"] = max_tokens
@@ -169,9 +183,15 @@ async def _generate_completion(
 
 async def _handle_stream(
     response: AsyncIterator[TextGenModelChunk],
+    stream_coalescer: StreamCoalescer,
 ) -> StreamChatResponse:
     async def _stream_generator():
         async for result in response:
             yield result.text
 
-    return StreamChatResponse(_stream_generator(), media_type="text/event-stream")
+    return StreamChatResponse(
+        stream_coalescer.coalesce(
+            _stream_generator(), route="/v1/chat/{chat_invokable}"
+        ),
+        media_type="text/event-stream",
+    )
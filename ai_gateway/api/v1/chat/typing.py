@@ -33,6 +33,8 @@ class AnthropicParams(BaseModel):
     ]
     temperature: Annotated[float, Field(ge=0.0, le=1.0)] = 0.2
     max_tokens_to_sample: Annotated[int, Field(ge=1, le=8192)] = 8192
+    # Mark the system prompt and the conversation history as cacheable (Messages API only)
+    cache_prompt: bool = False
 
 
 class PromptPayload(BaseModel):
@@ -29,7 +29,7 @@ def authorize_with_unit_primitive_header():
             *args: typing.Any,
             **kwargs: typing.Any,
         ) -> typing.Any:
-            await _validate_request(request, background_tasks, abuse_detector)
+            await _validate_request(request, abuse_detector)
             return await func(
                 request, background_tasks, abuse_detector, *args, **kwargs
             )
@@ -39,9 +39,7 @@ def authorize_with_unit_primitive_header():
     return decorator
 
 
-async def _validate_request(
-    request: Request, background_tasks: BackgroundTasks, abuse_detector: AbuseDetector
-) -> None:
+async def _validate_request(request: Request, abuse_detector: AbuseDetector) -> None:
     if X_GITLAB_UNIT_PRIMITIVE not in request.headers:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -71,4 +69,4 @@ async def _validate_request(
         body = body_bytes.decode("utf-8", errors="ignore")
 
         description = UNIT_PRIMITIVE_AND_DESCRIPTION_MAPPING.get(unit_primitive, "")
-        background_tasks.add_task(abuse_detector.detect, request, body, description)
+        abuse_detector.enqueue(request, body, description)
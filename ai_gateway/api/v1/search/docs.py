@@ -18,9 +18,11 @@ from ai_gateway.api.v1.search.typing import (
 from ai_gateway.async_dependency_resolver import (
     get_internal_event_client,
     get_search_factory_provider,
+    get_token_estimator,
 )
 from ai_gateway.internal_events import InternalEventsClient
 from ai_gateway.searches import Searcher
+from ai_gateway.token_estimation import TokenEstimator
 
 __all__ = [
     "router",
@@ -33,18 +35,15 @@ router = APIRouter()
 request_log = get_request_logger("search")
 
 
-def estimate_token_count(text: str) -> int:
-    """Estimate the number of tokens in a given text (approx: 1.4 x word count)."""
-    return int(len(text.split()) * 1.4)
-
-
-def limit_search_results(response, max_tokens: int) -> tuple[list[SearchResult], int]:
+def limit_search_results(
+    response, max_tokens: int, token_estimator: TokenEstimator
+) -> tuple[list[SearchResult], int]:
     """Limit search results based on a maximum token count."""
     token_count = 0
     results = []
 
     for result in response:
-        tokens = estimate_token_count(result["content"])
+        tokens = token_estimator.estimate(result["content"])
         if token_count + tokens > max_tokens:
             break
         token_count += tokens
@@ -99,6 +98,7 @@ async def docs(
     search_request: SearchRequest,
     search_factory: Factory[Searcher] = Depends(get_search_factory_provider),
     internal_event_client: InternalEventsClient = Depends(get_internal_event_client),
+    token_estimator: TokenEstimator = Depends(get_token_estimator),
 ):
     if not current_user.can(GitLabUnitPrimitive.DOCUMENTATION_SEARCH):
         raise HTTPException(
@@ -126,7 +126,9 @@ async def docs(
     custom_models_enabled = config.custom_models.enabled
 
     if custom_models_enabled:
-        results, token_count = limit_search_results(response, max_tokens=8000)
+        results, token_count = limit_search_results(
+            response, max_tokens=8000, token_estimator=token_estimator
+        )
     else:
         results = [
             SearchResult(
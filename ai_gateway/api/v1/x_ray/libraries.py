@@ -17,6 +17,7 @@ from ai_gateway.async_dependency_resolver import (
 )
 from ai_gateway.internal_events import InternalEventsClient
 from ai_gateway.models import AnthropicModel
+from ai_gateway.scheduling import WorkloadClass
 
 __all__ = [
     "router",
@@ -34,7 +35,8 @@ router = APIRouter()
     summary="Deprecated endpoint",
     description="This endpoint is deprecated and will be removed https://gitlab.com/gitlab-org/modelops/applied-ml/code-suggestions/ai-assist/-/issues/692",
 )
-@feature_category(GitLabFeatureCategory.CODE_SUGGESTIONS)
+# Library descriptions are generated in the background, not waited for in the editor
+@feature_category(GitLabFeatureCategory.CODE_SUGGESTIONS, WorkloadClass.BACKGROUND)
 async def libraries(
     request: Request,
     payload: XRayRequest,
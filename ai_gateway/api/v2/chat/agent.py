@@ -11,6 +11,7 @@ from ai_gateway.api.v2.chat.typing import AgentRequest
 from ai_gateway.async_dependency_resolver import (
     get_container_application,
     get_internal_event_client,
+    get_stream_coalescer,
 )
 from ai_gateway.chat.agents import (
     AdditionalContext,
@@ -21,6 +22,7 @@ from ai_gateway.chat.agents import (
 )
 from ai_gateway.chat.executor import GLAgentRemoteExecutor
 from ai_gateway.internal_events import InternalEventsClient
+from ai_gateway.streaming import StreamCoalescer
 
 __all__ = [
     "router",
@@ -92,6 +94,7 @@ async def chat(
         ReActAgentInputs, TypeAgentEvent
     ] = Depends(get_gl_agent_remote_executor),
     internal_event_client: InternalEventsClient = Depends(get_internal_event_client),
+    stream_coalescer: StreamCoalescer = Depends(get_stream_coalescer),
 ):
     authorize_agent_request(current_user, agent_request, internal_event_client)
 
@@ -134,5 +137,8 @@ async def chat(
     # Ref: https://github.com/encode/starlette/discussions/1739#discussioncomment-3094935.
     # If an exception is raised during the process, you will see `exception_message` field in the access log.
     return StreamingResponse(
-        _stream_handler(stream_events), media_type="application/x-ndjson; charset=utf-8"
+        stream_coalescer.coalesce(
+            _stream_handler(stream_events), route="/v2/chat/agent"
+        ),
+        media_type="application/x-ndjson; charset=utf-8",
     )
@@ -14,6 +14,7 @@ from ai_gateway.api.auth_utils import StarletteUser, get_current_user
 from ai_gateway.api.error_utils import capture_validation_errors
 from ai_gateway.api.feature_category import feature_category
 from ai_gateway.api.middleware import X_GITLAB_LANGUAGE_SERVER_VERSION
+from ai_gateway.api.routing import JSONValidationRoute
 from ai_gateway.api.snowplow_context import get_snowplow_code_suggestion_context
 from ai_gateway.api.v2.code.typing import (
     CompletionsRequestV1,
@@ -58,6 +59,7 @@ from ai_gateway.models import KindAnthropicModel, KindModelProvider
 from ai_gateway.models.base import TokensConsumptionMetadata
 from ai_gateway.prompts import BasePromptRegistry
 from ai_gateway.prompts.typing import ModelMetadata
+from ai_gateway.scheduling import classify_workload
 from ai_gateway.structured_logging import get_request_logger
 from ai_gateway.tracking import SnowplowEvent, SnowplowEventContext
 from ai_gateway.tracking.errors import log_exception
@@ -70,7 +72,7 @@ __all__ = [
 
 request_log = get_request_logger("codesuggestions")
 
-router = APIRouter()
+router = APIRouter(route_class=JSONValidationRoute)
 
 CompletionsRequestWithVersion = Annotated[
     Union[CompletionsRequestV1, CompletionsRequestV2, CompletionsRequestV3],
@@ -229,7 +231,10 @@ async def completions(
 
 
 @router.post("/code/generations")
-@feature_category(GitLabFeatureCategory.CODE_SUGGESTIONS)
+@feature_category(
+    GitLabFeatureCategory.CODE_SUGGESTIONS,
+    classify_workload(GitLabFeatureCategory.CODE_SUGGESTIONS, generation=True),
+)
 @capture_validation_errors()
 async def generations(
     request: Request,
@@ -13,6 +13,7 @@ from gitlab_cloud_connector import (
 from ai_gateway.api.auth_utils import StarletteUser, get_current_user
 from ai_gateway.api.feature_category import feature_category
 from ai_gateway.api.middleware import X_GITLAB_LANGUAGE_SERVER_VERSION
+from ai_gateway.api.routing import JSONValidationRoute
 from ai_gateway.api.snowplow_context import get_snowplow_code_suggestion_context
 from ai_gateway.api.v3.code.typing import (
     CodeContextPayload,
@@ -40,23 +41,33 @@ from ai_gateway.config import Config
 from ai_gateway.container import ContainerApplication
 from ai_gateway.models import KindModelProvider
 from ai_gateway.prompts import BasePromptRegistry
+from ai_gateway.scheduling import WorkloadClass, classify_workload
 from ai_gateway.structured_logging import get_request_logger
 from ai_gateway.tracking import SnowplowEventContext
 
 __all__ = [
     "router",
+    "classify_code_suggestion",
     "code_suggestions",
 ]
 
 request_log = get_request_logger("codesuggestions")
 
-router = APIRouter()
+router = APIRouter(route_class=JSONValidationRoute)
 
 
 async def get_prompt_registry():
     yield get_container_application().pkg_prompts.prompt_registry()
 
 
+def classify_code_suggestion(payload: CompletionRequest, **_kwargs) -> WorkloadClass:
+    # Classified by the suggestion intent, as the completions and generations of v2 are
+    return classify_workload(
+        GitLabFeatureCategory.CODE_SUGGESTIONS,
+        generation=payload.prompt_components[0].type == CodeEditorComponents.GENERATION,
+    )
+
+
 async def handle_stream(
     stream: AsyncIterator[CodeSuggestionsChunk],
     engine: StreamModelEngine,
@@ -71,7 +82,7 @@ async def handle_stream(
 
 
 @router.post("/completions")
-@feature_category(GitLabFeatureCategory.CODE_SUGGESTIONS)
+@feature_category(GitLabFeatureCategory.CODE_SUGGESTIONS, classify_code_suggestion)
 async def completions(
     request: Request,
     payload: CompletionRequest,
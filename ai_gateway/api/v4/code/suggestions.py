@@ -1,3 +1,4 @@
+import functools
 from time import time
 from typing import Annotated, AsyncIterator
 
@@ -7,6 +8,8 @@ from sse_starlette.sse import EventSourceResponse
 
 from ai_gateway.api.auth_utils import StarletteUser, get_current_user
 from ai_gateway.api.feature_category import feature_category
+from ai_gateway.api.routing import JSONValidationRoute
+from ai_gateway.api.v3.code.completions import classify_code_suggestion
 from ai_gateway.api.v3.code.completions import code_suggestions as v3_code_suggestions
 from ai_gateway.api.v3.code.typing import (
     CompletionRequest,
@@ -14,22 +17,22 @@ from ai_gateway.api.v3.code.typing import (
     ResponseMetadataBase,
     StreamModelEngine,
 )
-from ai_gateway.api.v4.code.typing import (
-    StreamDelta,
-    StreamEvent,
-    StreamSSEMessage,
-    StreamSuggestionChunk,
+from ai_gateway.api.v4.code.typing import StreamEvent, StreamSSEMessage
+from ai_gateway.async_dependency_resolver import (
+    get_config,
+    get_container_application,
+    get_stream_coalescer,
 )
-from ai_gateway.async_dependency_resolver import get_config, get_container_application
 from ai_gateway.code_suggestions import CodeSuggestionsChunk
 from ai_gateway.config import Config
 from ai_gateway.prompts import BasePromptRegistry
+from ai_gateway.streaming import StreamCoalescer
 
 __all__ = [
     "router",
 ]
 
-router = APIRouter()
+router = APIRouter(route_class=JSONValidationRoute)
 
 
 async def get_prompt_registry():
@@ -39,7 +42,12 @@ async def get_prompt_registry():
 async def handle_stream_sse(
     stream: AsyncIterator[CodeSuggestionsChunk],
     engine: StreamModelEngine,
+    stream_coalescer: StreamCoalescer,
 ) -> EventSourceResponse:
+    async def _stream_text():
+        async for chunk in stream:
+            yield chunk.text
+
     async def _stream_response_generator():
         def _start_message():
             # To minimize redundancy, we're only sending metadata in the first SSE message.
@@ -56,25 +64,15 @@ async def handle_stream_sse(
                 },
             ).dump_with_json_data()
 
-        def _content_message(chunk):
-            return StreamSSEMessage(
-                event=StreamEvent.CONTENT_CHUNK,
-                data=StreamSuggestionChunk(
-                    choices=[
-                        StreamSuggestionChunk.Choice(
-                            delta=StreamDelta(content=chunk.text)
-                        )
-                    ],
-                ).model_dump(),
-            ).dump_with_json_data()
-
         def _end_message():
             return StreamSSEMessage(event=StreamEvent.END).dump_with_json_data()
 
         yield _start_message()
 
-        async for chunk in stream:
-            yield _content_message(chunk)
+        async for text in stream_coalescer.coalesce(
+            _stream_text(), route="/v4/code/suggestions"
+        ):
+            yield StreamSSEMessage.content_chunk(text)
 
         yield _end_message()
 
@@ -84,13 +82,14 @@ async def handle_stream_sse(
 
 
 @router.post("/suggestions")
-@feature_category(GitLabFeatureCategory.CODE_SUGGESTIONS)
+@feature_category(GitLabFeatureCategory.CODE_SUGGESTIONS, classify_code_suggestion)
 async def suggestions(
     request: Request,
     payload: CompletionRequest,
     current_user: Annotated[StarletteUser, Depends(get_current_user)],
     prompt_registry: Annotated[BasePromptRegistry, Depends(get_prompt_registry)],
     config: Annotated[Config, Depends(get_config)],
+    stream_coalescer: Annotated[StreamCoalescer, Depends(get_stream_coalescer)],
 ):
     return await v3_code_suggestions(
         request=request,
@@ -98,5 +97,7 @@ async def suggestions(
         current_user=current_user,
         prompt_registry=prompt_registry,
         config=config,
-        stream_handler=handle_stream_sse,
+        stream_handler=functools.partial(
+            handle_stream_sse, stream_coalescer=stream_coalescer
+        ),
     )
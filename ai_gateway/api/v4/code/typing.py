@@ -1,9 +1,10 @@
-import json
 from enum import StrEnum
 from typing import Optional
 
 from pydantic import BaseModel
 
+from ai_gateway.serialization import json_dumps
+
 __all__ = [
     "StreamDelta",
     "StreamSuggestionChunk",
@@ -36,6 +37,18 @@ class StreamSSEMessage(BaseModel):
     data: Optional[dict] = None
 
     def dump_with_json_data(self) -> dict:
-        model_dump = self.model_dump()
-        model_dump["data"] = json.dumps(self.data)
-        return model_dump
+        return {"event": self.event, "data": json_dumps(self.data)}
+
+    @staticmethod
+    def content_chunk(content: str) -> dict:
+        """Same as the content chunk message dumped with JSON data.
+
+        Content chunks are streamed for every few tokens, so the data is built as a
+        dict matching `StreamSuggestionChunk` instead of validating a model.
+        """
+        return {
+            "event": StreamEvent.CONTENT_CHUNK,
+            "data": json_dumps(
+                {"choices": [{"delta": {"content": content}, "index": 0}]}
+            ),
+        }
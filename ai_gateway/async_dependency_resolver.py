@@ -32,6 +32,22 @@ async def get_config():
     yield get_container_application().config
 
 
+async def get_stream_coalescer():
+    yield get_container_application().stream_coalescer()
+
+
+async def get_health_checker():
+    yield get_container_application().health.health_checker()
+
+
+async def get_token_estimator():
+    yield get_container_application().token_estimator()
+
+
+async def get_memory_profiler():
+    yield get_container_application().memory_profiler()
+
+
 async def get_chat_anthropic_claude_factory_provider():
     yield get_container_application().chat.anthropic_claude_factory
 
@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 from typing import Any, AsyncIterator, Optional
 
 import starlette_context
@@ -128,6 +129,28 @@ class ReActPlainTextParser(BaseCumulativeTransformOutputParser):
         return self.parse_result([Generation(text=text)])
 
 
+def _as_tuple(values: Optional[list]) -> Optional[tuple]:
+    return None if values is None else tuple(values)
+
+
+@lru_cache(maxsize=256)
+def _render_system_prompt(
+    template: str,
+    tools: Optional[tuple[BaseTool, ...]],
+    unavailable_resources: Optional[tuple[str, ...]],
+) -> str:
+    # The system prompt only depends on the tools of the user and the unavailable
+    # resources, which take a handful of values. They're rendered as lists like the
+    # values of the inputs.
+    return jinja2_formatter(
+        template,
+        tools=None if tools is None else list(tools),
+        unavailable_resources=(
+            None if unavailable_resources is None else list(unavailable_resources)
+        ),
+    )
+
+
 class ReActPromptTemplate(Runnable[ReActAgentInputs, PromptValue]):
     def __init__(self, prompt_template: dict[str, str]):
         self.prompt_template = prompt_template
@@ -143,10 +166,10 @@ class ReActPromptTemplate(Runnable[ReActAgentInputs, PromptValue]):
         if "system" in self.prompt_template:
             messages.append(
                 SystemMessage(
-                    jinja2_formatter(
+                    _render_system_prompt(
                         self.prompt_template["system"],
-                        tools=input.tools,
-                        unavailable_resources=input.unavailable_resources,
+                        _as_tuple(input.tools),
+                        _as_tuple(input.unavailable_resources),
                     )
                 )
             )
@@ -1,9 +1,9 @@
-import json
 from typing import Literal, Optional, TypeVar
 
 from pydantic import BaseModel
 
 from ai_gateway.models.base_chat import Role
+from ai_gateway.serialization import json_dumps
 
 __all__ = [
     "AgentToolAction",
@@ -25,7 +25,7 @@ class AgentBaseEvent(BaseModel):
     def dump_as_response(self) -> str:
         model_dump = self.model_dump()
         type = model_dump.pop("type")
-        return json.dumps({"type": type, "data": model_dump})
+        return json_dumps({"type": type, "data": model_dump})
 
 
 class AgentToolAction(AgentBaseEvent):
@@ -1,7 +1,9 @@
+import time
 from typing import AsyncIterator, Generic, Protocol
 
 import starlette_context
 from langchain_core.runnables import Runnable
+from prometheus_client import Histogram
 
 from ai_gateway.api.auth_utils import StarletteUser
 from ai_gateway.chat.agents import (
@@ -27,6 +29,13 @@ _REACT_AGENT_AVAILABLE_TOOL_NAMES_CONTEXT_KEY = "duo_chat.agent_available_tools"
 
 log = get_request_logger("gl_agent_remote_executor")
 
+AGENT_SETUP_DURATION_HISTOGRAM = Histogram(
+    "duo_chat_agent_setup_duration_seconds",
+    "Duration of the setup of the Duo Chat agent before it's called in seconds",
+    ["stage"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+
 
 class TypeAgentFactory(Protocol[TypeAgentEvent]):
     def __call__(
@@ -65,14 +74,21 @@ class GLAgentRemoteExecutor(Generic[TypeAgentInputs, TypeAgentEvent]):
         # (in case of invalid unit primitives) before starting the data stream.
         # Reason: https://github.com/tiangolo/fastapi/discussions/10138
         if not user.is_debug:
-            self._tools = self.tools_registry.get_on_behalf(user, gl_version)
+            with AGENT_SETUP_DURATION_HISTOGRAM.labels(stage="tools").time():
+                self._tools = self.tools_registry.get_on_behalf(user, gl_version)
 
     async def stream(self, *, inputs: TypeAgentInputs) -> AsyncIterator[TypeAgentEvent]:
+        start = time.perf_counter()
+
         inputs.tools = self.tools
         agent: ReActAgent = self.agent_factory(model_metadata=inputs.model_metadata)
 
         tools_by_name = self.tools_by_name
 
+        AGENT_SETUP_DURATION_HISTOGRAM.labels(stage="agent").observe(
+            time.perf_counter() - start
+        )
+
         starlette_context.context[_REACT_AGENT_AVAILABLE_TOOL_NAMES_CONTEXT_KEY] = list(
             tools_by_name.keys()
         )
@@ -1,3 +1,7 @@
+from functools import lru_cache
+
+from gitlab_cloud_connector import GitLabUnitPrimitive
+
 from ai_gateway.api.auth_utils import StarletteUser
 from ai_gateway.chat.base import BaseToolsRegistry
 from ai_gateway.chat.tools import BaseTool
@@ -15,45 +19,78 @@ from ai_gateway.feature_flags import FeatureFlag, is_feature_enabled
 __all__ = ["DuoChatToolsRegistry"]
 
 
-class DuoChatToolsRegistry(BaseToolsRegistry):
+@lru_cache(maxsize=None)
+def _tool_definitions(
+    self_hosted_documentation_enabled: bool, commit_reader_enabled: bool
+) -> tuple[BaseTool, ...]:
+    # We can also read the list of tools and associated unit primitives from the file
+    # similar to what we implemented for the Prompt Registry
+    tools: list[BaseTool] = [
+        BuildReader(),
+        EpicReader(),
+        IssueReader(),
+        MergeRequestReader(),
+    ]
 
-    def __init__(self, self_hosted_documentation_enabled: bool = False):
-        self.self_hosted_documentation_enabled = self_hosted_documentation_enabled
+    if self_hosted_documentation_enabled:
+        tools.append(SelfHostedGitlabDocumentation())
+    else:
+        tools.append(GitlabDocumentation())
 
-    @property
-    def tools(self) -> list[BaseTool]:
-        # We can also read the list of tools and associated unit primitives from the file
-        # similar to what we implemented for the Prompt Registry
-        tools = [
-            BuildReader(),
-            EpicReader(),
-            IssueReader(),
-            MergeRequestReader(),
-        ]
+    if commit_reader_enabled:
+        tools.append(CommitReader())
 
-        if self.self_hosted_documentation_enabled:
-            tools.append(SelfHostedGitlabDocumentation())
-        else:
-            tools.append(GitlabDocumentation())
+    return tuple(tools)
 
-        if is_feature_enabled(FeatureFlag.AI_COMMIT_READER_FOR_CHAT):
-            tools.append(CommitReader())
 
-        return tools
+@lru_cache(maxsize=1024)
+def _tools_on_behalf(
+    self_hosted_documentation_enabled: bool,
+    commit_reader_enabled: bool,
+    unit_primitives: frozenset[GitLabUnitPrimitive],
+    gl_version: str,
+) -> tuple[BaseTool, ...]:
+    return tuple(
+        tool
+        for tool in _tool_definitions(
+            self_hosted_documentation_enabled, commit_reader_enabled
+        )
+        if tool.unit_primitive in unit_primitives and tool.is_compatible(gl_version)
+    )
 
-    def get_on_behalf(self, user: StarletteUser, gl_version: str) -> list[BaseTool]:
-        _tools = []
 
-        for tool in self.tools:
-            if not user.can(tool.unit_primitive):
-                continue
+class DuoChatToolsRegistry(BaseToolsRegistry):
+    """Tools available to Duo Chat.
 
-            if not tool.is_compatible(gl_version):
-                continue
+    Tools don't depend on the user, they're built once by configuration. The tools of a
+    user are then cached by the unit primitives they have access to and their GitLab
+    version.
+    """
 
-            _tools.append(tool)
+    def __init__(self, self_hosted_documentation_enabled: bool = False):
+        self.self_hosted_documentation_enabled = self_hosted_documentation_enabled
+
+    @property
+    def tools(self) -> list[BaseTool]:
+        return list(_tool_definitions(*self._definitions_key()))
+
+    def get_on_behalf(self, user: StarletteUser, gl_version: str) -> list[BaseTool]:
+        definitions_key = self._definitions_key()
+        unit_primitives = frozenset(
+            unit_primitive
+            for unit_primitive in {
+                tool.unit_primitive for tool in _tool_definitions(*definitions_key)
+            }
+            if user.can(unit_primitive)
+        )
 
-        return _tools
+        return list(_tools_on_behalf(*definitions_key, unit_primitives, gl_version))
 
     def get_all(self) -> list[BaseTool]:
         return self.tools
+
+    def _definitions_key(self) -> tuple[bool, bool]:
+        return (
+            self.self_hosted_documentation_enabled,
+            is_feature_enabled(FeatureFlag.AI_COMMIT_READER_FOR_CHAT),
+        )
@@ -1,4 +1,6 @@
-from typing import Any, AsyncIterator, Optional, Union
+import functools
+import time
+from typing import Any, AsyncIterator, Callable, Optional, Union
 
 import structlog
 from dependency_injector.providers import Factory
@@ -11,9 +13,11 @@ from ai_gateway.code_suggestions.base import (
     resolve_lang_id,
 )
 from ai_gateway.code_suggestions.processing import (
+    BudgetModel,
     ModelEngineCompletions,
     ModelEngineOutput,
     Prompt,
+    PromptBudget,
     TokenStrategyBase,
 )
 from ai_gateway.code_suggestions.processing.post.completions import PostProcessor
@@ -24,7 +28,13 @@ from ai_gateway.instrumentators import (
     TextGenModelInstrumentator,
     benchmark,
 )
-from ai_gateway.models import ChatModelBase, Message, ModelAPICallError, ModelAPIError
+from ai_gateway.models import (
+    ChatModelBase,
+    CircuitBreakerOpenError,
+    Message,
+    ModelAPICallError,
+    ModelAPIError,
+)
 from ai_gateway.models.agent_model import AgentModel
 from ai_gateway.models.base import TokensConsumptionMetadata
 from ai_gateway.models.base_text import (
@@ -32,6 +42,7 @@ from ai_gateway.models.base_text import (
     TextGenModelChunk,
     TextGenModelOutput,
 )
+from ai_gateway.models.hedging import HedgingPolicyRegistry
 from ai_gateway.tracking.instrumentator import SnowplowInstrumentator
 from ai_gateway.tracking.snowplow import SnowplowEvent, SnowplowEventContext
 
@@ -123,8 +134,14 @@ class CodeCompletions:
         model: TextGenModelBase,
         tokenization_strategy: TokenStrategyBase,
         post_processor: Optional[Factory[PostProcessor]] = None,
+        fallback_model: Optional[TextGenModelBase] = None,
+        hedging_policies: Optional[HedgingPolicyRegistry] = None,
+        prompt_budget: Optional[PromptBudget] = None,
     ):
         self.model = model
+        self.fallback_model = fallback_model
+        self.hedging_policies = hedging_policies
+        self.prompt_budget = prompt_budget or PromptBudget()
 
         self.instrumentator = TextGenModelInstrumentator(
             model.metadata.engine, model.metadata.name
@@ -138,6 +155,13 @@ class CodeCompletions:
         self.prompt_builder = PromptBuilderPrefixBased(
             model.input_token_limit, tokenization_strategy
         )
+        self.fallback_prompt_builder = (
+            PromptBuilderPrefixBased(
+                fallback_model.input_token_limit, tokenization_strategy
+            )
+            if fallback_model
+            else None
+        )
 
     def _get_prompt(
         self,
@@ -146,11 +170,21 @@ class CodeCompletions:
         raw_prompt: Optional[str | list[Message]] = None,
         code_context: Optional[list] = None,
         context_max_percent: Optional[float] = None,
+        fallback: bool = False,
     ) -> Prompt:
         if raw_prompt:
             return self.prompt_builder.wrap(raw_prompt)
 
-        self.prompt_builder.add_content(
+        model, prompt_builder = self.model, self.prompt_builder
+        if fallback:
+            model, prompt_builder = self.fallback_model, self.fallback_prompt_builder
+
+        # Prompts built by the clients are sent as is, only these ones are shrunk
+        budget_model = BudgetModel(model.metadata.engine, model.metadata.name)
+        if not self.prompt_budget.include_code_context(budget_model):
+            code_context = None
+
+        prompt_builder.add_content(
             prefix,
             suffix=suffix,
             suffix_reserved_percent=self.SUFFIX_RESERVED_PERCENT,
@@ -158,10 +192,37 @@ class CodeCompletions:
             code_context=code_context,
         )
 
-        prompt = self.prompt_builder.build()
+        prompt = prompt_builder.build(
+            self.prompt_budget.max_tokens(budget_model, model.input_token_limit)
+        )
 
         return prompt
 
+    def _get_fallback_prompt(
+        self,
+        prompt: Prompt,
+        prefix: str,
+        suffix: str,
+        code_context: Optional[list] = None,
+        context_max_percent: Optional[float] = None,
+    ) -> Optional[Prompt]:
+        """Build the prompt of the request for the fallback model.
+
+        Text models get a prompt built from the prefix and the suffix within their own
+        limit. Chat models can only take the messages sent to another chat model, so
+        `None` is returned when the fallback can't serve the request.
+        """
+        if isinstance(self.fallback_model, ChatModelBase):
+            return prompt if isinstance(self.model, ChatModelBase) else None
+
+        return self._get_prompt(
+            prefix,
+            suffix,
+            code_context=code_context,
+            context_max_percent=context_max_percent,
+            fallback=True,
+        )
+
     async def execute(
         self,
         prefix: str,
@@ -187,29 +248,56 @@ class CodeCompletions:
             context_max_percent=context_max_percent,
         )
 
+        model = self.model
+        get_fallback_prompt = functools.partial(
+            self._get_fallback_prompt,
+            prompt,
+            prefix,
+            suffix,
+            code_context=code_context,
+            context_max_percent=context_max_percent,
+        )
+
         with self.instrumentator.watch(prompt) as watch_container:
             try:
                 watch_container.register_lang(lang_id, editor_lang)
 
-                if isinstance(self.model, AgentModel):
-                    params = {"prefix": prompt.prefix, "suffix": prompt.suffix}
-
-                    res = await self.model.generate(params, stream)
-                elif isinstance(self.model, ChatModelBase):
-                    res = await self.model.generate(
-                        prompt.prefix, stream=stream, **kwargs
+                try:
+                    start = time.perf_counter()
+                    # The winner of a hedged request may be the fallback model
+                    model, prompt, res = await self._generate_hedged(
+                        model, prompt, stream, get_fallback_prompt, **kwargs
                     )
-                else:
-                    res = await self.model.generate(
-                        prompt.prefix, prompt.suffix, stream, **kwargs
+                    self.prompt_budget.observe_latency(
+                        BudgetModel(model.metadata.engine, model.metadata.name),
+                        time.perf_counter() - start,
                     )
+                except CircuitBreakerOpenError as ex:
+                    if not self.fallback_model:
+                        raise
+
+                    fallback_prompt = get_fallback_prompt()
+                    if fallback_prompt is None:
+                        raise
+
+                    log.info(
+                        "falling back to another model",
+                        reason=str(ex),
+                        fallback_model_engine=self.fallback_model.metadata.engine,
+                        fallback_model_name=self.fallback_model.metadata.name,
+                    )
+
+                    # The parameters of the request were tuned for the requested model,
+                    # the fallback model runs with its defaults
+                    model, prompt = self.fallback_model, fallback_prompt
+                    res = await self._generate(model, prompt, stream)
 
                 if res:
                     if isinstance(res, AsyncIterator):
                         return self._handle_stream(res)
 
                     return await self._handle_sync(
-                        prompt, res, lang_id, watch_container
+                        prompt, res, lang_id, watch_container, model
                     )
             except ModelAPICallError as ex:
                 watch_container.register_model_exception(str(ex), ex.code)
@@ -222,7 +310,7 @@ class CodeCompletions:
         return CodeSuggestionsOutput(
             text="",
             score=0,
-            model=self.model.metadata,
+            model=model.metadata,
             lang_id=lang_id,
             metadata=CodeSuggestionsOutput.Metadata(
                 experiments=[],
@@ -232,6 +320,67 @@ class CodeCompletions:
             ),
         )
 
+    async def _generate_hedged(
+        self,
+        model: TextGenModelBase,
+        prompt: Prompt,
+        stream: bool,
+        get_fallback_prompt: Callable[[], Optional[Prompt]],
+        **kwargs: Any,
+    ) -> tuple[
+        TextGenModelBase,
+        Prompt,
+        Union[TextGenModelOutput, AsyncIterator[TextGenModelChunk]],
+    ]:
+        """
+        Generate the completion, hedged if a policy is set for the model. Returns the
+        model and the prompt the completion was generated with, with the completion.
+        """
+        policy = None
+        if self.hedging_policies and not stream:
+            policy = self.hedging_policies.for_model(
+                model.metadata.engine, model.metadata.name
+            )
+
+        async def _call(
+            call_model: TextGenModelBase, call_prompt: Prompt, **call_kwargs: Any
+        ):
+            res = await self._generate(call_model, call_prompt, stream, **call_kwargs)
+            return call_model, call_prompt, res
+
+        if policy is None:
+            return await _call(model, prompt, **kwargs)
+
+        def _hedge_call():
+            if self.hedging_policies.use_fallback_model and self.fallback_model:
+                # Built only when the request is hedged, and sent like a fallback
+                # request. Falls back to hedging with the requested model when the
+                # fallback model can't serve the request.
+                fallback_prompt = get_fallback_prompt()
+                if fallback_prompt is not None:
+                    return _call(self.fallback_model, fallback_prompt)
+
+            return _call(model, prompt, **kwargs)
+
+        return await policy.run(
+            lambda: _call(model, prompt, **kwargs),
+            hedge_call=_hedge_call,
+            instrumentator=model.instrumentator,
+        )
+
+    async def _generate(
+        self, model: TextGenModelBase, prompt: Prompt, stream: bool, **kwargs: Any
+    ) -> Union[TextGenModelOutput, AsyncIterator[TextGenModelChunk]]:
+        if isinstance(model, AgentModel):
+            params = {"prefix": prompt.prefix, "suffix": prompt.suffix}
+
+            return await model.generate(params, stream)
+
+        if isinstance(model, ChatModelBase):
+            return await model.generate(prompt.prefix, stream=stream, **kwargs)
+
+        return await model.generate(prompt.prefix, prompt.suffix, stream, **kwargs)
+
     async def _handle_stream(
         self, response: AsyncIterator[TextGenModelChunk]
     ) -> AsyncIterator[CodeSuggestionsChunk]:
@@ -245,6 +394,7 @@ class CodeCompletions:
         response: TextGenModelOutput,
         lang_id: Optional[LanguageId],
         watch_container: TextGenModelInstrumentator.WatchContainer,
+        model: Optional[TextGenModelBase] = None,
     ) -> CodeSuggestionsOutput:
         watch_container.register_model_output_length(response.text)
         watch_container.register_model_score(response.score)
@@ -255,7 +405,7 @@ class CodeCompletions:
         return CodeSuggestionsOutput(
             text=response_text,
             score=response.score,
-            model=self.model.metadata,
+            model=(model or self.model).metadata,
             lang_id=lang_id,
             metadata=CodeSuggestionsOutput.Metadata(
                 experiments=[],
@@ -1,3 +1,5 @@
+from typing import AsyncIterator, Iterator
+
 import anthropic
 from dependency_injector import containers, providers
 from transformers import PreTrainedTokenizerFast
@@ -7,15 +9,19 @@ from ai_gateway.code_suggestions.completions import (
     CodeCompletionsLegacy,
 )
 from ai_gateway.code_suggestions.generations import CodeGenerations
-from ai_gateway.code_suggestions.processing import ModelEngineCompletions
+from ai_gateway.code_suggestions.processing import ModelEngineCompletions, PromptBudget
 from ai_gateway.code_suggestions.processing.post.completions import (
     PostProcessor as PostProcessorCompletions,
 )
 from ai_gateway.code_suggestions.processing.pre import TokenizerTokenStrategy
+from ai_gateway.code_suggestions.prompts.parsers import ParserExecutor
 from ai_gateway.experimentation import experiment_registry_provider
 from ai_gateway.models import KindAnthropicModel, KindVertexTextModel
 from ai_gateway.models.base_chat import ChatModelBase
 from ai_gateway.models.base_text import TextGenModelBase
+from ai_gateway.models.hedging import HedgingPolicyRegistry
+from ai_gateway.scheduling import WorkloadClass
+from ai_gateway.token_estimation import TokenEstimator
 from ai_gateway.tokenizer import init_tokenizer
 from ai_gateway.tracking.instrumentator import SnowplowInstrumentator
 
@@ -24,6 +30,36 @@ __all__ = [
 ]
 
 
+def _init_parser_executor(
+    max_workers: int,
+    timeout_ms: int,
+    scheduling_enabled: bool,
+    max_shares: dict[str, float],
+    prompt_budget: PromptBudget,
+) -> Iterator[ParserExecutor]:
+    parser_executor = ParserExecutor(
+        max_workers=max_workers,
+        timeout_micros=timeout_ms * 1000,
+        # The threads are only handed out by priority when the workloads are scheduled
+        max_shares=(
+            {WorkloadClass(workload): share for workload, share in max_shares.items()}
+            if scheduling_enabled
+            else None
+        ),
+        prompt_budget=prompt_budget,
+    )
+
+    yield parser_executor
+
+    parser_executor.shutdown()
+
+
+async def _run_prompt_budget(prompt_budget: PromptBudget) -> AsyncIterator[None]:
+    prompt_budget.start()
+    yield
+    await prompt_budget.stop()
+
+
 class ContainerCodeGenerations(containers.DeclarativeContainer):
     tokenizer = providers.Dependency(instance_of=PreTrainedTokenizerFast)
     vertex_code_bison = providers.Dependency(instance_of=TextGenModelBase)
@@ -32,8 +68,10 @@ class ContainerCodeGenerations(containers.DeclarativeContainer):
 
     litellm_chat = providers.Dependency(instance_of=ChatModelBase)
     agent_model = providers.Dependency(instance_of=TextGenModelBase)
+    fallback_model = providers.Dependency()
 
     snowplow_instrumentator = providers.Dependency(instance_of=SnowplowInstrumentator)
+    token_estimator = providers.Dependency(instance_of=TokenEstimator)
 
     vertex = providers.Factory(
         CodeGenerations,
@@ -44,6 +82,8 @@ class ContainerCodeGenerations(containers.DeclarativeContainer):
             TokenizerTokenStrategy, tokenizer=tokenizer
         ),
         snowplow_instrumentator=snowplow_instrumentator,
+        fallback_model=fallback_model,
+        token_estimator=token_estimator,
     )
 
     # We need to resolve the model based on model name provided in request payload
@@ -58,6 +98,8 @@ class ContainerCodeGenerations(containers.DeclarativeContainer):
             TokenizerTokenStrategy, tokenizer=tokenizer
         ),
         snowplow_instrumentator=snowplow_instrumentator,
+        fallback_model=fallback_model,
+        token_estimator=token_estimator,
     )
 
     anthropic_chat_factory = providers.Factory(
@@ -67,6 +109,8 @@ class ContainerCodeGenerations(containers.DeclarativeContainer):
             TokenizerTokenStrategy, tokenizer=tokenizer
         ),
         snowplow_instrumentator=snowplow_instrumentator,
+        fallback_model=fallback_model,
+        token_estimator=token_estimator,
     )
 
     litellm_factory = providers.Factory(
@@ -76,6 +120,8 @@ class ContainerCodeGenerations(containers.DeclarativeContainer):
             TokenizerTokenStrategy, tokenizer=tokenizer
         ),
         snowplow_instrumentator=snowplow_instrumentator,
+        fallback_model=fallback_model,
+        token_estimator=token_estimator,
     )
 
     agent_factory = providers.Factory(
@@ -85,6 +131,7 @@ class ContainerCodeGenerations(containers.DeclarativeContainer):
             TokenizerTokenStrategy, tokenizer=tokenizer
         ),
         snowplow_instrumentator=snowplow_instrumentator,
+        token_estimator=token_estimator,
     )
 
     # Default use case with claude.2.0
@@ -101,7 +148,12 @@ class ContainerCodeCompletions(containers.DeclarativeContainer):
     anthropic_claude_chat = providers.Dependency(instance_of=ChatModelBase)
     litellm = providers.Dependency(instance_of=TextGenModelBase)
     agent_model = providers.Dependency(instance_of=TextGenModelBase)
+    fallback_model = providers.Dependency()
+    hedging_policies = providers.Dependency(instance_of=HedgingPolicyRegistry)
     snowplow_instrumentator = providers.Dependency(instance_of=SnowplowInstrumentator)
+    parser_executor = providers.Dependency(instance_of=ParserExecutor)
+    prompt_budget = providers.Dependency(instance_of=PromptBudget)
+    token_estimator = providers.Dependency(instance_of=TokenEstimator)
 
     config = providers.Configuration(strict=True)
 
@@ -116,10 +168,14 @@ class ContainerCodeCompletions(containers.DeclarativeContainer):
                 TokenizerTokenStrategy, tokenizer=tokenizer
             ),
             experiment_registry=experiment_registry_provider(),
+            parser_executor=parser_executor,
+            prompt_budget=prompt_budget,
+            token_estimator=token_estimator,
         ),
         post_processor=providers.Factory(
             PostProcessorCompletions,
             exclude=config.excl_post_proc,
+            parser_executor=parser_executor,
         ).provider,
         snowplow_instrumentator=snowplow_instrumentator,
     )
@@ -130,6 +186,9 @@ class ContainerCodeCompletions(containers.DeclarativeContainer):
         tokenization_strategy=providers.Factory(
             TokenizerTokenStrategy, tokenizer=tokenizer
         ),
+        fallback_model=fallback_model,
+        hedging_policies=hedging_policies,
+        prompt_budget=prompt_budget,
     )
 
     litellm_factory = providers.Factory(
@@ -138,6 +197,9 @@ class ContainerCodeCompletions(containers.DeclarativeContainer):
         tokenization_strategy=providers.Factory(
             TokenizerTokenStrategy, tokenizer=tokenizer
         ),
+        fallback_model=fallback_model,
+        hedging_policies=hedging_policies,
+        prompt_budget=prompt_budget,
     )
 
     agent_factory = providers.Factory(
@@ -146,6 +208,7 @@ class ContainerCodeCompletions(containers.DeclarativeContainer):
         tokenization_strategy=providers.Factory(
             TokenizerTokenStrategy, tokenizer=tokenizer
         ),
+        prompt_budget=prompt_budget,
     )
 
 
@@ -153,10 +216,42 @@ class ContainerCodeSuggestions(containers.DeclarativeContainer):
     models = providers.DependenciesContainer()
 
     config = providers.Configuration(strict=True)
+    startup = providers.Configuration(strict=True)
+    tree_sitter = providers.Configuration(strict=True)
+    workload_scheduling = providers.Configuration(strict=True)
+    prompt_budget_config = providers.Configuration(strict=True)
+
+    tokenizer = providers.Singleton(init_tokenizer, path=startup.tokenizer_path)
+
+    prompt_budget = providers.Singleton(
+        PromptBudget,
+        enabled=prompt_budget_config.enabled,
+        interval_s=prompt_budget_config.interval_s,
+        queue_wait_threshold_s=prompt_budget_config.queue_wait_threshold_s,
+        loop_lag_threshold_s=prompt_budget_config.loop_lag_threshold_s,
+        vendor_latency_threshold_s=prompt_budget_config.vendor_latency_threshold_s,
+        min_ratio=prompt_budget_config.min_ratio,
+        drop_context_below=prompt_budget_config.drop_context_below,
+    )
 
-    tokenizer = providers.Singleton(init_tokenizer)
+    # Adjusts the budget in the background while the application runs
+    prompt_budget_adjuster = providers.Resource(
+        _run_prompt_budget,
+        prompt_budget=prompt_budget,
+    )
+
+    # The threads are shut down with the resources of the application
+    parser_executor = providers.Resource(
+        _init_parser_executor,
+        max_workers=tree_sitter.max_workers,
+        timeout_ms=tree_sitter.timeout_ms,
+        scheduling_enabled=workload_scheduling.enabled,
+        max_shares=workload_scheduling.max_shares,
+        prompt_budget=prompt_budget,
+    )
 
     snowplow = providers.DependenciesContainer()
+    token_estimator = providers.Dependency(instance_of=TokenEstimator)
 
     generations = providers.Container(
         ContainerCodeGenerations,
@@ -166,7 +261,9 @@ class ContainerCodeSuggestions(containers.DeclarativeContainer):
         anthropic_claude_chat=models.anthropic_claude_chat,
         litellm_chat=models.litellm_chat,
         agent_model=models.agent_model,
+        fallback_model=models.code_generations_fallback,
         snowplow_instrumentator=snowplow.instrumentator,
+        token_estimator=token_estimator,
     )
 
     completions = providers.Container(
@@ -177,6 +274,11 @@ class ContainerCodeSuggestions(containers.DeclarativeContainer):
         anthropic_claude_chat=models.anthropic_claude_chat,
         litellm=models.litellm,
         agent_model=models.agent_model,
+        fallback_model=models.code_completions_fallback,
+        hedging_policies=models.hedging_policies,
         config=config,
         snowplow_instrumentator=snowplow.instrumentator,
+        parser_executor=parser_executor,
+        prompt_budget=prompt_budget,
+        token_estimator=token_estimator,
     )
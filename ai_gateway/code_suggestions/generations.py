@@ -1,6 +1,8 @@
 from pathlib import Path
 from typing import Any, AsyncIterator, Optional, Union
 
+import structlog
+
 from ai_gateway.code_suggestions.base import (
     CodeSuggestionsChunk,
     CodeSuggestionsOutput,
@@ -16,7 +18,12 @@ from ai_gateway.code_suggestions.processing.post.generations import (
 from ai_gateway.code_suggestions.processing.pre import PromptBuilderPrefixBased
 from ai_gateway.code_suggestions.prompts import PromptTemplate
 from ai_gateway.instrumentators import TextGenModelInstrumentator
-from ai_gateway.models import Message, ModelAPICallError, ModelAPIError
+from ai_gateway.models import (
+    CircuitBreakerOpenError,
+    Message,
+    ModelAPICallError,
+    ModelAPIError,
+)
 from ai_gateway.models.agent_model import AgentModel
 from ai_gateway.models.base_chat import ChatModelBase
 from ai_gateway.models.base_text import (
@@ -24,11 +31,14 @@ from ai_gateway.models.base_text import (
     TextGenModelChunk,
     TextGenModelOutput,
 )
+from ai_gateway.token_estimation import TokenEstimator, tokenizer_family
 from ai_gateway.tracking.instrumentator import SnowplowInstrumentator
 from ai_gateway.tracking.snowplow import SnowplowEvent, SnowplowEventContext
 
 __all__ = ["CodeGenerations"]
 
+log = structlog.stdlib.get_logger("codesuggestions")
+
 
 TPL_GENERATION_BASE = """
 ```{lang}
@@ -45,8 +55,12 @@ class CodeGenerations:
         model: TextGenModelBase,
         tokenization_strategy: TokenStrategyBase,
         snowplow_instrumentator: SnowplowInstrumentator,
+        fallback_model: Optional[TextGenModelBase] = None,
+        token_estimator: Optional[TokenEstimator] = None,
     ):
         self.model = model
+        self.fallback_model = fallback_model
+        self.token_estimator = token_estimator or TokenEstimator()
 
         self.prompt: Optional[Prompt] = None
         self.instrumentator = TextGenModelInstrumentator(
@@ -55,30 +69,67 @@ class CodeGenerations:
         self.prompt_builder = PromptBuilderPrefixBased(
             model.input_token_limit, tokenization_strategy
         )
+        self.fallback_prompt_builder = (
+            PromptBuilderPrefixBased(
+                fallback_model.input_token_limit, tokenization_strategy
+            )
+            if fallback_model
+            else None
+        )
         self.tokenization_strategy = tokenization_strategy
         self.snowplow_instrumentator = snowplow_instrumentator
 
     def _get_prompt(
-        self, prefix: str, file_name: str, lang_id: Optional[LanguageId] = None
+        self,
+        prefix: str,
+        file_name: str,
+        lang_id: Optional[LanguageId] = None,
+        fallback: bool = False,
     ) -> Prompt:
-        if self.prompt:
+        if self.prompt and not fallback:
             return self.prompt
 
+        prompt_builder = (
+            self.fallback_prompt_builder if fallback else self.prompt_builder
+        )
+
         # We use either the language name or the file extension
         # if we couldn't determine the language before
         lang_repl = (
             lang_id.name.lower() if lang_id else Path(file_name).suffix.replace(".", "")
         )
 
-        self.prompt_builder.add_template(
+        prompt_builder.add_template(
             PromptTemplate(TPL_GENERATION_BASE),
             lang=lang_repl,
         )
-        self.prompt_builder.add_content(prefix)
-        prompt = self.prompt_builder.build()
+        prompt_builder.add_content(prefix)
+        prompt = prompt_builder.build()
 
         return prompt
 
+    def _get_fallback_prompt(
+        self,
+        prompt: Prompt,
+        prefix: str,
+        file_name: str,
+        lang_id: Optional[LanguageId] = None,
+    ) -> Optional[Prompt]:
+        """Build the prompt of the request for the fallback model.
+
+        Text models get a text prompt prepared by the client as is, or the base
+        generation prompt built from the prefix within their own limit. Chat models can
+        only take the messages sent to another chat model, so `None` is returned when
+        the fallback can't serve the request.
+        """
+        if isinstance(self.fallback_model, ChatModelBase):
+            return prompt if isinstance(self.model, ChatModelBase) else None
+
+        if self.prompt and isinstance(self.prompt.prefix, str):
+            return self.prompt
+
+        return self._get_prompt(prefix, file_name, lang_id, fallback=True)
+
     def with_prompt_prepared(self, prompt: str | list[Message]):
         self.prompt = self.prompt_builder.wrap(prompt)
 
@@ -109,30 +160,46 @@ class CodeGenerations:
             )
         )
 
+        model = self.model
+
         with self.instrumentator.watch(prompt) as watch_container:
             try:
                 watch_container.register_lang(lang_id, editor_lang)
 
-                if isinstance(self.model, AgentModel):
-                    # The prefix variable here is content-above-cursor, it'll appear as `prefix` field in the template
-                    # The prompt.prefix field is the pre-processed prompt and contains the user's instruction
-                    params = {
-                        "prefix": prefix,
-                        "instruction": prompt.prefix,
-                        "language": editor_lang,
-                        "file_name": file_name,
-                    }
-
-                    if prompt_enhancer:
-                        params.update(prompt_enhancer)
-                    res = await self.model.generate(params, stream)
-                elif isinstance(self.model, ChatModelBase):
-                    res = await self.model.generate(
-                        prompt.prefix, stream=stream, **kwargs
+                generate_kwargs = {
+                    "prefix": prefix,
+                    "file_name": file_name,
+                    "editor_lang": editor_lang,
+                    "prompt_enhancer": prompt_enhancer,
+                    "stream": stream,
+                }
+
+                try:
+                    res = await self._generate(
+                        model, prompt, **generate_kwargs, **kwargs
                     )
-                else:
-                    res = await self.model.generate(
-                        prompt.prefix, "", stream=stream, **kwargs
+                except CircuitBreakerOpenError as ex:
+                    if not self.fallback_model:
+                        raise
+
+                    fallback_prompt = self._get_fallback_prompt(
+                        prompt, prefix, file_name, lang_id
+                    )
+                    if fallback_prompt is None:
+                        raise
+
+                    log.info(
+                        "falling back to another model",
+                        reason=str(ex),
+                        fallback_model_engine=self.fallback_model.metadata.engine,
+                        fallback_model_name=self.fallback_model.metadata.name,
+                    )
+
+                    # The parameters of the request were tuned for the requested model,
+                    # the fallback model runs with its defaults
+                    model = self.fallback_model
+                    res = await self._generate(
+                        model, fallback_prompt, **generate_kwargs
                     )
 
                 if isinstance(res, list):
@@ -140,7 +207,9 @@ class CodeGenerations:
 
                 if res:
                     if isinstance(res, AsyncIterator):
-                        return self._handle_stream(res, snowplow_event_context)
+                        return self._handle_stream(
+                            res, snowplow_event_context, model=model
+                        )
 
                     return await self._handle_sync(
                         response=res,
@@ -149,6 +218,7 @@ class CodeGenerations:
                         prefix=prefix,
                         watch_container=watch_container,
                         snowplow_event_context=snowplow_event_context,
+                        model=model,
                     )
 
             except ModelAPICallError as ex:
@@ -160,13 +230,47 @@ class CodeGenerations:
                 raise
 
         return CodeSuggestionsOutput(
-            text="", score=0, model=self.model.metadata, lang_id=lang_id
+            text="", score=0, model=model.metadata, lang_id=lang_id
         )
 
+    async def _generate(
+        self,
+        model: TextGenModelBase,
+        prompt: Prompt,
+        prefix: str,
+        file_name: str,
+        editor_lang: Optional[str],
+        prompt_enhancer: Optional[dict],
+        stream: bool,
+        **kwargs: Any,
+    ) -> Union[
+        TextGenModelOutput, list[TextGenModelOutput], AsyncIterator[TextGenModelChunk]
+    ]:
+        if isinstance(model, AgentModel):
+            # The prefix variable here is content-above-cursor, it'll appear as `prefix` field in the template
+            # The prompt.prefix field is the pre-processed prompt and contains the user's instruction
+            params = {
+                "prefix": prefix,
+                "instruction": prompt.prefix,
+                "language": editor_lang,
+                "file_name": file_name,
+            }
+
+            if prompt_enhancer:
+                params.update(prompt_enhancer)
+
+            return await model.generate(params, stream)
+
+        if isinstance(model, ChatModelBase):
+            return await model.generate(prompt.prefix, stream=stream, **kwargs)
+
+        return await model.generate(prompt.prefix, "", stream=stream, **kwargs)
+
     async def _handle_stream(
         self,
         response: AsyncIterator[TextGenModelChunk],
         snowplow_event_context: Optional[SnowplowEventContext] = None,
+        model: Optional[TextGenModelBase] = None,
     ) -> AsyncIterator[CodeSuggestionsChunk]:
         chunks = []
         try:
@@ -175,12 +279,16 @@ class CodeGenerations:
                 chunks.append(chunk.text)
                 yield chunk_content
         finally:
+            # Only used for the metrics, an estimate of the whole response is enough
             self.snowplow_instrumentator.watch(
                 SnowplowEvent(
                     context=snowplow_event_context,
                     action="tokens_per_user_request_response",
                     label="code_generation",
-                    value=sum(self.tokenization_strategy.estimate_length(chunks)),
+                    value=self.token_estimator.estimate(
+                        "".join(chunks),
+                        tokenizer_family((model or self.model).metadata.name),
+                    ),
                 )
             )
 
@@ -192,6 +300,7 @@ class CodeGenerations:
         watch_container: TextGenModelInstrumentator.WatchContainer,
         model_provider: Optional[str] = None,
         snowplow_event_context: Optional[SnowplowEventContext] = None,
+        model: Optional[TextGenModelBase] = None,
     ) -> CodeSuggestionsOutput:
         watch_container.register_model_output_length(response.text)
         watch_container.register_model_score(response.score)
@@ -209,13 +318,16 @@ class CodeGenerations:
                 context=snowplow_event_context,
                 action="tokens_per_user_request_response",
                 label="code_generation",
-                value=self.tokenization_strategy.estimate_length(response.text)[0],
+                value=self.token_estimator.estimate(
+                    response.text,
+                    tokenizer_family((model or self.model).metadata.name),
+                ),
             )
         )
 
         return CodeSuggestionsOutput(
             text=generation,
             score=response.score,
-            model=self.model.metadata,
+            model=(model or self.model).metadata,
             lang_id=lang_id,
         )
@@ -2,5 +2,8 @@
 
 from ai_gateway.code_suggestions.processing import ops, post
 from ai_gateway.code_suggestions.processing.base import *
+from ai_gateway.code_suggestions.processing.budget import *
+from ai_gateway.code_suggestions.processing.buffer import *
 from ai_gateway.code_suggestions.processing.completions import *
+from ai_gateway.code_suggestions.processing.context import *
 from ai_gateway.code_suggestions.processing.typing import *
@@ -5,6 +5,8 @@ from typing import Any, NamedTuple, Optional
 from prometheus_client import Counter
 
 from ai_gateway.code_suggestions.processing.ops import (
+    SUPPORTED_EDITOR_LANGS,
+    SUPPORTED_EXTENSIONS,
     lang_from_editor_lang,
     lang_from_filename,
 )
@@ -18,6 +20,7 @@ from ai_gateway.code_suggestions.processing.typing import (
 )
 from ai_gateway.experimentation import ExperimentTelemetry
 from ai_gateway.instrumentators import TextGenModelInstrumentator
+from ai_gateway.instrumentators.cardinality import BoundedMetric
 from ai_gateway.models import ModelMetadata, PalmCodeGenBaseModel
 from ai_gateway.models.base import TokensConsumptionMetadata
 
@@ -28,10 +31,18 @@ __all__ = [
     "PromptBuilderBase",
 ]
 
-LANGUAGE_COUNTER = Counter(
-    "code_suggestions_prompt_language",
-    "Language count by number",
-    ["lang", "extension", "editor_lang"],
+# The extension and the editor language come from the request, so only the
+# values of the supported languages are kept
+LANGUAGE_COUNTER = BoundedMetric(
+    Counter(
+        "code_suggestions_prompt_language",
+        "Language count by number",
+        ["lang", "extension", "editor_lang"],
+    ),
+    allowed_values={
+        "extension": SUPPORTED_EXTENSIONS,
+        "editor_lang": SUPPORTED_EDITOR_LANGS,
+    },
 )
 
 CODE_SYMBOL_COUNTER = Counter(
@@ -0,0 +1,201 @@
+import asyncio
+from enum import StrEnum
+from typing import NamedTuple, Optional
+
+import structlog
+from prometheus_client import Gauge, Histogram
+from starlette_context import context
+
+__all__ = [
+    "BudgetModel",
+    "PressureSignal",
+    "PromptBudget",
+]
+
+log = structlog.stdlib.get_logger("codesuggestions")
+
+PROMPT_BUDGET_RATIO_GAUGE = Gauge(
+    "code_suggestions_prompt_budget_ratio",
+    "Share of the model input token limit allowed in the code completion prompts",
+)
+
+PROMPT_BUDGET_MODEL_RATIO_GAUGE = Gauge(
+    "code_suggestions_prompt_budget_model_ratio",
+    "Share of the model input token limit allowed by the latency of the model",
+    ["model_engine", "model_name"],
+)
+
+PROMPT_BUDGET_TOKENS_HISTOGRAM = Histogram(
+    "code_suggestions_prompt_budget_tokens",
+    "Token budget applied to the code completion prompts",
+    buckets=(256, 512, 1024, 2048, 4096, 8192, 16384, 32768),
+)
+
+
+class PressureSignal(StrEnum):
+    # Time waited by the parses for a tree-sitter thread
+    QUEUE_WAIT = "queue_wait"
+    # Delay of the event loop in running a task scheduled on time
+    LOOP_LAG = "loop_lag"
+    # Time until the model returns its completion, or starts streaming it
+    VENDOR_LATENCY = "vendor_latency"
+
+
+class BudgetModel(NamedTuple):
+    engine: str
+    name: str
+
+
+class PromptBudget:
+    """Shrinks the code completion prompts while the gateway or the vendors are saturated.
+
+    The signals are smoothed with an exponential moving average and checked every
+    `interval_s`. When any of them is above its threshold, the share of the input token
+    limit used by the prompts is multiplied by `decrease_factor`, down to `min_ratio`.
+    Otherwise it grows back by `increase_step`. Below `drop_context_below`, the code
+    context is left out of the prompts.
+
+    The queue wait and the loop lag shrink the prompts of all the models. The vendor
+    latency is tracked by model, a slow model only shrinks its own prompts.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        interval_s: float = 1.0,
+        smoothing: float = 0.3,
+        queue_wait_threshold_s: float = 0.05,
+        loop_lag_threshold_s: float = 0.1,
+        vendor_latency_threshold_s: float = 2.0,
+        min_ratio: float = 0.25,
+        decrease_factor: float = 0.7,
+        increase_step: float = 0.05,
+        drop_context_below: float = 0.5,
+    ):
+        self.enabled = enabled
+        self.interval_s = interval_s
+        self.smoothing = smoothing
+        self.thresholds = {
+            PressureSignal.QUEUE_WAIT: queue_wait_threshold_s,
+            PressureSignal.LOOP_LAG: loop_lag_threshold_s,
+            PressureSignal.VENDOR_LATENCY: vendor_latency_threshold_s,
+        }
+        self.min_ratio = min_ratio
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        self.drop_context_below = drop_context_below
+
+        self.ratio = 1.0
+        self.signals = {
+            signal: 0.0
+            for signal in PressureSignal
+            if signal != PressureSignal.VENDOR_LATENCY
+        }
+        self.model_ratios: dict[BudgetModel, float] = {}
+        self.model_latencies: dict[BudgetModel, float] = {}
+        self._observed: set[PressureSignal | BudgetModel] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def observe(self, signal: PressureSignal, value: float):
+        if not self.enabled:
+            return
+
+        self.signals[signal] += self.smoothing * (value - self.signals[signal])
+        self._observed.add(signal)
+
+    def observe_latency(self, model: BudgetModel, value: float):
+        if not self.enabled:
+            return
+
+        latency = self.model_latencies.get(model, 0.0)
+        self.model_latencies[model] = latency + self.smoothing * (value - latency)
+        self._observed.add(model)
+
+    def adjust(self) -> float:
+        # Signals without new measurements, e.g. no parses, fade away
+        for signal in self.signals:
+            if signal not in self._observed:
+                self.signals[signal] *= 1 - self.smoothing
+        for model in self.model_latencies:
+            if model not in self._observed:
+                self.model_latencies[model] *= 1 - self.smoothing
+        self._observed.clear()
+
+        pressured = [
+            signal.value
+            for signal, value in self.signals.items()
+            if value > self.thresholds[signal]
+        ]
+
+        previous = self.ratio
+        self.ratio = self._next_ratio(self.ratio, bool(pressured))
+        if self.ratio != previous:
+            PROMPT_BUDGET_RATIO_GAUGE.set(self.ratio)
+            if pressured and previous == 1.0:
+                log.info("shrinking the code completion prompts", signals=pressured)
+
+        threshold = self.thresholds[PressureSignal.VENDOR_LATENCY]
+        for model, latency in self.model_latencies.items():
+            previous = self.model_ratios.get(model, 1.0)
+            slow = latency > threshold
+            ratio = self._next_ratio(previous, slow)
+            self.model_ratios[model] = ratio
+            if ratio != previous:
+                PROMPT_BUDGET_MODEL_RATIO_GAUGE.labels(
+                    model_engine=model.engine, model_name=model.name
+                ).set(ratio)
+                if slow and previous == 1.0:
+                    log.info(
+                        "shrinking the code completion prompts",
+                        signals=[PressureSignal.VENDOR_LATENCY.value],
+                        model_engine=model.engine,
+                        model_name=model.name,
+                    )
+
+        return self.ratio
+
+    def model_ratio(self, model: BudgetModel) -> float:
+        return min(self.ratio, self.model_ratios.get(model, 1.0))
+
+    def max_tokens(self, model: BudgetModel, input_token_limit: int) -> int:
+        ratio = self.model_ratio(model)
+        tokens = int(input_token_limit * ratio)
+
+        PROMPT_BUDGET_TOKENS_HISTOGRAM.observe(tokens)
+        if context.exists():
+            context["prompt_budget_ratio"] = ratio
+            context["prompt_budget_tokens"] = tokens
+
+        return tokens
+
+    def include_code_context(self, model: BudgetModel) -> bool:
+        return self.model_ratio(model) >= self.drop_context_below
+
+    def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            scheduled_at = loop.time()
+            await asyncio.sleep(self.interval_s)
+
+            self.observe(
+                PressureSignal.LOOP_LAG,
+                max(loop.time() - scheduled_at - self.interval_s, 0.0),
+            )
+            self.adjust()
+
+    def _next_ratio(self, ratio: float, pressured: bool) -> float:
+        if pressured:
+            return max(self.min_ratio, ratio * self.decrease_factor)
+
+        return min(1.0, ratio + self.increase_step)
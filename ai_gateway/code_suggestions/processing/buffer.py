@@ -0,0 +1,141 @@
+import re
+from bisect import bisect_right
+from functools import cached_property
+from itertools import accumulate
+
+__all__ = [
+    "TextBuffer",
+]
+
+# Line boundaries recognized by `str.splitlines` other than "\n"
+_OTHER_LINE_BREAKS_REGEX = re.compile(r"[\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]")
+
+
+class TextBuffer:
+    """Text content indexed by line, converting between the points, character offsets and
+    byte offsets of the same position.
+
+    Rows are delimited by "\\n" only, as in tree-sitter. Point columns are counted in
+    characters, byte points use UTF-8 byte columns like the tree-sitter `start_point` and
+    `end_point` of nodes parsed from `encoded`.
+
+    Build a buffer once per request and share it between the processing ops and the parser:
+    the line index and the encoding are computed on first use only.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+
+    @classmethod
+    def from_encoded(cls, encoded: bytes) -> "TextBuffer":
+        """Builds the buffer of UTF-8 content, keeping the bytes instead of encoding it again."""
+        buffer = cls(encoded.decode("utf-8"))
+        buffer.__dict__["encoded"] = encoded
+
+        return buffer
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    @cached_property
+    def encoded(self) -> bytes:
+        return self.text.encode("utf-8")
+
+    @cached_property
+    def is_ascii(self) -> bool:
+        return self.text.isascii()
+
+    @cached_property
+    def has_other_line_breaks(self) -> bool:
+        """Whether the lines of `str.splitlines` differ from the "\\n" delimited ones."""
+        return _OTHER_LINE_BREAKS_REGEX.search(self.text) is not None
+
+    @cached_property
+    def line_starts(self) -> list[int]:
+        """Character offset of the start of each line."""
+        return list(
+            accumulate((len(line) + 1 for line in self.text.split("\n")), initial=0)
+        )[:-1]
+
+    @cached_property
+    def byte_line_starts(self) -> list[int]:
+        """Byte offset of the start of each line in `encoded`."""
+        if self.is_ascii:
+            return self.line_starts
+
+        return list(
+            accumulate((len(line) + 1 for line in self.encoded.split(b"\n")), initial=0)
+        )[:-1]
+
+    @property
+    def line_count(self) -> int:
+        return len(self.line_starts)
+
+    def line_length(self, row: int) -> int:
+        """Number of characters in the line, excluding the "\\n" line break."""
+        starts = self.line_starts
+        end = starts[row + 1] - 1 if row + 1 < len(starts) else len(self.text)
+
+        return end - starts[row]
+
+    def point_to_offset(self, point: tuple[int, int]) -> int:
+        """Converts a (row, column) point to its character offset, -1 if out of the text."""
+        row, col = point
+        if not 0 <= row < self.line_count or not 0 <= col <= self.line_length(row):
+            return -1
+
+        return self.line_starts[row] + col
+
+    def offset_to_point(self, offset: int) -> tuple[int, int]:
+        row = bisect_right(self.line_starts, offset) - 1
+
+        return row, offset - self.line_starts[row]
+
+    def offset_to_byte(self, offset: int) -> int:
+        if self.is_ascii:
+            return offset
+
+        row, col = self.offset_to_point(offset)
+        start = self.line_starts[row]
+
+        return self.byte_line_starts[row] + len(
+            self.text[start : start + col].encode("utf-8")
+        )
+
+    def byte_to_offset(self, byte: int) -> int:
+        """Converts a byte offset in `encoded` to its character offset.
+
+        A byte offset in the middle of a multi-byte character maps to the start of it.
+        """
+        if self.is_ascii:
+            return byte
+
+        row = bisect_right(self.byte_line_starts, byte) - 1
+        start = self.byte_line_starts[row]
+
+        return self.line_starts[row] + len(
+            self.encoded[start:byte].decode("utf-8", errors="ignore")
+        )
+
+    def byte_point_to_offset(self, point: tuple[int, int]) -> int:
+        """Converts a tree-sitter (row, byte column) point to its character offset, -1 if
+        out of the text."""
+        row, col = point
+        if not 0 <= row < self.line_count or col < 0:
+            return -1
+
+        byte = self.byte_line_starts[row] + col
+        if row + 1 < self.line_count:
+            line_end = self.byte_line_starts[row + 1] - 1
+        else:
+            line_end = len(self.text) if self.is_ascii else len(self.encoded)
+
+        if byte > line_end:
+            return -1
+
+        return self.byte_to_offset(byte)
+
+    def offset_to_byte_point(self, offset: int) -> tuple[int, int]:
+        row = bisect_right(self.line_starts, offset) - 1
+
+        return row, self.offset_to_byte(offset) - self.byte_line_starts[row]
@@ -1,3 +1,4 @@
+import time
 from typing import Any, Callable, NamedTuple, Optional
 
 import structlog
@@ -8,6 +9,7 @@ from ai_gateway.code_suggestions.processing.base import (
     ModelEngineOutput,
     PromptBuilderBase,
 )
+from ai_gateway.code_suggestions.processing.budget import BudgetModel, PromptBudget
 from ai_gateway.code_suggestions.processing.ops import remove_incomplete_block
 from ai_gateway.code_suggestions.processing.typing import (
     CodeContent,
@@ -18,7 +20,7 @@ from ai_gateway.code_suggestions.processing.typing import (
     Prompt,
     TokenStrategyBase,
 )
-from ai_gateway.code_suggestions.prompts.parsers import CodeParser
+from ai_gateway.code_suggestions.prompts.parsers import CodeParser, ParserExecutor
 from ai_gateway.experimentation import ExperimentRegistry, ExperimentTelemetry
 from ai_gateway.instrumentators import TextGenModelInstrumentator
 from ai_gateway.models import (
@@ -27,6 +29,7 @@ from ai_gateway.models import (
     VertexAPIStatusError,
 )
 from ai_gateway.models.base import TokensConsumptionMetadata
+from ai_gateway.token_estimation import TokenEstimator, tokenizer_family
 
 log = structlog.stdlib.get_logger("codesuggestions")
 
@@ -117,18 +120,29 @@ class _PromptBuilder(PromptBuilderBase):
         total_length_tokens = 0
         tokens_used = 0
         total_length = 0
+        added: list[str] = []
+        seen: set[str] = set()
 
-        # Only prepend the info if it's not present and we have room
+        # Only prepend the info if it's not present and we have room. The repeated
+        # infos are found by hash instead of searching the prefix as it grows.
         for info in extra_info.content:
-            if info.text in self._prefix or info.text in self._suffix:
+            if (
+                info.text in seen
+                or info.text in self._prefix
+                or info.text in self._suffix
+            ):
                 continue
 
+            seen.add(info.text)
             total_length += len(info.text)
             total_length_tokens += info.length_tokens
             if max_total_length_tokens - total_length_tokens >= 0:
-                self._prefix = f"{info.text}\n{self._prefix}"
+                added.append(info.text)
                 tokens_used = total_length_tokens
 
+        if added:
+            self._prefix = "\n".join([*reversed(added), self._prefix])
+
         self._metadata[extra_info_name] = MetadataExtraInfo(
             name=extra_info_name,
             pre=MetadataCodeContent(
@@ -182,9 +196,16 @@ class ModelEngineCompletions(ModelEngineBase):
         model: PalmCodeGenBaseModel,
         tokenization_strategy: TokenStrategyBase,
         experiment_registry: ExperimentRegistry,
+        parser_executor: ParserExecutor,
+        prompt_budget: Optional[PromptBudget] = None,
+        token_estimator: Optional[TokenEstimator] = None,
     ):
         super().__init__(model, tokenization_strategy)
         self.experiment_registry = experiment_registry
+        self.parser_executor = parser_executor
+        self.prompt_budget = prompt_budget or PromptBudget()
+        self.token_estimator = token_estimator or TokenEstimator()
+        self.budget_model = BudgetModel(model.metadata.engine, model.metadata.name)
 
     async def _generate(
         self,
@@ -226,9 +247,15 @@ class ModelEngineCompletions(ModelEngineBase):
 
                 watch_container.register_lang(lang_id, editor_lang)
 
-                if responses := await self.model.generate(
+                start = time.perf_counter()
+                responses = await self.model.generate(
                     prompt.prefix, prompt.suffix, **kwargs
-                ):
+                )
+                self.prompt_budget.observe_latency(
+                    self.budget_model, time.perf_counter() - start
+                )
+
+                if responses:
                     if not isinstance(responses, list):
                         responses = [responses]
 
@@ -270,11 +297,10 @@ class ModelEngineCompletions(ModelEngineBase):
                             )
 
                             tokens_consumption_metadata = TokensConsumptionMetadata(
-                                output_tokens=self.tokenization_strategy.estimate_length(
-                                    completion
-                                )[
-                                    0
-                                ],
+                                output_tokens=self.token_estimator.estimate(
+                                    completion,
+                                    tokenizer_family(self.model.metadata.name),
+                                ),
                                 input_tokens=sum(
                                     md.length_tokens
                                     for md in prompt.metadata.components.values()
@@ -311,9 +337,13 @@ class ModelEngineCompletions(ModelEngineBase):
         lang_id: Optional[LanguageId] = None,
         code_context: Optional[list] = None,
     ) -> Prompt:
+        input_token_limit = self.prompt_budget.max_tokens(
+            self.budget_model, self.model.input_token_limit
+        )
+
         imports = await self._get_imports(prefix, lang_id)
         prompt_len_imports_max = int(
-            self.model.input_token_limit * self.MAX_TOKENS_IMPORTS_PERCENT
+            input_token_limit * self.MAX_TOKENS_IMPORTS_PERCENT
         )
         prompt_len_imports = min(imports.total_length_tokens, prompt_len_imports_max)
 
@@ -323,15 +353,17 @@ class ModelEngineCompletions(ModelEngineBase):
         )  # max 1024 tokens
 
         prompt_len_body = (
-            self.model.input_token_limit
-            - prompt_len_imports
-            - prompt_len_func_signatures
+            input_token_limit - prompt_len_imports - prompt_len_func_signatures
         )
 
         experiments = []
         if exp := self.experiment_registry.get_experiment("exp_truncate_suffix"):
             experiment_output = exp.run(
-                logger=log, prefix=prefix, suffix=suffix, lang_id=lang_id
+                logger=log,
+                prefix=prefix,
+                suffix=suffix,
+                lang_id=lang_id,
+                parser_executor=self.parser_executor,
             )
             experiments.append(experiment_output.telemetry)
             truncated_suffix = experiment_output.output
@@ -352,10 +384,10 @@ class ModelEngineCompletions(ModelEngineBase):
             imports, prompt_len_imports, extra_info_name="imports"
         )
 
-        # Add code context
-        if code_context:
+        # Add code context, unless the prompts are shrunk because of the load
+        if code_context and self.prompt_budget.include_code_context(self.budget_model):
             prompt_context_imports_max = int(
-                self.model.input_token_limit * self.MAX_TOKENS_CONTEXT_PERCENT
+                input_token_limit * self.MAX_TOKENS_CONTEXT_PERCENT
             )
             code_context_info = self._to_code_info(
                 code_context, lang_id, as_comments=False
@@ -385,14 +417,15 @@ class ModelEngineCompletions(ModelEngineBase):
         signatures = await self._extract(content, "function_signatures", lang_id)
         return self._to_code_info(signatures, lang_id, as_comments=True)
 
-    @staticmethod
     async def _extract(
-        content: str, target: str, lang_id: Optional[LanguageId] = None
+        self, content: str, target: str, lang_id: Optional[LanguageId] = None
     ) -> list[str]:
         extracted = []
         if lang_id:
             try:
-                parser = await CodeParser.from_language_id(content, lang_id)
+                parser = await CodeParser.from_language_id(
+                    content, lang_id, parser_executor=self.parser_executor
+                )
                 if target == "imports":
                     extracted = parser.imports()
                 elif target == "function_signatures":
@@ -455,7 +488,9 @@ class ModelEngineCompletions(ModelEngineBase):
         watch_container: TextGenModelInstrumentator.WatchContainer,
     ) -> None:
         try:
-            parser = await CodeParser.from_language_id(prompt, lang_id)
+            parser = await CodeParser.from_language_id(
+                prompt, lang_id, parser_executor=self.parser_executor
+            )
             symbol_map = parser.count_symbols()
             self.increment_code_symbol_counter(lang_id, symbol_map)
             self.log_symbol_map(watch_container, symbol_map)
@@ -0,0 +1,167 @@
+import hashlib
+import re
+from typing import NamedTuple, Optional, Sequence
+
+from ai_gateway.code_suggestions.processing.typing import CodeContent, TokenStrategyBase
+
+__all__ = [
+    "ContextSnippet",
+    "PackedContext",
+    "pack_code_context",
+]
+
+_IDENTIFIER_REGEX = re.compile(r"[A-Za-z_][A-Za-z0-9_]{2,}")
+
+# Number of characters before the cursor to look for the identifiers the user works with
+_CURSOR_WINDOW = 2000
+
+# The IDE sends the most recently used files first, earlier snippets get a small bonus
+_RECENCY_WEIGHT = 0.2
+
+_SEPARATOR = "\n"
+
+
+class ContextSnippet(NamedTuple):
+    text: str
+    length_tokens: int
+    position: int
+    score: float
+
+
+class PackedContext(NamedTuple):
+    # Length of all the snippets received, before removing duplicates
+    length: int
+    length_tokens: int
+    content: CodeContent
+    snippets: list[ContextSnippet]
+
+
+def _content_hash(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def _identifiers(text: str) -> set[str]:
+    return set(_IDENTIFIER_REGEX.findall(text))
+
+
+def _score(text: str, position: int, cursor_identifiers: set[str]) -> float:
+    overlap = 0.0
+    if cursor_identifiers:
+        overlap = len(_identifiers(text) & cursor_identifiers) / len(cursor_identifiers)
+
+    return overlap + _RECENCY_WEIGHT / (1 + position)
+
+
+def _unique_snippets(code_context: Sequence[str]) -> tuple[list[str], list[int]]:
+    """Returns the unique snippets with the index of each received snippet in that list.
+
+    Snippets only differing by their whitespaces, e.g. a file sent with another
+    indentation, are considered duplicates.
+    """
+    unique: list[str] = []
+    indices: list[int] = []
+    seen: dict[bytes, int] = {}
+
+    for text in code_context:
+        key = _content_hash(" ".join(text.split()))
+        if key not in seen:
+            seen[key] = len(unique)
+            unique.append(text)
+
+        indices.append(seen[key])
+
+    return unique, indices
+
+
+def pack_code_context(
+    code_context: Sequence[str],
+    tkn_strategy: TokenStrategyBase,
+    max_length: int,
+    prefix: str = "",
+) -> PackedContext:
+    """Selects the most relevant context snippets fitting in `max_length` tokens.
+
+    Snippets are tokenized once, duplicates are removed and the rest are scored by
+    the identifiers they share with the code before the cursor and by their order.
+    The snippets are then taken by decreasing score per token while they fit, unless
+    the best snippet fitting alone scores more than all of them. The space left is
+    filled with the beginning of the best snippet that was not taken.
+    The selected snippets keep the order they were received in.
+    """
+    unique, indices = _unique_snippets(code_context)
+    lengths_tokens = tkn_strategy.estimate_length(unique) if unique else []
+
+    length = sum(len(text) for text in code_context) + max(len(code_context) - 1, 0)
+    length_tokens = sum(lengths_tokens[index] for index in indices)
+
+    cursor_identifiers = _identifiers(prefix[-_CURSOR_WINDOW:])
+    by_score = sorted(
+        (
+            ContextSnippet(
+                text=text,
+                length_tokens=text_length_tokens,
+                position=position,
+                score=_score(text, position, cursor_identifiers),
+            )
+            for position, (text, text_length_tokens) in enumerate(
+                zip(unique, lengths_tokens)
+            )
+        ),
+        key=lambda snippet: (-snippet.score, snippet.position),
+    )
+    # Every snippet but the first one is preceded by a separator, counted as one token
+    by_density = sorted(
+        by_score,
+        key=lambda snippet: (
+            -snippet.score / (snippet.length_tokens + 1),
+            snippet.position,
+        ),
+    )
+
+    selected: list[ContextSnippet] = []
+    remaining = max_length + 1
+
+    for snippet in by_density:
+        if remaining <= 1:
+            break
+
+        if snippet.length_tokens + 1 <= remaining:
+            selected.append(snippet)
+            remaining -= snippet.length_tokens + 1
+
+    # Small snippets can be denser than a large one scoring more than all of them
+    best_single = next(
+        (snippet for snippet in by_score if snippet.length_tokens <= max_length), None
+    )
+    if best_single and best_single.score > sum(snippet.score for snippet in selected):
+        selected = [best_single]
+        remaining = max_length - best_single.length_tokens
+
+    selected_positions = {snippet.position for snippet in selected}
+    best_skipped = next(
+        (snippet for snippet in by_score if snippet.position not in selected_positions),
+        None,
+    )
+
+    if best_skipped and remaining > 1:
+        truncated = tkn_strategy.truncate_content(
+            best_skipped.text, remaining - 1, truncation_side="right"
+        )
+        if truncated.text:
+            selected.append(
+                best_skipped._replace(
+                    text=truncated.text, length_tokens=truncated.length_tokens
+                )
+            )
+
+    selected.sort(key=lambda snippet: snippet.position)
+
+    return PackedContext(
+        length=length,
+        length_tokens=length_tokens,
+        content=CodeContent(
+            text=_SEPARATOR.join(snippet.text for snippet in selected),
+            length_tokens=sum(snippet.length_tokens for snippet in selected),
+        ),
+        snippets=selected,
+    )
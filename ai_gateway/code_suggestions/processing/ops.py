@@ -5,9 +5,12 @@ from typing import Callable, NamedTuple, Optional, Union
 import numpy as np
 from tree_sitter import Node
 
+from ai_gateway.code_suggestions.processing.buffer import TextBuffer
 from ai_gateway.code_suggestions.processing.typing import LanguageId
 
 __all__ = [
+    "SUPPORTED_EXTENSIONS",
+    "SUPPORTED_EDITOR_LANGS",
     "prepend_lang_id",
     "remove_incomplete_lines",
     "remove_incomplete_block",
@@ -102,8 +105,13 @@ _EDITOR_LANG_TO_LANG_ID = {
     name: language.lang_id for language in _ALL_LANGS for name in language.editor_names
 }
 
+SUPPORTED_EXTENSIONS = frozenset(_EXTENSION_TO_LANG_ID)
+
+SUPPORTED_EDITOR_LANGS = frozenset(_EDITOR_LANG_TO_LANG_ID)
+
 # A new line with a non-indented letter or comment (/*, #, //)
 _END_OF_CODE_BLOCK_REGEX = re.compile(r"\n([a-zA-Z]|(\/\*)|(#)|(\/\/))")
+_NON_WHITESPACE_REGEX = re.compile(r"\S")
 
 # The maximum percentage of the text that can be trimmed to remove an incomplete code block
 _MAX_CODE_BLOCK_TRIM_PERCENT = 0.1
@@ -172,28 +180,15 @@ def lang_from_editor_lang(editor_lang: str) -> Optional[LanguageId]:
     return _EDITOR_LANG_TO_LANG_ID.get(editor_lang, None)
 
 
-def find_non_whitespace_point(value: str, start_index: int = 0) -> tuple[int, int]:
-    row = 0
-    col = 0
-
-    found_row = -1
-    found_col = -1
-
-    for idx, c in enumerate(value):
-        if c == "\n":
-            # increase the row counter and reset the column one
-            row += 1
-            col = 0
-            continue
-
-        if idx >= start_index and not c.isspace():
-            found_row = row
-            found_col = col
-            break
+def find_non_whitespace_point(
+    value: Union[str, TextBuffer], start_index: int = 0
+) -> tuple[int, int]:
+    buffer = _as_text_buffer(value)
 
-        col += 1
+    if match := _NON_WHITESPACE_REGEX.search(buffer.text, max(start_index, 0)):
+        return buffer.offset_to_point(match.start())
 
-    return found_row, found_col
+    return -1, -1
 
 
 def find_newline_position(value: str, start_index: int = 0) -> int:
@@ -306,7 +301,7 @@ def find_common_lines(
 
 
 def split_on_point(
-    source_code: str, point: tuple[int, int]
+    source_code: Union[str, TextBuffer], point: tuple[int, int]
 ) -> tuple[Optional[str], Optional[str]]:
     """
     Splits the source_code into a prefix and a suffix.
@@ -316,21 +311,36 @@ def split_on_point(
     if pos == -1:
         return (None, None)
 
-    prefix = source_code[:pos]
-    suffix = source_code[pos:]
+    text = source_code.text if isinstance(source_code, TextBuffer) else source_code
+    prefix = text[:pos]
+    suffix = text[pos:]
     return (prefix, suffix)
 
 
-def find_cursor_position(source_code: str, point: tuple[int, int]) -> int:
+def find_cursor_position(
+    source_code: Union[str, TextBuffer, None], point: tuple[int, int]
+) -> int:
     """
     Converts a 2D point to its 1D position in the source_code.
     """
     if not source_code:
         return -1
 
-    row, col = point
-    lines = source_code.splitlines()
+    buffer = _as_text_buffer(source_code)
+    if buffer.has_other_line_breaks:
+        # Rows follow `str.splitlines`, keep counting a single character per line break
+        return _find_cursor_position_in_lines(buffer.text.splitlines(), point)
 
+    row, _ = point
+    if row == buffer.line_count - 1 and buffer.text.endswith("\n"):
+        # `str.splitlines` doesn't return the empty line following the last line break
+        return -1
+
+    return buffer.point_to_offset(point)
+
+
+def _find_cursor_position_in_lines(lines: list[str], point: tuple[int, int]) -> int:
+    row, col = point
     if row >= len(lines) or col > len(lines[row]):
         return -1
 
@@ -341,6 +351,10 @@ def find_cursor_position(source_code: str, point: tuple[int, int]) -> int:
     return pos
 
 
+def _as_text_buffer(value: Union[str, TextBuffer]) -> TextBuffer:
+    return value if isinstance(value, TextBuffer) else TextBuffer(value)
+
+
 def convert_point_to_relative_point_in_node(
     node: Node, point: tuple[int, int]
 ) -> tuple[int, int]:
@@ -14,6 +14,7 @@ from ai_gateway.code_suggestions.processing.post.ops import (
     trim_by_min_allowed_context,
 )
 from ai_gateway.code_suggestions.processing.typing import LanguageId
+from ai_gateway.code_suggestions.prompts.parsers import ParserExecutor
 
 __all__ = [
     "PostProcessorOperation",
@@ -56,6 +57,8 @@ class PostProcessor(PostProcessorBase):
         ] = None,
         exclude: Optional[list] = None,
         extras: Optional[list] = None,
+        *,
+        parser_executor: ParserExecutor,
     ):
         self.code_context = code_context
         self.lang_id = lang_id
@@ -63,27 +66,35 @@ class PostProcessor(PostProcessorBase):
         self.overrides = overrides if overrides else {}
         self.exclude = set(exclude) if exclude else []
         self.extras = extras if extras else []
+        self.parser_executor = parser_executor
 
     @property
     def ops(self) -> list[AliasOpsRecord]:
         return {
             PostProcessorOperation.REMOVE_COMMENTS: partial(
-                remove_comment_only_completion, lang_id=self.lang_id
+                remove_comment_only_completion,
+                lang_id=self.lang_id,
+                parser_executor=self.parser_executor,
             ),
             PostProcessorOperation.TRIM_BY_MINIMUM_CONTEXT: partial(
-                trim_by_min_allowed_context, self.code_context, lang_id=self.lang_id
+                trim_by_min_allowed_context,
+                self.code_context,
+                lang_id=self.lang_id,
+                parser_executor=self.parser_executor,
             ),
             PostProcessorOperation.FIX_END_BLOCK_ERRORS: partial(
                 fix_end_block_errors,
                 self.code_context,
                 suffix=self.suffix,
                 lang_id=self.lang_id,
+                parser_executor=self.parser_executor,
             ),
             PostProcessorOperation.FIX_END_BLOCK_ERRORS_WITH_COMPARISON: partial(
                 fix_end_block_errors_with_comparison,
                 self.code_context,
                 suffix=self.suffix,
                 lang_id=self.lang_id,
+                parser_executor=self.parser_executor,
             ),
             PostProcessorOperation.CLEAN_MODEL_REFLECTION: partial(
                 clean_model_reflection, self.code_context
@@ -4,14 +4,14 @@ from typing import Any, Optional
 
 import structlog
 
+from ai_gateway.code_suggestions.processing.buffer import TextBuffer
 from ai_gateway.code_suggestions.processing.ops import (
     find_common_lines,
-    find_cursor_position,
     find_newline_position,
     find_non_whitespace_point,
 )
 from ai_gateway.code_suggestions.processing.typing import LanguageId
-from ai_gateway.code_suggestions.prompts.parsers import CodeParser
+from ai_gateway.code_suggestions.prompts.parsers import CodeParser, ParserExecutor
 
 __all__ = [
     "clean_model_reflection",
@@ -115,8 +115,10 @@ async def trim_by_min_allowed_context(
     prefix: str,
     completion: str,
     lang_id: Optional[LanguageId] = None,
+    *,
+    parser_executor: ParserExecutor,
 ) -> str:
-    code_sample = f"{prefix}{completion}"
+    code_sample = TextBuffer(f"{prefix}{completion}")
     len_prefix = len(prefix)
     target_point = find_non_whitespace_point(code_sample, start_index=len_prefix)
     if target_point == (-1, -1):
@@ -126,13 +128,16 @@ async def trim_by_min_allowed_context(
         parser = await CodeParser.from_language_id(
             code_sample,
             lang_id,
+            parser_executor=parser_executor,
         )
-        context = parser.min_allowed_context(target_point)
-        end_pos = find_cursor_position(code_sample, context.end)
+        context = parser.min_allowed_context(
+            code_sample.offset_to_byte_point(code_sample.point_to_offset(target_point))
+        )
+        end_pos = code_sample.byte_point_to_offset(context.end)
         if end_pos == -1:
             return completion
 
-        out = code_sample[len_prefix:end_pos]
+        out = code_sample.text[len_prefix:end_pos]
     except ValueError as e:
         log.warning(f"Failed to parse code: {e}")
         out = completion
@@ -145,6 +150,8 @@ async def fix_end_block_errors(
     completion: str,
     suffix: str,
     lang_id: Optional[LanguageId] = None,
+    *,
+    parser_executor: ParserExecutor,
 ) -> str:
     # Hypothesis 1: the suffix contains only one line.
     suffix_first_line = suffix.strip()
@@ -168,7 +175,9 @@ async def fix_end_block_errors(
         # Check if any errors exists when joining the original suffix
         # and the updated version of the completion.
         code_sample = f"{prefix}{completion_lookup}{suffix}"
-        parser = await CodeParser.from_language_id(code_sample, lang_id)
+        parser = await CodeParser.from_language_id(
+            code_sample, lang_id, parser_executor=parser_executor
+        )
         if len(parser.errors()) == 0:
             completion = completion_lookup
     except ValueError as e:
@@ -182,6 +191,8 @@ async def fix_end_block_errors_with_comparison(
     completion: str,
     suffix: str,
     lang_id: Optional[LanguageId] = None,
+    *,
+    parser_executor: ParserExecutor,
 ) -> str:
     stripped_suffix = suffix.strip()
     if len(stripped_suffix) == 0:
@@ -208,14 +219,14 @@ async def fix_end_block_errors_with_comparison(
         # Check for errors in the original code
         code_sample_before_suggestion = f"{prefix}{suffix}"
         parser_before_suggestion = await CodeParser.from_language_id(
-            code_sample_before_suggestion, lang_id
+            code_sample_before_suggestion, lang_id, parser_executor=parser_executor
         )
         errors_before_suggestion = len(parser_before_suggestion.errors())
 
         # Check if there are any new errors when inserting the code suggestion
         code_sample_after_suggestion = f"{prefix}{completion_lookup}{suffix}"
         parser_after_suggestion = await CodeParser.from_language_id(
-            code_sample_after_suggestion, lang_id
+            code_sample_after_suggestion, lang_id, parser_executor=parser_executor
         )
         errors_after_suggestion = len(parser_after_suggestion.errors())
 
@@ -266,6 +277,8 @@ def _split_code_lines(s: str) -> list[str]:
 async def remove_comment_only_completion(
     completion: str,
     lang_id: Optional[LanguageId] = None,
+    *,
+    parser_executor: ParserExecutor,
 ) -> str:
     if not completion:
         return completion
@@ -273,6 +286,7 @@ async def remove_comment_only_completion(
         parser = await CodeParser.from_language_id(
             completion,
             lang_id,
+            parser_executor=parser_executor,
         )
         if parser.comments_only():
             log.info("removing comments-only completion")
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Optional
 
 from ai_gateway.code_suggestions.processing.typing import (
     MetadataCodeContent,
@@ -67,5 +67,5 @@ class PromptBuilderBase(ABC):
         pass
 
     @abstractmethod
-    def build(self) -> Prompt:
+    def build(self, total_max_len: Optional[int] = None) -> Prompt:
         pass
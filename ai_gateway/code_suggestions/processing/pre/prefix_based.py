@@ -1,6 +1,10 @@
 import math
 from typing import Any, Optional
 
+from ai_gateway.code_suggestions.processing.context import (
+    PackedContext,
+    pack_code_context,
+)
 from ai_gateway.code_suggestions.processing.pre.base import PromptBuilderBase
 from ai_gateway.code_suggestions.processing.typing import (
     CodeContent,
@@ -57,10 +61,13 @@ class PromptBuilderPrefixBased(PromptBuilderBase):
 
         self.opts.update(opts)
 
-    def build(self) -> Prompt:
+    def build(self, total_max_len: Optional[int] = None) -> Prompt:
+        if total_max_len is None:
+            total_max_len = self.total_max_len
+
         suffix_reserved_percent = self.opts[self.KEY_SUFFIX_RESERVED_PERCENT]
         context_max_percent = self.opts[self.KEY_CONTEXT_MAX_PERCENT]
-        max_length = self.total_max_len - self.always_len
+        max_length = max(total_max_len, 0) - self.always_len
         max_length_prefix = math.ceil((1 - suffix_reserved_percent) * max_length)
         max_length_suffix = max_length - max_length_prefix
 
@@ -76,11 +83,14 @@ class PromptBuilderPrefixBased(PromptBuilderBase):
         max_length_code_context = math.floor(
             min(max_length_code_context, max_length * context_max_percent)
         )
-        code_context_info = self._build_code_context(max_length_code_context)
+        code_context_info = self._build_code_context(
+            max_length_code_context, prefix.text
+        )
 
-        if code_context_info and max_length_code_context > 0:
-            _, truncated = code_context_info
-            prefix_with_tpl = "\n".join([truncated.text, prefix_with_tpl])
+        if code_context_info and code_context_info.content.text:
+            prefix_with_tpl = "\n".join(
+                [code_context_info.content.text, prefix_with_tpl]
+            )
 
         components = {
             name: MetadataCodeContent(
@@ -134,39 +144,30 @@ class PromptBuilderPrefixBased(PromptBuilderBase):
         return truncated
 
     def _build_code_context(
-        self, max_length: int
-    ) -> Optional[tuple[CodeContent, CodeContent]]:
+        self, max_length: int, prefix: str
+    ) -> Optional[PackedContext]:
         if not self.code_context:
             return None
 
-        original = CodeContent(
-            text="\n".join(self.code_context),
-            length_tokens=self.tkn_strategy.estimate_length(self.code_context)[0],
+        return pack_code_context(
+            self.code_context, self.tkn_strategy, max_length, prefix=prefix
         )
 
-        truncated = self.tkn_strategy.truncate_content(
-            original.text, max_length, truncation_side="right"
-        )
-
-        return original, truncated
-
     def _build_code_context_metadata(
-        self, code_context_info: Optional[tuple[CodeContent, CodeContent]]
+        self, code_context_info: Optional[PackedContext]
     ) -> Optional[MetadataExtraInfo]:
         if not code_context_info:
             return None
 
-        original, truncated = code_context_info
-
         return MetadataExtraInfo(
             name="code_context",
             pre=MetadataCodeContent(
-                length=len(original.text),
-                length_tokens=original.length_tokens,
+                length=code_context_info.length,
+                length_tokens=code_context_info.length_tokens,
             ),
             post=MetadataCodeContent(
-                length=len(truncated.text),
-                length_tokens=truncated.length_tokens,
+                length=len(code_context_info.content.text),
+                length_tokens=code_context_info.content.length_tokens,
             ),
         )
 
@@ -3,6 +3,8 @@
 from ai_gateway.code_suggestions.prompts.parsers.base import *
 from ai_gateway.code_suggestions.prompts.parsers.blocks import *
 from ai_gateway.code_suggestions.prompts.parsers.counters import *
+from ai_gateway.code_suggestions.prompts.parsers.executor import *
 from ai_gateway.code_suggestions.prompts.parsers.imports import *
+from ai_gateway.code_suggestions.prompts.parsers.queries import *
 from ai_gateway.code_suggestions.prompts.parsers.treesitter import *
 from ai_gateway.code_suggestions.prompts.parsers.treetraversal import *
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, NamedTuple
+from typing import List, NamedTuple, Optional
 
 from tree_sitter import Node
 
@@ -30,6 +30,19 @@ class CodeContext(NamedTuple):
 class BaseVisitor(ABC):
     _TARGET_SYMBOLS: List[str] = []
 
+    # Tree-sitter query capturing the nodes to visit as `@target`.
+    # Defaults to matching any node listed in `_TARGET_SYMBOLS`, see `parsers.queries`.
+    _QUERY: Optional[str] = None
+
+    @property
+    def query_range(self) -> Optional[tuple[Point, Point]]:
+        """Restrict the query captures to the nodes intersecting this range of points."""
+        return None
+
+    def visit_captures(self, root: Node, nodes: List[Node]):
+        for node in nodes:
+            self._visit_node(node)
+
     @abstractmethod
     def _visit_node(self, node: Node):
         pass
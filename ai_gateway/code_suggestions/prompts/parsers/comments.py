@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 
 from tree_sitter import Node
 
@@ -36,6 +36,10 @@ class BaseCommentVisitor(BaseVisitor):
             self._stop_node_traversal = True
             self._stop_tree_traversal = True
 
+    def visit_captures(self, root: Node, nodes: List[Node]):
+        # The tree contains only comments if every node, including the root, was captured
+        self._comments_only = len(nodes) == root.descendant_count
+
     def _visit_node(self, node: Node):
         pass
 
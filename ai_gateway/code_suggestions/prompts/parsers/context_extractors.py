@@ -3,7 +3,7 @@ from typing import List, Optional
 from tree_sitter import Node
 
 from ai_gateway.code_suggestions.processing.ops import LanguageId
-from ai_gateway.code_suggestions.prompts.parsers.base import BaseVisitor
+from ai_gateway.code_suggestions.prompts.parsers.base import BaseVisitor, Point
 
 __all__ = [
     "BaseContextVisitor",
@@ -24,6 +24,17 @@ class BaseContextVisitor(BaseVisitor):
     def _visit_node(self, node: Node):
         pass
 
+    @property
+    def query_range(self) -> Optional[tuple[Point, Point]]:
+        target_row, _ = self.target_point
+
+        # Start a row earlier to include the nodes ending at the first column of the target row
+        return (max(target_row - 1, 0), 0), (target_row + 1, 0)
+
+    def visit_captures(self, root: Node, nodes: List[Node]):
+        for node in nodes:
+            self.visit(node)
+
     def visit(self, node: Node):
         if not node.is_named:
             return
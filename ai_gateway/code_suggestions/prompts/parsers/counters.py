@@ -101,6 +101,7 @@ class RubyCounterVisitor(BaseCounterVisitor, RubyParserMixin):
         "module",
         "class",
     ]
+    _QUERY = "[(comment) (module) (class)] @target" + RubyParserMixin.IMPORT_PATTERN
 
     def _visit_node(self, node: Node):
         if node.type == "call":
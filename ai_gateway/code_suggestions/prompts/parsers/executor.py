@@ -0,0 +1,146 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from prometheus_client import Counter, Histogram
+from tree_sitter import Parser, Tree
+from tree_sitter_languages import get_parser
+
+from ai_gateway.code_suggestions.processing.budget import PressureSignal, PromptBudget
+from ai_gateway.code_suggestions.processing.ops import ProgramLanguage
+from ai_gateway.code_suggestions.processing.typing import LanguageId
+from ai_gateway.scheduling import PriorityLimiter, WorkloadClass
+
+__all__ = [
+    "ParserExecutor",
+]
+
+T = TypeVar("T")
+
+PARSE_DURATION_HISTOGRAM = Histogram(
+    "code_suggestions_tree_sitter_parse_duration_seconds",
+    "Duration of the tree-sitter parses in seconds",
+    ["lang"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+
+PARSE_QUEUE_WAIT_HISTOGRAM = Histogram(
+    "code_suggestions_tree_sitter_queue_wait_seconds",
+    "Time waited by the tree-sitter parses for a free thread in seconds",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+
+PARSE_TIMEOUTS_COUNTER = Counter(
+    "code_suggestions_tree_sitter_parse_timeouts",
+    "Number of tree-sitter parses that timed out",
+    ["lang"],
+)
+
+
+class ParserExecutor:
+    """Runs the tree-sitter parses in dedicated threads, apart from the default executor.
+
+    Each thread keeps one parser per language, created when the thread starts. Parses
+    taking more than `timeout_micros` are stopped and raise a `ValueError`, 0 disables
+    the timeout. When `max_shares` is set, the free threads are given to the parses by
+    the priority of their workload, within the share of the threads of each class. The
+    time waited for a thread is reported to the prompt budget.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        timeout_micros: int = 0,
+        max_shares: Optional[dict[WorkloadClass, float]] = None,
+        prompt_budget: Optional[PromptBudget] = None,
+    ):
+        self.max_workers = max_workers
+        self.timeout_micros = timeout_micros
+        self.prompt_budget = prompt_budget or PromptBudget()
+        self.limiter = PriorityLimiter(
+            "tree_sitter",
+            capacity=max_workers,
+            max_shares=max_shares,
+            enabled=max_shares is not None,
+        )
+
+        self._local = threading.local()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # Threads are created on first use, after the pre-fork workers are started
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="tree-sitter",
+                        initializer=self._warm_up,
+                    )
+
+        return self._executor
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+        queue_wait: Optional[float] = None
+
+        def _call() -> T:
+            nonlocal queue_wait
+            queue_wait = time.perf_counter() - submitted
+            return fn(*args)
+
+        async with self.limiter.slot():
+            try:
+                return await loop.run_in_executor(self.executor, _call)
+            finally:
+                # Reported from the event loop, the prompt budget isn't thread-safe
+                if queue_wait is not None:
+                    PARSE_QUEUE_WAIT_HISTOGRAM.observe(queue_wait)
+                    self.prompt_budget.observe(PressureSignal.QUEUE_WAIT, queue_wait)
+
+    def parse(self, source: bytes, grammar_name: str) -> Tree:
+        """Parses the source with the parser of the current thread."""
+        parser = self._parser(grammar_name)
+
+        start = time.perf_counter()
+        try:
+            tree = parser.parse(source)
+        except ValueError:
+            # The parser resumes a parse that timed out on its next call unless it's reset
+            parser.reset()
+            PARSE_TIMEOUTS_COUNTER.labels(lang=grammar_name).inc()
+            raise ValueError(
+                f"Parsing timed out after {self.timeout_micros} microseconds"
+            )
+        finally:
+            PARSE_DURATION_HISTOGRAM.labels(lang=grammar_name).observe(
+                time.perf_counter() - start
+            )
+
+        return tree
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _parser(self, grammar_name: str) -> Parser:
+        parsers: Optional[dict[str, Parser]] = getattr(self._local, "parsers", None)
+        if parsers is None:
+            parsers = self._local.parsers = {}
+
+        if (parser := parsers.get(grammar_name)) is None:
+            parser = get_parser(grammar_name)
+            parser.set_timeout_micros(self.timeout_micros)
+            parsers[grammar_name] = parser
+
+        return parser
+
+    def _warm_up(self):
+        for lang_id in LanguageId:
+            self._parser(ProgramLanguage.from_language_id(lang_id).grammar_name)
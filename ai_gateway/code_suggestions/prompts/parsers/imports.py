@@ -61,6 +61,7 @@ class PythonImportVisitor(BaseImportVisitor):
 
 class RubyImportVisitor(BaseImportVisitor, RubyParserMixin):
     _TARGET_SYMBOLS = ["call"]
+    _QUERY = RubyParserMixin.IMPORT_PATTERN
 
     def _visit_node(self, node: Node):
         if self.is_import(node):
@@ -4,6 +4,12 @@ __all__ = ["RubyParserMixin"]
 
 
 class RubyParserMixin:
+    # Matches `require 'lib'` and `require_relative 'lib'` calls, see `is_import`
+    IMPORT_PATTERN = """
+    ((call . (identifier) @_method . (argument_list) .) @target
+     (#match? @_method "^require(_relative)?$"))
+    """
+
     def is_import(self, node: Node) -> bool:
         if len(node.children) != 2:
             return False
@@ -0,0 +1,107 @@
+from functools import cache
+from typing import Optional
+
+from tree_sitter import Language, Node, Query
+from tree_sitter_languages import get_language
+
+from ai_gateway.code_suggestions.processing.ops import LanguageId, ProgramLanguage
+from ai_gateway.code_suggestions.prompts.parsers.base import BaseVisitor
+from ai_gateway.code_suggestions.prompts.parsers.comments import CommentVisitorFactory
+from ai_gateway.code_suggestions.prompts.parsers.context_extractors import (
+    ContextVisitorFactory,
+)
+from ai_gateway.code_suggestions.prompts.parsers.counters import CounterVisitorFactory
+from ai_gateway.code_suggestions.prompts.parsers.function_signatures import (
+    FunctionSignatureVisitorFactory,
+)
+from ai_gateway.code_suggestions.prompts.parsers.imports import ImportVisitorFactory
+
+__all__ = [
+    "compile_query",
+    "compile_queries",
+    "query_visitor",
+]
+
+_TARGET_CAPTURE = "target"
+
+_VISITOR_FACTORIES = [
+    CommentVisitorFactory,
+    ContextVisitorFactory,
+    CounterVisitorFactory,
+    FunctionSignatureVisitorFactory,
+    ImportVisitorFactory,
+]
+
+
+def _node_pattern(symbol: str) -> str:
+    # Symbols are either named nodes, e.g. `comment`, or anonymous ones, e.g. `//`
+    return f"({symbol})" if symbol.replace("_", "").isalpha() else f'"{symbol}"'
+
+
+def _target_query(language: Language, symbols: list[str]) -> Optional[Query]:
+    if not symbols:
+        return None
+
+    patterns = " ".join(map(_node_pattern, symbols))
+
+    try:
+        return language.query(f"[{patterns}] @{_TARGET_CAPTURE}")
+    except NameError:
+        # Some visitors list symbols missing from the grammar, skip them
+        return _target_query(
+            language, [symbol for symbol in symbols if _is_node_type(language, symbol)]
+        )
+
+
+def _is_node_type(language: Language, symbol: str) -> bool:
+    try:
+        language.query(_node_pattern(symbol))
+        return True
+    except NameError:
+        return False
+
+
+@cache
+def compile_query(
+    grammar_name: str, visitor_class: type[BaseVisitor]
+) -> Optional[Query]:
+    language = get_language(grammar_name)
+
+    if visitor_class._QUERY:
+        return language.query(visitor_class._QUERY)
+
+    return _target_query(language, visitor_class._TARGET_SYMBOLS)
+
+
+def compile_queries(lang_ids: Optional[list[LanguageId]] = None):
+    """Compile the queries of every visitor upfront, so that requests never pay for it."""
+    for factory in _VISITOR_FACTORIES:
+        for lang_id, klass in factory._LANG_ID_VISITORS.items():
+            if lang_ids is None or lang_id in lang_ids:
+                compile_query(
+                    ProgramLanguage.from_language_id(lang_id).grammar_name, klass
+                )
+
+
+def query_visitor(root: Node, lang_id: LanguageId, visitor: BaseVisitor) -> bool:
+    """Feed the visitor with the nodes captured by its query.
+
+    Tree-sitter returns the captures in the order of a depth-first traversal, without
+    visiting every node from Python. Returns False if the visitor has no query.
+    """
+    grammar_name = ProgramLanguage.from_language_id(lang_id).grammar_name
+    query = compile_query(grammar_name, type(visitor))
+    if query is None:
+        return False
+
+    if query_range := visitor.query_range:
+        start_point, end_point = query_range
+        captures = query.captures(root, start_point=start_point, end_point=end_point)
+    else:
+        captures = query.captures(root)
+
+    visitor.visit_captures(
+        root, [node for node, name in captures if name == _TARGET_CAPTURE]
+    )
+
+    return True
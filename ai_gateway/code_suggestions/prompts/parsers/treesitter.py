@@ -1,15 +1,9 @@
-import asyncio
-from typing import Optional
+from typing import Optional, Union
 
 from tree_sitter import Node, Tree
-from tree_sitter_languages import get_parser
 
-from ai_gateway.code_suggestions.processing.ops import (
-    LanguageId,
-    ProgramLanguage,
-    convert_point_to_relative_point_in_node,
-    split_on_point,
-)
+from ai_gateway.code_suggestions.processing.buffer import TextBuffer
+from ai_gateway.code_suggestions.processing.ops import LanguageId, ProgramLanguage
 from ai_gateway.code_suggestions.prompts.parsers.base import (
     BaseCodeParser,
     BaseVisitor,
@@ -25,24 +19,29 @@ from ai_gateway.code_suggestions.prompts.parsers.context_extractors import (
     ContextVisitorFactory,
 )
 from ai_gateway.code_suggestions.prompts.parsers.counters import CounterVisitorFactory
+from ai_gateway.code_suggestions.prompts.parsers.executor import ParserExecutor
 from ai_gateway.code_suggestions.prompts.parsers.function_signatures import (
     FunctionSignatureVisitorFactory,
 )
 from ai_gateway.code_suggestions.prompts.parsers.imports import ImportVisitorFactory
+from ai_gateway.code_suggestions.prompts.parsers.queries import query_visitor
 from ai_gateway.code_suggestions.prompts.parsers.treetraversal import tree_dfs
 
 
 class CodeParser(BaseCodeParser):
-    def __init__(self, tree: Tree, lang_id: LanguageId):
+    def __init__(
+        self, tree: Tree, lang_id: LanguageId, buffer: Optional[TextBuffer] = None
+    ):
         self.tree = tree
         self.lang_id = lang_id
+        self.buffer = buffer or TextBuffer(tree.text.decode("utf-8", errors="ignore"))
 
     def imports(self) -> list[str]:
         visitor = ImportVisitorFactory.from_language_id(self.lang_id)
         if visitor is None:
             return []
 
-        self._visit_nodes(visitor)
+        self._query_nodes(visitor)
         imports = visitor.imports
 
         return imports
@@ -52,7 +51,7 @@ class CodeParser(BaseCodeParser):
         if visitor is None:
             return []
 
-        self._visit_nodes(visitor)
+        self._query_nodes(visitor)
         function_signatures = visitor.function_signatures
 
         return function_signatures
@@ -62,7 +61,7 @@ class CodeParser(BaseCodeParser):
         if visitor is None:
             return {}
 
-        self._visit_nodes(visitor)
+        self._query_nodes(visitor)
         counts = visitor.counts
 
         return counts
@@ -77,18 +76,20 @@ class CodeParser(BaseCodeParser):
         if not node:
             return None
 
-        point_in_node = convert_point_to_relative_point_in_node(node, point)
-        _, suffix = split_on_point(
-            node.text.decode("utf-8", errors="ignore"), point_in_node
-        )
-        return suffix
+        pos = self.buffer.byte_point_to_offset(point)
+        start = self.buffer.byte_to_offset(node.start_byte)
+        end = self.buffer.byte_to_offset(node.end_byte)
+        if not start <= pos <= end:
+            return None
+
+        return self.buffer.text[pos:end]
 
     def _context_near_cursor(self, point: tuple[int, int]) -> Optional[Node]:
         visitor = ContextVisitorFactory.from_language_id(self.lang_id, point)
         if visitor is None:
             return None
 
-        self._visit_nodes(visitor)
+        self._query_nodes(visitor)
 
         return visitor.extract_most_relevant_context()
 
@@ -113,28 +114,38 @@ class CodeParser(BaseCodeParser):
     def _visit_nodes(self, visitor: BaseVisitor):
         tree_dfs(self.tree, visitor)
 
+    def _query_nodes(self, visitor: BaseVisitor):
+        # Let tree-sitter capture the target nodes natively instead of walking the whole tree
+        if not query_visitor(self.tree.root_node, self.lang_id, visitor):
+            self._visit_nodes(visitor)
+
     def comments_only(self) -> bool:
         visitor = CommentVisitorFactory.from_language_id(self.lang_id)
         if visitor is None:
             return False
 
-        self._visit_nodes(visitor)
+        self._query_nodes(visitor)
 
         return visitor.comments_only
 
     @classmethod
     async def from_language_id(
         cls,
-        content: str,
+        content: Union[str, bytes, TextBuffer],
         lang_id: Optional[LanguageId] = None,
+        *,
+        parser_executor: ParserExecutor,
     ):
-        return await asyncio.to_thread(cls._from_language_id, content, lang_id)
+        return await parser_executor.run(
+            cls._from_language_id, content, lang_id, parser_executor
+        )
 
     @classmethod
     def _from_language_id(
         cls,
-        content: str,
-        lang_id: Optional[LanguageId] = None,
+        content: Union[str, bytes, TextBuffer],
+        lang_id: Optional[LanguageId],
+        parser_executor: ParserExecutor,
     ):
         if lang_id is None:
             raise ValueError(f"Unsupported language: {lang_id}")
@@ -142,9 +153,15 @@ class CodeParser(BaseCodeParser):
         lang_def = ProgramLanguage.from_language_id(lang_id)
 
         try:
-            parser = get_parser(lang_def.grammar_name)
-            tree = parser.parse(bytes(content, "utf8"))
-        except (AttributeError, TypeError) as ex:
+            if isinstance(content, TextBuffer):
+                buffer = content
+            elif isinstance(content, bytes):
+                buffer = TextBuffer.from_encoded(content)
+            else:
+                buffer = TextBuffer(content)
+
+            tree = parser_executor.parse(buffer.encoded, lang_def.grammar_name)
+        except (AttributeError, TypeError, UnicodeDecodeError) as ex:
             raise ValueError(f"Unsupported code content: {str(ex)}")
 
-        return cls(tree, lang_id)
+        return cls(tree, lang_id, buffer)
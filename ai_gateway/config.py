@@ -1,4 +1,5 @@
 import os
+import tempfile
 from typing import Annotated, Optional, Set
 
 from dotenv import find_dotenv
@@ -102,6 +103,170 @@ class ConfigCustomModels(BaseModel):
 class ConfigAbuseDetection(BaseModel):
     enabled: bool = False
     sampling_rate: float = 0.1  # 1/10 of requests are sampled
+    queue_size: int = 1_000
+    batch_size: int = 10
+    batch_timeout_s: float = 1.0
+    cache_size: int = 10_000
+
+
+class ConfigModelFallback(BaseModel):
+    engine: Optional[str] = None
+    name: Optional[str] = None
+
+
+class ConfigCircuitBreaker(BaseModel):
+    enabled: bool = False
+    window_size: int = 20
+    minimum_requests: int = 10
+    failure_rate_threshold: float = 0.5
+    slow_request_duration_s: float = 10.0
+    slow_request_rate_threshold: float = 0.8
+    open_duration_s: float = 30.0
+    half_open_max_requests: int = 1
+    probe_timeout_s: float = 60.0
+    code_completions_fallback: Annotated[
+        ConfigModelFallback, Field(default_factory=ConfigModelFallback)
+    ] = ConfigModelFallback()
+    code_generations_fallback: Annotated[
+        ConfigModelFallback, Field(default_factory=ConfigModelFallback)
+    ] = ConfigModelFallback()
+
+
+class ConfigHedging(BaseModel):
+    enabled: bool = False
+    percentile: float = 0.95
+    min_delay_s: float = 0.1
+    max_delay_s: float = 2.0
+    max_extra_rate: float = 0.05
+    window_size: int = 100
+    min_samples: int = 20
+    use_fallback_model: bool = False
+
+
+class ConfigStreamCoalescing(BaseModel):
+    enabled: bool = False
+    window_ms: int = 15
+    max_bytes: int = 4_096
+    # Window by route template, e.g. `{"/v2/chat/agent": 0}` to write every chunk
+    route_window_ms: dict[str, int] = {}
+    max_queued_chunks: int = 64
+
+
+class ConfigStartup(BaseModel):
+    # Tokenizer and prompt registry artifacts built by `scripts/bootstrap.py`
+    tokenizer_path: Optional[str] = None
+    prompt_registry_snapshot: Optional[str] = None
+    # Import Amazon Q, Vertex AI Search and LiteLLM on first use instead of on startup
+    lazy_integrations: bool = False
+    # Load the application in a master process and fork the workers from it
+    prefork: bool = False
+    memory_report_interval_s: float = 60.0
+
+
+class ConfigTreeSitter(BaseModel):
+    # Threads parsing code suggestions requests, apart from the default executor
+    max_workers: int = 4
+    # Stop parses taking longer than this, 0 to never stop them
+    timeout_ms: int = 1000
+
+
+class ConfigRequestLimits(BaseModel):
+    enabled: bool = True
+    max_body_bytes: int = 64 * 1024 * 1024
+    # Limit by path, e.g. `{"/v1/x-ray/libraries": 1048576}`
+    route_max_body_bytes: dict[str, int] = {}
+
+
+class ConfigHealthCheck(BaseModel):
+    # The model providers are probed in the background, less often while healthy
+    interval_s: float = 300.0
+    unhealthy_interval_s: float = 15.0
+    timeout_s: float = 30.0
+    # Consecutive probes needed to change the status of a provider
+    failure_threshold: int = 3
+    success_threshold: int = 1
+    # The instance isn't ready when the last probe is older than this
+    max_status_age_s: float = 900.0
+    # Status shared by the workers of the instance so that only one probes the
+    # providers, each worker probes them when empty
+    state_file: str = os.path.join(tempfile.gettempdir(), "ai_gateway_health.json")
+
+
+class ConfigPromptBudget(BaseModel):
+    # Shrink the code completion prompts when one of these is exceeded
+    enabled: bool = False
+    interval_s: float = 1.0
+    queue_wait_threshold_s: float = 0.05
+    loop_lag_threshold_s: float = 0.1
+    vendor_latency_threshold_s: float = 2.0
+    # Share of the input token limit kept at most, and below which the code context
+    # is dropped
+    min_ratio: float = 0.25
+    drop_context_below: float = 0.5
+
+
+class ConfigWorkloadScheduling(BaseModel):
+    # Hand out the request slots and the tree-sitter threads by workload priority:
+    # code completions first, then chat and the other features, then x-ray and
+    # abuse detection
+    enabled: bool = False
+    max_concurrent_requests: int = 256
+    # Share of the slots each class can hold at most, 1.0 when not set
+    max_shares: dict[str, float] = {"standard": 0.8, "background": 0.2}
+    # Within a class, the slots are shared fairly between the users of the GitLab
+    # instances, weighted by instance id and by unit primitive (feature category for
+    # the single purpose endpoints), 1.0 when not set
+    tenant_weights: dict[str, float] = {}
+    unit_primitive_weights: dict[str, float] = {}
+
+
+class ConfigRateLimit(BaseModel):
+    rate_per_s: float = Field(gt=0)
+    burst: float = Field(ge=1)
+
+
+class ConfigRateLimiting(BaseModel):
+    # Token buckets of each GitLab instance and user, by unit primitive (or feature
+    # category for the single purpose endpoints), falling back to `default`
+    enabled: bool = False
+    instance_limits: dict[str, ConfigRateLimit] = {}
+    user_limits: dict[str, ConfigRateLimit] = {}
+    # Buckets kept in memory, the least recently used ones are dropped once full again
+    max_keys: int = 100_000
+
+
+class ConfigTokenCalibration(BaseModel):
+    words: float
+    letters: float
+    digits: float
+    symbols: float
+    breaks: float
+    non_ascii_bytes: float
+
+
+class ConfigTokenEstimation(BaseModel):
+    # Calibrations of the token estimator by tokenizer family, as printed by
+    # `calibrate_token_estimator`
+    calibrations: dict[str, ConfigTokenCalibration] = {}
+
+
+class ConfigMemoryDiagnostics(BaseModel):
+    # Serve the memory diagnostics of the workers under `/monitoring/memory`
+    enabled: bool = False
+    # Frames kept by `tracemalloc` for each allocation while tracing
+    traceback_frames: int = 10
+    max_snapshots: int = 5
+    # Share of the requests whose allocations are recorded by route while tracing
+    route_sample_rate: float = Field(default=0.0, ge=0.0, le=1.0)
+
+
+class ConfigMockModel(BaseModel):
+    # Time to the first token of the mocked models, drawn from a log-normal distribution
+    latency_median_s: float = 0.0
+    latency_p99_s: float = 0.0
+    # Delay between the chunks streamed by the mocked models
+    chunk_delay_s: float = 0.0
+    seed: Optional[int] = None
 
 
 class ConfigModelKeys(BaseModel):
@@ -198,6 +363,9 @@ class Config(BaseSettings):
     customer_portal_url: str = "https://customers.gitlab.com"
     glgo_base_url: str = "http://auth.token.gitlab.com"
     mock_model_responses: bool = False
+    mock_model: Annotated[ConfigMockModel, Field(default_factory=ConfigMockModel)] = (
+        ConfigMockModel()
+    )
 
     logging: Annotated[ConfigLogging, Field(default_factory=ConfigLogging)] = (
         ConfigLogging()
@@ -255,6 +423,42 @@ class Config(BaseSettings):
     feature_flags: Annotated[
         ConfigFeatureFlags, Field(default_factory=ConfigFeatureFlags)
     ] = ConfigFeatureFlags()
+    circuit_breaker: Annotated[
+        ConfigCircuitBreaker, Field(default_factory=ConfigCircuitBreaker)
+    ] = ConfigCircuitBreaker()
+    hedging: Annotated[ConfigHedging, Field(default_factory=ConfigHedging)] = (
+        ConfigHedging()
+    )
+    stream_coalescing: Annotated[
+        ConfigStreamCoalescing, Field(default_factory=ConfigStreamCoalescing)
+    ] = ConfigStreamCoalescing()
+    startup: Annotated[ConfigStartup, Field(default_factory=ConfigStartup)] = (
+        ConfigStartup()
+    )
+    tree_sitter: Annotated[
+        ConfigTreeSitter, Field(default_factory=ConfigTreeSitter)
+    ] = ConfigTreeSitter()
+    request_limits: Annotated[
+        ConfigRequestLimits, Field(default_factory=ConfigRequestLimits)
+    ] = ConfigRequestLimits()
+    health_check: Annotated[
+        ConfigHealthCheck, Field(default_factory=ConfigHealthCheck)
+    ] = ConfigHealthCheck()
+    prompt_budget: Annotated[
+        ConfigPromptBudget, Field(default_factory=ConfigPromptBudget)
+    ] = ConfigPromptBudget()
+    workload_scheduling: Annotated[
+        ConfigWorkloadScheduling, Field(default_factory=ConfigWorkloadScheduling)
+    ] = ConfigWorkloadScheduling()
+    rate_limiting: Annotated[
+        ConfigRateLimiting, Field(default_factory=ConfigRateLimiting)
+    ] = ConfigRateLimiting()
+    token_estimation: Annotated[
+        ConfigTokenEstimation, Field(default_factory=ConfigTokenEstimation)
+    ] = ConfigTokenEstimation()
+    memory_diagnostics: Annotated[
+        ConfigMemoryDiagnostics, Field(default_factory=ConfigMemoryDiagnostics)
+    ] = ConfigMemoryDiagnostics()
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -5,12 +5,22 @@ from ai_gateway.abuse_detection.container import ContainerAbuseDetection
 from ai_gateway.auth.container import ContainerSelfSignedJwt
 from ai_gateway.chat.container import ContainerChat
 from ai_gateway.code_suggestions.container import ContainerCodeSuggestions
+from ai_gateway.health.container import ContainerHealth
+from ai_gateway.instrumentators.memory import MemoryProfiler
 from ai_gateway.integrations.container import ContainerIntegrations
 from ai_gateway.internal_events import ContainerInternalEvent
 from ai_gateway.models.container import ContainerModels
 from ai_gateway.models.v2.container import ContainerModels as ContainerModelsV2
 from ai_gateway.prompts.container import ContainerPrompts
+from ai_gateway.rate_limiting import (
+    InMemoryRateLimitBackend,
+    RateLimiter,
+    RateLimitRule,
+)
+from ai_gateway.scheduling import PriorityLimiter, WorkloadClass
 from ai_gateway.searches.container import ContainerSearches
+from ai_gateway.streaming import StreamCoalescer
+from ai_gateway.token_estimation import Calibration, TokenEstimator, TokenizerFamily
 from ai_gateway.tracking.container import ContainerTracking
 
 __all__ = [
@@ -20,6 +30,50 @@ __all__ = [
 from ai_gateway.x_ray.container import ContainerXRay
 
 
+def _init_request_limiter(
+    enabled: bool,
+    max_concurrent_requests: int,
+    max_shares: dict[str, float],
+    tenant_weights: dict[str, float],
+    unit_primitive_weights: dict[str, float],
+) -> PriorityLimiter:
+    return PriorityLimiter(
+        "requests",
+        capacity=max_concurrent_requests,
+        max_shares={
+            WorkloadClass(workload): share for workload, share in max_shares.items()
+        },
+        enabled=enabled,
+        tenant_weights=tenant_weights,
+        unit_primitive_weights=unit_primitive_weights,
+    )
+
+
+def _init_rate_limiter(
+    enabled: bool,
+    max_keys: int,
+    instance_limits: dict[str, dict],
+    user_limits: dict[str, dict],
+) -> RateLimiter:
+    return RateLimiter(
+        backend=InMemoryRateLimitBackend(max_keys=max_keys),
+        instance_limits={
+            key: RateLimitRule(**limit) for key, limit in instance_limits.items()
+        },
+        user_limits={key: RateLimitRule(**limit) for key, limit in user_limits.items()},
+        enabled=enabled,
+    )
+
+
+def _init_token_estimator(calibrations: dict[str, dict]) -> TokenEstimator:
+    return TokenEstimator(
+        {
+            TokenizerFamily(family): Calibration(**calibration)
+            for family, calibration in calibrations.items()
+        }
+    )
+
+
 class ContainerApplication(containers.DeclarativeContainer):
     wiring_config = containers.WiringConfiguration(
         modules=[
@@ -31,6 +85,8 @@ class ContainerApplication(containers.DeclarativeContainer):
             "ai_gateway.api.v4.code.suggestions",
             "ai_gateway.api.server",
             "ai_gateway.api.monitoring",
+            "ai_gateway.api.feature_category",
+            "ai_gateway.api.middleware",
             "ai_gateway.async_dependency_resolver",
         ]
     )
@@ -44,6 +100,47 @@ class ContainerApplication(containers.DeclarativeContainer):
         enable_client_stream_send_time_histogram=True,
     )
 
+    stream_coalescer = providers.Singleton(
+        StreamCoalescer,
+        enabled=config.stream_coalescing.enabled,
+        window_ms=config.stream_coalescing.window_ms,
+        max_bytes=config.stream_coalescing.max_bytes,
+        route_window_ms=config.stream_coalescing.route_window_ms,
+        max_queued_chunks=config.stream_coalescing.max_queued_chunks,
+    )
+
+    # Request slots handed out by workload priority, shared by the endpoints and the
+    # background workers calling the models
+    request_limiter = providers.Singleton(
+        _init_request_limiter,
+        enabled=config.workload_scheduling.enabled,
+        max_concurrent_requests=config.workload_scheduling.max_concurrent_requests,
+        max_shares=config.workload_scheduling.max_shares,
+        tenant_weights=config.workload_scheduling.tenant_weights,
+        unit_primitive_weights=config.workload_scheduling.unit_primitive_weights,
+    )
+
+    rate_limiter = providers.Singleton(
+        _init_rate_limiter,
+        enabled=config.rate_limiting.enabled,
+        max_keys=config.rate_limiting.max_keys,
+        instance_limits=config.rate_limiting.instance_limits,
+        user_limits=config.rate_limiting.user_limits,
+    )
+
+    memory_profiler = providers.Singleton(
+        MemoryProfiler,
+        enabled=config.memory_diagnostics.enabled,
+        traceback_frames=config.memory_diagnostics.traceback_frames,
+        max_snapshots=config.memory_diagnostics.max_snapshots,
+        route_sample_rate=config.memory_diagnostics.route_sample_rate,
+    )
+
+    token_estimator = providers.Singleton(
+        _init_token_estimator,
+        calibrations=config.token_estimation.calibrations,
+    )
+
     searches = providers.Container(
         ContainerSearches,
         config=config,
@@ -73,7 +170,12 @@ class ContainerApplication(containers.DeclarativeContainer):
         ContainerCodeSuggestions,
         models=pkg_models,
         config=config.f.code_suggestions,
+        startup=config.startup,
+        tree_sitter=config.tree_sitter,
+        workload_scheduling=config.workload_scheduling,
+        prompt_budget_config=config.prompt_budget,
         snowplow=snowplow,
+        token_estimator=token_estimator,
     )
     x_ray = providers.Container(
         ContainerXRay,
@@ -94,8 +196,14 @@ class ContainerApplication(containers.DeclarativeContainer):
         ContainerAbuseDetection,
         config=config.abuse_detection,
         models=pkg_models,
+        request_limiter=request_limiter,
     )
     integrations = providers.Container(
         ContainerIntegrations,
         config=config,
     )
+    health = providers.Container(
+        ContainerHealth,
+        config=config,
+        models=pkg_models,
+    )
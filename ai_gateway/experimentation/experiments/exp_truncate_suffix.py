@@ -11,12 +11,13 @@ async def variant_1(**kwargs) -> str:
     from structlog import BoundLogger
 
     from ai_gateway.code_suggestions.processing.ops import LanguageId
-    from ai_gateway.code_suggestions.prompts.parsers.treesitter import CodeParser
+    from ai_gateway.code_suggestions.prompts.parsers import CodeParser, ParserExecutor
 
     async def _truncate_suffix_context(
         logger: BoundLogger,
         prefix: str,
         suffix: str,
+        parser_executor: ParserExecutor,
         lang_id: Optional[LanguageId] = None,
     ) -> str:
         # no point in truncating the suffix if the prefix is empty
@@ -24,7 +25,9 @@ async def variant_1(**kwargs) -> str:
             return suffix
 
         try:
-            parser = await CodeParser.from_language_id(prefix + suffix, lang_id)
+            parser = await CodeParser.from_language_id(
+                prefix + suffix, lang_id, parser_executor=parser_executor
+            )
         except ValueError as e:
             logger.warning(f"Failed to parse code: {e}")
             # default to the original suffix
@@ -0,0 +1,4 @@
+# flake8: noqa
+
+from ai_gateway.health.checker import *
+from ai_gateway.health.probes import *
@@ -0,0 +1,223 @@
+import asyncio
+import fcntl
+import json
+import os
+import time
+from typing import Any, Awaitable, Callable, NamedTuple, Optional
+
+import structlog
+from prometheus_client import Gauge
+
+from ai_gateway.models import KindModelProvider
+
+__all__ = [
+    "HealthChecker",
+    "ProviderProbe",
+    "ProviderStatus",
+]
+
+log = structlog.stdlib.get_logger("health")
+
+PROVIDER_UP_GAUGE = Gauge(
+    "model_provider_up",
+    "Whether the model provider is considered healthy by the background probes",
+    ["provider"],
+)
+
+
+class ProviderProbe(NamedTuple):
+    provider: KindModelProvider
+    check: Callable[[], Awaitable[Any]]
+
+
+class ProviderStatus(NamedTuple):
+    healthy: bool
+    # Wall-clock time of the last probe
+    checked_at: float
+    consecutive_successes: int = 0
+    consecutive_failures: int = 0
+    error: Optional[str] = None
+
+
+class HealthChecker:
+    """Probes the model providers in the background and caches their status.
+
+    Each provider is probed by its own task every `interval_s`, or every
+    `unhealthy_interval_s` while it isn't healthy. To absorb flapping, a healthy
+    provider is only marked unhealthy after `failure_threshold` consecutive failures,
+    and an unhealthy one healthy again after `success_threshold` consecutive successes.
+    The readiness and liveness checks only read the cached status.
+
+    With a `state_file`, the workers of an instance share the probes: the worker
+    holding the lock next to the file probes the providers and writes their status to
+    it, the others read the status from it and take over the lock when that worker
+    exits. Otherwise, each process probes the providers on its own.
+    """
+
+    def __init__(
+        self,
+        probes: list[ProviderProbe],
+        interval_s: float = 300.0,
+        unhealthy_interval_s: float = 15.0,
+        timeout_s: float = 30.0,
+        failure_threshold: int = 3,
+        success_threshold: int = 1,
+        max_status_age_s: float = 900.0,
+        state_file: Optional[str] = None,
+    ):
+        self.probes = probes
+        self.interval_s = interval_s
+        self.unhealthy_interval_s = unhealthy_interval_s
+        self.timeout_s = timeout_s
+        self.failure_threshold = failure_threshold
+        self.success_threshold = success_threshold
+        self.max_status_age_s = max_status_age_s
+        self.state_file = state_file
+
+        self.statuses: dict[KindModelProvider, ProviderStatus] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._lock_fd: Optional[int] = None
+
+    def start(self):
+        if self._tasks:
+            return
+
+        self._tasks = [
+            asyncio.create_task(self._run(probe), name=f"health-{probe.provider}")
+            for probe in self.probes
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    async def probe(self, probe: ProviderProbe) -> ProviderStatus:
+        error = None
+        try:
+            await asyncio.wait_for(probe.check(), timeout=self.timeout_s)
+        except Exception as ex:
+            error = f"{type(ex).__name__}: {ex}"
+            log.warning(
+                "model provider probe failed", provider=probe.provider, error=error
+            )
+
+        status = self._next_status(self.statuses.get(probe.provider), error)
+        self._set_status(probe.provider, status)
+        self._save_statuses()
+
+        return status
+
+    def is_leader(self) -> bool:
+        """Whether this process probes the providers, tries to take the lock if not."""
+        if not self.state_file or self._lock_fd is not None:
+            return True
+
+        try:
+            fd = os.open(f"{self.state_file}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as ex:
+            # Probe from every process rather than not at all
+            log.warning("failed to open the health check lock", error=str(ex))
+            return True
+
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+
+        self._lock_fd = fd
+        return True
+
+    def load_statuses(self):
+        """Read the status of the providers probed by the leader."""
+        try:
+            with open(self.state_file, encoding="utf-8") as f:
+                statuses = json.load(f)
+        except (OSError, TypeError, ValueError):
+            # The leader hasn't probed the providers yet
+            return
+
+        for probe in self.probes:
+            if status := statuses.get(probe.provider.value):
+                self._set_status(probe.provider, ProviderStatus(**status))
+
+    def provider_ready(self, provider: KindModelProvider) -> bool:
+        status = self.statuses.get(provider)
+        if status is None or not status.healthy:
+            return False
+
+        # A status this old means the probes are stuck
+        return time.time() - status.checked_at <= self.max_status_age_s
+
+    def ready(self) -> bool:
+        return all(self.provider_ready(probe.provider) for probe in self.probes)
+
+    def alive(self) -> bool:
+        # The probes never return on their own, a finished task has crashed
+        return not any(task.done() for task in self._tasks)
+
+    def _next_status(
+        self, previous: Optional[ProviderStatus], error: Optional[str]
+    ) -> ProviderStatus:
+        checked_at = time.time()
+
+        if error is None:
+            successes = (previous.consecutive_successes if previous else 0) + 1
+            return ProviderStatus(
+                healthy=(previous is not None and previous.healthy)
+                or successes >= self.success_threshold,
+                checked_at=checked_at,
+                consecutive_successes=successes,
+            )
+
+        failures = (previous.consecutive_failures if previous else 0) + 1
+        return ProviderStatus(
+            healthy=previous is not None
+            and previous.healthy
+            and failures < self.failure_threshold,
+            checked_at=checked_at,
+            consecutive_failures=failures,
+            error=error,
+        )
+
+    def _set_status(self, provider: KindModelProvider, status: ProviderStatus):
+        self.statuses[provider] = status
+        PROVIDER_UP_GAUGE.labels(provider=provider.value).set(status.healthy)
+
+    def _save_statuses(self):
+        if not self.state_file:
+            return
+
+        # Replace the file at once so that the other workers never read a partial one
+        tmp_file = f"{self.state_file}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        provider.value: status._asdict()
+                        for provider, status in self.statuses.items()
+                    },
+                    f,
+                )
+            os.replace(tmp_file, self.state_file)
+        except OSError as ex:
+            log.warning("failed to save the health check status", error=str(ex))
+
+    async def _run(self, probe: ProviderProbe):
+        while True:
+            if not self.is_leader():
+                self.load_statuses()
+                await asyncio.sleep(self.unhealthy_interval_s)
+                continue
+
+            status = await self.probe(probe)
+            await asyncio.sleep(
+                self.interval_s if status.healthy else self.unhealthy_interval_s
+            )
@@ -0,0 +1,45 @@
+from typing import AsyncIterator
+
+from dependency_injector import containers, providers
+
+from ai_gateway.health.checker import HealthChecker
+from ai_gateway.health.probes import build_provider_probes
+
+
+async def _run_health_checker(health_checker: HealthChecker) -> AsyncIterator[None]:
+    health_checker.start()
+    yield
+    await health_checker.stop()
+
+
+class ContainerHealth(containers.DeclarativeContainer):
+    config = providers.Configuration(strict=True)
+    models = providers.DependenciesContainer()
+
+    health_checker = providers.Singleton(
+        HealthChecker,
+        probes=providers.Callable(
+            build_provider_probes,
+            mock_model_responses=config.mock_model_responses,
+            grpc_client_vertex=models.grpc_client_vertex.provider,
+            http_client_anthropic=models.http_client_anthropic.provider,
+            async_fireworks_client=models.async_fireworks_client.provider,
+            vertex_project=config.vertex_text_model.project,
+            vertex_location=config.vertex_text_model.location,
+            model_endpoints=config.model_endpoints,
+            timeout_s=config.health_check.timeout_s,
+        ),
+        interval_s=config.health_check.interval_s,
+        unhealthy_interval_s=config.health_check.unhealthy_interval_s,
+        timeout_s=config.health_check.timeout_s,
+        failure_threshold=config.health_check.failure_threshold,
+        success_threshold=config.health_check.success_threshold,
+        max_status_age_s=config.health_check.max_status_age_s,
+        state_file=config.health_check.state_file,
+    )
+
+    # Probes the model providers in the background while the application runs
+    health_checker_probes = providers.Resource(
+        _run_health_checker,
+        health_checker=health_checker,
+    )
@@ -0,0 +1,137 @@
+import functools
+from typing import Any, Callable, Optional
+
+from anthropic import AsyncAnthropic
+from google.cloud.aiplatform.gapic import PredictionServiceAsyncClient
+from openai import AsyncOpenAI
+
+from ai_gateway.health.checker import ProviderProbe
+from ai_gateway.models import KindAnthropicModel, KindModelProvider
+from ai_gateway.models.vertex_predict import PredictParameters, build_predict_request
+from ai_gateway.models.vertex_text import KindVertexTextModel
+
+__all__ = [
+    "build_provider_probes",
+    "check_anthropic_available",
+    "check_fireworks_available",
+    "check_vertex_available",
+]
+
+# The probes call the provider clients directly: a request served by a fallback model
+# would hide the outage, and the probes must not feed the circuit breakers or the model
+# latency read by the prompt budget. They ask for a single token to keep them cheap.
+
+_PROBE_PROMPT = "def hello_world():"
+
+
+def _client(provider: KindModelProvider, client: Callable[[], Optional[Any]]) -> Any:
+    if (instance := client()) is None:
+        raise ValueError(f"the {provider.value} client isn't configured")
+
+    return instance
+
+
+async def check_vertex_available(
+    client: Callable[[], Optional[PredictionServiceAsyncClient]],
+    project: str,
+    location: str,
+    timeout_s: float,
+):
+    endpoint = (
+        f"projects/{project}/locations/{location}/publishers/google/models/"
+        f"{KindVertexTextModel.CODE_GECKO_002.value}"
+    )
+    request = build_predict_request(
+        endpoint,
+        {"prefix": _PROBE_PROMPT, "suffix": ""},
+        PredictParameters(
+            temperature=0.0,
+            max_output_tokens=1,
+            top_p=0.95,
+            top_k=40,
+            candidate_count=1,
+        ),
+    )
+
+    await _client(KindModelProvider.VERTEX_AI, client).predict(
+        request=request, timeout=timeout_s
+    )
+
+
+async def check_anthropic_available(
+    client: Callable[[], Optional[AsyncAnthropic]], timeout_s: float
+):
+    await _client(KindModelProvider.ANTHROPIC, client).messages.create(
+        model=KindAnthropicModel.CLAUDE_3_HAIKU.value,
+        messages=[{"role": "user", "content": f"Complete this code: {_PROBE_PROMPT}"}],
+        max_tokens=1,
+        timeout=timeout_s,
+    )
+
+
+async def check_fireworks_available(
+    client: Callable[[], Optional[AsyncOpenAI]], model: str, timeout_s: float
+):
+    await _client(KindModelProvider.FIREWORKS, client).completions.create(
+        model=model,
+        prompt=_PROBE_PROMPT,
+        max_tokens=1,
+        timeout=timeout_s,
+    )
+
+
+async def _check_mocked():
+    pass
+
+
+def build_provider_probes(
+    mock_model_responses: bool,
+    grpc_client_vertex: Callable[[], Optional[PredictionServiceAsyncClient]],
+    http_client_anthropic: Callable[[], Optional[AsyncAnthropic]],
+    async_fireworks_client: Callable[[], Optional[AsyncOpenAI]],
+    vertex_project: str,
+    vertex_location: str,
+    model_endpoints: dict,
+    timeout_s: float,
+) -> list[ProviderProbe]:
+    providers = [
+        KindModelProvider.VERTEX_AI,
+        KindModelProvider.ANTHROPIC,
+        KindModelProvider.FIREWORKS,
+    ]
+
+    # There are no clients when the model responses are mocked, the providers are
+    # always reported as healthy then
+    if mock_model_responses:
+        return [
+            ProviderProbe(provider=provider, check=_check_mocked)
+            for provider in providers
+        ]
+
+    # The clients are only created when probed, a client that fails to connect marks
+    # its provider unhealthy instead of failing the startup
+    checks = [
+        functools.partial(
+            check_vertex_available,
+            grpc_client_vertex,
+            project=vertex_project,
+            location=vertex_location,
+            timeout_s=timeout_s,
+        ),
+        functools.partial(
+            check_anthropic_available, http_client_anthropic, timeout_s=timeout_s
+        ),
+        functools.partial(
+            check_fireworks_available,
+            async_fireworks_client,
+            model=model_endpoints.get("fireworks_current_region_endpoint", {}).get(
+                "identifier", ""
+            ),
+            timeout_s=timeout_s,
+        ),
+    ]
+
+    return [
+        ProviderProbe(provider=provider, check=check)
+        for provider, check in zip(providers, checks)
+    ]
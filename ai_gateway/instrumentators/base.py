@@ -1,6 +1,7 @@
 import re
 import time
 from contextlib import contextmanager
+from functools import lru_cache
 from typing import Annotated, Any, Optional
 
 import structlog
@@ -69,11 +70,51 @@ telemetry_logger = structlog.stdlib.get_logger("telemetry")
 
 WHITESPACE_REGEX = re.compile(r"\s+")
 
+# The characters matched by `\s`, the last one being U+3000 IDEOGRAPHIC SPACE
+WHITESPACE_CHARS = "".join(c for c in map(chr, range(0x3001)) if c.isspace())
+ASCII_WHITESPACE_CHARS = "".join(c for c in WHITESPACE_CHARS if c.isascii())
+
 
 def remove_whitespace(text: str) -> str:
     return WHITESPACE_REGEX.sub("", text)
 
 
+def stripped_length(text: str) -> int:
+    """Return `len(remove_whitespace(text))` without building the stripped string.
+
+    Counting each whitespace character runs in C and is several times faster than
+    the regex on large prompts.
+    """
+    chars = ASCII_WHITESPACE_CHARS if text.isascii() else WHITESPACE_CHARS
+    return len(text) - sum(map(text.count, chars))
+
+
+class MetricChildren:
+    """Cache the children of metrics sharing a set of labels, e.g. the model labels.
+
+    Resolving `metric.labels(...)` validates the labels and takes a lock on every
+    call, while the same few children are used by every request to a model.
+    """
+
+    def __init__(self, **labels: str):
+        self.labels = labels
+        self._children: dict[tuple, Any] = {}
+
+    def get(self, metric: Any, **labels: str) -> Any:
+        key = (metric, *labels.items())
+
+        if (child := self._children.get(key)) is None:
+            child = self._children[key] = metric.labels(**self.labels, **labels)
+
+        return child
+
+
+@lru_cache(maxsize=1_000)
+def metric_children(**labels: str) -> MetricChildren:
+    """Return the children shared by the requests with the same labels, e.g. model."""
+    return MetricChildren(**labels)
+
+
 class TextGenModelInstrumentator:
     # Code Completions currently returns multiple completion suggestions while code
     # generations returns one. For most of these properties, we return the data from
@@ -104,7 +145,7 @@ class TextGenModelInstrumentator:
                     "model_output_length_stripped": self.__dict__.get(
                         "model_output_length_stripped", 0
                     )
-                    + len(remove_whitespace(model_output)),
+                    + stripped_length(model_output),
                 }
             )
 
@@ -145,12 +186,25 @@ class TextGenModelInstrumentator:
 
     def __init__(self, model_engine: str, model_name: str):
         self.labels = {"model_engine": model_engine, "model_name": model_name}
+        self.children = metric_children(**self.labels)
+        self.cost_children = metric_children(
+            unit="characters",
+            vendor=model_engine,
+            model=model_name,
+            feature_category="code_suggestions",
+        )
 
     @contextmanager
     def watch(self, prompt, **kwargs: Any):
-        prompt_string = f"{prompt.prefix}{prompt.suffix if prompt.suffix else ''}"
-        prompt_length = len(prompt_string)
-        prompt_length_stripped = len(remove_whitespace(prompt_string))
+        # The prepared chat prompts of the code generations are lists of messages
+        if isinstance(prompt.prefix, list):
+            prefix = "".join(message.content for message in prompt.prefix)
+        else:
+            prefix = prompt.prefix
+
+        suffix = prompt.suffix or ""
+        prompt_length = len(prefix) + len(suffix)
+        prompt_length_stripped = stripped_length(prefix) + stripped_length(suffix)
 
         context["model_engine"] = self.labels["model_engine"]
         context["model_name"] = self.labels["model_name"]
@@ -158,12 +212,14 @@ class TextGenModelInstrumentator:
         context["prompt_length_stripped"] = prompt_length_stripped
 
         for name, md in prompt.metadata.components.items():
-            labels = self.labels.copy()
-            labels["component"] = name
-            INFERENCE_PROMPT_HISTOGRAM.labels(**labels).observe(md.length)
-            INFERENCE_PROMPT_TOKENS_HISTOGRAM.labels(**labels).observe(md.length_tokens)
+            self.children.get(INFERENCE_PROMPT_HISTOGRAM, component=name).observe(
+                md.length
+            )
+            self.children.get(
+                INFERENCE_PROMPT_TOKENS_HISTOGRAM, component=name
+            ).observe(md.length_tokens)
 
-        INFERENCE_COUNTER.labels(**self.labels).inc()
+        self.children.get(INFERENCE_COUNTER).inc()
         self._track_model_cost("input", prompt_length_stripped)
 
         watch_container = TextGenModelInstrumentator.WatchContainer(**kwargs)
@@ -173,7 +229,7 @@ class TextGenModelInstrumentator:
             yield watch_container
         finally:
             duration = time.perf_counter() - start_time
-            INFERENCE_HISTOGRAM.labels(**self.labels).observe(duration)
+            self.children.get(INFERENCE_HISTOGRAM).observe(duration)
 
             container_dict = watch_container.dict()
             self._track_model_cost(
@@ -184,14 +240,9 @@ class TextGenModelInstrumentator:
             context.update(container_dict)
 
     def _track_model_cost(self, kind, character_count):
-        labels = {
-            "item": f"completions/completion/{kind}",
-            "unit": "characters",
-            "vendor": self.labels["model_engine"],
-            "model": self.labels["model_name"],
-            "feature_category": "code_suggestions",
-        }
-        CLOUD_COST_COUNTER.labels(**labels).inc(character_count)
+        self.cost_children.get(
+            CLOUD_COST_COUNTER, item=f"completions/completion/{kind}"
+        ).inc(character_count)
 
 
 class Telemetry(BaseModel):
@@ -0,0 +1,88 @@
+import threading
+from typing import Any, Iterable, Optional
+
+from prometheus_client import Counter
+from prometheus_client.metrics import MetricWrapperBase
+
+__all__ = [
+    "OTHER_LABEL_VALUE",
+    "BoundedMetric",
+]
+
+OTHER_LABEL_VALUE = "other"
+
+METRIC_LABEL_VALUES_DROPPED = Counter(
+    "metric_label_values_dropped_total",
+    "Number of label values replaced with `other` to bound the cardinality of a metric",
+    ["metric", "label"],
+)
+
+
+class BoundedMetric:
+    """Bound the number of time series a metric creates from request data.
+
+    Every label combination creates a time series that lives until the process exits
+    and is serialized on each scrape, so labels fed by clients must be bounded:
+
+    - Labels listed in `allowed_values` keep only the values of their allow-list.
+    - Labels listed in `capped_labels` keep their values until `max_values` distinct
+      combinations of them were recorded, which caps the number of series of the metric.
+
+    Values that are not kept are replaced with `other` and counted in
+    `metric_label_values_dropped_total`. A combination that was kept once is always
+    kept, so gauges are decremented on the same series they were incremented on.
+    """
+
+    def __init__(
+        self,
+        metric: MetricWrapperBase,
+        allowed_values: Optional[dict[str, Iterable[str]]] = None,
+        capped_labels: Iterable[str] = (),
+        max_values: int = 1_000,
+    ):
+        self.metric = metric
+        self.allowed_values = {
+            label: frozenset(values) for label, values in (allowed_values or {}).items()
+        }
+        self.capped_labels = tuple(sorted(capped_labels))
+        self.max_values = max_values
+
+        self._values: set[tuple] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return self.metric._name
+
+    def labels(self, **labels: Any) -> Any:
+        return self.metric.labels(**self.bound_labels(labels))
+
+    def bound_labels(self, labels: dict[str, Any]) -> dict[str, Any]:
+        bounded = dict(labels)
+
+        for label, allowed in self.allowed_values.items():
+            value = bounded.get(label)
+            if value is not None and value not in allowed:
+                self._drop(bounded, label)
+
+        if not self.capped_labels:
+            return bounded
+
+        key = tuple(bounded.get(label) for label in self.capped_labels)
+        with self._lock:
+            if key in self._values:
+                return bounded
+
+            if len(self._values) < self.max_values:
+                self._values.add(key)
+                return bounded
+
+        for label in self.capped_labels:
+            if label in bounded:
+                self._drop(bounded, label)
+
+        return bounded
+
+    def _drop(self, labels: dict[str, Any], label: str):
+        labels[label] = OTHER_LABEL_VALUE
+        METRIC_LABEL_VALUES_DROPPED.labels(metric=self.name, label=label).inc()
@@ -0,0 +1,261 @@
+import gc
+import itertools
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Iterable, NamedTuple, Union
+
+from prometheus_client import REGISTRY, CollectorRegistry
+
+__all__ = [
+    "KEY_TYPES",
+    "MemoryProfiler",
+    "RouteAllocations",
+    "metric_series_counts",
+    "object_counts",
+    "process_memory",
+]
+
+_SMAPS_ROLLUP_FIELDS = {
+    "Rss": "rss_bytes",
+    "Pss": "pss_bytes",
+    "Shared_Clean": "shared_bytes",
+    "Shared_Dirty": "shared_bytes",
+    "Private_Clean": "private_bytes",
+    "Private_Dirty": "private_bytes",
+    "Swap": "swap_bytes",
+}
+
+
+def process_memory(pid: Union[int, str] = "self") -> dict[str, int]:
+    """Report the memory of a process, split between pages shared with other processes,
+    e.g. inherited from the pre-fork master, and pages private to it.
+
+    Only available on Linux, an empty dict is returned elsewhere or if the process is gone.
+    """
+    try:
+        content = Path(f"/proc/{pid}/smaps_rollup").read_text()
+    except OSError:
+        return {}
+
+    memory = dict.fromkeys(_SMAPS_ROLLUP_FIELDS.values(), 0)
+    for line in content.splitlines():
+        field, _, value = line.partition(":")
+        if key := _SMAPS_ROLLUP_FIELDS.get(field):
+            # Values are reported in kB
+            memory[key] += int(value.split()[0]) * 1024
+
+    return memory
+
+
+# Types worth counting when the memory of the workers grows: the prompts and the code
+# they hold, the tree-sitter trees, and the LangChain prompts and messages
+KEY_TYPES = (
+    "ai_gateway.code_suggestions.processing.typing.Prompt",
+    "ai_gateway.code_suggestions.processing.typing.CodeContent",
+    "ai_gateway.code_suggestions.prompts.parsers.treesitter.CodeParser",
+    "tree_sitter.Tree",
+    "ai_gateway.prompts.base.Prompt",
+    "langchain_core.messages.ai.AIMessage",
+    "langchain_core.messages.human.HumanMessage",
+    "langchain_core.messages.system.SystemMessage",
+)
+
+_REFERENTS_CHUNK_SIZE = 10_000
+
+
+def _resolve_types(type_names: Iterable[str]) -> dict[type, str]:
+    types = {}
+    for type_name in type_names:
+        module_name, _, qualname = type_name.rpartition(".")
+        # Types of modules not loaded yet can't have any instance
+        if module := sys.modules.get(module_name):
+            if isinstance(cls := getattr(module, qualname, None), type):
+                types[cls] = type_name
+
+    return types
+
+
+def object_counts(type_names: Iterable[str] = KEY_TYPES) -> dict[str, int]:
+    """Count the live instances of the given types, by fully qualified name.
+
+    Walks all the objects of the process, which holds the GIL for a while on large heaps.
+    """
+    counts = dict.fromkeys(type_names, 0)
+    types = _resolve_types(type_names)
+
+    objects = gc.get_objects()
+    for obj in objects:
+        if type_name := types.get(type(obj)):
+            counts[type_name] += 1
+
+    # Objects the collector doesn't track, e.g. the tree-sitter trees or the tuples of
+    # strings and numbers, are only found through the objects referring to them
+    untracked: set[int] = set()
+    for start in range(0, len(objects), _REFERENTS_CHUNK_SIZE):
+        for referent in gc.get_referents(
+            *objects[start : start + _REFERENTS_CHUNK_SIZE]
+        ):
+            type_name = types.get(type(referent))
+            if (
+                type_name
+                and not gc.is_tracked(referent)
+                and id(referent) not in untracked
+            ):
+                untracked.add(id(referent))
+                counts[type_name] += 1
+
+    return counts
+
+
+def metric_series_counts(
+    registry: CollectorRegistry = REGISTRY, limit: int = 20
+) -> dict[str, int]:
+    """Count the samples exposed by the largest metrics, each label set is a child of
+    the metric kept until the process exits."""
+    counts = {metric.name: len(metric.samples) for metric in registry.collect()}
+
+    return dict(sorted(counts.items(), key=lambda item: item[1], reverse=True)[:limit])
+
+
+class RouteAllocations(NamedTuple):
+    samples: int = 0
+    total_bytes: int = 0
+    max_bytes: int = 0
+
+
+class MemoryProfiler:
+    """Takes `tracemalloc` snapshots on demand and samples the allocations by route.
+
+    Tracing starts with the first snapshot, so that it costs nothing until an
+    investigation starts, and stops when the snapshots are cleared. Only the last
+    `max_snapshots` are kept.
+
+    While tracing, `route_sample_rate` of the requests record the memory allocated and
+    not freed while they were processed. The requests running concurrently in the same
+    worker are included, so the figures only point at the routes to look at.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        traceback_frames: int = 10,
+        max_snapshots: int = 5,
+        route_sample_rate: float = 0.0,
+    ):
+        self.enabled = enabled
+        self.traceback_frames = traceback_frames
+        self.max_snapshots = max_snapshots
+        self.route_sample_rate = route_sample_rate
+
+        self.snapshots: OrderedDict[int, tuple[float, tracemalloc.Snapshot]] = (
+            OrderedDict()
+        )
+        self.routes: dict[str, RouteAllocations] = {}
+        self._snapshot_ids = itertools.count(1)
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def take_snapshot(self) -> tuple[int, tracemalloc.Snapshot]:
+        if not self.tracing:
+            tracemalloc.start(self.traceback_frames)
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ]
+        )
+
+        snapshot_id = next(self._snapshot_ids)
+        self.snapshots[snapshot_id] = (time.time(), snapshot)
+        while len(self.snapshots) > self.max_snapshots:
+            self.snapshots.popitem(last=False)
+
+        return snapshot_id, snapshot
+
+    def clear(self):
+        self.snapshots.clear()
+        self.routes.clear()
+        tracemalloc.stop()
+
+    def top(self, snapshot_id: int, limit: int = 20) -> list[dict[str, Any]]:
+        _, snapshot = self.snapshots[snapshot_id]
+
+        return [
+            {
+                "size_bytes": stat.size,
+                "count": stat.count,
+                "traceback": _format_traceback(stat.traceback),
+            }
+            for stat in snapshot.statistics("traceback")[:limit]
+        ]
+
+    def diff(
+        self, base_id: int, target_id: int, limit: int = 20
+    ) -> list[dict[str, Any]]:
+        _, base = self.snapshots[base_id]
+        _, target = self.snapshots[target_id]
+
+        return [
+            {
+                "size_diff_bytes": stat.size_diff,
+                "count_diff": stat.count_diff,
+                "size_bytes": stat.size,
+                "count": stat.count,
+                "traceback": _format_traceback(stat.traceback),
+            }
+            for stat in target.compare_to(base, "traceback")[:limit]
+        ]
+
+    def should_sample(self) -> bool:
+        return (
+            self.enabled
+            and self.route_sample_rate > 0
+            and self.tracing
+            and random.random() < self.route_sample_rate
+        )
+
+    def record_route(self, route: str, allocated_bytes: int):
+        current = self.routes.get(route, RouteAllocations())
+        self.routes[route] = RouteAllocations(
+            samples=current.samples + 1,
+            total_bytes=current.total_bytes + allocated_bytes,
+            max_bytes=max(current.max_bytes, allocated_bytes),
+        )
+
+    def summary(self) -> dict[str, Any]:
+        traced_bytes, traced_peak_bytes = tracemalloc.get_traced_memory()
+
+        return {
+            "pid": os.getpid(),
+            "process": process_memory(),
+            "gc": {"objects": len(gc.get_objects()), "counts": gc.get_count()},
+            "tracemalloc": {
+                "tracing": self.tracing,
+                "traced_bytes": traced_bytes,
+                "traced_peak_bytes": traced_peak_bytes,
+                "snapshots": [
+                    {"id": snapshot_id, "taken_at": taken_at}
+                    for snapshot_id, (taken_at, _) in list(self.snapshots.items())
+                ],
+            },
+            "objects": object_counts(),
+            "metric_series": metric_series_counts(),
+            "routes": {
+                route: allocations._asdict()
+                # Copied, the requests keep recording meanwhile
+                for route, allocations in list(self.routes.items())
+            },
+        }
+
+
+def _format_traceback(traceback: tracemalloc.Traceback) -> list[str]:
+    # Most recent call first
+    return [f"{frame.filename}:{frame.lineno}" for frame in reversed(traceback)]
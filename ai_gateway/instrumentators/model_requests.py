@@ -1,42 +1,82 @@
+import asyncio
 import time
 from contextlib import contextmanager
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from prometheus_client import Counter, Gauge, Histogram
 
 from ai_gateway.api.feature_category import current_feature_category
+from ai_gateway.instrumentators.base import MetricChildren, metric_children
+from ai_gateway.instrumentators.cardinality import BoundedMetric
 from ai_gateway.tracking.errors import log_exception
 
+if TYPE_CHECKING:
+    from ai_gateway.models.circuit_breaker import CircuitBreaker
+
 METRIC_LABELS = ["model_engine", "model_name"]
 INFERENCE_DETAILS = METRIC_LABELS + ["error", "streaming", "feature_category"]
 
-INFERENCE_IN_FLIGHT_GAUGE = Gauge(
-    "model_inferences_in_flight",
-    "The number of in flight inferences running",
-    METRIC_LABELS,
+# Model names of self-hosted models come from the request payload
+MAX_MODEL_NAMES = 100
+
+
+def _bounded(metric):
+    return BoundedMetric(
+        metric, capped_labels=["model_name"], max_values=MAX_MODEL_NAMES
+    )
+
+
+INFERENCE_IN_FLIGHT_GAUGE = _bounded(
+    Gauge(
+        "model_inferences_in_flight",
+        "The number of in flight inferences running",
+        METRIC_LABELS,
+    )
 )
 
-MAX_CONCURRENT_MODEL_INFERENCES = Gauge(
-    "model_inferences_max_concurrent",
-    "The maximum number of inferences we can run concurrently on a model",
-    METRIC_LABELS,
+MAX_CONCURRENT_MODEL_INFERENCES = _bounded(
+    Gauge(
+        "model_inferences_max_concurrent",
+        "The maximum number of inferences we can run concurrently on a model",
+        METRIC_LABELS,
+    )
 )
 
 # The counter and histogram from `instrumentators/base.py` can be removed once
 # the SLIs stop using these. Then all requests, not just the code-suggestion ones
 # will be instrumented
 # We'll remove this as part of https://gitlab.com/gitlab-org/modelops/applied-ml/code-suggestions/ai-assist/-/issues/441
-INFERENCE_COUNTER = Counter(
-    "model_inferences_total",
-    "The total number of inferences on a model with a label",
-    INFERENCE_DETAILS,
+INFERENCE_COUNTER = _bounded(
+    Counter(
+        "model_inferences_total",
+        "The total number of inferences on a model with a label",
+        INFERENCE_DETAILS,
+    )
+)
+
+INFERENCE_HEDGED_COUNTER = _bounded(
+    Counter(
+        "model_inferences_hedged_total",
+        "The total number of inferences that fired a hedged request, by the request that won",
+        METRIC_LABELS + ["winner"],
+    )
+)
+
+INFERENCE_TOKENS_COUNTER = _bounded(
+    Counter(
+        "model_inference_tokens_total",
+        "The total number of tokens consumed by inferences on a model, by token type",
+        METRIC_LABELS + ["type"],
+    )
 )
 
-INFERENCE_DURATION_S = Histogram(
-    "inference_request_duration_seconds",
-    "Duration of the inference request in seconds",
-    INFERENCE_DETAILS,
-    buckets=(0.5, 1, 2.5, 5, 10, 30, 60),
+INFERENCE_DURATION_S = _bounded(
+    Histogram(
+        "inference_request_duration_seconds",
+        "Duration of the inference request in seconds",
+        INFERENCE_DETAILS,
+        buckets=(0.5, 1, 2.5, 5, 10, 30, 60),
+    )
 )
 
 
@@ -47,10 +87,18 @@ class ModelRequestInstrumentator:
             labels: dict[str, str],
             concurrency_limit: Optional[int],
             streaming: bool,
+            circuit_breaker: Optional["CircuitBreaker"] = None,
+            children: Optional[MetricChildren] = None,
         ):
             self.labels = labels
+            self.children = children or metric_children(**labels)
             self.concurrency_limit = concurrency_limit
+            self.circuit_breaker = circuit_breaker
+            # Id of the request when it probes a half-open circuit
+            self.probe: Optional[int] = None
             self.error = False
+            self.exception: Optional[Exception] = None
+            self.cancelled = False
             self.streaming = streaming
             self.start_time = None
 
@@ -61,45 +109,104 @@ class ModelRequestInstrumentator:
             self.start_time = time.perf_counter()
 
             if self.concurrency_limit is not None:
-                MAX_CONCURRENT_MODEL_INFERENCES.labels(**self.labels).set(
+                self.children.get(MAX_CONCURRENT_MODEL_INFERENCES).set(
                     self.concurrency_limit
                 )
-            INFERENCE_IN_FLIGHT_GAUGE.labels(**self.labels).inc()
+            self.children.get(INFERENCE_IN_FLIGHT_GAUGE).inc()
 
-        def register_error(self):
+        def register_error(self, ex: Optional[Exception] = None):
             self.error = True
+            self.exception = ex
+
+        def register_cancellation(self):
+            """Register that the inference request was abandoned before completion,
+            e.g. because the client disconnected and the request task was cancelled.
+            """
+            self.cancelled = True
 
         def finish(self):
             """Register the end of the inference request.
             Duration is calculated from the start time set by `start()`.
             """
-            INFERENCE_IN_FLIGHT_GAUGE.labels(**self.labels).dec()
+            self.children.get(INFERENCE_IN_FLIGHT_GAUGE).dec()
 
             duration = time.perf_counter() - self.start_time
             detail_labels = self._detail_labels()
 
-            INFERENCE_COUNTER.labels(**detail_labels).inc()
-            INFERENCE_DURATION_S.labels(**detail_labels).observe(duration)
+            self.children.get(INFERENCE_COUNTER, **detail_labels).inc()
+            self.children.get(INFERENCE_DURATION_S, **detail_labels).observe(duration)
+
+            if self.circuit_breaker:
+                self._update_circuit_breaker(duration)
 
         async def afinish(self):
             self.finish()
 
+        def _update_circuit_breaker(self, duration: float):
+            if self.cancelled:
+                self.circuit_breaker.release(probe=self.probe)
+            elif self.error:
+                self.circuit_breaker.record_failure(self.exception, probe=self.probe)
+            else:
+                # The duration of a stream depends on the length of the output,
+                # so it's not a signal of model degradation
+                self.circuit_breaker.record_success(
+                    None if self.streaming else duration, probe=self.probe
+                )
+
         def _detail_labels(self) -> dict[str, str]:
-            detail_labels = {
-                "error": "yes" if self.error else "no",
+            if self.cancelled:
+                error = "cancelled"
+            else:
+                error = "yes" if self.error else "no"
+
+            return {
+                "error": error,
                 "streaming": "yes" if self.streaming else "no",
                 "feature_category": current_feature_category(),
             }
-            return {**self.labels, **detail_labels}
 
     def __init__(
         self,
         model_engine: str,
         model_name: str,
         concurrency_limit: Optional[int],
+        circuit_breaker: Optional["CircuitBreaker"] = None,
     ):
         self.labels = {"model_engine": model_engine, "model_name": model_name}
+        self.children = metric_children(**self.labels)
         self.concurrency_limit = concurrency_limit
+        self.circuit_breaker = circuit_breaker
+
+    def register_hedged_request(self, winner: str):
+        """Register that a second request was fired because the first one was slow.
+
+        `winner` is either `primary`, `hedge` or `none` if both requests failed.
+        """
+        self.children.get(INFERENCE_HEDGED_COUNTER, winner=winner).inc()
+
+    def register_token_usage(
+        self,
+        input_tokens: Optional[int] = None,
+        output_tokens: Optional[int] = None,
+        cache_read_input_tokens: Optional[int] = None,
+        cache_creation_input_tokens: Optional[int] = None,
+    ):
+        """Register the tokens reported by the model provider for an inference.
+
+        `input_tokens` counts only the prompt tokens that were neither read from
+        nor written to the prompt cache, so the token types add up to the full prompt.
+        """
+        usage = {
+            "input": input_tokens,
+            "output": output_tokens,
+            "cache_read": cache_read_input_tokens,
+            "cache_creation": cache_creation_input_tokens,
+        }
+
+        for token_type, tokens in usage.items():
+            if tokens:
+                self.children.get(INFERENCE_TOKENS_COUNTER, type=token_type).inc(tokens)
 
     @contextmanager
     def watch(self, stream=False):
@@ -107,13 +214,24 @@ class ModelRequestInstrumentator:
             labels=self.labels,
             concurrency_limit=self.concurrency_limit,
             streaming=stream,
+            circuit_breaker=self.circuit_breaker,
+            children=self.children,
         )
+
+        if self.circuit_breaker:
+            # Fail fast without calling the model while its circuit is open
+            watcher.probe = self.circuit_breaker.before_request()
+
         watcher.start()
         try:
             yield watcher
+        except (asyncio.CancelledError, GeneratorExit):
+            watcher.register_cancellation()
+            watcher.finish()
+            raise
         except Exception as ex:
             log_exception(ex, self.labels)
-            watcher.register_error()
+            watcher.register_error(ex)
             watcher.finish()
             raise
 
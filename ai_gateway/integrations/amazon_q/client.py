@@ -1,7 +1,5 @@
-import boto3
 from botocore.exceptions import ClientError
 from fastapi import HTTPException, status
-from q_developer_boto3 import boto3 as q_boto3
 
 from ai_gateway.api.auth_utils import StarletteUser
 from ai_gateway.auth.glgo import GlgoAuthority
@@ -10,11 +8,16 @@ from ai_gateway.integrations.amazon_q.errors import (
     AWSException,
     raise_aws_errors,
 )
+from ai_gateway.startup import lazy_import
 from ai_gateway.structured_logging import get_request_logger
 from ai_gateway.tracking import log_exception
 
 request_log = get_request_logger("amazon_q")
 
+# boto3 is imported on the first Amazon Q request
+boto3 = lazy_import("boto3")
+q_developer_boto3 = lazy_import("q_developer_boto3")
+
 __all__ = [
     "AmazonQClientFactory",
     "AmazonQClient",
@@ -94,7 +97,7 @@ class AmazonQClientFactory:
 
 class AmazonQClient:
     def __init__(self, url: str, region: str, credentials: dict):
-        self.client = q_boto3.client(
+        self.client = q_developer_boto3.boto3.client(
             "q",
             region_name=region,
             endpoint_url=url,
@@ -9,7 +9,8 @@ from prometheus_client import (
     start_http_server,
 )
 
-from ai_gateway.app import Config, get_config
+from ai_gateway.app import Config, get_app, get_config
+from ai_gateway.prefork import PreforkSupervisor, warm_up
 from ai_gateway.structured_logging import setup_logging
 
 
@@ -42,6 +43,10 @@ def run_app():
     setup_logging(config.logging)
     start_metrics_server(config)
 
+    if config.startup.prefork and not config.fastapi.reload:
+        run_prefork(config)
+        return
+
     # For now, trust all IPs for proxy headers until https://github.com/encode/uvicorn/pull/1611 is available.
     uvicorn.run(
         "ai_gateway.app:get_app",
@@ -54,5 +59,24 @@ def run_app():
     )
 
 
+def run_prefork(config: Config):
+    app = get_app()
+    warm_up(app)
+
+    # The number of workers is read from WEB_CONCURRENCY
+    uvicorn_config = uvicorn.Config(
+        app,
+        host=config.fastapi.api_host,
+        port=config.fastapi.api_port,
+        log_config=config.fastapi.uvicorn_logger,
+        forwarded_allow_ips="*",
+    )
+
+    PreforkSupervisor(
+        uvicorn_config,
+        memory_report_interval_s=config.startup.memory_report_interval_s,
+    ).run()
+
+
 if __name__ == "__main__":
     run_app()
@@ -5,5 +5,6 @@ from ai_gateway.models.anthropic import *
 from ai_gateway.models.base import *
 from ai_gateway.models.base_chat import *
 from ai_gateway.models.base_text import *
+from ai_gateway.models.circuit_breaker import *
 from ai_gateway.models.litellm import *
 from ai_gateway.models.vertex_text import *
@@ -1,3 +1,4 @@
+import asyncio
 from enum import StrEnum
 from typing import Any, AsyncIterator, Callable, Optional, Union
 
@@ -11,13 +12,21 @@ from anthropic import (
     AsyncStream,
 )
 from anthropic._types import NOT_GIVEN
-from anthropic.types import ContentBlockDeltaEvent
+from anthropic.types import (
+    ContentBlockDeltaEvent,
+    MessageDeltaEvent,
+    MessageStartEvent,
+    Usage,
+)
 
+from ai_gateway.instrumentators.model_requests import ModelRequestInstrumentator
 from ai_gateway.models.base import (
     KindModelProvider,
     ModelAPICallError,
     ModelAPIError,
     ModelMetadata,
+    TokensConsumptionMetadata,
+    close_stream,
 )
 from ai_gateway.models.base_chat import ChatModelBase, Message, Role
 from ai_gateway.models.base_text import (
@@ -167,7 +176,9 @@ class AnthropicModel(TextGenModelBase):
                 raise AnthropicAPIConnectionError.from_exception(ex)
 
             if stream:
-                return self._handle_stream(suggestion, watcher.finish)
+                return self._handle_stream(
+                    suggestion, watcher.finish, watcher.register_cancellation
+                )
 
         return TextGenModelOutput(
             text=suggestion.completion,
@@ -177,13 +188,21 @@ class AnthropicModel(TextGenModelBase):
         )
 
     async def _handle_stream(
-        self, response: AsyncStream, after_callback: Callable
+        self,
+        response: AsyncStream,
+        after_callback: Callable,
+        cancel_callback: Optional[Callable] = None,
     ) -> AsyncIterator[TextGenModelChunk]:
         try:
             async for event in response:
                 chunk_content = TextGenModelChunk(text=event.completion)
                 yield chunk_content
+        except (asyncio.CancelledError, GeneratorExit):
+            if cancel_callback:
+                cancel_callback()
+            raise
         finally:
+            await close_stream(response)
             after_callback()
 
     @classmethod
@@ -263,14 +282,16 @@ class AnthropicChatModel(ChatModelBase):
         self,
         messages: list[Message],
         stream: bool = False,
+        cache_prompt: bool = False,
         **kwargs: Any,
     ) -> Union[TextGenModelOutput, AsyncIterator[TextGenModelChunk]]:
         opts = _obtain_opts(self.model_opts, **kwargs)
         log.debug("codegen anthropic call:", **opts)
 
-        model_messages = _build_model_messages(messages)
+        model_messages = _build_model_messages(messages, cache_prompt=cache_prompt)
+        instrumentator = self.instrumentator
 
-        with self.instrumentator.watch(stream=stream) as watcher:
+        with instrumentator.watch(stream=stream) as watcher:
             try:
                 suggestion = await self.client.messages.create(
                     model=self.metadata.name,
@@ -290,18 +311,31 @@ class AnthropicChatModel(ChatModelBase):
                     suggestion,
                     watcher.finish,
                     watcher.register_error,
+                    watcher.register_cancellation,
+                    lambda metadata: _register_token_usage(instrumentator, metadata),
                 )
 
+        metadata = _extract_usage_metadata(suggestion.usage)
+        _register_token_usage(instrumentator, metadata)
+
         return TextGenModelOutput(
             text=suggestion.content[0].text,
             # Give a high value, the model doesn't return scores.
             score=10**5,
             safety_attributes=SafetyAttributes(),
+            metadata=metadata,
         )
 
     async def _handle_stream(
-        self, response: AsyncStream, after_callback: Callable, error_callback: Callable
+        self,
+        response: AsyncStream,
+        after_callback: Callable,
+        error_callback: Callable,
+        cancel_callback: Optional[Callable] = None,
+        usage_callback: Optional[Callable] = None,
     ) -> AsyncIterator[TextGenModelChunk]:
+        metadata = None
+
         try:
             async for event in response:
                 if isinstance(event, ContentBlockDeltaEvent):
@@ -309,12 +343,25 @@ class AnthropicChatModel(ChatModelBase):
                         yield TextGenModelChunk(text="")
 
                     yield TextGenModelChunk(text=event.delta.text)
+                elif isinstance(event, MessageStartEvent):
+                    metadata = _extract_usage_metadata(event.message.usage)
+                elif isinstance(event, MessageDeltaEvent) and metadata:
+                    # The final output token count is reported with the last delta
+                    metadata.output_tokens = event.usage.output_tokens
                 else:
                     continue
+
+            if usage_callback and metadata:
+                usage_callback(metadata)
+        except (asyncio.CancelledError, GeneratorExit):
+            if cancel_callback:
+                cancel_callback()
+            raise
         except Exception:
             error_callback()
             raise
         finally:
+            await close_stream(response)
             after_callback()
 
     @classmethod
@@ -332,7 +379,7 @@ class AnthropicChatModel(ChatModelBase):
         return cls(client, model_name=kind_model.value, **kwargs)
 
 
-def _build_model_messages(messages: list[Message]) -> dict:
+def _build_model_messages(messages: list[Message], cache_prompt: bool = False) -> dict:
     request: dict = {"system": NOT_GIVEN, "messages": []}
 
     for message in messages:
@@ -341,9 +388,50 @@ def _build_model_messages(messages: list[Message]) -> dict:
         else:
             request["messages"].append(message.dict())
 
+    if not cache_prompt:
+        return request
+
+    # Mark the system prompt and the conversation up to the last user message as a
+    # cacheable prefix, so that the next turn of the conversation reads it from the cache.
+    # Ref: https://docs.anthropic.com/en/docs/build-with-claude/prompt-caching
+    if request["system"]:
+        request["system"] = [_cacheable_text_block(request["system"])]
+
+    user_messages = [
+        message for message in request["messages"] if message["role"] == Role.USER
+    ]
+    if user_messages and user_messages[-1]["content"]:
+        user_messages[-1]["content"] = [
+            _cacheable_text_block(user_messages[-1]["content"])
+        ]
+
     return request
 
 
+def _cacheable_text_block(text: str) -> dict:
+    return {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}
+
+
+def _extract_usage_metadata(usage: Usage) -> TokensConsumptionMetadata:
+    return TokensConsumptionMetadata(
+        input_tokens=usage.input_tokens,
+        output_tokens=usage.output_tokens,
+        cache_read_input_tokens=usage.cache_read_input_tokens,
+        cache_creation_input_tokens=usage.cache_creation_input_tokens,
+    )
+
+
+def _register_token_usage(
+    instrumentator: ModelRequestInstrumentator, metadata: TokensConsumptionMetadata
+):
+    instrumentator.register_token_usage(
+        input_tokens=metadata.input_tokens,
+        output_tokens=metadata.output_tokens,
+        cache_read_input_tokens=metadata.cache_read_input_tokens,
+        cache_creation_input_tokens=metadata.cache_creation_input_tokens,
+    )
+
+
 def _obtain_opts(default_opts: dict, **kwargs: Any) -> dict:
     return {
         opt_name: kwargs.pop(opt_name, opt_value) or opt_value
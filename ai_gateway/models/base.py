@@ -1,6 +1,8 @@
+import inspect
 import json
 from abc import ABC, abstractmethod
 from enum import StrEnum
+from functools import cached_property
 from typing import Any, NamedTuple, Optional
 
 import httpx
@@ -13,6 +15,7 @@ from pydantic import BaseModel
 from ai_gateway.config import Config
 from ai_gateway.feature_flags import FeatureFlag, is_feature_enabled
 from ai_gateway.instrumentators.model_requests import ModelRequestInstrumentator
+from ai_gateway.models.circuit_breaker import CircuitBreakerRegistry
 from ai_gateway.structured_logging import get_request_logger
 
 # TODO: The instrumentator needs the config here to know what limit needs to be
@@ -21,6 +24,8 @@ from ai_gateway.structured_logging import get_request_logger
 # https://gitlab.com/gitlab-org/modelops/applied-ml/code-suggestions/ai-assist/-/issues/384
 config = Config()
 
+circuit_breakers = CircuitBreakerRegistry(config.circuit_breaker)
+
 __all__ = [
     "KindModelProvider",
     "ModelAPIError",
@@ -81,6 +86,9 @@ class TokensConsumptionMetadata(BaseModel):
     context_tokens_sent: Optional[int] = None
     # number of tokens from context used in the prompt
     context_tokens_used: Optional[int] = None
+    # number of prompt tokens read from or written to the model provider's prompt cache
+    cache_read_input_tokens: Optional[int] = None
+    cache_creation_input_tokens: Optional[int] = None
 
 
 class ModelMetadata(NamedTuple):
@@ -97,7 +105,7 @@ class ModelBase(ABC):
         # Default token limit
         return 2_048
 
-    @property
+    @cached_property
     def instrumentator(self) -> ModelRequestInstrumentator:
         return ModelRequestInstrumentator(
             model_engine=self.metadata.engine,
@@ -105,6 +113,9 @@ class ModelBase(ABC):
             concurrency_limit=config.model_engine_concurrency_limits.for_model(
                 engine=self.metadata.engine, name=self.metadata.name
             ),
+            circuit_breaker=circuit_breakers.for_model(
+                engine=self.metadata.engine, name=self.metadata.name
+            ),
         )
 
     @property
@@ -137,6 +148,23 @@ class ModelBase(ABC):
         return params
 
 
+async def close_stream(stream: Any):
+    """Release the vendor connection held by a streamed response.
+
+    Vendor SDKs expose either `aclose()` (LiteLLM, async generators) or an async
+    `close()` (Anthropic). Closing an already exhausted stream is a no-op, so this is
+    safe to call unconditionally once the consumer stops iterating, including when the
+    client disconnected and the stream was abandoned halfway.
+    """
+    close = getattr(stream, "aclose", None) or getattr(stream, "close", None)
+    if close is None:
+        return
+
+    result = close()
+    if inspect.isawaitable(result):
+        await result
+
+
 def grpc_connect_vertex(client_options: dict) -> PredictionServiceAsyncClient:
     log.info("Initializing Vertex AI client", **client_options)
     return PredictionServiceAsyncClient(client_options=client_options)
@@ -0,0 +1,246 @@
+import itertools
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Optional
+
+import structlog
+from prometheus_client import Gauge
+
+from ai_gateway.config import ConfigCircuitBreaker
+from ai_gateway.instrumentators.cardinality import BoundedMetric
+
+__all__ = [
+    "CircuitState",
+    "CircuitBreakerOpenError",
+    "CircuitBreaker",
+    "CircuitBreakerRegistry",
+]
+
+log = structlog.stdlib.get_logger("models")
+
+# Model names of self-hosted models come from the request payload
+MAX_BREAKERS = 100
+
+CIRCUIT_BREAKER_STATE = BoundedMetric(
+    Gauge(
+        "model_circuit_breaker_state",
+        "State of the circuit breaker guarding a model: 0 - closed, 1 - half-open, 2 - open",
+        ["model_engine", "model_name"],
+    ),
+    capped_labels=["model_engine", "model_name"],
+    max_values=MAX_BREAKERS,
+)
+
+
+class CircuitState(IntEnum):
+    CLOSED = 0
+    HALF_OPEN = 1
+    OPEN = 2
+
+
+class CircuitBreakerOpenError(Exception):
+    def __init__(self, engine: str, name: str):
+        self.engine = engine
+        self.name = name
+
+        super().__init__(f"circuit breaker is open for {engine}/{name}")
+
+
+class CircuitBreaker:
+    """Track the health of a single model and short-circuit requests while it is degraded.
+
+    Outcomes of the last `window_size` requests are kept in a sliding window. Once at
+    least `minimum_requests` have been recorded and either the failure rate or the
+    slow request rate reaches its threshold, the circuit opens and every request fails
+    immediately with `CircuitBreakerOpenError`. After `open_duration_s`, the circuit
+    becomes half-open and lets up to `half_open_max_requests` probes through: the circuit
+    closes if they all succeed and opens again as soon as one of them fails.
+
+    `before_request` returns an id for each probe, which is passed back with its
+    outcome. A probe that isn't released within `probe_timeout_s`, e.g. a stream that
+    was never iterated, stops counting against `half_open_max_requests`.
+    """
+
+    def __init__(self, engine: str, name: str, config: ConfigCircuitBreaker):
+        self.engine = engine
+        self.name = name
+        self.config = config
+
+        self.state = CircuitState.CLOSED
+        self.opened_at = 0.0
+        # Each entry is a tuple of (failed, slow)
+        self.outcomes: deque[tuple[bool, bool]] = deque(maxlen=config.window_size)
+        # Monotonic start time of the probes in flight, by probe id
+        self.probes: dict[int, float] = {}
+        self.probes_succeeded = 0
+
+        self._probe_ids = itertools.count()
+
+        self._set_state(CircuitState.CLOSED)
+
+    @property
+    def probes_in_flight(self) -> int:
+        return len(self.probes)
+
+    def before_request(self) -> Optional[int]:
+        """Raise `CircuitBreakerOpenError` if the request can't be sent to the model.
+
+        Returns the id of the probe when the circuit is half-open.
+        """
+        now = time.monotonic()
+
+        if self.state == CircuitState.OPEN:
+            if now - self.opened_at < self.config.open_duration_s:
+                raise CircuitBreakerOpenError(self.engine, self.name)
+
+            self._set_state(CircuitState.HALF_OPEN)
+
+        if self.state != CircuitState.HALF_OPEN:
+            return None
+
+        self._expire_probes(now)
+        if self.probes_in_flight >= self.config.half_open_max_requests:
+            raise CircuitBreakerOpenError(self.engine, self.name)
+
+        probe = next(self._probe_ids)
+        self.probes[probe] = now
+
+        return probe
+
+    def record_success(
+        self, duration: Optional[float] = None, probe: Optional[int] = None
+    ):
+        slow = duration is not None and duration >= self.config.slow_request_duration_s
+        self._record(failed=False, slow=slow, probe=probe)
+
+    def record_failure(
+        self, ex: Optional[Exception] = None, probe: Optional[int] = None
+    ):
+        if ex is not None and not self.is_failure(ex):
+            # The model API is healthy, it rejected the request itself
+            self._record(failed=False, slow=False, probe=probe)
+            return
+
+        self._record(failed=True, slow=False, probe=probe)
+
+    def release(self, probe: Optional[int] = None):
+        """Release the request without recording an outcome, e.g. when it was cancelled."""
+        if probe is not None:
+            self.probes.pop(probe, None)
+
+    @staticmethod
+    def is_failure(ex: Exception) -> bool:
+        # Client errors are caused by the request, except rate limiting which is
+        # a signal to back off from the model API.
+        code = getattr(ex, "code", None)
+        if isinstance(code, int) and 400 <= code < 500:
+            return code == 429
+
+        return True
+
+    def _record(self, failed: bool, slow: bool, probe: Optional[int] = None):
+        if self.state == CircuitState.HALF_OPEN:
+            if probe is None or self.probes.pop(probe, None) is None:
+                # Requests started before the circuit opened, or probes that expired
+                return
+
+            if failed or slow:
+                self._open()
+                return
+
+            self.probes_succeeded += 1
+            if self.probes_succeeded >= self.config.half_open_max_requests:
+                self._close()
+
+            return
+
+        if self.state == CircuitState.OPEN:
+            # Requests started before the circuit opened, nothing to update
+            return
+
+        self.outcomes.append((failed, slow))
+
+        if len(self.outcomes) < self.config.minimum_requests:
+            return
+
+        total = len(self.outcomes)
+        failure_rate = sum(1 for failed, _ in self.outcomes if failed) / total
+        slow_rate = sum(1 for _, slow in self.outcomes if slow) / total
+
+        if (
+            failure_rate >= self.config.failure_rate_threshold
+            or slow_rate >= self.config.slow_request_rate_threshold
+        ):
+            self._open()
+
+    def _expire_probes(self, now: float):
+        expired = [
+            probe
+            for probe, started_at in self.probes.items()
+            if now - started_at >= self.config.probe_timeout_s
+        ]
+        for probe in expired:
+            log.info(
+                "circuit breaker probe expired",
+                model_engine=self.engine,
+                model_name=self.name,
+            )
+            del self.probes[probe]
+
+    def _open(self):
+        log.warning(
+            "circuit breaker opened",
+            model_engine=self.engine,
+            model_name=self.name,
+        )
+
+        self.opened_at = time.monotonic()
+        self.probes.clear()
+        self.probes_succeeded = 0
+        self._set_state(CircuitState.OPEN)
+
+    def _close(self):
+        log.info(
+            "circuit breaker closed",
+            model_engine=self.engine,
+            model_name=self.name,
+        )
+
+        self.outcomes.clear()
+        self.probes.clear()
+        self.probes_succeeded = 0
+        self._set_state(CircuitState.CLOSED)
+
+    def _set_state(self, state: CircuitState):
+        self.state = state
+        CIRCUIT_BREAKER_STATE.labels(
+            model_engine=self.engine, model_name=self.name
+        ).set(state.value)
+
+
+class CircuitBreakerRegistry:
+    """Hold one circuit breaker per model engine and name for the lifetime of the process.
+
+    Model names of self-hosted models come from the requests, so only the first
+    `max_breakers` models get a circuit breaker. The requests to the other models
+    aren't guarded.
+    """
+
+    def __init__(self, config: ConfigCircuitBreaker, max_breakers: int = MAX_BREAKERS):
+        self.config = config
+        self.max_breakers = max_breakers
+        self._breakers: dict[tuple[str, str], CircuitBreaker] = {}
+
+    def for_model(self, engine: str, name: str) -> Optional[CircuitBreaker]:
+        if not self.config.enabled:
+            return None
+
+        key = (engine, name)
+        if key not in self._breakers:
+            if len(self._breakers) >= self.max_breakers:
+                return None
+
+            self._breakers[key] = CircuitBreaker(engine, name, self.config)
+
+        return self._breakers[key]
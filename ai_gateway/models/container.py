@@ -1,3 +1,5 @@
+from typing import Callable, Optional
+
 import httpx
 from dependency_injector import containers, providers
 from google.cloud.aiplatform.gapic import PredictionServiceAsyncClient
@@ -7,7 +9,13 @@ from ai_gateway.config import ConfigModelConcurrency
 from ai_gateway.models import mock
 from ai_gateway.models.agent_model import AgentModel
 from ai_gateway.models.anthropic import AnthropicChatModel, AnthropicModel
-from ai_gateway.models.base import grpc_connect_vertex, init_anthropic_client
+from ai_gateway.models.base import (
+    KindModelProvider,
+    ModelBase,
+    grpc_connect_vertex,
+    init_anthropic_client,
+)
+from ai_gateway.models.hedging import HedgingPolicyRegistry
 from ai_gateway.models.litellm import LiteLlmChatModel, LiteLlmTextGenModel
 from ai_gateway.models.vertex_text import (
     PalmCodeBisonModel,
@@ -48,9 +56,10 @@ def _init_async_fireworks_client(
 
 def _init_anthropic_proxy_client(
     mock_model_responses: bool,
+    mock_latency: Optional[mock.LatencyProfile] = None,
 ) -> httpx.AsyncClient | mock.AsyncClient:
     if mock_model_responses:
-        return mock.AsyncClient()
+        return mock.AsyncClient(latency=mock_latency)
 
     return httpx.AsyncClient(
         base_url="https://api.anthropic.com/", timeout=httpx.Timeout(timeout=60.0)
@@ -70,6 +79,20 @@ def _init_vertex_ai_proxy_client(
     )
 
 
+def _init_fallback_model(
+    engine: Optional[str],
+    name: Optional[str],
+    models: dict[str, Callable[..., ModelBase]],
+) -> Optional[ModelBase]:
+    if not engine or not name:
+        return None
+
+    if engine not in models:
+        raise ValueError(f"unsupported fallback model engine: {engine}")
+
+    return models[engine](name=name)
+
+
 class ContainerModels(containers.DeclarativeContainer):
     # We need to resolve the model based on the model name provided by the upstream container.
     # Hence, `VertexTextBaseModel.from_model_name` and `AnthropicModel.from_model_name` are only partially applied here.
@@ -81,6 +104,15 @@ class ContainerModels(containers.DeclarativeContainer):
         config.mock_model_responses,
     )
 
+    # Response times emulated by the mocked models, e.g. to benchmark the gateway
+    mock_latency = providers.Singleton(
+        mock.LatencyProfile,
+        median_s=config.mock_model.latency_median_s,
+        p99_s=config.mock_model.latency_p99_s,
+        chunk_delay_s=config.mock_model.chunk_delay_s,
+        seed=config.mock_model.seed,
+    )
+
     grpc_client_vertex = providers.Singleton(
         _init_vertex_grpc_client,
         endpoint=config.vertex_text_model.endpoint,
@@ -102,6 +134,7 @@ class ContainerModels(containers.DeclarativeContainer):
     http_client_anthropic_proxy = providers.Singleton(
         _init_anthropic_proxy_client,
         mock_model_responses=config.mock_model_responses,
+        mock_latency=mock_latency,
     )
 
     http_client_vertex_ai_proxy = providers.Singleton(
@@ -118,7 +151,7 @@ class ContainerModels(containers.DeclarativeContainer):
             project=config.vertex_text_model.project,
             location=config.vertex_text_model.location,
         ),
-        mocked=providers.Factory(mock.LLM),
+        mocked=providers.Factory(mock.LLM, latency=mock_latency),
     )
 
     vertex_code_bison = providers.Selector(
@@ -129,7 +162,7 @@ class ContainerModels(containers.DeclarativeContainer):
             project=config.vertex_text_model.project,
             location=config.vertex_text_model.location,
         ),
-        mocked=providers.Factory(mock.LLM),
+        mocked=providers.Factory(mock.LLM, latency=mock_latency),
     )
 
     vertex_code_gecko = providers.Selector(
@@ -140,7 +173,7 @@ class ContainerModels(containers.DeclarativeContainer):
             project=config.vertex_text_model.project,
             location=config.vertex_text_model.location,
         ),
-        mocked=providers.Factory(mock.LLM),
+        mocked=providers.Factory(mock.LLM, latency=mock_latency),
     )
 
     anthropic_claude = providers.Selector(
@@ -148,7 +181,7 @@ class ContainerModels(containers.DeclarativeContainer):
         original=providers.Factory(
             AnthropicModel.from_model_name, client=http_client_anthropic
         ),
-        mocked=providers.Factory(mock.LLM),
+        mocked=providers.Factory(mock.LLM, latency=mock_latency),
     )
 
     anthropic_claude_chat = providers.Selector(
@@ -157,7 +190,7 @@ class ContainerModels(containers.DeclarativeContainer):
             AnthropicChatModel.from_model_name,
             client=http_client_anthropic,
         ),
-        mocked=providers.Factory(mock.ChatModel),
+        mocked=providers.Factory(mock.ChatModel, latency=mock_latency),
     )
 
     litellm = providers.Selector(
@@ -170,7 +203,7 @@ class ContainerModels(containers.DeclarativeContainer):
             provider_endpoints=config.model_endpoints,
             async_fireworks_client=async_fireworks_client,
         ),
-        mocked=providers.Factory(mock.ChatModel),
+        mocked=providers.Factory(mock.ChatModel, latency=mock_latency),
     )
 
     litellm_chat = providers.Selector(
@@ -183,13 +216,52 @@ class ContainerModels(containers.DeclarativeContainer):
             provider_endpoints=config.model_endpoints,
             async_fireworks_client=async_fireworks_client,
         ),
-        mocked=providers.Factory(mock.ChatModel),
+        mocked=providers.Factory(mock.ChatModel, latency=mock_latency),
+    )
+
+    # Models serving requests while the circuit of the requested model is open
+    code_completions_fallback = providers.Factory(
+        _init_fallback_model,
+        engine=config.circuit_breaker.code_completions_fallback.engine,
+        name=config.circuit_breaker.code_completions_fallback.name,
+        models=providers.Dict(
+            {
+                KindModelProvider.ANTHROPIC: anthropic_claude_chat.provider,
+                KindModelProvider.LITELLM: litellm.provider,
+                KindModelProvider.VERTEX_AI: vertex_code_gecko.provider,
+            }
+        ),
+    )
+
+    code_generations_fallback = providers.Factory(
+        _init_fallback_model,
+        engine=config.circuit_breaker.code_generations_fallback.engine,
+        name=config.circuit_breaker.code_generations_fallback.name,
+        models=providers.Dict(
+            {
+                KindModelProvider.ANTHROPIC: anthropic_claude_chat.provider,
+                KindModelProvider.LITELLM: litellm_chat.provider,
+                KindModelProvider.VERTEX_AI: vertex_code_bison.provider,
+            }
+        ),
+    )
+
+    hedging_policies = providers.Singleton(
+        HedgingPolicyRegistry,
+        enabled=config.hedging.enabled,
+        percentile=config.hedging.percentile,
+        min_delay_s=config.hedging.min_delay_s,
+        max_delay_s=config.hedging.max_delay_s,
+        max_extra_rate=config.hedging.max_extra_rate,
+        window_size=config.hedging.window_size,
+        min_samples=config.hedging.min_samples,
+        use_fallback_model=config.hedging.use_fallback_model,
     )
 
     agent_model = providers.Selector(
         _mock_selector,
         original=providers.Factory(AgentModel),
-        mocked=providers.Factory(mock.LLM),
+        mocked=providers.Factory(mock.LLM, latency=mock_latency),
     )
 
     anthropic_proxy_client = providers.Factory(
@@ -211,5 +283,5 @@ class ContainerModels(containers.DeclarativeContainer):
                 ConfigModelConcurrency, config.model_engine_concurrency_limits
             ),
         ),
-        mocked=providers.Factory(mock.ProxyClient),
+        mocked=providers.Factory(mock.ProxyClient, latency=mock_latency),
     )
@@ -0,0 +1,160 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from ai_gateway.instrumentators.model_requests import ModelRequestInstrumentator
+
+__all__ = [
+    "HedgingPolicy",
+    "HedgingPolicyRegistry",
+]
+
+_T = TypeVar("_T")
+
+
+class HedgingPolicy:
+    """Fire a second, identical request when the first one is slower than usual.
+
+    The hedging delay is the configured percentile of the latencies observed for the
+    model, clamped to `[min_delay_s, max_delay_s]`. Hedging starts once `min_samples`
+    latencies have been observed. Extra requests are budgeted with a token bucket that
+    earns `max_extra_rate` tokens per request, so at most that share of requests is
+    hedged on average. Whichever request finishes first wins and the other one is
+    cancelled.
+    """
+
+    def __init__(
+        self,
+        percentile: float,
+        min_delay_s: float,
+        max_delay_s: float,
+        max_extra_rate: float,
+        window_size: int,
+        min_samples: int,
+    ):
+        self.percentile = percentile
+        self.min_delay_s = min_delay_s
+        self.max_delay_s = max_delay_s
+        self.max_extra_rate = max_extra_rate
+        self.min_samples = min_samples
+
+        self.latencies: deque[float] = deque(maxlen=window_size)
+        self.max_tokens = max(1.0, max_extra_rate * window_size)
+        self.tokens = 0.0
+
+    def delay(self) -> Optional[float]:
+        if len(self.latencies) < self.min_samples:
+            return None
+
+        latencies = sorted(self.latencies)
+        delay = latencies[int(self.percentile * (len(latencies) - 1))]
+
+        return min(max(delay, self.min_delay_s), self.max_delay_s)
+
+    def record_latency(self, duration: float):
+        self.latencies.append(duration)
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[_T]],
+        hedge_call: Optional[Callable[[], Awaitable[_T]]] = None,
+        instrumentator: Optional[ModelRequestInstrumentator] = None,
+    ) -> _T:
+        self.tokens = min(self.tokens + self.max_extra_rate, self.max_tokens)
+
+        delay = self.delay()
+        start_time = time.perf_counter()
+        primary = asyncio.ensure_future(call())
+        hedge = None
+
+        try:
+            if delay is not None:
+                await asyncio.wait({primary}, timeout=delay)
+
+            if primary.done() or delay is None or self.tokens < 1:
+                result = await primary
+                self.record_latency(time.perf_counter() - start_time)
+                return result
+
+            self.tokens -= 1
+            hedge = asyncio.ensure_future((hedge_call or call)())
+
+            winner = await self._first_successful(primary, hedge)
+
+            # The primary latency is at least the time it took until now
+            self.record_latency(time.perf_counter() - start_time)
+
+            if instrumentator:
+                instrumentator.register_hedged_request(
+                    winner=self._winner_label(winner, primary)
+                )
+
+            if winner is None:
+                # Both requests failed, report the error of the primary request
+                return primary.result()
+
+            return winner.result()
+        finally:
+            for task in (primary, hedge):
+                if task and not task.done():
+                    task.cancel()
+
+    @staticmethod
+    async def _first_successful(*tasks: asyncio.Future) -> Optional[asyncio.Future]:
+        pending = set(tasks)
+
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+
+            for task in tasks:
+                if task in done and task.exception() is None:
+                    return task
+
+        return None
+
+    @staticmethod
+    def _winner_label(winner: Optional[asyncio.Future], primary: asyncio.Future) -> str:
+        if winner is None:
+            return "none"
+
+        return "primary" if winner is primary else "hedge"
+
+
+class HedgingPolicyRegistry:
+    """Hold one hedging policy per model engine and name for the lifetime of the process."""
+
+    def __init__(
+        self,
+        enabled: bool,
+        percentile: float,
+        min_delay_s: float,
+        max_delay_s: float,
+        max_extra_rate: float,
+        window_size: int,
+        min_samples: int,
+        use_fallback_model: bool = False,
+    ):
+        self.enabled = enabled
+        self.use_fallback_model = use_fallback_model
+        self.policy_kwargs = {
+            "percentile": percentile,
+            "min_delay_s": min_delay_s,
+            "max_delay_s": max_delay_s,
+            "max_extra_rate": max_extra_rate,
+            "window_size": window_size,
+            "min_samples": min_samples,
+        }
+        self._policies: dict[tuple[str, str], HedgingPolicy] = {}
+
+    def for_model(self, engine: str, name: str) -> Optional[HedgingPolicy]:
+        if not self.enabled:
+            return None
+
+        key = (engine, name)
+        if key not in self._policies:
+            self._policies[key] = HedgingPolicy(**self.policy_kwargs)
+
+        return self._policies[key]
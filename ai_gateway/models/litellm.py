@@ -1,8 +1,7 @@
+import asyncio
 from enum import StrEnum
-from typing import AsyncIterator, Callable, Optional, Sequence, Union
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Optional, Sequence, Union
 
-from litellm import CustomStreamWrapper, ModelResponse, acompletion
-from litellm.exceptions import APIConnectionError, InternalServerError
 from openai import AsyncOpenAI
 
 from ai_gateway.models.base import (
@@ -10,6 +9,7 @@ from ai_gateway.models.base import (
     ModelAPIError,
     ModelMetadata,
     TokensConsumptionMetadata,
+    close_stream,
 )
 from ai_gateway.models.base_chat import ChatModelBase, Message, Role
 from ai_gateway.models.base_text import (
@@ -18,8 +18,13 @@ from ai_gateway.models.base_text import (
     TextGenModelOutput,
 )
 from ai_gateway.safety_attributes import SafetyAttributes
+from ai_gateway.startup import lazy_import
 from ai_gateway.tracking import SnowplowEventContext
 
+if TYPE_CHECKING:
+    from litellm import CustomStreamWrapper, ModelResponse
+    from litellm.exceptions import APIConnectionError, InternalServerError
+
 __all__ = [
     "LiteLlmChatModel",
     "LiteLlmTextGenModel",
@@ -30,10 +35,16 @@ __all__ = [
 
 STUBBED_API_KEY = "stubbed-api-key"
 
+litellm = lazy_import("litellm")
+
+
+async def acompletion(**kwargs) -> Union["ModelResponse", "CustomStreamWrapper"]:
+    return await litellm.acompletion(**kwargs)
+
 
 class LiteLlmAPIConnectionError(ModelAPIError):
     @classmethod
-    def from_exception(cls, ex: APIConnectionError):
+    def from_exception(cls, ex: "APIConnectionError"):
         wrapper = cls(ex.message, errors=(ex,))
 
         return wrapper
@@ -41,7 +52,7 @@ class LiteLlmAPIConnectionError(ModelAPIError):
 
 class LiteLlmInternalServerError(ModelAPIError):
     @classmethod
-    def from_exception(cls, ex: InternalServerError):
+    def from_exception(cls, ex: "InternalServerError"):
         wrapper = cls(ex.message, errors=(ex,))
 
         return wrapper
@@ -197,6 +208,7 @@ class LiteLlmChatModel(ChatModelBase):
                     suggestion,
                     watcher.finish,
                     watcher.register_error,
+                    watcher.register_cancellation,
                 )
 
         return TextGenModelOutput(
@@ -209,17 +221,23 @@ class LiteLlmChatModel(ChatModelBase):
 
     async def _handle_stream(
         self,
-        response: CustomStreamWrapper,
+        response: "CustomStreamWrapper",
         after_callback: Callable,
         error_callback: Callable,
+        cancel_callback: Optional[Callable] = None,
     ) -> AsyncIterator[TextGenModelChunk]:
         try:
             async for chunk in response:
                 yield TextGenModelChunk(text=(chunk.choices[0].delta.content or ""))
+        except (asyncio.CancelledError, GeneratorExit):
+            if cancel_callback:
+                cancel_callback()
+            raise
         except Exception:
             error_callback()
             raise
         finally:
+            await close_stream(response)
             after_callback()
 
     def _extract_suggestion_metadata(self, suggestion):
@@ -333,9 +351,9 @@ class LiteLlmTextGenModel(TextGenModelBase):
                     top_p=top_p,
                     snowplow_event_context=snowplow_event_context,
                 )
-            except APIConnectionError as ex:
+            except litellm.APIConnectionError as ex:
                 raise LiteLlmAPIConnectionError.from_exception(ex)
-            except InternalServerError as ex:
+            except litellm.InternalServerError as ex:
                 raise LiteLlmInternalServerError.from_exception(ex)
 
             if should_stream:
@@ -343,6 +361,7 @@ class LiteLlmTextGenModel(TextGenModelBase):
                     suggestion,
                     watcher.finish,
                     watcher.register_error,
+                    watcher.register_cancellation,
                 )
 
         return TextGenModelOutput(
@@ -355,17 +374,23 @@ class LiteLlmTextGenModel(TextGenModelBase):
 
     async def _handle_stream(
         self,
-        response: CustomStreamWrapper,
+        response: "CustomStreamWrapper",
         after_callback: Callable,
         error_callback: Callable,
+        cancel_callback: Optional[Callable] = None,
     ) -> AsyncIterator[TextGenModelChunk]:
         try:
             async for chunk in response:
                 yield TextGenModelChunk(text=(chunk.choices[0].delta.content or ""))
+        except (asyncio.CancelledError, GeneratorExit):
+            if cancel_callback:
+                cancel_callback()
+            raise
         except Exception:
             error_callback()
             raise
         finally:
+            await close_stream(response)
             after_callback()
 
     async def _get_suggestion(
@@ -377,7 +402,7 @@ class LiteLlmTextGenModel(TextGenModelBase):
         top_p: float,
         suffix: Optional[str] = "",
         snowplow_event_context: Optional[SnowplowEventContext] = None,
-    ) -> Union[ModelResponse, CustomStreamWrapper]:
+    ) -> Union["ModelResponse", "CustomStreamWrapper"]:
         content = prefix
 
         if self._completion_type() == ModelCompletionType.FIM:
@@ -1,4 +1,7 @@
+import asyncio
 import json
+import math
+import random
 import re
 from typing import Any, AsyncIterator, Callable, List, Optional, TypeVar
 from unittest.mock import AsyncMock
@@ -6,9 +9,13 @@ from unittest.mock import AsyncMock
 import fastapi
 import httpx
 from anthropic.types import Message
-from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
 from langchain_core.language_models.chat_models import SimpleChatModel
 from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
 
 from ai_gateway.models.base import ModelMetadata
 from ai_gateway.models.base_chat import ChatModelBase
@@ -20,6 +27,7 @@ from ai_gateway.models.base_text import (
 from ai_gateway.safety_attributes import SafetyAttributes
 
 __all__ = [
+    "LatencyProfile",
     "AsyncStream",
     "AsyncClient",
     "LLM",
@@ -28,17 +36,72 @@ __all__ = [
 
 _T = TypeVar("_T")
 
+# z-score of the 99th percentile of the standard normal distribution
+_Z_P99 = 2.326
+
+
+class LatencyProfile:
+    """Emulate the response times of a model API.
+
+    The time to the first token follows a log-normal distribution defined by its median
+    and 99th percentile, which matches the long tail of real model APIs. Streamed chunks
+    are spaced by `chunk_delay_s`. With a `seed`, the same sequence of delays is drawn on
+    every run, so benchmarks are reproducible.
+    """
+
+    def __init__(
+        self,
+        median_s: float = 0.0,
+        p99_s: float = 0.0,
+        chunk_delay_s: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.median_s = median_s
+        self.p99_s = max(p99_s, median_s)
+        self.chunk_delay_s = chunk_delay_s
+        self._random = random.Random(seed)
+
+    def sample(self) -> float:
+        if self.median_s <= 0:
+            return 0.0
+
+        sigma = math.log(self.p99_s / self.median_s) / _Z_P99
+
+        return self._random.lognormvariate(math.log(self.median_s), sigma)
+
+    async def wait_first_token(self):
+        if delay := self.sample():
+            await asyncio.sleep(delay)
+
+    async def wait_chunk(self):
+        if self.chunk_delay_s > 0:
+            await asyncio.sleep(self.chunk_delay_s)
+
+
+async def _wait_first_token(latency: Optional[LatencyProfile]):
+    if latency:
+        await latency.wait_first_token()
+
 
 class AsyncStream(AsyncIterator[_T]):
-    def __init__(self, chunks: list[_T], callback_finish: Optional[Callable] = None):
+    def __init__(
+        self,
+        chunks: list[_T],
+        callback_finish: Optional[Callable] = None,
+        latency: Optional[LatencyProfile] = None,
+    ):
         self.chunks = chunks
         self.callback_finish = callback_finish
+        self.latency = latency
 
     def __aiter__(self) -> "AsyncStream[_T]":
         return self
 
     async def __anext__(self) -> _T:
         if len(self.chunks) > 0:
+            if self.latency:
+                await self.latency.wait_chunk()
+
             return self.chunks.pop(0)
 
         if self.callback_finish:
@@ -48,7 +111,12 @@ class AsyncStream(AsyncIterator[_T]):
 
 
 class AsyncClient(AsyncMock):
+    # Pass `latency=LatencyProfile(...)` to the constructor to emulate response times
+    latency: Optional[LatencyProfile] = None
+
     async def send(self, *args, **kwargs):
+        await _wait_first_token(self.latency)
+
         return httpx.Response(
             status_code=200,
             headers={
@@ -61,7 +129,12 @@ class AsyncClient(AsyncMock):
 
 
 class ProxyClient(AsyncMock):
+    # Pass `latency=LatencyProfile(...)` to the constructor to emulate response times
+    latency: Optional[LatencyProfile] = None
+
     async def proxy(self, *args, **kwargs):
+        await _wait_first_token(self.latency)
+
         return fastapi.Response(
             content=json.dumps({"response": "mocked"}).encode("utf-8"),
             status_code=200,
@@ -80,8 +153,11 @@ class LLM(TextGenModelBase):
     Please, use this class if you require to mock such models as `AnthropicModel` or `PalmCodeGeckoModel`
     """
 
-    def __init__(self, *_args: Any, **_kwargs: Any):
+    def __init__(
+        self, *_args: Any, latency: Optional[LatencyProfile] = None, **_kwargs: Any
+    ):
         super().__init__()
+        self.latency = latency
 
     @property
     def metadata(self) -> ModelMetadata:
@@ -108,12 +184,14 @@ class LLM(TextGenModelBase):
         suggestion = f"echo: {json.dumps(scope, default=vars)}"
 
         with self.instrumentator.watch(stream=stream) as watcher:
+            await _wait_first_token(self.latency)
+
             if stream:
                 chunks = [
                     TextGenModelChunk(text=chunk)
                     for chunk in re.split(r"(\s)", suggestion)
                 ]
-                return AsyncStream(chunks, watcher.finish)
+                return AsyncStream(chunks, watcher.finish, self.latency)
 
         return TextGenModelOutput(
             text=suggestion,
@@ -123,6 +201,8 @@ class LLM(TextGenModelBase):
 
 
 class FakeModel(SimpleChatModel):
+    latency: Optional[LatencyProfile] = None
+
     @property
     def _llm_type(self) -> str:
         return "fake-provider"
@@ -140,6 +220,17 @@ class FakeModel(SimpleChatModel):
     ) -> str:
         return "mock"
 
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await _wait_first_token(self.latency)
+
+        return await super()._agenerate(messages, stop, run_manager, **kwargs)
+
 
 class ChatModel(ChatModelBase):
     """
@@ -147,8 +238,11 @@ class ChatModel(ChatModelBase):
     Please, use this class if you require to mock such models as `AnthropicChatModel`
     """
 
-    def __init__(self, *_args: Any, **_kwargs: Any):
+    def __init__(
+        self, *_args: Any, latency: Optional[LatencyProfile] = None, **_kwargs: Any
+    ):
         super().__init__()
+        self.latency = latency
 
     @property
     def metadata(self) -> ModelMetadata:
@@ -170,12 +264,14 @@ class ChatModel(ChatModelBase):
         )
 
         with self.instrumentator.watch(stream=stream) as watcher:
+            await _wait_first_token(self.latency)
+
             if stream:
                 chunks = [
                     TextGenModelChunk(text=chunk)
                     for chunk in re.split(r"(\s)", suggestion)
                 ]
-                return AsyncStream(chunks, watcher.finish)
+                return AsyncStream(chunks, watcher.finish, self.latency)
 
         return TextGenModelOutput(
             text=suggestion,
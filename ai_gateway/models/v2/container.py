@@ -1,6 +1,5 @@
 from dependency_injector import containers, providers
 from langchain_community.chat_models import ChatLiteLLM
-from litellm.llms.custom_httpx.http_handler import AsyncHTTPHandler
 
 from ai_gateway.models import mock
 from ai_gateway.models.base import init_anthropic_client, log_request
@@ -16,6 +15,8 @@ def _litellm_factory(*args, **kwargs) -> Model:
     model = ChatLiteLLM(*args, **kwargs)
 
     if kwargs.get("custom_llm_provider", "") == "vertex_ai":
+        from litellm.llms.custom_httpx.http_handler import AsyncHTTPHandler
+
         client = AsyncHTTPHandler(event_hooks={"request": [log_request]})
 
         return model.bind(client=client)
@@ -34,6 +35,14 @@ class ContainerModels(containers.DeclarativeContainer):
         config.mock_model_responses,
     )
 
+    mock_latency = providers.Singleton(
+        mock.LatencyProfile,
+        median_s=config.mock_model.latency_median_s,
+        p99_s=config.mock_model.latency_p99_s,
+        chunk_delay_s=config.mock_model.chunk_delay_s,
+        seed=config.mock_model.seed,
+    )
+
     http_async_client_anthropic = providers.Singleton(
         init_anthropic_client,
         mock_model_responses=config.mock_model_responses,
@@ -45,7 +54,7 @@ class ContainerModels(containers.DeclarativeContainer):
             ChatAnthropic,
             async_client=http_async_client_anthropic,
         ),
-        mocked=providers.Factory(mock.FakeModel),
+        mocked=providers.Factory(mock.FakeModel, latency=mock_latency),
     )
 
     lite_llm_chat_fn = providers.Factory(_litellm_factory)
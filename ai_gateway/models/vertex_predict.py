@@ -0,0 +1,148 @@
+from functools import lru_cache
+from typing import Any, NamedTuple, Optional, Sequence
+
+from google.cloud.aiplatform.gapic import PredictRequest, PredictResponse
+from google.protobuf import struct_pb2
+
+__all__ = [
+    "PredictParameters",
+    "Prediction",
+    "PredictResult",
+    "build_predict_request",
+    "parse_predict_response",
+]
+
+
+class PredictParameters(NamedTuple):
+    temperature: float
+    max_output_tokens: int
+    top_p: float
+    top_k: int
+    candidate_count: int
+    stop_sequences: Optional[tuple[str, ...]] = None
+
+    @classmethod
+    def from_args(
+        cls,
+        temperature: float,
+        max_output_tokens: int,
+        top_p: float,
+        top_k: int,
+        candidate_count: int,
+        stop_sequences: Optional[Sequence[str]] = None,
+    ) -> "PredictParameters":
+        return cls(
+            temperature=temperature,
+            max_output_tokens=max_output_tokens,
+            top_p=top_p,
+            top_k=top_k,
+            candidate_count=min(candidate_count, 4),
+            stop_sequences=tuple(stop_sequences) if stop_sequences else None,
+        )
+
+
+class Prediction(NamedTuple):
+    content: Optional[str]
+    score: Optional[float]
+    safety_attributes: dict[str, Any]
+
+
+class PredictResult(NamedTuple):
+    predictions: list[Prediction]
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+
+
+@lru_cache(maxsize=256)
+def _parameters_value(parameters: PredictParameters) -> struct_pb2.Value:
+    # The struct is shared by all the requests with the same parameters, it's only ever copied
+    value = struct_pb2.Value()
+    fields = value.struct_value.fields
+    fields["temperature"].number_value = parameters.temperature
+    fields["maxOutputTokens"].number_value = parameters.max_output_tokens
+    fields["topP"].number_value = parameters.top_p
+    fields["topK"].number_value = parameters.top_k
+    fields["candidateCount"].number_value = parameters.candidate_count
+    if parameters.stop_sequences:
+        stop_sequences = fields["stopSequences"].list_value
+        for stop_sequence in parameters.stop_sequences:
+            stop_sequences.values.add().string_value = stop_sequence
+
+    return value
+
+
+def build_predict_request(
+    endpoint: str, instance: dict[str, Optional[str]], parameters: PredictParameters
+) -> PredictRequest:
+    """Builds the request of a single instance without converting the input from JSON."""
+    request = PredictRequest.pb()(endpoint=endpoint)
+
+    fields = request.instances.add().struct_value.fields
+    for key, value in instance.items():
+        if value is None:
+            fields[key].null_value = struct_pb2.NULL_VALUE
+        else:
+            fields[key].string_value = value
+
+    request.parameters.CopyFrom(_parameters_value(parameters))
+
+    return PredictRequest.wrap(request)
+
+
+def parse_predict_response(response: PredictResponse) -> PredictResult:
+    """Reads the predictions from the response message instead of converting it to a dict."""
+    response_pb = PredictResponse.pb(response)
+
+    predictions = []
+    for prediction in response_pb.predictions:
+        fields = prediction.struct_value.fields
+
+        content = fields["content"].string_value if "content" in fields else None
+        score = fields["score"].number_value if "score" in fields else None
+        safety_attributes = (
+            _to_python(fields["safetyAttributes"])
+            if "safetyAttributes" in fields
+            else {}
+        )
+
+        predictions.append(Prediction(content, score, safety_attributes))
+
+    token_metadata = _struct_field(
+        response_pb.metadata.struct_value.fields, "tokenMetadata"
+    )
+
+    return PredictResult(
+        predictions=predictions,
+        input_tokens=_total_tokens(token_metadata, "inputTokenCount"),
+        output_tokens=_total_tokens(token_metadata, "outputTokenCount"),
+    )
+
+
+def _to_python(value: struct_pb2.Value) -> Any:
+    kind = value.WhichOneof("kind")
+
+    if kind == "struct_value":
+        return {
+            key: _to_python(field) for key, field in value.struct_value.fields.items()
+        }
+    if kind == "list_value":
+        return [_to_python(item) for item in value.list_value.values]
+    if kind is None or kind == "null_value":
+        return None
+
+    return getattr(value, kind)
+
+
+def _struct_field(fields, key: str):
+    if key in fields:
+        return fields[key].struct_value.fields
+
+    return {}
+
+
+def _total_tokens(token_metadata, key: str) -> Optional[int]:
+    count = _struct_field(token_metadata, key)
+    if "totalTokens" in count:
+        return int(count["totalTokens"].number_value)
+
+    return None
@@ -4,8 +4,7 @@ from typing import Any, Optional, Sequence, Union
 
 import structlog
 from google.api_core.exceptions import GoogleAPICallError, GoogleAPIError
-from google.cloud.aiplatform.gapic import PredictionServiceAsyncClient, PredictResponse
-from google.protobuf import json_format, struct_pb2
+from google.cloud.aiplatform.gapic import PredictionServiceAsyncClient
 
 from ai_gateway.models.base import (
     KindModelProvider,
@@ -15,6 +14,11 @@ from ai_gateway.models.base import (
     TokensConsumptionMetadata,
 )
 from ai_gateway.models.base_text import TextGenModelBase, TextGenModelOutput
+from ai_gateway.models.vertex_predict import (
+    PredictParameters,
+    build_predict_request,
+    parse_predict_response,
+)
 from ai_gateway.safety_attributes import SafetyAttributes
 from ai_gateway.tracking import SnowplowEventContext
 
@@ -163,65 +167,46 @@ class PalmCodeGenBaseModel(TextGenModelBase):
             )
 
         input_data = input.dict()
+        parameters = PredictParameters.from_args(
+            temperature,
+            max_output_tokens,
+            top_p,
+            top_k,
+            candidate_count,
+            stop_sequences,
+        )
+        request = build_predict_request(self.endpoint, input_data, parameters)
 
-        instance = json_format.ParseDict(input_data, struct_pb2.Value())
-        instances = [instance]
-        parameters_dict: dict[str, Union[float, int, Sequence[str]]] = {
-            "temperature": temperature,
-            "maxOutputTokens": max_output_tokens,
-            "topP": top_p,
-            "topK": top_k,
-            "candidateCount": min(candidate_count, 4),
-        }
-        if stop_sequences:
-            parameters_dict["stopSequences"] = stop_sequences
-
-        parameters = json_format.ParseDict(parameters_dict, struct_pb2.Value())
-
-        log.debug("codegen vertex call:", input=input_data, parameters=parameters_dict)
+        log.debug(
+            "codegen vertex call:", input=input_data, parameters=parameters._asdict()
+        )
 
         with self.instrumentator.watch():
             try:
                 response = await self.client.predict(
-                    endpoint=self.endpoint,
-                    instances=instances,
-                    parameters=parameters,
-                    timeout=self.timeout,
+                    request=request, timeout=self.timeout
                 )
-                response = PredictResponse.to_dict(response)
-                tokens_metatada = response.get("metadata", {}).get("tokenMetadata", {})
+                result = parse_predict_response(response)
                 log.debug(
                     "codegen vertex response:",
-                    tokens_metatada=tokens_metatada,
-                    input_tokens=tokens_metatada.get("inputTokenCount", {}).get(
-                        "totalTokens", None
-                    ),
-                    output_tokens=tokens_metatada.get("outputTokenCount", {}).get(
-                        "totalTokens", None
-                    ),
+                    input_tokens=result.input_tokens,
+                    output_tokens=result.output_tokens,
                 )
-                predictions = response.get("predictions", [])
             except GoogleAPICallError as ex:
                 raise VertexAPIStatusError.from_exception(ex)
             except GoogleAPIError as ex:
                 raise VertexAPIConnectionError.from_exception(ex)
 
         text_gen_model_outputs = []
-        for prediction in predictions:
+        for prediction in result.predictions:
             text_gen_model_outputs.append(
                 TextGenModelOutput(
-                    text=prediction.get("content"),
-                    score=prediction.get("score"),
-                    safety_attributes=SafetyAttributes(
-                        **prediction.get("safetyAttributes", {})
-                    ),
+                    text=prediction.content,
+                    score=prediction.score,
+                    safety_attributes=SafetyAttributes(**prediction.safety_attributes),
                     metadata=TokensConsumptionMetadata(
-                        input_tokens=tokens_metatada.get("inputTokenCount", {}).get(
-                            "totalTokens", None
-                        ),
-                        output_tokens=tokens_metatada.get("outputTokenCount", {}).get(
-                            "totalTokens", None
-                        ),
+                        input_tokens=result.input_tokens,
+                        output_tokens=result.output_tokens,
                     ),
                 )
             )
@@ -0,0 +1,160 @@
+import gc
+import os
+import signal
+import socket
+import threading
+import time
+
+import structlog
+import uvicorn
+from fastapi import FastAPI
+from prometheus_client import multiprocess
+from tree_sitter_languages import get_parser
+
+from ai_gateway.api.server import setup_container
+from ai_gateway.code_suggestions.processing.ops import ProgramLanguage
+from ai_gateway.code_suggestions.processing.typing import LanguageId
+from ai_gateway.code_suggestions.prompts.parsers import compile_queries
+from ai_gateway.instrumentators.memory import process_memory
+from ai_gateway.prompts import compile_template
+from ai_gateway.startup import StartupTimings, load_lazy_imports
+
+__all__ = [
+    "warm_up",
+    "PreforkSupervisor",
+]
+
+log = structlog.stdlib.get_logger("prefork")
+
+
+def warm_up(app: FastAPI):
+    """Load the read-only state used by requests in the master process.
+
+    Forked workers inherit it as copy-on-write pages, so it is loaded once per pod instead of
+    once per worker.
+    """
+    timings = StartupTimings()
+
+    with timings.measure("container"):
+        container_application = setup_container(app)
+
+    with timings.measure("integrations"):
+        load_lazy_imports()
+
+    with timings.measure("tokenizer"):
+        container_application.code_suggestions.tokenizer()
+
+    with timings.measure("tree_sitter"):
+        for lang_id in LanguageId:
+            get_parser(ProgramLanguage.from_language_id(lang_id).grammar_name)
+
+        compile_queries()
+
+    with timings.measure("prompt_registry"):
+        prompt_registry = container_application.pkg_prompts.prompt_registry()
+
+        for prompt_registered in prompt_registry.prompts_registered.values():
+            for prompt_config in prompt_registered.versions.values():
+                for template in prompt_config.prompt_template.values():
+                    compile_template(template)
+
+    timings.log()
+
+
+class PreforkSupervisor:
+    """Fork uvicorn workers from a master process that has already loaded the application.
+
+    Workers share the listening socket and are restarted if they exit. The memory of each
+    worker is logged every `memory_report_interval_s` seconds.
+    """
+
+    def __init__(self, config: uvicorn.Config, memory_report_interval_s: float):
+        self.config = config
+        self.memory_report_interval_s = memory_report_interval_s
+        self.workers: set[int] = set()
+        self.should_exit = threading.Event()
+
+    def run(self):
+        sock = self.config.bind_socket()
+
+        signal.signal(signal.SIGINT, self._handle_exit)
+        signal.signal(signal.SIGTERM, self._handle_exit)
+
+        # Move the loaded objects out of the collected generations, so that collections in the
+        # workers don't write to their pages and keep them shared
+        gc.collect()
+        gc.freeze()
+
+        log.info("Starting pre-fork workers", workers=self.config.workers)
+
+        reported_at = time.monotonic()
+
+        try:
+            while not self.should_exit.is_set():
+                while len(self.workers) < self.config.workers:
+                    self._spawn(sock)
+
+                self._reap()
+
+                if time.monotonic() - reported_at >= self.memory_report_interval_s:
+                    self.report_memory()
+                    reported_at = time.monotonic()
+
+                self.should_exit.wait(0.5)
+        finally:
+            self._stop()
+            sock.close()
+
+    def report_memory(self):
+        for pid in sorted(self.workers):
+            log.info("Worker memory", pid=pid, **process_memory(pid))
+
+    def _handle_exit(self, sig, _frame):
+        log.info("Stopping pre-fork workers", signal=signal.Signals(sig).name)
+        self.should_exit.set()
+
+    def _spawn(self, sock: socket.socket):
+        pid = os.fork()
+
+        if pid == 0:
+            exit_code = 1
+            try:
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+                uvicorn.Server(self.config).run(sockets=[sock])
+                exit_code = 0
+            finally:
+                os._exit(exit_code)
+
+        log.info("Started pre-fork worker", pid=pid)
+        self.workers.add(pid)
+
+    def _reap(self):
+        for pid in list(self.workers):
+            reaped_pid, status = os.waitpid(pid, os.WNOHANG)
+            if reaped_pid:
+                self._remove(pid, status)
+
+    def _stop(self):
+        for pid in self.workers:
+            os.kill(pid, signal.SIGTERM)
+
+        for pid in list(self.workers):
+            _, status = os.waitpid(pid, 0)
+            self._remove(pid, status)
+
+    def _remove(self, pid: int, status: int):
+        self.workers.discard(pid)
+
+        # pylint: disable=direct-environment-variable-reference
+        if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+            multiprocess.mark_process_dead(pid)
+        # pylint: enable=direct-environment-variable-reference
+
+        if not self.should_exit.is_set():
+            log.warning(
+                "Pre-fork worker exited",
+                pid=pid,
+                exit_code=os.waitstatus_to_exitcode(status),
+            )
@@ -1,23 +1,39 @@
 from abc import ABC, abstractmethod
+from functools import cached_property, lru_cache, partial
 from typing import Any, AsyncIterator, Mapping, Optional, Tuple, TypeVar, cast
 
 from gitlab_cloud_connector import GitLabUnitPrimitive, WrongUnitPrimitives
-from jinja2 import PackageLoader
+from jinja2 import PackageLoader, Template
 from jinja2.sandbox import SandboxedEnvironment
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
 from langchain_core.prompt_values import PromptValue
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.prompts.string import DEFAULT_FORMATTER_MAPPING
-from langchain_core.runnables import Runnable, RunnableBinding, RunnableConfig
+from langchain_core.runnables import (
+    Runnable,
+    RunnableBinding,
+    RunnableConfig,
+    RunnableLambda,
+)
 
 from ai_gateway.api.auth_utils import StarletteUser
 from ai_gateway.instrumentators.model_requests import ModelRequestInstrumentator
-from ai_gateway.prompts.config.base import ModelConfig, PromptConfig, PromptParams
+from ai_gateway.prompts.config.base import (
+    ModelConfig,
+    PromptCaching,
+    PromptConfig,
+    PromptParams,
+)
+from ai_gateway.prompts.config.models import ModelClassProvider
 from ai_gateway.prompts.typing import Model, ModelMetadata, TypeModelFactory
 
 __all__ = [
     "Prompt",
     "BasePromptRegistry",
     "jinja2_formatter",
+    "compile_template",
 ]
 
 Input = TypeVar("Input")
@@ -28,8 +44,14 @@ jinja_env = SandboxedEnvironment(
 )
 
 
+@lru_cache(maxsize=1_000)
+def compile_template(template: str) -> Template:
+    # Prompt templates come from the definitions, compiling each of them once is enough
+    return jinja_env.from_string(template)
+
+
 def jinja2_formatter(template: str, /, **kwargs: Any) -> str:
-    return jinja_env.from_string(template).render(**kwargs)
+    return compile_template(template).render(**kwargs)
 
 
 # Override LangChain's jinja2 formatter so we can specify a loader with access to all our templates
@@ -53,7 +75,13 @@ class Prompt(RunnableBinding[Input, Output]):
         model = self._build_model(model_factory, config.model, disable_streaming)
         prompt = self._build_prompt_template(config.prompt_template)
         chain = self._build_chain(
-            cast(Runnable[Input, Output], prompt | model.bind(**model_kwargs))
+            cast(
+                Runnable[Input, Output],
+                self._build_model_input(prompt, config)
+                | model.bind(**model_kwargs).with_config(
+                    callbacks=[_TokenUsageCallbackHandler(model)]
+                ),
+            )
         )
 
         super().__init__(
@@ -88,11 +116,26 @@ class Prompt(RunnableBinding[Input, Output]):
             ),
         )
 
+    @staticmethod
+    def _build_model_input(
+        prompt: Runnable[Input, PromptValue], config: PromptConfig
+    ) -> Runnable[Input, Any]:
+        caching = config.prompt_caching
+
+        # Only the Anthropic API accepts cache breakpoints in the prompt
+        if (
+            not caching
+            or config.model.params.model_class_provider != ModelClassProvider.ANTHROPIC
+        ):
+            return prompt
+
+        return prompt | RunnableLambda(partial(_mark_cacheable_prefix, caching))
+
     @property
     def model_name(self) -> str:
         return self.model._identifying_params["model"]
 
-    @property
+    @cached_property
     def instrumentator(self) -> ModelRequestInstrumentator:
         return ModelRequestInstrumentator(
             model_engine=self.model._llm_type,
@@ -147,6 +190,88 @@ class Prompt(RunnableBinding[Input, Output]):
         )
 
 
+class _TokenUsageCallbackHandler(BaseCallbackHandler):
+    """Report the token usage returned by the model, including prompt cache reads and writes."""
+
+    run_inline = True
+
+    def __init__(self, model: Model):
+        self.instrumentator = ModelRequestInstrumentator(
+            model_engine=model._llm_type,
+            model_name=model._identifying_params["model"],
+            concurrency_limit=None,
+        )
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any):
+        for generations in response.generations:
+            for generation in generations:
+                if not isinstance(generation, ChatGeneration):
+                    continue
+
+                usage = getattr(generation.message, "usage_metadata", None)
+                if not usage:
+                    continue
+
+                details = usage.get("input_token_details", {})
+                cache_read = details.get("cache_read", 0)
+                cache_creation = details.get("cache_creation", 0)
+
+                # LangChain includes the cached tokens in the input tokens
+                self.instrumentator.register_token_usage(
+                    input_tokens=usage["input_tokens"] - cache_read - cache_creation,
+                    output_tokens=usage["output_tokens"],
+                    cache_read_input_tokens=cache_read,
+                    cache_creation_input_tokens=cache_creation,
+                )
+
+
+def _mark_cacheable_prefix(
+    caching: PromptCaching, prompt_value: PromptValue
+) -> list[BaseMessage]:
+    """Add Anthropic cache breakpoints to the end of the stable prefix of the prompt.
+
+    Everything up to a breakpoint is cached, so marking the system prompt caches the
+    instructions and tool definitions, and marking the last user message caches the
+    conversation history for the following requests of the same conversation.
+    Ref: https://docs.anthropic.com/en/docs/build-with-claude/prompt-caching
+    """
+    messages = prompt_value.to_messages()
+
+    breakpoints = []
+    if caching.system:
+        breakpoints += [
+            i for i, m in enumerate(messages) if isinstance(m, SystemMessage)
+        ]
+    if caching.history:
+        breakpoints += [
+            i for i, m in enumerate(messages) if isinstance(m, HumanMessage)
+        ][-1:]
+
+    for i in breakpoints:
+        messages[i] = _with_cache_control(messages[i])
+
+    return messages
+
+
+def _with_cache_control(message: BaseMessage) -> BaseMessage:
+    content = message.content
+    if not content:
+        # Anthropic rejects cache breakpoints on empty text blocks
+        return message
+
+    blocks = (
+        [{"type": "text", "text": content}]
+        if isinstance(content, str)
+        else [
+            block if isinstance(block, dict) else {"type": "text", "text": block}
+            for block in content
+        ]
+    )
+    blocks[-1] = {**blocks[-1], "cache_control": {"type": "ephemeral"}}
+
+    return message.model_copy(update={"content": blocks})
+
+
 class BasePromptRegistry(ABC):
     @abstractmethod
     def get(
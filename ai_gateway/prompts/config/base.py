@@ -3,7 +3,7 @@ from pydantic import BaseModel, ConfigDict
 
 from ai_gateway.prompts.config.models import TypeModelParams
 
-__all__ = ["PromptConfig", "ModelConfig"]
+__all__ = ["PromptConfig", "ModelConfig", "PromptCaching"]
 
 
 class ModelConfig(BaseModel):
@@ -24,6 +24,15 @@ class PromptParams(BaseModel):
     vertex_location: str | None = None
 
 
+class PromptCaching(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    # Cache the system prompt, which includes the tool definitions of chat agents
+    system: bool = False
+    # Cache the conversation up to and including the last user message
+    history: bool = False
+
+
 class PromptConfig(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
@@ -32,3 +41,4 @@ class PromptConfig(BaseModel):
     unit_primitives: list[GitLabUnitPrimitive]
     prompt_template: dict[str, str]
     params: PromptParams | None = None
+    prompt_caching: PromptCaching | None = None
@@ -1,3 +1,4 @@
+import json
 from pathlib import Path
 from typing import NamedTuple, Optional, Type
 
@@ -8,6 +9,7 @@ from poetry.core.constraints.version import Version, parse_constraint
 from ai_gateway.prompts.base import BasePromptRegistry, Prompt
 from ai_gateway.prompts.config import ModelClassProvider, PromptConfig
 from ai_gateway.prompts.typing import ModelMetadata, TypeModelFactory
+from ai_gateway.serialization import json_dumps_bytes
 
 __all__ = ["LocalPromptRegistry", "PromptRegistered"]
 
@@ -97,22 +99,13 @@ class LocalPromptRegistry(BasePromptRegistry):
             disable_streaming=self.disable_streaming,
         )
 
-    @classmethod
-    def from_local_yaml(
-        cls,
-        class_overrides: dict[str, Type[Prompt]],
-        model_factories: dict[ModelClassProvider, TypeModelFactory],
-        default_prompts: dict[str, str],
-        custom_models_enabled: bool = False,
-        disable_streaming: bool = False,
-    ) -> "LocalPromptRegistry":
-        """Iterate over all prompt definition files matching [usecase]/[type]/[version].yml,
-        and create a corresponding prompt for each one. The base Prompt class is
-        used if no matching override is provided in `class_overrides`.
-        """
+    @staticmethod
+    def _load_definitions() -> dict[str, dict[str, dict]]:
+        """Parse the prompt definition files matching [usecase]/[type]/[version].yml
+        into their raw content by prompt id and version."""
 
         prompts_definitions_dir = Path(__file__).parent / "definitions"
-        prompts_registered = {}
+        definitions = {}
 
         # Iterate over each folder
         for path in prompts_definitions_dir.glob("**"):
@@ -121,7 +114,7 @@ class LocalPromptRegistry(BasePromptRegistry):
             # Iterate over each version file
             for version in path.glob("*.yml"):
                 with open(version, "r") as fp:
-                    versions[version.stem] = PromptConfig(**yaml.safe_load(fp))
+                    versions[version.stem] = yaml.safe_load(fp)
 
             # If there were no yml files in this folder, skip it
             if not versions:
@@ -129,16 +122,59 @@ class LocalPromptRegistry(BasePromptRegistry):
 
             # E.g., "chat/react/base", "generate_description/mistral", etc.
             prompt_id_with_model_name = path.relative_to(prompts_definitions_dir)
+            definitions[str(prompt_id_with_model_name)] = versions
+
+        return definitions
 
-            klass = class_overrides.get(str(prompt_id_with_model_name.parent), Prompt)
-            prompts_registered[str(prompt_id_with_model_name)] = PromptRegistered(
-                klass=klass, versions=versions
+    @classmethod
+    def dump_snapshot(cls, snapshot_path: str):
+        """Write the prompt definitions to a JSON snapshot, loaded faster than the
+        YAML files on startup."""
+
+        Path(snapshot_path).write_bytes(json_dumps_bytes(cls._load_definitions()))
+
+    @classmethod
+    def from_local_yaml(
+        cls,
+        class_overrides: dict[str, Type[Prompt]],
+        model_factories: dict[ModelClassProvider, TypeModelFactory],
+        default_prompts: dict[str, str],
+        custom_models_enabled: bool = False,
+        disable_streaming: bool = False,
+        snapshot_path: Optional[str] = None,
+    ) -> "LocalPromptRegistry":
+        """Iterate over all prompt definition files matching [usecase]/[type]/[version].yml,
+        and create a corresponding prompt for each one. The base Prompt class is
+        used if no matching override is provided in `class_overrides`.
+
+        The definitions are read from `snapshot_path` instead if the snapshot exists.
+        """
+
+        if snapshot_path and Path(snapshot_path).is_file():
+            definitions = json.loads(Path(snapshot_path).read_bytes())
+        else:
+            snapshot_path = None
+            definitions = cls._load_definitions()
+
+        prompts_registered = {}
+
+        for prompt_id_with_model_name, versions in definitions.items():
+            klass = class_overrides.get(
+                str(Path(prompt_id_with_model_name).parent), Prompt
+            )
+            prompts_registered[prompt_id_with_model_name] = PromptRegistered(
+                klass=klass,
+                versions={
+                    version: PromptConfig(**definition)
+                    for version, definition in versions.items()
+                },
             )
 
         log.info(
             "Initializing prompt registry from local yaml",
             default_prompts=default_prompts,
             custom_models_enabled=custom_models_enabled,
+            snapshot_path=snapshot_path,
         )
 
         return cls(
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import re
 import typing
@@ -5,7 +6,6 @@ from abc import ABC, abstractmethod
 
 import fastapi
 import httpx
-from starlette.background import BackgroundTask
 
 from ai_gateway.config import ConfigModelConcurrency
 from ai_gateway.instrumentators.model_requests import ModelRequestInstrumentator
@@ -57,10 +57,9 @@ class BaseProxyClient(ABC):
 
         if stream:
             return fastapi.responses.StreamingResponse(
-                response_from_upstream.aiter_text(),
+                self._stream_upstream(response_from_upstream, watcher),
                 status_code=response_from_upstream.status_code,
                 headers=headers_to_downstream,
-                background=BackgroundTask(func=watcher.afinish),
             )
 
         return fastapi.Response(
@@ -69,6 +68,26 @@ class BaseProxyClient(ABC):
             headers=headers_to_downstream,
         )
 
+    async def _stream_upstream(
+        self,
+        response_from_upstream: httpx.Response,
+        watcher: ModelRequestInstrumentator.WatchContainer,
+    ) -> typing.AsyncIterator[str]:
+        # Close the upstream response explicitly so the vendor connection is released
+        # as soon as the downstream client goes away instead of when it's garbage collected.
+        try:
+            async for chunk in response_from_upstream.aiter_text():
+                yield chunk
+        except (asyncio.CancelledError, GeneratorExit):
+            watcher.register_cancellation()
+            raise
+        except Exception:
+            watcher.register_error()
+            raise
+        finally:
+            await response_from_upstream.aclose()
+            watcher.finish()
+
     @abstractmethod
     def _allowed_upstream_paths(self) -> list[str]:
         """Allowed paths to the upstream service."""
@@ -0,0 +1,4 @@
+# flake8: noqa
+
+from ai_gateway.rate_limiting.backend import *
+from ai_gateway.rate_limiting.limiter import *
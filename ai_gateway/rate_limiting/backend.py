@@ -0,0 +1,101 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import NamedTuple
+
+from prometheus_client import Gauge
+
+__all__ = [
+    "InMemoryRateLimitBackend",
+    "RateLimitBackend",
+]
+
+RATE_LIMIT_BUCKETS_GAUGE = Gauge(
+    "rate_limit_buckets",
+    "Number of token buckets held in memory by the rate limiter",
+)
+
+
+class RateLimitBackend(ABC):
+    """Stores the token buckets of the rate limiter.
+
+    The buckets are refilled with `rate_per_s` tokens per second, up to `burst` tokens.
+    A backend shared by the workers, e.g. Redis, only needs to take the tokens
+    atomically.
+    """
+
+    @abstractmethod
+    async def consume(
+        self, key: str, rate_per_s: float, burst: float, tokens: float = 1.0
+    ) -> float:
+        """Take `tokens` from the bucket of `key`.
+
+        Returns 0 when the tokens were taken, or the seconds to wait until the bucket
+        holds them. Nothing is taken from the bucket in that case.
+        """
+
+
+class _Bucket(NamedTuple):
+    # Tokens left and monotonic time of the last refill
+    available: float
+    updated_at: float
+    rate_per_s: float
+    burst: float
+
+    def refill_s(self, now: float) -> float:
+        """Seconds until the bucket is full again."""
+        if self.available >= self.burst:
+            return 0.0
+        if self.rate_per_s <= 0:
+            return float("inf")
+
+        missing = self.burst - self.available
+        return max(0.0, missing / self.rate_per_s - (now - self.updated_at))
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Keeps the token buckets in the process, each worker limits on its own.
+
+    At most `max_keys` buckets are kept, the least recently used one is evicted for a
+    new key once it's full again: an evicted bucket starts again full, so evicting a
+    bucket still refilling would let its key send a new burst. Until then, the requests
+    of new keys wait for the least recently used bucket to refill.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, _Bucket] = OrderedDict()
+
+    async def consume(
+        self, key: str, rate_per_s: float, burst: float, tokens: float = 1.0
+    ) -> float:
+        now = time.monotonic()
+
+        if key not in self._buckets and len(self._buckets) >= self.max_keys:
+            oldest_key, oldest = next(iter(self._buckets.items()))
+
+            if (refill_s := oldest.refill_s(now)) > 0:
+                return refill_s
+
+            del self._buckets[oldest_key]
+
+        bucket = self._buckets.get(key, _Bucket(burst, now, rate_per_s, burst))
+        available = min(
+            burst, bucket.available + (now - bucket.updated_at) * rate_per_s
+        )
+
+        if available >= tokens:
+            available -= tokens
+            wait_s = 0.0
+        elif tokens > burst or rate_per_s <= 0:
+            # The bucket never holds that many tokens
+            wait_s = float("inf")
+        else:
+            wait_s = (tokens - available) / rate_per_s
+
+        self._buckets[key] = _Bucket(available, now, rate_per_s, burst)
+        self._buckets.move_to_end(key)
+
+        RATE_LIMIT_BUCKETS_GAUGE.set(len(self._buckets))
+
+        return wait_s
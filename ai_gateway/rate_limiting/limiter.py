@@ -0,0 +1,132 @@
+import math
+from enum import StrEnum
+from typing import NamedTuple, Optional
+
+from prometheus_client import Counter
+
+from ai_gateway.instrumentators.cardinality import BoundedMetric
+from ai_gateway.rate_limiting.backend import InMemoryRateLimitBackend, RateLimitBackend
+from ai_gateway.scheduling import Tenant, current_tenant
+
+__all__ = [
+    "DEFAULT_LIMIT_KEY",
+    "RateLimitExceeded",
+    "RateLimitRule",
+    "RateLimitScope",
+    "RateLimiter",
+]
+
+DEFAULT_LIMIT_KEY = "default"
+
+_UNKNOWN_CLIENT = "unknown"
+
+# The unit primitives and feature categories are validated by the endpoints, but the
+# instance ids are unbounded
+RATE_LIMITED_REQUESTS = BoundedMetric(
+    Counter(
+        "rate_limited_requests",
+        "Requests rejected because the instance or the user sent too many of them",
+        ["scope", "unit_primitive", "instance_id"],
+    ),
+    capped_labels=["instance_id"],
+    max_values=100,
+)
+
+
+class RateLimitScope(StrEnum):
+    INSTANCE = "instance"
+    USER = "user"
+
+
+class RateLimitRule(NamedTuple):
+    # Sustained rate of requests, and requests allowed at once after being idle
+    rate_per_s: float
+    burst: float
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, scope: RateLimitScope, retry_after_s: float):
+        super().__init__(f"rate limit of the {scope} exceeded")
+        self.scope = scope
+        self.retry_after_s = retry_after_s
+
+    @property
+    def retry_after(self) -> Optional[str]:
+        """Value of the `Retry-After` header, in whole seconds."""
+        if math.isinf(self.retry_after_s):
+            return None
+
+        return str(max(1, math.ceil(self.retry_after_s)))
+
+
+class RateLimiter:
+    """Limits the requests of each GitLab instance and each user with token buckets.
+
+    The limits are looked up by unit primitive, or by feature category for the single
+    purpose endpoints, then under `default`. A scope without a limit isn't limited.
+    The user is checked before the instance, so that the requests of a throttled user
+    don't use up the tokens of their instance. A request without a user or an instance
+    takes the tokens of its client instead, the subject of its token or its address.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[RateLimitBackend] = None,
+        instance_limits: Optional[dict[str, RateLimitRule]] = None,
+        user_limits: Optional[dict[str, RateLimitRule]] = None,
+        enabled: bool = True,
+    ):
+        self.backend = backend or InMemoryRateLimitBackend()
+        self.limits = {
+            RateLimitScope.INSTANCE: instance_limits or {},
+            RateLimitScope.USER: user_limits or {},
+        }
+        self.enabled = enabled
+
+    def rule(
+        self, scope: RateLimitScope, unit_primitive: str
+    ) -> Optional[RateLimitRule]:
+        limits = self.limits[scope]
+        return limits.get(unit_primitive, limits.get(DEFAULT_LIMIT_KEY))
+
+    async def check(self, unit_primitive: str, tenant: Optional[Tenant] = None):
+        """Take a token for the request, or raise `RateLimitExceeded`."""
+        if not self.enabled:
+            return
+
+        tenant = tenant or current_tenant.get()
+
+        for scope, tenant_id in [
+            (RateLimitScope.USER, tenant.global_user_id),
+            (RateLimitScope.INSTANCE, tenant.instance_id),
+        ]:
+            rule = self.rule(scope, unit_primitive)
+            if rule is None:
+                continue
+
+            wait_s = await self.backend.consume(
+                self._key(scope, unit_primitive, tenant_id, tenant.client_id),
+                rule.rate_per_s,
+                rule.burst,
+            )
+
+            if wait_s > 0:
+                RATE_LIMITED_REQUESTS.labels(
+                    scope=scope.value,
+                    unit_primitive=unit_primitive,
+                    instance_id=tenant.instance_id or "",
+                ).inc()
+                raise RateLimitExceeded(scope, wait_s)
+
+    @staticmethod
+    def _key(
+        scope: RateLimitScope,
+        unit_primitive: str,
+        tenant_id: Optional[str],
+        client_id: Optional[str],
+    ) -> str:
+        if tenant_id:
+            return f"{scope}:{unit_primitive}:{tenant_id}"
+
+        # Kept apart from the ids of the instances and users
+        return f"{scope}:{unit_primitive}:client:{client_id or _UNKNOWN_CLIENT}"
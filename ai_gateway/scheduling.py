@@ -0,0 +1,253 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from enum import StrEnum
+from typing import AsyncIterator, NamedTuple, Optional
+
+from gitlab_cloud_connector import GitLabFeatureCategory
+from prometheus_client import Histogram
+from starlette_context import context
+
+__all__ = [
+    "PriorityLimiter",
+    "Tenant",
+    "WorkloadClass",
+    "classify_workload",
+    "current_tenant",
+    "current_workload",
+]
+
+WORKLOAD_QUEUE_WAIT_HISTOGRAM = Histogram(
+    "workload_queue_wait_seconds",
+    "Time waited for a slot by the workloads, by class and resource",
+    ["workload", "resource"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+
+class WorkloadClass(StrEnum):
+    # Served first, e.g. code completions waited for in the editor
+    INTERACTIVE = "interactive"
+    STANDARD = "standard"
+    # Deferred while the other classes need the slots, e.g. x-ray or abuse detection
+    BACKGROUND = "background"
+
+    @property
+    def priority(self) -> int:
+        return list(WorkloadClass).index(self)
+
+
+_INTERACTIVE_FEATURE_CATEGORIES = {GitLabFeatureCategory.CODE_SUGGESTIONS}
+
+current_workload: ContextVar[WorkloadClass] = ContextVar(
+    "current_workload", default=WorkloadClass.STANDARD
+)
+
+
+class Tenant(NamedTuple):
+    instance_id: Optional[str] = None
+    global_user_id: Optional[str] = None
+    # Subject of the token, or address of the client, identifying the requests without
+    # an instance or a user
+    client_id: Optional[str] = None
+
+
+current_tenant: ContextVar[Tenant] = ContextVar("current_tenant", default=Tenant())
+
+
+def classify_workload(feature_category: str, generation: bool = False) -> WorkloadClass:
+    # Code generations take seconds anyway, only the completions are waited for as the
+    # user types, whichever endpoint serves them
+    if feature_category in _INTERACTIVE_FEATURE_CATEGORIES and not generation:
+        return WorkloadClass.INTERACTIVE
+
+    return WorkloadClass.STANDARD
+
+
+class _Waiter:
+    def __init__(self, workload: WorkloadClass, future: asyncio.Future, tag: float):
+        self.workload = workload
+        self.future = future
+        self.tag = tag
+
+
+class PriorityLimiter:
+    """Limits the concurrent use of a resource, handing out the slots by priority.
+
+    When all the slots are taken, the waiting workloads get the released slots by
+    class priority. Each class also holds at most a share of the slots, so that the
+    background workloads can't take the slots needed by the interactive ones during a
+    burst. A disabled limiter never waits.
+
+    Within a class, the slots are shared fairly between the users of the GitLab
+    instances waiting for them (start-time fair queuing): each waiter is tagged with
+    the virtual time its user would be served at, advancing by `1 / weight` for each
+    queued request of the user, so that a user sending many requests at once waits
+    behind the others instead of in front of them. The weight of a request is the
+    weight of its instance times the weight of its unit primitive. Requests without a
+    user are told apart by their client, and served in arrival order without either.
+    """
+
+    # Finish tags of the users kept when no request of them is waiting anymore
+    _MAX_IDLE_TENANTS = 1_000
+
+    def __init__(
+        self,
+        resource: str,
+        capacity: int,
+        max_shares: Optional[dict[WorkloadClass, float]] = None,
+        enabled: bool = True,
+        tenant_weights: Optional[dict[str, float]] = None,
+        unit_primitive_weights: Optional[dict[str, float]] = None,
+    ):
+        self.resource = resource
+        self.capacity = capacity
+        self.enabled = enabled
+        self.max_slots = {
+            workload: max(1, int(capacity * (max_shares or {}).get(workload, 1.0)))
+            for workload in WorkloadClass
+        }
+        self.tenant_weights = tenant_weights or {}
+        self.unit_primitive_weights = unit_primitive_weights or {}
+
+        self.in_use: Counter[WorkloadClass] = Counter()
+        self._waiters: list[tuple[int, float, int, _Waiter]] = []
+        self._sequence = itertools.count()
+        self._virtual_time: dict[WorkloadClass, float] = {
+            workload: 0.0 for workload in WorkloadClass
+        }
+        self._finish_tags: dict[
+            WorkloadClass, dict[tuple[Optional[str], Optional[str]], float]
+        ] = {workload: {} for workload in WorkloadClass}
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        workload: Optional[WorkloadClass] = None,
+        tenant: Optional[Tenant] = None,
+        unit_primitive: Optional[str] = None,
+    ) -> AsyncIterator[WorkloadClass]:
+        previous_workload = current_workload.get()
+        workload = workload or previous_workload
+        tenant = tenant if tenant is not None else current_tenant.get()
+        current_workload.set(workload)
+
+        try:
+            if not self.enabled:
+                yield workload
+                return
+
+            start = time.perf_counter()
+            await self._acquire(workload, tenant, unit_primitive)
+            queue_wait = time.perf_counter() - start
+
+            WORKLOAD_QUEUE_WAIT_HISTOGRAM.labels(
+                workload=workload.value, resource=self.resource
+            ).observe(queue_wait)
+            if context.exists():
+                context[f"{self.resource}_queue_wait_s"] = queue_wait
+
+            try:
+                yield workload
+            finally:
+                self._release(workload)
+        finally:
+            # Not a reset, the slot of a streamed response is released from another
+            # context once the response is sent
+            current_workload.set(previous_workload)
+
+    def _can_run(self, workload: WorkloadClass) -> bool:
+        return (
+            self.in_use.total() < self.capacity
+            and self.in_use[workload] < self.max_slots[workload]
+        )
+
+    def _weight(self, tenant: Tenant, unit_primitive: Optional[str]) -> float:
+        instance_weight = self.tenant_weights.get(tenant.instance_id or "", 1.0)
+        unit_primitive_weight = self.unit_primitive_weights.get(
+            unit_primitive or "", 1.0
+        )
+
+        return instance_weight * unit_primitive_weight
+
+    def _tag(
+        self, workload: WorkloadClass, tenant: Tenant, unit_primitive: Optional[str]
+    ) -> float:
+        virtual_time = self._virtual_time[workload]
+        flow = (tenant.instance_id, tenant.global_user_id or tenant.client_id)
+        if flow == (None, None):
+            return virtual_time
+
+        finish_tags = self._finish_tags[workload]
+        if len(finish_tags) > len(self._waiters) + self._MAX_IDLE_TENANTS:
+            # Tags behind the virtual time don't delay their instance anymore
+            self._finish_tags[workload] = finish_tags = {
+                key: tag for key, tag in finish_tags.items() if tag > virtual_time
+            }
+
+        start = max(virtual_time, finish_tags.get(flow, 0.0))
+        finish_tags[flow] = start + 1 / self._weight(tenant, unit_primitive)
+
+        return start
+
+    async def _acquire(
+        self, workload: WorkloadClass, tenant: Tenant, unit_primitive: Optional[str]
+    ):
+        # Waiters are woken up as soon as they can run, the ones left can't use this slot
+        if self._can_run(workload):
+            self.in_use[workload] += 1
+            return
+
+        waiter = _Waiter(
+            workload,
+            asyncio.get_running_loop().create_future(),
+            self._tag(workload, tenant, unit_primitive),
+        )
+        heapq.heappush(
+            self._waiters,
+            (workload.priority, waiter.tag, next(self._sequence), waiter),
+        )
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # The slot was handed over before the cancellation
+                self._release(workload)
+            else:
+                self._waiters = [
+                    entry for entry in self._waiters if entry[-1] is not waiter
+                ]
+                heapq.heapify(self._waiters)
+            raise
+
+    def _release(self, workload: WorkloadClass):
+        self.in_use[workload] -= 1
+        self._wake_up()
+
+    def _wake_up(self):
+        blocked = []
+
+        while self._waiters and self.in_use.total() < self.capacity:
+            entry = heapq.heappop(self._waiters)
+            waiter = entry[-1]
+
+            if waiter.future.done():
+                continue
+
+            if self.in_use[waiter.workload] < self.max_slots[waiter.workload]:
+                self.in_use[waiter.workload] += 1
+                self._virtual_time[waiter.workload] = max(
+                    self._virtual_time[waiter.workload], waiter.tag
+                )
+                waiter.future.set_result(None)
+            else:
+                # The class holds its share already, the next classes can still run
+                blocked.append(entry)
+
+        for entry in blocked:
+            heapq.heappush(self._waiters, entry)
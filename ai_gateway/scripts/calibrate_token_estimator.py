@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# Reports the error of the token estimator against a real tokenizer on sample files, and
+# fits the calibration of a tokenizer family to them. The fitted calibration can be set
+# with AIGW_TOKEN_ESTIMATION__CALIBRATIONS.
+
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+from transformers import AutoTokenizer
+
+from ai_gateway.token_estimation import (
+    Calibration,
+    TokenEstimator,
+    TokenizerFamily,
+    text_features,
+)
+from ai_gateway.tokenizer import init_tokenizer
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Compare the token estimator with a tokenizer on sample data."
+    )
+    parser.add_argument(
+        "samples", nargs="+", help="Sample files, or directories read recursively"
+    )
+    parser.add_argument(
+        "--family",
+        choices=[family.value for family in TokenizerFamily],
+        default=TokenizerFamily.DEFAULT.value,
+        help="Tokenizer family of the calibration to check",
+    )
+    parser.add_argument(
+        "--tokenizer",
+        help="Hugging Face name or local path of the tokenizer of the family, "
+        "the tokenizer of the gateway when not set",
+    )
+    parser.add_argument(
+        "--chunk-lines",
+        type=int,
+        default=50,
+        help="Split the files in samples of this many lines",
+    )
+
+    return parser.parse_args()
+
+
+def read_samples(paths: list[str], chunk_lines: int) -> list[str]:
+    files = []
+    for path in map(Path, paths):
+        files.extend(sorted(p for p in path.rglob("*") if p.is_file()) or [path])
+
+    samples = []
+    for file in files:
+        try:
+            lines = file.read_text(encoding="utf-8").splitlines(keepends=True)
+        except (UnicodeDecodeError, OSError):
+            continue
+
+        for start in range(0, len(lines), chunk_lines):
+            sample = "".join(lines[start : start + chunk_lines])
+            if sample.strip():
+                samples.append(sample)
+
+    return samples
+
+
+def report(name: str, estimated: np.ndarray, actual: np.ndarray):
+    relative_errors = np.abs(estimated - actual) / np.maximum(actual, 1)
+    total_error = (estimated.sum() - actual.sum()) / max(actual.sum(), 1)
+
+    print(
+        f"{name}: "
+        f"mean {relative_errors.mean():.1%}, "
+        f"p50 {np.percentile(relative_errors, 50):.1%}, "
+        f"p90 {np.percentile(relative_errors, 90):.1%}, "
+        f"max {relative_errors.max():.1%}, "
+        f"total {total_error:+.1%}"
+    )
+
+
+def calibrate():
+    args = parse_arguments()
+    family = TokenizerFamily(args.family)
+
+    tokenizer = (
+        AutoTokenizer.from_pretrained(args.tokenizer, use_fast=True)
+        if args.tokenizer
+        else init_tokenizer()
+    )
+
+    samples = read_samples(args.samples, args.chunk_lines)
+    if not samples:
+        raise SystemExit("No sample found")
+
+    actual = np.array(
+        tokenizer(samples, return_length=True, add_special_tokens=False)["length"],
+        dtype=float,
+    )
+    features = np.array([text_features(sample) for sample in samples], dtype=float)
+
+    estimator = TokenEstimator()
+    estimated = np.array(
+        [estimator.estimate(sample, family) for sample in samples], dtype=float
+    )
+
+    print(f"{len(samples)} samples, {int(actual.sum())} tokens")
+    report("current calibration", estimated, actual)
+
+    # Least squares on the relative error, so that the small samples count as much as
+    # the large ones
+    weights = 1 / np.maximum(actual, 1)
+    coefficients, *_ = np.linalg.lstsq(
+        features * weights[:, None], actual * weights, rcond=None
+    )
+    fitted = Calibration(*np.clip(coefficients, 0, None).round(3).tolist())
+
+    report(
+        "fitted calibration",
+        np.maximum(1, np.round(features @ np.array(fitted))),
+        actual,
+    )
+    print(json.dumps({family.value: fitted._asdict()}))
+
+
+if __name__ == "__main__":
+    calibrate()
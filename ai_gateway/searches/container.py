@@ -1,16 +1,19 @@
 from dependency_injector import containers, providers
-from google.cloud import discoveryengine
+
+from ai_gateway.startup import lazy_import
 
 from .search import VertexAISearch
 from .sqlite_search import SqliteSearch
 
 __all__ = ["ContainerSearches"]
 
+discoveryengine = lazy_import("google.cloud.discoveryengine")
+
 
 def _init_vertex_search_service_client(
     mock_model_responses: bool,
     custom_models_enabled: bool,
-) -> discoveryengine.SearchServiceAsyncClient | None:
+) -> "discoveryengine.SearchServiceAsyncClient | None":
     if mock_model_responses or custom_models_enabled:
         return None
 
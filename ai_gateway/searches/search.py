@@ -5,14 +5,16 @@ from typing import Any, Dict, List
 import structlog
 from fastapi import HTTPException, status
 from google.api_core.exceptions import GoogleAPIError, NotFound
-from google.cloud import discoveryengine
 from google.protobuf.json_format import MessageToDict
 
 from ai_gateway.models import ModelAPIError
+from ai_gateway.startup import lazy_import
 from ai_gateway.tracking import log_exception
 
 SEARCH_APP_NAME = "gitlab-docs"
 
+discoveryengine = lazy_import("google.cloud.discoveryengine")
+
 log = structlog.stdlib.get_logger("chat")
 
 
@@ -76,7 +78,7 @@ class Searcher:
 class VertexAISearch(Searcher):
     def __init__(
         self,
-        client: discoveryengine.SearchServiceAsyncClient,
+        client: "discoveryengine.SearchServiceAsyncClient",
         project: str,
         fallback_datastore_version: str,
         *args: Any,
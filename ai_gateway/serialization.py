@@ -0,0 +1,47 @@
+import json
+from typing import Any, Callable, Optional
+
+import orjson
+from starlette.responses import JSONResponse as StarletteJSONResponse
+
+__all__ = [
+    "json_dumps",
+    "json_dumps_bytes",
+    "JSONResponse",
+]
+
+# Same output as `json.dumps(..., ensure_ascii=False, separators=(",", ":"))`, which is
+# also how Starlette renders JSON responses. Stream events and logs used to have the
+# default separators and escaped non-ASCII characters.
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _stdlib_dumps(obj: Any, default: Optional[Callable[[Any], Any]]) -> str:
+    return json.dumps(obj, default=default, ensure_ascii=False, separators=(",", ":"))
+
+
+def json_dumps_bytes(
+    obj: Any, default: Optional[Callable[[Any], Any]] = None, **_kwargs: Any
+) -> bytes:
+    """Serialize to compact UTF-8 JSON with orjson.
+
+    Objects orjson rejects, e.g. integers above 64 bits, are serialized by the stdlib.
+    """
+    try:
+        return orjson.dumps(obj, default=default, option=_ORJSON_OPTIONS)
+    except TypeError:
+        return _stdlib_dumps(obj, default).encode("utf-8")
+
+
+def json_dumps(
+    obj: Any, default: Optional[Callable[[Any], Any]] = None, **kwargs: Any
+) -> str:
+    """Same as `json_dumps_bytes`, also usable as the serializer of structlog."""
+    return json_dumps_bytes(obj, default, **kwargs).decode("utf-8")
+
+
+class JSONResponse(StarletteJSONResponse):
+    """Default response class of the API, rendered with `json_dumps_bytes`."""
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps_bytes(content)
@@ -0,0 +1,104 @@
+import importlib
+import importlib.util
+import sys
+import time
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Any, Iterator
+
+import structlog
+
+__all__ = [
+    "lazy_import",
+    "load_lazy_imports",
+    "StartupTimings",
+]
+
+log = structlog.stdlib.get_logger("startup")
+
+# Proxies by module name, shared by the callers so that they apply the same settings
+_LAZY_MODULES: dict[str, "_LazyModule"] = {}
+
+
+class _LazyModule:
+    """Proxy importing the module on the first attribute access.
+
+    The proxy isn't registered in `sys.modules`, so `from name.submodule import ...`
+    still goes through a regular import.
+    """
+
+    def __init__(self, name: str):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+        object.__setattr__(self, "_pending", {})
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            module = importlib.import_module(self._name)
+            for attr, value in self._pending.items():
+                setattr(module, attr, value)
+            self._pending.clear()
+            object.__setattr__(self, "_module", module)
+
+        return self._module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value: Any):
+        if self._module is None:
+            self._pending[attr] = value
+        else:
+            setattr(self._module, attr, value)
+
+    def __delattr__(self, attr: str):
+        delattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        return f"<lazy module {self._name!r}>"
+
+
+def lazy_import(name: str) -> Any:
+    """Return a proxy of `name` importing the module on the first attribute access.
+
+    Attributes set before the module is imported, e.g. `litellm.vertex_project`, are
+    applied on top of the imported module.
+    """
+    if module := _LAZY_MODULES.get(name) or sys.modules.get(name):
+        return module
+
+    if importlib.util.find_spec(name) is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+
+    module = _LAZY_MODULES[name] = _LazyModule(name)
+
+    return module
+
+
+def load_lazy_imports():
+    """Execute the lazily imported modules that were not used yet."""
+    for module in _LAZY_MODULES.values():
+        module._load()
+
+
+class StartupTimings:
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.durations: dict[str, float] = {}
+
+    @contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[phase] = round(time.perf_counter() - started_at, 3)
+
+    def log(self):
+        log.info(
+            "Application startup complete",
+            # CPU time since the process started, mostly spent importing modules
+            process_time_s=round(time.process_time(), 3),
+            total_s=round(time.perf_counter() - self.started_at, 3),
+            **{f"{phase}_s": duration for phase, duration in self.durations.items()},
+        )
@@ -0,0 +1,138 @@
+import asyncio
+from contextlib import suppress
+from typing import AsyncIterator, Optional
+
+from prometheus_client import Counter
+
+__all__ = [
+    "StreamCoalescer",
+]
+
+STREAM_CHUNKS_COUNTER = Counter(
+    "stream_chunks_total",
+    "The total number of chunks received by streamed responses",
+    ["route"],
+)
+
+STREAM_WRITES_COUNTER = Counter(
+    "stream_writes_total",
+    "The total number of writes sent to clients by streamed responses",
+    ["route"],
+)
+
+_END = object()
+
+
+class _StreamError:
+    def __init__(self, ex: BaseException):
+        self.ex = ex
+
+
+class StreamCoalescer:
+    """Batch the chunks of a streamed response into fewer writes.
+
+    Model providers stream a few tokens per chunk, and every chunk forwarded as is
+    costs an event, a write and often a TCP segment. The first chunk is written
+    immediately to keep the time to first token. The following chunks are joined
+    until `window_ms` elapsed since the first buffered one or `max_bytes` are buffered.
+    At most `max_queued_chunks` are read ahead from the model while the client is slow
+    to receive the writes.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        window_ms: int,
+        max_bytes: int,
+        route_window_ms: Optional[dict[str, int]] = None,
+        max_queued_chunks: int = 64,
+    ):
+        self.enabled = enabled
+        self.window_ms = window_ms
+        self.max_bytes = max_bytes
+        self.route_window_ms = route_window_ms or {}
+        self.max_queued_chunks = max_queued_chunks
+
+    def window_s(self, route: str) -> float:
+        if not self.enabled:
+            return 0.0
+
+        return self.route_window_ms.get(route, self.window_ms) / 1_000
+
+    async def coalesce(
+        self, stream: AsyncIterator[str], route: str
+    ) -> AsyncIterator[str]:
+        chunks_counter = STREAM_CHUNKS_COUNTER.labels(route=route)
+        writes_counter = STREAM_WRITES_COUNTER.labels(route=route)
+
+        window_s = self.window_s(route)
+        if window_s <= 0:
+            async for chunk in stream:
+                chunks_counter.inc()
+                writes_counter.inc()
+                yield chunk
+            return
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queued_chunks)
+        producer = asyncio.create_task(_produce(stream, queue))
+        loop = asyncio.get_running_loop()
+
+        buffer: list[str] = []
+        buffer_size = 0
+        deadline = 0.0
+        first = True
+
+        try:
+            while True:
+                try:
+                    if buffer:
+                        item = await asyncio.wait_for(
+                            queue.get(), max(deadline - loop.time(), 0)
+                        )
+                    else:
+                        item = await queue.get()
+                except TimeoutError:
+                    item = None
+
+                if isinstance(item, str):
+                    chunks_counter.inc()
+
+                    if first:
+                        first = False
+                        writes_counter.inc()
+                        yield item
+                        continue
+
+                    if not buffer:
+                        deadline = loop.time() + window_s
+                    buffer.append(item)
+                    buffer_size += len(item)
+
+                    if buffer_size < self.max_bytes:
+                        continue
+
+                if buffer:
+                    writes_counter.inc()
+                    yield "".join(buffer)
+                    buffer, buffer_size = [], 0
+
+                if item is _END:
+                    return
+                if isinstance(item, _StreamError):
+                    raise item.ex
+        finally:
+            if not producer.done():
+                producer.cancel()
+                with suppress(asyncio.CancelledError):
+                    await producer
+
+
+async def _produce(stream: AsyncIterator[str], queue: asyncio.Queue):
+    # Waits for room in the queue, the model stream isn't read ahead of the client
+    try:
+        async for chunk in stream:
+            await queue.put(chunk)
+    except Exception as ex:  # pylint: disable=broad-exception-caught
+        await queue.put(_StreamError(ex))
+    else:
+        await queue.put(_END)
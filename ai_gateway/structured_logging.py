@@ -10,6 +10,7 @@ from structlog.types import EventDict, Processor
 
 from ai_gateway.config import ConfigLogging
 from ai_gateway.feature_flags import FeatureFlag, is_feature_enabled
+from ai_gateway.serialization import json_dumps
 
 access_logger = structlog.stdlib.get_logger("api.access")
 ENABLE_REQUEST_LOGGING = False
@@ -88,7 +89,7 @@ def setup_logging(logging_config: ConfigLogging):
 
     log_renderer: structlog.types.Processor
     if logging_config.format_json:
-        log_renderer = structlog.processors.JSONRenderer()
+        log_renderer = structlog.processors.JSONRenderer(serializer=json_dumps)
     else:
         log_renderer = structlog.dev.ConsoleRenderer()
 
@@ -0,0 +1,144 @@
+import re
+from enum import StrEnum
+from typing import NamedTuple, Optional
+
+__all__ = [
+    "Calibration",
+    "TextFeatures",
+    "TokenEstimator",
+    "TokenizerFamily",
+    "text_features",
+    "tokenizer_family",
+]
+
+# Estimated token counts are meant for the metrics and the budgets of the prompts. The
+# prompts still need to be truncated by the tokenizer of the `TokenStrategyBase` so that
+# they never exceed the limit of the model.
+
+_WORD_RE = re.compile(r"[A-Za-z]+")
+_DIGIT_RE = re.compile(r"[0-9]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class TokenizerFamily(StrEnum):
+    # Byte-level BPE of the tokenizer shipped with the gateway (CodeGen), also used for
+    # the self-hosted models
+    DEFAULT = "default"
+    ANTHROPIC = "anthropic"
+    # SentencePiece of the Gemini and PaLM models, splitting the numbers into digits
+    VERTEX = "vertex"
+
+
+_FAMILY_MODEL_PREFIXES = {
+    TokenizerFamily.ANTHROPIC: ("claude",),
+    TokenizerFamily.VERTEX: ("gemini", "code-gecko", "code-bison", "codechat-bison"),
+}
+
+
+def tokenizer_family(model_name: Optional[str]) -> TokenizerFamily:
+    name = str(model_name or "").lower()
+
+    for family, prefixes in _FAMILY_MODEL_PREFIXES.items():
+        if name.startswith(prefixes):
+            return family
+
+    return TokenizerFamily.DEFAULT
+
+
+class TextFeatures(NamedTuple):
+    # Runs of ASCII letters, most of them are a single token
+    words: int
+    letters: int
+    digits: int
+    # ASCII characters that are neither letters, digits nor whitespace
+    symbols: int
+    # Whitespace other than a single space, which is merged into the next token
+    breaks: int
+    non_ascii_bytes: int
+
+
+class Calibration(NamedTuple):
+    """Tokens per unit of each of the `TextFeatures`."""
+
+    words: float
+    letters: float
+    digits: float
+    symbols: float
+    breaks: float
+    non_ascii_bytes: float
+
+
+def text_features(text: str) -> TextFeatures:
+    encoded = text.encode("utf-8")
+    ascii_chars = len(encoded.decode("ascii", "ignore"))
+
+    words = _WORD_RE.findall(text)
+    letters = sum(map(len, words))
+    digits = len(_DIGIT_RE.findall(text))
+    whitespaces = _WHITESPACE_RE.findall(text)
+
+    return TextFeatures(
+        words=len(words),
+        letters=letters,
+        digits=digits,
+        symbols=max(0, ascii_chars - letters - digits - sum(map(len, whitespaces))),
+        breaks=len(whitespaces) - whitespaces.count(" "),
+        non_ascii_bytes=len(encoded) - ascii_chars,
+    )
+
+
+# Starting points, see `calibrate_token_estimator`
+DEFAULT_CALIBRATIONS = {
+    TokenizerFamily.DEFAULT: Calibration(
+        words=0.6,
+        letters=0.12,
+        digits=0.5,
+        symbols=0.8,
+        breaks=1.0,
+        non_ascii_bytes=0.5,
+    ),
+    TokenizerFamily.ANTHROPIC: Calibration(
+        words=0.6,
+        letters=0.1,
+        digits=0.35,
+        symbols=0.7,
+        breaks=0.8,
+        non_ascii_bytes=0.4,
+    ),
+    TokenizerFamily.VERTEX: Calibration(
+        words=0.55,
+        letters=0.1,
+        digits=1.0,
+        symbols=0.8,
+        breaks=0.8,
+        non_ascii_bytes=0.35,
+    ),
+}
+
+
+class TokenEstimator:
+    """Estimates the number of tokens of a text without tokenizing it.
+
+    The text is reduced to counts of character classes in a few regex passes, which
+    are weighted by the calibration of the tokenizer family. The calibrations can be
+    checked and refit against the real tokenizers on sample data with
+    `calibrate_token_estimator`.
+    """
+
+    def __init__(
+        self, calibrations: Optional[dict[TokenizerFamily, Calibration]] = None
+    ):
+        self.calibrations = {**DEFAULT_CALIBRATIONS, **(calibrations or {})}
+
+    def estimate(
+        self, text: str, family: TokenizerFamily = TokenizerFamily.DEFAULT
+    ) -> int:
+        if not text:
+            return 0
+
+        calibration = self.calibrations[family]
+        tokens = sum(
+            weight * count for weight, count in zip(calibration, text_features(text))
+        )
+
+        return max(1, round(tokens))
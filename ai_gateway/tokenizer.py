@@ -1,13 +1,23 @@
 import os
+from pathlib import Path
+from typing import Optional
 
 from transformers import AutoTokenizer, PreTrainedTokenizerFast
 
+TOKENIZER_NAME = "Salesforce/codegen2-16B"
 
-def init_tokenizer() -> PreTrainedTokenizerFast:
+
+def init_tokenizer(path: Optional[str] = None) -> PreTrainedTokenizerFast:
     # T5Tokenizer ignores new lines, tabs and multiple spaces used a lot in coding.
     # When the T5Tokenizer is applied, the output differs from input.
     # We're switching to the Salesforce Codegen tokenizer temporarily.
-    tokenizer = AutoTokenizer.from_pretrained("Salesforce/codegen2-16B", use_fast=True)
+    if path and Path(path).is_dir():
+        # Saved by `save_tokenizer`, loading it doesn't reach the Hugging Face Hub
+        tokenizer = AutoTokenizer.from_pretrained(
+            path, use_fast=True, local_files_only=True
+        )
+    else:
+        tokenizer = AutoTokenizer.from_pretrained(TOKENIZER_NAME, use_fast=True)
 
     # Disable parallelism to avoid deadlocks
     # pylint: disable=direct-environment-variable-reference
@@ -15,3 +25,7 @@ def init_tokenizer() -> PreTrainedTokenizerFast:
     # pylint: enable=direct-environment-variable-reference
 
     return tokenizer
+
+
+def save_tokenizer(path: str):
+    init_tokenizer().save_pretrained(path)
@@ -0,0 +1,120 @@
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+from ai_gateway.config import ConfigLogging, ConfigMockModel
+from ai_gateway.structured_logging import setup_logging
+from benchmarks.harness import (
+    EndpointResult,
+    compare_results,
+    load_corpus,
+    load_results,
+    run_benchmark,
+    save_results,
+)
+
+_BENCHMARKS_DIR = Path(__file__).parent
+_DEFAULT_CORPUS = _BENCHMARKS_DIR / "corpus" / "default.json"
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the AI Gateway endpoints against mocked models."
+    )
+    parser.add_argument("--corpus", type=Path, default=_DEFAULT_CORPUS)
+    parser.add_argument(
+        "--requests", type=int, default=200, help="Requests sent per endpoint"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=10, help="Requests in flight per endpoint"
+    )
+    parser.add_argument("--latency-median-s", type=float, default=0.2)
+    parser.add_argument("--latency-p99-s", type=float, default=1.0)
+    parser.add_argument("--chunk-delay-s", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--only", action="append", help="Only run the corpus entries with this name"
+    )
+    parser.add_argument(
+        "--save-baseline", type=Path, help="Write the results to this file"
+    )
+    parser.add_argument(
+        "--baseline", type=Path, help="Compare the results with this file"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Relative change allowed before a metric is reported as a regression",
+    )
+
+    return parser.parse_args()
+
+
+def _print_results(results: list[EndpointResult]):
+    header = (
+        f"{'endpoint':<28}{'reqs':>6}{'errs':>6}{'rps':>9}{'p50 ms':>9}"
+        f"{'p95 ms':>9}{'p99 ms':>9}{'cpu ms/req':>12}{'lag p99':>9}{'lag max':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+
+    for result in results:
+        print(
+            f"{result.name:<28}{result.requests:>6}{result.errors:>6}{result.rps:>9.1f}"
+            f"{result.latency_p50_ms:>9.1f}{result.latency_p95_ms:>9.1f}"
+            f"{result.latency_p99_ms:>9.1f}{result.cpu_ms_per_request:>12.2f}"
+            f"{result.loop_lag_p99_ms:>9.1f}{result.loop_lag_max_ms:>9.1f}"
+        )
+
+
+def main() -> int:
+    args = _parse_args()
+
+    # Keep the access logs of every request from skewing the CPU measurements
+    setup_logging(ConfigLogging(level="WARNING", to_file=os.devnull))
+
+    corpus = load_corpus(args.corpus)
+    if args.only:
+        corpus = [request for request in corpus if request.name in args.only]
+
+    mock_model = ConfigMockModel(
+        latency_median_s=args.latency_median_s,
+        latency_p99_s=args.latency_p99_s,
+        chunk_delay_s=args.chunk_delay_s,
+        seed=args.seed,
+    )
+
+    results = asyncio.run(
+        run_benchmark(
+            corpus,
+            requests=args.requests,
+            concurrency=args.concurrency,
+            mock_model=mock_model,
+        )
+    )
+    _print_results(results)
+
+    if args.save_baseline:
+        save_results(args.save_baseline, results)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare_results(
+            results, load_results(args.baseline), args.tolerance
+        )
+        if regressions:
+            print(f"\nRegressions compared with {args.baseline}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+
+        print(f"\nNo regressions compared with {args.baseline}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
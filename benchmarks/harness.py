@@ -0,0 +1,249 @@
+import asyncio
+import json
+import math
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Optional
+
+import httpx
+from pydantic import BaseModel
+
+from ai_gateway.api.server import create_fast_api_server
+from ai_gateway.config import Config, ConfigAuth, ConfigMockModel
+
+__all__ = [
+    "BenchmarkRequest",
+    "EndpointResult",
+    "LoopLagMonitor",
+    "percentile",
+    "load_corpus",
+    "load_results",
+    "save_results",
+    "compare_results",
+    "run_benchmark",
+]
+
+_DEFAULT_BASE_URL = "http://benchmark"
+
+
+class BenchmarkRequest(BaseModel):
+    name: str
+    method: str = "POST"
+    path: str
+    headers: dict[str, str] = {}
+    body: dict[str, Any] = {}
+    stream: bool = False
+
+
+class EndpointResult(BaseModel):
+    name: str
+    requests: int
+    errors: int
+    rps: float
+    latency_p50_ms: float
+    latency_p95_ms: float
+    latency_p99_ms: float
+    cpu_ms_per_request: float
+    loop_lag_p99_ms: float
+    loop_lag_max_ms: float
+
+
+class LoopLagMonitor:
+    """Measure how late the event loop wakes up a task sleeping for `interval_s`.
+
+    The lag is the time spent by the loop running callbacks that block it, e.g. CPU-bound
+    prompt rendering or JSON serialization, while other requests wait.
+    """
+
+    def __init__(self, interval_s: float = 0.005):
+        self.interval_s = interval_s
+        self.lags: list[float] = []
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval_s)
+            self.lags.append(max(time.perf_counter() - start - self.interval_s, 0.0))
+
+    @asynccontextmanager
+    async def watch(self) -> AsyncIterator["LoopLagMonitor"]:
+        task = asyncio.create_task(self._run())
+        try:
+            yield self
+        finally:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Return the `q` percentile (0-100) of `values` using the nearest-rank method."""
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    rank = max(math.ceil(q / 100 * len(ordered)), 1)
+
+    return ordered[rank - 1]
+
+
+def load_corpus(path: Path) -> list[BenchmarkRequest]:
+    with open(path, "r") as f:
+        return [BenchmarkRequest(**request) for request in json.load(f)]
+
+
+def load_results(path: Path) -> list[EndpointResult]:
+    with open(path, "r") as f:
+        return [EndpointResult(**result) for result in json.load(f)]
+
+
+def save_results(path: Path, results: list[EndpointResult]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump([result.model_dump() for result in results], f, indent=2)
+        f.write("\n")
+
+
+def compare_results(
+    results: list[EndpointResult],
+    baseline: list[EndpointResult],
+    tolerance: float,
+) -> list[str]:
+    """Return a description of every metric that regressed by more than `tolerance`."""
+    regressions = []
+    baseline_by_name = {result.name: result for result in baseline}
+
+    for result in results:
+        base = baseline_by_name.get(result.name)
+        if base is None:
+            continue
+
+        if result.errors > base.errors:
+            regressions.append(
+                f"{result.name}: errors increased from {base.errors} to {result.errors}"
+            )
+
+        if result.rps < base.rps * (1 - tolerance):
+            regressions.append(
+                f"{result.name}: rps dropped from {base.rps:.1f} to {result.rps:.1f}"
+            )
+
+        for metric in (
+            "latency_p50_ms",
+            "latency_p95_ms",
+            "latency_p99_ms",
+            "cpu_ms_per_request",
+        ):
+            current, previous = getattr(result, metric), getattr(base, metric)
+            if current > previous * (1 + tolerance):
+                regressions.append(
+                    f"{result.name}: {metric} increased from {previous:.2f} to {current:.2f}"
+                )
+
+    return regressions
+
+
+def _benchmark_config(mock_model: ConfigMockModel) -> Config:
+    return Config(
+        _env_file=None,
+        mock_model_responses=True,
+        mock_model=mock_model,
+        auth=ConfigAuth(bypass_external=True),
+    )
+
+
+async def _send(client: httpx.AsyncClient, request: BenchmarkRequest) -> bool:
+    if request.stream:
+        async with client.stream(
+            request.method, request.path, headers=request.headers, json=request.body
+        ) as response:
+            async for _ in response.aiter_raw():
+                pass
+    else:
+        response = await client.request(
+            request.method, request.path, headers=request.headers, json=request.body
+        )
+
+    return response.is_success
+
+
+async def _run_endpoint(
+    client: httpx.AsyncClient,
+    request: BenchmarkRequest,
+    requests: int,
+    concurrency: int,
+) -> EndpointResult:
+    latencies: list[float] = []
+    errors = 0
+    pending = iter(range(requests))
+
+    async def _worker():
+        nonlocal errors
+        for _ in pending:
+            start = time.perf_counter()
+            try:
+                success = await _send(client, request)
+            except Exception:
+                success = False
+
+            latencies.append(time.perf_counter() - start)
+            errors += 0 if success else 1
+
+    monitor = LoopLagMonitor()
+    async with monitor.watch():
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+
+        await asyncio.gather(*(_worker() for _ in range(concurrency)))
+
+        wall_time = time.perf_counter() - wall_start
+        cpu_time = time.process_time() - cpu_start
+
+    return EndpointResult(
+        name=request.name,
+        requests=requests,
+        errors=errors,
+        rps=requests / wall_time if wall_time else 0.0,
+        latency_p50_ms=percentile(latencies, 50) * 1000,
+        latency_p95_ms=percentile(latencies, 95) * 1000,
+        latency_p99_ms=percentile(latencies, 99) * 1000,
+        cpu_ms_per_request=cpu_time / requests * 1000,
+        loop_lag_p99_ms=percentile(monitor.lags, 99) * 1000,
+        loop_lag_max_ms=max(monitor.lags, default=0.0) * 1000,
+    )
+
+
+async def run_benchmark(
+    corpus: list[BenchmarkRequest],
+    requests: int,
+    concurrency: int,
+    mock_model: ConfigMockModel,
+    warmup: int = 5,
+    config: Optional[Config] = None,
+) -> list[EndpointResult]:
+    """Replay every request of the corpus against an in-process app using mocked models.
+
+    Endpoints run one after another, so that the CPU time and the event loop lag of each
+    phase are attributed to a single endpoint.
+    """
+    app = create_fast_api_server(config or _benchmark_config(mock_model))
+    results = []
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+            base_url=_DEFAULT_BASE_URL,
+            timeout=None,
+        ) as client:
+            for request in corpus:
+                for _ in range(warmup):
+                    await _send(client, request)
+
+                results.append(
+                    await _run_endpoint(client, request, requests, concurrency)
+                )
+
+    return results
@@ -0,0 +1,140 @@
+import argparse
+import timeit
+from typing import Any, Optional
+
+from google.cloud.aiplatform.gapic import PredictRequest, PredictResponse
+from google.protobuf import json_format, struct_pb2
+
+from ai_gateway.models.vertex_predict import (
+    Prediction,
+    PredictParameters,
+    PredictResult,
+    build_predict_request,
+    parse_predict_response,
+)
+
+_ENDPOINT = (
+    "projects/project/locations/location/publishers/google/models/code-gecko@002"
+)
+
+
+def _parameters_dict(parameters: PredictParameters) -> dict[str, Any]:
+    parameters_dict: dict[str, Any] = {
+        "temperature": parameters.temperature,
+        "maxOutputTokens": parameters.max_output_tokens,
+        "topP": parameters.top_p,
+        "topK": parameters.top_k,
+        "candidateCount": parameters.candidate_count,
+    }
+    if parameters.stop_sequences:
+        parameters_dict["stopSequences"] = list(parameters.stop_sequences)
+
+    return parameters_dict
+
+
+def build_predict_request_from_dict(
+    endpoint: str, instance: dict[str, Optional[str]], parameters: PredictParameters
+) -> PredictRequest:
+    """Reference implementation of `build_predict_request` going through JSON dicts."""
+    request = PredictRequest(
+        endpoint=endpoint,
+        parameters=json_format.ParseDict(
+            _parameters_dict(parameters), struct_pb2.Value()
+        ),
+    )
+    request.instances.extend([json_format.ParseDict(instance, struct_pb2.Value())])
+
+    return request
+
+
+def parse_predict_response_from_dict(response: PredictResponse) -> PredictResult:
+    """Reference implementation of `parse_predict_response` going through JSON dicts."""
+    response_dict = PredictResponse.to_dict(response)
+    token_metadata = response_dict.get("metadata", {}).get("tokenMetadata", {})
+
+    def _total_tokens_from_dict(key: str) -> Optional[int]:
+        total_tokens = token_metadata.get(key, {}).get("totalTokens", None)
+
+        return None if total_tokens is None else int(total_tokens)
+
+    return PredictResult(
+        predictions=[
+            Prediction(
+                content=prediction.get("content"),
+                score=prediction.get("score"),
+                safety_attributes=prediction.get("safetyAttributes", {}),
+            )
+            for prediction in response_dict.get("predictions", [])
+        ],
+        input_tokens=_total_tokens_from_dict("inputTokenCount"),
+        output_tokens=_total_tokens_from_dict("outputTokenCount"),
+    )
+
+
+def _instance(prefix_size: int) -> dict[str, str]:
+    line = "    total = sum(value for value in values if value is not None)\n"
+    prefix = (line * (prefix_size // len(line) + 1))[:prefix_size]
+
+    return {"prefix": prefix, "suffix": line * 10}
+
+
+def _response(candidates: int) -> PredictResponse:
+    response = PredictResponse()
+    for _ in range(candidates):
+        response.predictions.append(
+            {
+                "content": "    return total\n",
+                "score": -2.5,
+                "safetyAttributes": {"blocked": False, "categories": [], "scores": []},
+            }
+        )
+    response.metadata = {
+        "tokenMetadata": {
+            "inputTokenCount": {"totalTokens": 512, "totalBillableCharacters": 2048},
+            "outputTokenCount": {"totalTokens": 8, "totalBillableCharacters": 16},
+        }
+    }
+
+    return response
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare the Vertex text models request and response conversions."
+    )
+    parser.add_argument("--prefix-size", type=int, default=8_000)
+    parser.add_argument("--candidates", type=int, default=1)
+    parser.add_argument("--number", type=int, default=10_000)
+
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+
+    instance = _instance(args.prefix_size)
+    parameters = PredictParameters.from_args(0.2, 64, 0.95, 40, 1, ["\n\n"])
+    response = _response(args.candidates)
+
+    cases = [
+        (
+            "build request",
+            lambda: build_predict_request_from_dict(_ENDPOINT, instance, parameters),
+            lambda: build_predict_request(_ENDPOINT, instance, parameters),
+        ),
+        (
+            "parse response",
+            lambda: parse_predict_response_from_dict(response),
+            lambda: parse_predict_response(response),
+        ),
+    ]
+
+    print(f"{'conversion':<16}{'dict us':>10}{'proto us':>10}{'speedup':>9}")
+    for name, dict_path, proto_path in cases:
+        dict_us = timeit.timeit(dict_path, number=args.number) / args.number * 1e6
+        proto_us = timeit.timeit(proto_path, number=args.number) / args.number * 1e6
+        print(f"{name:<16}{dict_us:>10.2f}{proto_us:>10.2f}{dict_us / proto_us:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
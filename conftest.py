@@ -20,6 +20,7 @@ from ai_gateway.code_suggestions.processing.typing import (
     MetadataCodeContent,
     MetadataPromptBuilder,
 )
+from ai_gateway.code_suggestions.prompts.parsers import ParserExecutor
 from ai_gateway.config import Config
 from ai_gateway.container import ContainerApplication
 from ai_gateway.experimentation.base import ExperimentTelemetry
@@ -56,6 +57,13 @@ def text_gen_base_model():
     return model
 
 
+@pytest.fixture(scope="session")
+def parser_executor():
+    parser_executor = ParserExecutor()
+    yield parser_executor
+    parser_executor.shutdown()
+
+
 @pytest.fixture(scope="class")
 def stub_auth_provider():
     class StubKeyAuthProvider:
@@ -87,7 +95,7 @@ def mock_track_internal_event():
 
 @pytest.fixture
 def mock_detect_abuse():
-    with patch("ai_gateway.abuse_detection.AbuseDetector.detect") as mock:
+    with patch("ai_gateway.abuse_detection.AbuseDetector.enqueue") as mock:
         yield mock
 
 
@@ -1,6 +1,16 @@
 #!/usr/bin/env python
 
-from ai_gateway.tokenizer import init_tokenizer
+from ai_gateway.config import Config
+from ai_gateway.prompts import LocalPromptRegistry
+from ai_gateway.tokenizer import init_tokenizer, save_tokenizer
 
 if __name__ == "__main__":
-    init_tokenizer()
+    config = Config()
+
+    if config.startup.tokenizer_path:
+        save_tokenizer(config.startup.tokenizer_path)
+    else:
+        init_tokenizer()
+
+    if config.startup.prompt_registry_snapshot:
+        LocalPromptRegistry.dump_snapshot(config.startup.prompt_registry_snapshot)
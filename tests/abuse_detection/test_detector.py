@@ -1,3 +1,4 @@
+import asyncio
 from unittest import mock
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -5,9 +6,13 @@ import pytest
 from fastapi import Request
 from structlog.testing import capture_logs
 
-from ai_gateway.abuse_detection import AbuseDetector
-from ai_gateway.models.anthropic import AnthropicChatModel
+from ai_gateway.abuse_detection import AbuseDetector, AbuseSample
 from ai_gateway.models.base_text import TextGenModelOutput
+from ai_gateway.models.mock import ChatModel
+from ai_gateway.scheduling import PriorityLimiter, WorkloadClass
+
+BODY = '{"messages": [{"role": "user", "content": "How can I create an issue in GitLab?"}]}'
+EXPECTED_USECASE = "Asking a question about how to use GitLab."
 
 
 @pytest.fixture
@@ -23,15 +28,32 @@ def mock_request():
 
 
 @pytest.fixture
-def mock_model():
-    model = MagicMock(spec=AnthropicChatModel)
-    model.generate = AsyncMock(return_value=TextGenModelOutput(text="0.2"))
+def sample(mock_request):
+    return AbuseSample.from_request(mock_request, BODY, EXPECTED_USECASE)
+
+
+@pytest.fixture
+def model_output():
+    return '<score id="0">0.2</score>'
+
+
+@pytest.fixture
+def mock_model(model_output):
+    model = ChatModel()
+    model.generate = AsyncMock(return_value=TextGenModelOutput(text=model_output))
     return model
 
 
 @pytest.fixture
-def abuse_detector(mock_model):
-    return AbuseDetector(enabled=True, sampling_rate=1.0, model=mock_model)
+def detector_params():
+    return {}
+
+
+@pytest.fixture
+def abuse_detector(mock_model, detector_params):
+    return AbuseDetector(
+        enabled=True, sampling_rate=1.0, model=mock_model, **detector_params
+    )
 
 
 @pytest.mark.asyncio
@@ -45,48 +67,167 @@ async def test_should_detect_disabled(mock_model):
     assert detector.should_detect() is False
 
 
+def test_sample_from_request(sample):
+    assert sample == AbuseSample(
+        url="http://0.0.0.0:5052/v1/proxy/anthropic/v1/messages",
+        body=BODY,
+        expected_usecase=EXPECTED_USECASE,
+        instance_id="test_instance_id",
+        global_user_id="test_global_user_id",
+        unit_primitive="test_unit_primitive",
+    )
+    assert sample.content_hash == sample._replace(instance_id="other").content_hash
+    assert sample.content_hash != sample._replace(body="{}").content_hash
+
+
 @pytest.mark.asyncio
-async def test_eval(mock_request, abuse_detector):
-    body = '{"messages": [{"role": "user", "content": "How can I create an issue in GitLab?"}]}'
-    expected_usecase = "Asking a question about how to use GitLab."
+@pytest.mark.parametrize(
+    ("model_output", "expected_scores"),
+    [
+        ('<score id="0">0.2</score><score id="1">0.9</score>', [0.2, 0.9]),
+        ('<score id="1">0.9</score>', [None, 0.9]),
+        ('<score id="0">invalid</score><score id="4">0.1</score>', [None, None]),
+    ],
+)
+async def test_eval(abuse_detector, sample, expected_scores):
+    samples = [sample, sample._replace(body="{}")]
 
-    score = await abuse_detector._eval(mock_request, body, expected_usecase)
-    assert float(score) == 0.2
+    scores = await abuse_detector._eval(samples)
 
+    assert scores == expected_scores
 
-@pytest.mark.asyncio
-async def test_eval_failure(mock_request):
-    body = '{"messages": [{"role": "user", "content": "How can I create an issue in GitLab?"}]}'
-    expected_usecase = "Asking a question about how to use GitLab."
+    _, kwargs = abuse_detector.model.generate.call_args
+    assert kwargs["max_tokens"] == 32
+    assert kwargs["stop_sequences"] == ["</scores>"]
+    assert '<user_request id="1">' in kwargs["messages"][0].content
 
-    model = MagicMock(spec=AnthropicChatModel)
-    model.generate = AsyncMock(return_value=TextGenModelOutput(text="invalid text"))
-    abuse_detector = AbuseDetector(enabled=True, sampling_rate=1.0, model=model)
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("model_output", ["invalid text"])
+async def test_eval_failure(abuse_detector, sample):
     with capture_logs() as cap_logs:
-        result = await abuse_detector._eval(mock_request, body, expected_usecase)
+        result = await abuse_detector._eval([sample])
+
+    assert result == [None]
+    assert cap_logs[-1]["event"] == "abuse detector missing scores"
+
+
+@pytest.mark.asyncio
+async def test_eval_mock_model(sample):
+    # The mock model echoes the prompt instead of scoring it
+    abuse_detector = AbuseDetector(enabled=True, sampling_rate=1.0, model=ChatModel())
 
-    assert result is None
-    assert len(cap_logs) == 2
-    assert cap_logs[1]["exception_class"] == "ValueError"
+    assert await abuse_detector._eval([sample]) == [None]
 
 
 @pytest.mark.asyncio
-async def test_detect(mock_request, abuse_detector):
-    body = '{"messages": [{"role": "user", "content": "How can I create an issue in GitLab?"}]}'
-    expected_usecase = "Asking a question about how to use GitLab."
+@pytest.mark.parametrize("detector_params", [{"batch_timeout_s": 0.05}])
+async def test_enqueue(abuse_detector, mock_request):
+    with patch.object(abuse_detector, "_report") as mock_report:
+        assert abuse_detector.enqueue(mock_request, BODY, EXPECTED_USECASE)
+        assert abuse_detector.enqueue(mock_request, "{}", EXPECTED_USECASE)
+        assert abuse_detector.enqueue(mock_request, BODY, EXPECTED_USECASE)
 
-    await abuse_detector.detect(mock_request, body, expected_usecase)
+        while not mock_report.called or abuse_detector.queue.qsize():
+            await asyncio.sleep(0.01)
+
+    # Both requests are scored with a single call and the repeated request only once
     abuse_detector.model.generate.assert_called_once()
+    prompt = abuse_detector.model.generate.call_args.kwargs["messages"][0].content
+    assert prompt.count("<user_request id=") == 4  # including the 2 of the example
+    assert mock_report.call_count == 2
+
+    await abuse_detector.stop()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("detector_params", [{"queue_size": 1}])
+async def test_enqueue_queue_full(abuse_detector, mock_request):
+    with patch(
+        "ai_gateway.abuse_detection.detector.ABUSE_DETECTION_DROPPED_SAMPLES"
+    ) as mock_dropped:
+        assert abuse_detector.enqueue(mock_request, BODY, EXPECTED_USECASE)
+        assert not abuse_detector.enqueue(mock_request, BODY, EXPECTED_USECASE)
+
+    mock_dropped.inc.assert_called_once()
+
+    await abuse_detector.stop()
+
+
+@pytest.mark.asyncio
+async def test_stop(abuse_detector, mock_request):
+    # Stopping a detector that never started its worker does nothing
+    await abuse_detector.stop()
+
+    abuse_detector.enqueue(mock_request, BODY, EXPECTED_USECASE)
+    worker = abuse_detector._worker
+
+    await abuse_detector.stop()
+
+    assert worker.cancelled()
+    assert abuse_detector._worker is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("detector_params", [{"cache_size": 1}])
+async def test_process_cache(abuse_detector, sample):
+    other_sample = sample._replace(body="{}")
+
+    with patch.object(abuse_detector, "_report") as mock_report:
+        await abuse_detector._process([sample])
+        await abuse_detector._process([sample])
+        await abuse_detector._process([other_sample])
+        await abuse_detector._process([sample])
+
+    assert abuse_detector.model.generate.call_count == 3
+    assert mock_report.mock_calls == [
+        mock.call(0.2, sample),
+        mock.call(0.2, sample),
+        mock.call(0.2, other_sample),
+        mock.call(0.2, sample),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_process_request_slot(mock_model, sample):
+    request_limiter = PriorityLimiter("requests", capacity=1)
+    abuse_detector = AbuseDetector(
+        enabled=True,
+        sampling_rate=1.0,
+        model=mock_model,
+        request_limiter=request_limiter,
+    )
+    in_use = []
+
+    async def _generate(*_args, **_kwargs):
+        in_use.append(dict(request_limiter.in_use))
+        return TextGenModelOutput(text='<score id="0">0.2</score>')
+
+    mock_model.generate.side_effect = _generate
+
+    await abuse_detector._process([sample])
+
+    assert in_use == [{WorkloadClass.BACKGROUND: 1}]
+    assert not +request_limiter.in_use
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("model_output", ["invalid text"])
+async def test_process_not_scored(abuse_detector, sample):
+    with patch.object(abuse_detector, "_report") as mock_report:
+        await abuse_detector._process([sample])
+
+    mock_report.assert_not_called()
+    assert not abuse_detector.scores
 
 
 @pytest.mark.asyncio
-async def test_report(mock_request, abuse_detector):
+async def test_report(sample, abuse_detector):
     score = 0.2
 
     with capture_logs() as cap_logs:
         with patch("prometheus_client.Histogram.labels") as mock_histograms:
-            abuse_detector._report(score, mock_request)
+            abuse_detector._report(score, sample)
 
     assert len(cap_logs) == 1
     assert cap_logs[0]["event"] == "abuse request score"
@@ -1,4 +1,5 @@
 # from ai_gateway.gitlab_features import GitLabFeatureCategory, GitLabUnitPrimitive
+import asyncio
 from enum import StrEnum
 from unittest import mock
 from unittest.mock import Mock, patch
@@ -6,14 +7,17 @@ from unittest.mock import Mock, patch
 import pytest
 from fastapi import HTTPException, Request
 from gitlab_cloud_connector import GitLabFeatureCategory, GitLabUnitPrimitive
+from starlette.responses import StreamingResponse
 from starlette_context import context, request_cycle_context
 
 from ai_gateway.api.feature_category import (
     current_feature_category,
     feature_categories,
     feature_category,
+    rate_limit_key,
     track_metadata,
 )
+from ai_gateway.scheduling import PriorityLimiter, WorkloadClass, current_workload
 
 
 class DummyGitLabFeatureCategory(StrEnum):
@@ -26,6 +30,14 @@ class DummyGitLabUnitPrimitive(StrEnum):
     AWESOME_FEATURE_2 = "awesome_feature_2"
 
 
+@pytest.fixture(autouse=True)
+def request_limiter(mock_container):
+    request_limiter = PriorityLimiter("requests", capacity=2, enabled=False)
+
+    with mock_container.request_limiter.override(request_limiter):
+        yield request_limiter
+
+
 @pytest.fixture
 def patch_feature_category():
     patcher = patch(
@@ -61,6 +73,146 @@ async def test_feature_category(patch_feature_category):
         )
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("workload", "expected_workload"),
+    [
+        (None, WorkloadClass.INTERACTIVE),
+        (WorkloadClass.BACKGROUND, WorkloadClass.BACKGROUND),
+    ],
+)
+async def test_feature_category_workload(workload, expected_workload):
+    @feature_category(GitLabFeatureCategory.CODE_SUGGESTIONS, workload)
+    async def to_be_decorated():
+        return current_workload.get()
+
+    with request_cycle_context({}):
+        assert await to_be_decorated() == expected_workload
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("generation", "expected_workload"),
+    [
+        (False, WorkloadClass.INTERACTIVE),
+        (True, WorkloadClass.STANDARD),
+    ],
+)
+async def test_feature_category_workload_classifier(generation, expected_workload):
+    def classify(payload: dict, **_kwargs) -> WorkloadClass:
+        return (
+            WorkloadClass.STANDARD
+            if payload["generation"]
+            else WorkloadClass.INTERACTIVE
+        )
+
+    @feature_category(GitLabFeatureCategory.CODE_SUGGESTIONS, classify)
+    async def to_be_decorated(payload: dict):
+        return current_workload.get()
+
+    with request_cycle_context({}):
+        assert (
+            await to_be_decorated(payload={"generation": generation})
+            == expected_workload
+        )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("messages", "expected_body"),
+    [
+        ([{"type": "http.request"}], b"chunk"),
+        # The client disconnects before the body is iterated
+        ([{"type": "http.disconnect"}], b""),
+    ],
+)
+async def test_feature_category_streaming_response(
+    mock_container, messages, expected_body
+):
+    request_limiter = PriorityLimiter("requests", capacity=2)
+    sent = []
+
+    async def _stream():
+        yield "chunk"
+
+    async def _receive():
+        if messages:
+            return messages.pop(0)
+
+        # Wait for the body to be sent
+        await asyncio.sleep(1)
+        return {"type": "http.disconnect"}
+
+    async def _send(message):
+        await asyncio.sleep(0)
+        sent.append(message)
+
+    @feature_category(GitLabFeatureCategory.CODE_SUGGESTIONS)
+    async def to_be_decorated():
+        return StreamingResponse(_stream())
+
+    with request_cycle_context({}), mock_container.request_limiter.override(
+        request_limiter
+    ):
+        response = await to_be_decorated()
+
+        # The slot is held until the response is sent
+        assert request_limiter.in_use[WorkloadClass.INTERACTIVE] == 1
+
+        await response({"type": "http"}, _receive, _send)
+
+        assert request_limiter.in_use[WorkloadClass.INTERACTIVE] == 0
+        assert b"".join(message.get("body", b"") for message in sent) == expected_body
+
+
+@pytest.mark.parametrize(
+    ("headers", "path_params", "expected_keys"),
+    [
+        (
+            {"x-gitlab-unit-primitive": "explain_vulnerability"},
+            {"chat_invokable": "troubleshoot_job"},
+            ["code_suggestions", "explain_vulnerability", "troubleshoot_job"],
+        ),
+        (
+            {"x-gitlab-unit-primitive": "unknown"},
+            {"chat_invokable": "unknown"},
+            ["code_suggestions", None, "unknown"],
+        ),
+    ],
+)
+def test_rate_limit_key(headers, path_params, expected_keys):
+    @feature_category(GitLabFeatureCategory.CODE_SUGGESTIONS)
+    async def single_purpose():
+        pass
+
+    @feature_categories(
+        {
+            GitLabUnitPrimitive.EXPLAIN_VULNERABILITY: GitLabFeatureCategory.VULNERABILITY_MANAGEMENT
+        }
+    )
+    async def multi_purpose(request: Request):
+        pass
+
+    @track_metadata(
+        "chat_invokable", {"troubleshoot_job": GitLabUnitPrimitive.TROUBLESHOOT_JOB}
+    )
+    async def proxy(request: Request):
+        pass
+
+    async def untracked():
+        pass
+
+    request = Mock(spec=Request)
+    request.headers = headers
+    request.path_params = path_params
+
+    assert [
+        rate_limit_key(endpoint, request)
+        for endpoint in [single_purpose, multi_purpose, proxy]
+    ] == expected_keys
+    assert rate_limit_key(untracked, request) is None
+
+
 def test_unknown_feature_category():
     with pytest.raises(ValueError) as error:
         feature_category("not_exist")
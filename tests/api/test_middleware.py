@@ -1,10 +1,20 @@
-from unittest.mock import AsyncMock, patch
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
-from gitlab_cloud_connector import X_GITLAB_DUO_SEAT_COUNT_HEADER
+from fastapi import FastAPI
+from gitlab_cloud_connector import (
+    X_GITLAB_DUO_SEAT_COUNT_HEADER,
+    CloudConnectorUser,
+    GitLabFeatureCategory,
+    UserClaims,
+)
+from starlette.exceptions import HTTPException
 from starlette.requests import Request
 from starlette_context import context, request_cycle_context
 
+from ai_gateway.api.auth_utils import StarletteUser
+from ai_gateway.api.feature_category import feature_category
 from ai_gateway.api.middleware import (
     X_GITLAB_FEATURE_ENABLED_BY_NAMESPACE_IDS_HEADER,
     X_GITLAB_GLOBAL_USER_ID_HEADER,
@@ -14,11 +24,19 @@ from ai_gateway.api.middleware import (
     X_GITLAB_SAAS_DUO_PRO_NAMESPACE_IDS_HEADER,
     X_GITLAB_TEAM_MEMBER_HEADER,
     X_GITLAB_VERSION_HEADER,
+    ClientDisconnectMiddleware,
     DistributedTraceMiddleware,
     FeatureFlagMiddleware,
     InternalEventMiddleware,
+    MemoryProfilingMiddleware,
+    RateLimitMiddleware,
+    RequestSizeLimitMiddleware,
+    TenantMiddleware,
 )
+from ai_gateway.instrumentators.memory import MemoryProfiler
 from ai_gateway.internal_events import EventContext
+from ai_gateway.rate_limiting import RateLimiter, RateLimitRule
+from ai_gateway.scheduling import Tenant, current_tenant
 
 
 @pytest.fixture
@@ -345,3 +363,281 @@ async def test_middleware_feature_flag(
         assert set(context["enabled_feature_flags"].split(",")) == expected_flags
 
     feature_flag_middleware.app.assert_called_once_with(scope, receive, send)
+
+
+@pytest.mark.asyncio
+async def test_client_disconnect_middleware_cancels_request():
+    app_cancelled = asyncio.Event()
+
+    async def app(scope, receive, send):
+        await receive()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            app_cancelled.set()
+            raise
+
+    messages = [
+        {"type": "http.request", "body": b"{}", "more_body": False},
+        {"type": "http.disconnect"},
+    ]
+
+    async def receive():
+        return messages.pop(0)
+
+    send = AsyncMock()
+    middleware = ClientDisconnectMiddleware(app, skip_endpoints=["/health"])
+    scope = Request({"type": "http", "path": "/api/endpoint", "headers": []}).scope
+
+    with request_cycle_context({}):
+        await middleware(scope, receive, send)
+
+        assert context["cancelled"] is True
+
+    assert app_cancelled.is_set()
+    send.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_client_disconnect_middleware_completed_request():
+    async def app(scope, receive, send):
+        await receive()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def receive():
+        if not messages:
+            # The client keeps the connection open.
+            await asyncio.Event().wait()
+        return messages.pop(0)
+
+    messages = [{"type": "http.request", "body": b"{}", "more_body": False}]
+    send = AsyncMock()
+    middleware = ClientDisconnectMiddleware(app, skip_endpoints=["/health"])
+    scope = Request({"type": "http", "path": "/api/endpoint", "headers": []}).scope
+
+    with request_cycle_context({}):
+        await middleware(scope, receive, send)
+
+        assert "cancelled" not in context.data
+
+    assert send.await_count == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("path", "content_length", "expected_status"),
+    [
+        ("/api/endpoint", "10", None),
+        ("/api/endpoint", "11", 413),
+        ("/api/small", "6", 413),
+        ("/health", "11", None),
+        ("/api/endpoint", "invalid", None),
+    ],
+)
+async def test_request_size_limit_middleware_content_length(
+    mock_app, path, content_length, expected_status
+):
+    middleware = RequestSizeLimitMiddleware(
+        mock_app,
+        skip_endpoints=["/health"],
+        enabled=True,
+        max_body_bytes=10,
+        route_max_body_bytes={"/api/small": 5},
+    )
+    scope = Request(
+        {
+            "type": "http",
+            "path": path,
+            "headers": [(b"content-length", content_length.encode())],
+        }
+    ).scope
+    receive = AsyncMock()
+    send = AsyncMock()
+
+    await middleware(scope, receive, send)
+
+    if expected_status:
+        mock_app.assert_not_called()
+        assert send.call_args_list[0].args[0]["status"] == expected_status
+        receive.assert_not_called()
+    else:
+        mock_app.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_request_size_limit_middleware_streamed_body():
+    messages = [
+        {"type": "http.request", "body": b"12345", "more_body": True},
+        {"type": "http.request", "body": b"67890", "more_body": True},
+        {"type": "http.request", "body": b"1", "more_body": False},
+    ]
+    received = []
+
+    async def app(scope, receive, send):
+        while True:
+            message = await receive()
+            received.append(message["body"])
+            if not message["more_body"]:
+                break
+
+    async def receive():
+        return messages.pop(0)
+
+    middleware = RequestSizeLimitMiddleware(
+        app, skip_endpoints=[], enabled=True, max_body_bytes=10
+    )
+    scope = Request({"type": "http", "path": "/api/endpoint", "headers": []}).scope
+
+    with pytest.raises(HTTPException) as ex:
+        await middleware(scope, receive, AsyncMock())
+
+    assert ex.value.status_code == 413
+    assert received == [b"12345", b"67890"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("user", "expected_tenant"),
+    [
+        (
+            StarletteUser(
+                CloudConnectorUser(
+                    authenticated=True,
+                    claims=UserClaims(subject="subject-1", gitlab_instance_id="1"),
+                    global_user_id="user-1",
+                )
+            ),
+            Tenant(instance_id="1", global_user_id="user-1", client_id="subject-1"),
+        ),
+        (
+            StarletteUser(
+                CloudConnectorUser(authenticated=True, claims=UserClaims(subject=""))
+            ),
+            Tenant(client_id="127.0.0.1"),
+        ),
+        (
+            StarletteUser(CloudConnectorUser(authenticated=False)),
+            Tenant(client_id="127.0.0.1"),
+        ),
+        (None, Tenant(client_id="127.0.0.1")),
+    ],
+)
+async def test_tenant_middleware(user, expected_tenant):
+    tenants = []
+
+    async def app(scope, receive, send):
+        tenants.append(current_tenant.get())
+
+    middleware = TenantMiddleware(app)
+    # The ids in the headers aren't authenticated
+    scope = Request(
+        {
+            "type": "http",
+            "path": "/api/endpoint",
+            "headers": [
+                (b"x-gitlab-instance-id", b"instance-2"),
+                (b"x-gitlab-global-user-id", b"user-2"),
+            ],
+            "client": ("127.0.0.1", 1234),
+            "user": user,
+        }
+    ).scope
+
+    await middleware(scope, AsyncMock(), AsyncMock())
+
+    assert tenants == [expected_tenant]
+
+
+@pytest.fixture
+def rate_limited_app(mock_container):
+    fastapi_app = FastAPI()
+
+    @fastapi_app.post("/limited")
+    @feature_category(GitLabFeatureCategory.CODE_SUGGESTIONS)
+    async def limited():
+        pass
+
+    @fastapi_app.post("/unlimited")
+    async def unlimited():
+        pass
+
+    rate_limiter = RateLimiter(
+        user_limits={"default": RateLimitRule(rate_per_s=0.5, burst=1)}
+    )
+
+    with mock_container.rate_limiter.override(rate_limiter):
+        yield fastapi_app
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("path", "expected_calls"),
+    [
+        ("/limited", 1),
+        ("/unlimited", 2),
+    ],
+)
+async def test_rate_limit_middleware(rate_limited_app, path, expected_calls):
+    calls = []
+    sent = []
+
+    async def app(scope, receive, send):
+        calls.append(scope["path"])
+
+    async def send(message):
+        sent.append(message)
+
+    middleware = RateLimitMiddleware(app)
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": path,
+        "headers": [],
+        "app": rate_limited_app,
+    }
+    # The body isn't read by a limited request
+    receive = AsyncMock(side_effect=AssertionError("the body was read"))
+
+    with request_cycle_context({}):
+        current_tenant.set(Tenant(global_user_id="user-1"))
+
+        await middleware(scope, receive, send)
+        await middleware(scope, receive, send)
+
+        assert len(calls) == expected_calls
+        if expected_calls == 1:
+            assert context["rate_limited"] == "user"
+            assert sent[0]["status"] == 429
+            assert (b"retry-after", b"2") in sent[0]["headers"]
+
+
+@pytest.mark.asyncio
+async def test_memory_profiling_middleware(mock_container):
+    retained = []
+
+    async def app(scope, receive, send):
+        retained.append(bytearray(100_000))
+        scope["route"] = Mock(path="/v2/code/completions")
+
+    profiler = MemoryProfiler(enabled=True, route_sample_rate=1.0)
+    middleware = MemoryProfilingMiddleware(app, skip_endpoints=["/metrics"])
+
+    with mock_container.memory_profiler.override(profiler):
+        for path in ["/v2/code/completions", "/metrics"]:
+            # Nothing is sampled until the profiler traces the allocations
+            await middleware({"type": "http", "path": path}, AsyncMock(), AsyncMock())
+
+        profiler.take_snapshot()
+        try:
+            for path in ["/v2/code/completions", "/metrics"]:
+                await middleware(
+                    {"type": "http", "path": path}, AsyncMock(), AsyncMock()
+                )
+
+            allocations = profiler.routes["/v2/code/completions"]
+            assert list(profiler.routes) == ["/v2/code/completions"]
+            assert allocations.samples == 1
+            assert allocations.max_bytes >= 100_000
+        finally:
+            profiler.clear()
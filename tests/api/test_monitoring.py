@@ -1,5 +1,6 @@
+import time
 from typing import Iterator
-from unittest.mock import Mock, call
+from unittest.mock import AsyncMock
 
 import pytest
 from dependency_injector import containers
@@ -7,24 +8,20 @@ from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from ai_gateway.api import create_fast_api_server
-from ai_gateway.api.monitoring import validated
-from ai_gateway.config import Config, ConfigAuth, ConfigModelEndpoints, ConfigModelKeys
-from ai_gateway.models import ModelAPIError
+from ai_gateway.config import Config, ConfigAuth
+from ai_gateway.health import HealthChecker, ProviderProbe, ProviderStatus
+from ai_gateway.models import KindModelProvider
+
+PROVIDERS = [
+    KindModelProvider.VERTEX_AI,
+    KindModelProvider.ANTHROPIC,
+    KindModelProvider.FIREWORKS,
+]
 
 
 @pytest.fixture
 def mock_config():
-    cfg = Config(_env_file=None, auth=ConfigAuth())
-    # test using a valid looking fireworks config so we can stub out the actual
-    # call rather than the `from_model_name` classmethod
-    cfg.model_keys = ConfigModelKeys(fireworks_api_key="fw_api_key")
-    cfg.model_endpoints = ConfigModelEndpoints(
-        fireworks_current_region_endpoint={
-            "endpoint": "https://fireworks.endpoint.com/v1",
-            "identifier": "accounts/fireworks/models/qwen2p5-coder-7b#accounts/deployment/deadbeef",
-        }
-    )
-    yield cfg
+    yield Config(_env_file=None, auth=ConfigAuth())
 
 
 @pytest.fixture
@@ -39,122 +36,63 @@ def client(
     return TestClient(fastapi_server_app)
 
 
-# Avoid the global state of checks leaking between tests
-@pytest.fixture(autouse=True)
-def reset_validated():
-    validated.clear()
-    yield
+@pytest.fixture
+def mock_check():
+    return AsyncMock()
+
+
+@pytest.fixture
+def health_checker(mock_container: containers.Container, mock_check):
+    health_checker = HealthChecker(
+        [ProviderProbe(provider=provider, check=mock_check) for provider in PROVIDERS]
+    )
+
+    with mock_container.health.health_checker.override(health_checker):
+        yield health_checker
 
 
-def test_healthz(client: TestClient):
+def _status(healthy: bool, age_s: float = 0.0) -> ProviderStatus:
+    return ProviderStatus(healthy=healthy, checked_at=time.time() - age_s)
+
+
+def test_healthz(client: TestClient, health_checker):
     response = client.get("/monitoring/healthz")
     assert response.status_code == 200
 
 
-def test_ready(
-    client: TestClient,
-    mock_generations: Mock,
-    mock_completions_legacy: Mock,
-    mock_llm_text: Mock,
-):
+def test_ready(client: TestClient, health_checker, mock_check: AsyncMock):
+    health_checker.statuses = {provider: _status(True) for provider in PROVIDERS}
+
     response = client.get("/monitoring/ready")
     response = client.get("/monitoring/ready")
 
     assert response.status_code == 200
-    # assert we only called each model once
-    assert mock_completions_legacy.mock_calls == [
-        call.execute(
-            prefix="def hello_world():",
-            suffix="",
-            file_name="monitoring.py",
-            editor_lang="python",
-        )
-    ]
-    assert mock_generations.mock_calls == [
-        call.execute(
-            prefix="",
-            file_name="monitoring.py",
-            editor_lang="python",
-            model_provider="anthropic",
-        )
-    ]
-
-    assert mock_llm_text.mock_calls == [call("def hello_world():", None, False)]
-
-    # Assert the attributes of the mock code generations object
-    assert mock_generations.return_value.model.name == "claude-3-haiku-20240307"
-
-
-def model_failure(*args, **kwargs):
-    raise ModelAPIError("Vertex unreachable")
-
-
-def test_ready_vertex_failure(
-    client: TestClient,
-    mock_generations: Mock,
-    mock_completions_legacy: Mock,
-    mock_llm_text: Mock,
-):
-    mock_generations.side_effect = model_failure
-    mock_completions_legacy.side_effect = model_failure
+    # The endpoint only reads the status cached by the background probes
+    mock_check.assert_not_called()
+
 
+def test_ready_not_probed(client: TestClient, health_checker):
     response = client.get("/monitoring/ready")
 
-    assert mock_completions_legacy.mock_calls == [
-        call.execute(
-            prefix="def hello_world():",
-            suffix="",
-            file_name="monitoring.py",
-            editor_lang="python",
-        )
-    ]
-    # Don't try antrhopic if vertex is not available, no need to spend
-    # the money if the service is not going to be ready
-    assert not mock_generations.mock_calls
     assert response.status_code == 503
 
 
-def test_ready_anthropic_failure(
-    client: TestClient,
-    mock_generations: Mock,
-    mock_completions_legacy: Mock,
-    mock_llm_text: Mock,
-):
-    mock_generations.side_effect = model_failure
+@pytest.mark.parametrize("provider", PROVIDERS)
+def test_ready_provider_failure(client: TestClient, health_checker, provider):
+    health_checker.statuses = {provider: _status(True) for provider in PROVIDERS}
+    health_checker.statuses[provider] = _status(False)
 
     response = client.get("/monitoring/ready")
 
-    assert mock_completions_legacy.mock_calls == [
-        call.execute(
-            prefix="def hello_world():",
-            suffix="",
-            file_name="monitoring.py",
-            editor_lang="python",
-        )
-    ]
-
-    assert mock_generations.mock_calls == [
-        call.execute(
-            prefix="",
-            file_name="monitoring.py",
-            editor_lang="python",
-            model_provider="anthropic",
-        )
-    ]
-
-    # Assert the attributes of the mock code generations object
-    assert mock_generations.return_value.model.name == "claude-3-haiku-20240307"
-
     assert response.status_code == 503
 
 
-def test_ready_fireworks_failure(
-    client: TestClient,
-    mock_generations: Mock,
-    mock_completions_legacy: Mock,
-    mock_llm_text: Mock,
-):
-    mock_llm_text.side_effect = model_failure
+def test_ready_stale_status(client: TestClient, health_checker):
+    health_checker.statuses = {provider: _status(True) for provider in PROVIDERS}
+    health_checker.statuses[KindModelProvider.VERTEX_AI] = _status(
+        True, age_s=health_checker.max_status_age_s + 1
+    )
+
     response = client.get("/monitoring/ready")
 
     assert response.status_code == 503
@@ -0,0 +1,109 @@
+import pytest
+from fastapi.testclient import TestClient
+from gitlab_cloud_connector import CloudConnectorUser, UserClaims
+
+from ai_gateway.api.monitoring import MEMORY_DIAGNOSTICS_SCOPE, router
+from ai_gateway.instrumentators.memory import MemoryProfiler
+
+
+@pytest.fixture(scope="class")
+def fast_api_router():
+    return router
+
+
+@pytest.fixture
+def auth_user():
+    return CloudConnectorUser(
+        authenticated=True, claims=UserClaims(scopes=[MEMORY_DIAGNOSTICS_SCOPE])
+    )
+
+
+@pytest.fixture
+def profiler(mock_container):
+    profiler = MemoryProfiler(enabled=True)
+
+    with mock_container.memory_profiler.override(profiler):
+        yield profiler
+
+    profiler.clear()
+
+
+HEADERS = {"Authorization": "Bearer 12345", "X-Gitlab-Authentication-Type": "oidc"}
+
+
+class TestMemoryDiagnostics:
+    def test_memory(self, mock_client: TestClient, profiler):
+        response = mock_client.get("/monitoring/memory", headers=HEADERS)
+
+        assert response.status_code == 200
+        body = response.json()
+        assert not body["tracemalloc"]["tracing"]
+        assert "ai_gateway.code_suggestions.processing.typing.Prompt" in body["objects"]
+        assert body["metric_series"]
+
+    def test_snapshots(self, mock_client: TestClient, profiler):
+        response = mock_client.post(
+            "/monitoring/memory/snapshots", headers=HEADERS, params={"limit": 5}
+        )
+        assert response.status_code == 200
+        base = response.json()["id"]
+
+        response = mock_client.post("/monitoring/memory/snapshots", headers=HEADERS)
+        target = response.json()["id"]
+        assert len(response.json()["top"]) <= 20
+
+        response = mock_client.get(
+            "/monitoring/memory/diff",
+            headers=HEADERS,
+            params={"base": base, "target": target, "limit": 3},
+        )
+        assert response.status_code == 200
+        assert response.json()["base"] == base
+        assert len(response.json()["diff"]) <= 3
+
+        response = mock_client.get(
+            "/monitoring/memory/diff",
+            headers=HEADERS,
+            params={"base": base, "target": 100},
+        )
+        assert response.status_code == 404
+
+        response = mock_client.delete("/monitoring/memory/snapshots", headers=HEADERS)
+        assert response.status_code == 204
+        assert not profiler.tracing
+
+    def test_disabled(self, mock_client: TestClient):
+        response = mock_client.get("/monitoring/memory", headers=HEADERS)
+
+        assert response.status_code == 404
+
+    def test_unauthenticated(self, test_client: TestClient, profiler):
+        response = test_client.get("/monitoring/memory")
+
+        assert response.status_code == 401
+
+    @pytest.mark.parametrize(
+        "auth_user",
+        [
+            CloudConnectorUser(
+                authenticated=True, claims=UserClaims(scopes=["duo_chat"])
+            )
+        ],
+    )
+    def test_forbidden(self, mock_client: TestClient, profiler):
+        response = mock_client.get("/monitoring/memory", headers=HEADERS)
+
+        assert response.status_code == 403
+
+    @pytest.mark.parametrize(
+        "auth_user",
+        [
+            CloudConnectorUser(
+                authenticated=True, is_debug=True, claims=UserClaims(scopes=[])
+            )
+        ],
+    )
+    def test_debug_user(self, mock_client: TestClient, profiler):
+        response = mock_client.get("/monitoring/memory", headers=HEADERS)
+
+        assert response.status_code == 200
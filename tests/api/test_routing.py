@@ -0,0 +1,137 @@
+from typing import Annotated, Literal, Union
+from unittest.mock import patch
+
+import pytest
+from fastapi import APIRouter, Body, FastAPI, Request
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, Field
+
+from ai_gateway.api.routing import JSONValidationRoute
+
+
+class FileContent(BaseModel):
+    name: Annotated[str, Field(max_length=10)]
+    content: Annotated[str, Field(max_length=20)]
+
+
+class RequestV1(BaseModel):
+    prompt_version: Literal[1] = 1
+    files: Annotated[list[FileContent], Field(max_length=2)]
+
+
+class RequestV2(BaseModel):
+    prompt_version: Literal[2]
+    prompt: str
+
+
+RequestWithVersion = Annotated[
+    Union[RequestV1, RequestV2], Body(discriminator="prompt_version")
+]
+
+
+def _client(route_class) -> TestClient:
+    router = APIRouter(route_class=route_class)
+
+    @router.post("/suggestions")
+    async def suggestions(request: Request, payload: RequestWithVersion):
+        return {
+            "type": type(payload).__name__,
+            "payload": payload.model_dump(),
+            "body_size": len(await request.body()),
+        }
+
+    @router.post("/embedded")
+    async def embedded(name: Annotated[str, Body()], content: Annotated[str, Body()]):
+        return {"name": name, "content": content}
+
+    app = FastAPI()
+    app.include_router(router)
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def client():
+    return _client(JSONValidationRoute)
+
+
+@pytest.fixture
+def default_client():
+    return _client(APIRoute)
+
+
+@pytest.mark.parametrize(
+    ("path", "body", "headers"),
+    [
+        (
+            "/suggestions",
+            '{"prompt_version": 1, "files": [{"name": "a.py", "content": "import os"}]}',
+            {"content-type": "application/json"},
+        ),
+        (
+            "/suggestions",
+            '{"prompt_version": 2, "prompt": "hello"}',
+            {"content-type": "application/json"},
+        ),
+        ("/suggestions", '{"prompt_version": 2, "prompt": "hello"}', {}),
+        (
+            "/suggestions",
+            '{"prompt_version": 1, "files": [{"name": "a.py", "content": "'
+            + "x" * 30
+            + '"}]}',
+            {"content-type": "application/json"},
+        ),
+        (
+            "/suggestions",
+            '{"prompt_version": 1, "files": [{}, {}, {}]}',
+            {"content-type": "application/json"},
+        ),
+        (
+            "/suggestions",
+            '{"prompt_version": 3}',
+            {"content-type": "application/json"},
+        ),
+        (
+            "/suggestions",
+            '{"prompt_version": 1, "files": [',
+            {"content-type": "application/json"},
+        ),
+        ("/suggestions", "", {"content-type": "application/json"}),
+        (
+            "/embedded",
+            '{"name": "a.py", "content": "import os"}',
+            {"content-type": "application/json"},
+        ),
+        (
+            "/embedded",
+            '{"name": "a.py"}',
+            {"content-type": "application/json"},
+        ),
+    ],
+)
+def test_same_responses_as_default_route(client, default_client, path, body, headers):
+    response = client.post(path, content=body, headers=headers)
+    expected = default_client.post(path, content=body, headers=headers)
+
+    assert response.status_code == expected.status_code
+    assert response.json() == expected.json()
+
+
+def test_body_parsed_into_model(client):
+    with patch(
+        "pydantic.TypeAdapter.validate_python",
+        autospec=True,
+        side_effect=lambda adapter, value, **kwargs: value,
+    ) as mock_validate_python:
+        response = client.post(
+            "/suggestions",
+            json={"prompt_version": 2, "prompt": "hello"},
+        )
+
+    assert response.status_code == 200
+    assert response.json()["type"] == "RequestV2"
+
+    # FastAPI receives the model built from the body instead of the decoded JSON
+    _, value = mock_validate_python.call_args.args
+    assert value == RequestV2(prompt_version=2, prompt="hello")
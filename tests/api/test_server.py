@@ -3,7 +3,7 @@ import os
 import socket
 from typing import Iterator, cast
 from unittest import mock
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import litellm
 import pytest
@@ -26,7 +26,7 @@ from ai_gateway.config import (
     ConfigInternalEvent,
 )
 from ai_gateway.container import ContainerApplication
-from ai_gateway.models import ModelAPIError
+from ai_gateway.models import CircuitBreakerOpenError, ModelAPIError
 from ai_gateway.structured_logging import setup_logging
 
 _ROUTES_V1 = [
@@ -166,6 +166,8 @@ async def test_lifespan(config, app, unused_port, monkeypatch, vertex_project):
     monkeypatch.setattr("google.auth.default", mock_default)
 
     mock_container_app = MagicMock(spec=ContainerApplication)
+    mock_container_app.return_value.init_resources = AsyncMock()
+    mock_container_app.return_value.shutdown_resources = AsyncMock()
     monkeypatch.setattr(
         "ai_gateway.api.server.ContainerApplication", mock_container_app
     )
@@ -185,6 +187,24 @@ async def test_lifespan(config, app, unused_port, monkeypatch, vertex_project):
             asyncio.get_running_loop.assert_called_once()
 
         assert litellm.vertex_project == vertex_project
+        mock_container_app.return_value.init_resources.assert_awaited_once()
+
+    mock_container_app.return_value.shutdown_resources.assert_awaited_once()
+
+
+def test_setup_container(config, monkeypatch):
+    mock_container_app = MagicMock(spec=ContainerApplication)
+    monkeypatch.setattr(
+        "ai_gateway.api.server.ContainerApplication", mock_container_app
+    )
+
+    app = FastAPI(extra={"config": config})
+
+    container_application = server.setup_container(app)
+
+    # The container created before forking the workers is reused
+    assert server.setup_container(app) is container_application
+    mock_container_app.assert_called_once()
 
 
 def test_middleware_authentication(fastapi_server_app: FastAPI, auth_enabled: bool):
@@ -285,6 +305,7 @@ def test_setup_custom_exception_handlers(app, monkeypatch):
     assert mock_add_exception_handler.mock_calls == [
         mock.call(StarletteHTTPException, custom_http_exception_handler),
         mock.call(ModelAPIError, model_api_exception_handler),
+        mock.call(CircuitBreakerOpenError, model_api_exception_handler),
     ]
 
 
@@ -322,6 +343,20 @@ def test_model_exception_handler(app):
     assert response.json() == {"detail": "Inference failed"}
 
 
+def test_circuit_breaker_exception_handler(app):
+    @app.get("/test")
+    def test_route():
+        raise CircuitBreakerOpenError("anthropic", "claude-3-5-sonnet-20240620")
+
+    setup_custom_exception_handlers(app)
+
+    client = TestClient(app)
+    response = client.get("/test")
+
+    assert response.status_code == 503
+    assert response.json() == {"detail": "Inference failed"}
+
+
 @pytest.mark.parametrize(
     ("service_account_json_key", "should_create_cred_file"),
     [
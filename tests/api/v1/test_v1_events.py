@@ -144,7 +144,9 @@ def mock_boto3(mock_sts_client):
 
 @pytest.fixture
 def mock_q_boto3():
-    with patch("ai_gateway.integrations.amazon_q.client.q_boto3") as mock_q_boto3:
+    with patch(
+        "ai_gateway.integrations.amazon_q.client.q_developer_boto3.boto3"
+    ) as mock_q_boto3:
         yield mock_q_boto3
 
 
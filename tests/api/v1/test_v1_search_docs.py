@@ -166,14 +166,14 @@ async def test_custom_models_enabled_token_limiting(
     search_results = [
         {
             "id": "1",
-            "content": "a " * 4000,
+            "content": "a " * 8000,
             "metadata": {},
-        },  # 4000 words * 1.4 = 5600 tokens
+        },  # 8000 words * 0.72 = 5760 tokens
         {
             "id": "2",
-            "content": "a " * 2000,
+            "content": "a " * 4000,
             "metadata": {},
-        },  # 2000 words * 1.4 = 2800 tokens
+        },  # 4000 words * 0.72 = 2880 tokens
     ]
 
     with patch(
@@ -193,7 +193,7 @@ async def test_custom_models_enabled_token_limiting(
     expected_results = [
         {
             "id": "1",
-            "content": "a " * 4000,
+            "content": "a " * 8000,
             "metadata": {},
         }
     ]
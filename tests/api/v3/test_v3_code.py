@@ -6,6 +6,9 @@ from fastapi.testclient import TestClient
 from gitlab_cloud_connector import CloudConnectorUser, UserClaims
 
 from ai_gateway.api.v3 import api_router
+from ai_gateway.api.v3.code.completions import classify_code_suggestion
+from ai_gateway.api.v3.code.typing import CompletionRequest
+from ai_gateway.scheduling import WorkloadClass
 from ai_gateway.tracking import SnowplowEventContext
 
 __all__ = [
@@ -15,6 +18,7 @@ __all__ = [
     "TestUnauthorizedScopes",
     "TestIncomingRequest",
     "TestUnauthorizedIssuer",
+    "test_classify_code_suggestion",
 ]
 
 
@@ -1023,3 +1027,27 @@ class TestUnauthorizedIssuer:
 
         assert response.status_code == 403
         assert response.json() == {"detail": "Unauthorized to access code suggestions"}
+
+
+@pytest.mark.parametrize(
+    ("component_type", "expected_workload"),
+    [
+        ("code_editor_completion", WorkloadClass.INTERACTIVE),
+        ("code_editor_generation", WorkloadClass.STANDARD),
+    ],
+)
+def test_classify_code_suggestion(component_type, expected_workload):
+    payload = CompletionRequest(
+        prompt_components=[
+            {
+                "type": component_type,
+                "payload": {
+                    "file_name": "test",
+                    "content_above_cursor": "def hello_world():",
+                    "content_below_cursor": "",
+                },
+            }
+        ]
+    )
+
+    assert classify_code_suggestion(payload=payload) == expected_workload
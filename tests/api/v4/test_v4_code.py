@@ -7,7 +7,12 @@ from fastapi.testclient import TestClient
 from sse_starlette.sse import AppStatus
 
 from ai_gateway.api.v4 import api_router
-from ai_gateway.api.v4.code.typing import StreamEvent
+from ai_gateway.api.v4.code.typing import (
+    StreamDelta,
+    StreamEvent,
+    StreamSSEMessage,
+    StreamSuggestionChunk,
+)
 
 # Pytest runs these imported tests as part of this file.
 from tests.api.v3.test_v3_code import (  # pylint: disable=unused-import
@@ -209,3 +214,15 @@ def _assert_stream_sse_responses(
             content_message["data"]["choices"][0]["delta"]["content"]
             == expected_suggestions_output_text[index]
         )
+
+
+@pytest.mark.parametrize("content", ["def hello_", 'puts "héllo"\n', ""])
+def test_stream_content_chunk(content):
+    message = StreamSSEMessage(
+        event="content_chunk",
+        data=StreamSuggestionChunk(
+            choices=[StreamSuggestionChunk.Choice(delta=StreamDelta(content=content))]
+        ).model_dump(),
+    )
+
+    assert StreamSSEMessage.content_chunk(content) == message.dump_with_json_data()
@@ -43,7 +43,7 @@ async def test_authorize_with_unit_primitive_header_missing_header(
 
     assert exc_info.value.status_code == 400
     assert exc_info.value.detail == f"Missing {X_GITLAB_UNIT_PRIMITIVE} header"
-    assert not mock_background_tasks.add_task.called
+    assert not mock_abuse_detector.enqueue.called
 
 
 @pytest.mark.asyncio
@@ -61,7 +61,7 @@ async def test_authorize_with_unit_primitive_header_unknown(
 
     assert exc_info.value.status_code == 400
     assert exc_info.value.detail == "Unknown unit primitive header odd_feature"
-    assert not mock_background_tasks.add_task.called
+    assert not mock_abuse_detector.enqueue.called
 
 
 @pytest.mark.asyncio
@@ -83,7 +83,7 @@ async def test_authorize_with_unit_primitive_header_unauthorized(
         exc_info.value.detail
         == f"Unauthorized to access {GitLabUnitPrimitive.DUO_CHAT}"
     )
-    assert not mock_background_tasks.add_task.called
+    assert not mock_abuse_detector.enqueue.called
 
 
 @pytest.mark.asyncio
@@ -100,7 +100,7 @@ async def test_authorize_with_unit_primitive_header_authorized(
 
     result = await dummy_func(mock_request, mock_background_tasks, mock_abuse_detector)
     assert result == "Success"
-    assert mock_background_tasks.add_task.called
+    assert mock_abuse_detector.enqueue.called
 
 
 @pytest.mark.asyncio
@@ -117,4 +117,4 @@ async def test_authorize_with_unit_primitive_header_authorized_without_abuse_det
 
     result = await dummy_func(mock_request, mock_background_tasks, mock_abuse_detector)
     assert result == "Success"
-    assert not mock_background_tasks.add_task.called
+    assert not mock_abuse_detector.enqueue.called
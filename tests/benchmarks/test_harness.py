@@ -0,0 +1,103 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from benchmarks.harness import (
+    EndpointResult,
+    LoopLagMonitor,
+    compare_results,
+    load_corpus,
+    load_results,
+    percentile,
+    save_results,
+)
+
+_CORPUS = Path(__file__).parents[2] / "benchmarks" / "corpus" / "default.json"
+
+
+def _result(**kwargs) -> EndpointResult:
+    values = {
+        "name": "code_completions",
+        "requests": 100,
+        "errors": 0,
+        "rps": 50.0,
+        "latency_p50_ms": 200.0,
+        "latency_p95_ms": 500.0,
+        "latency_p99_ms": 900.0,
+        "cpu_ms_per_request": 4.0,
+        "loop_lag_p99_ms": 2.0,
+        "loop_lag_max_ms": 5.0,
+    }
+    values.update(kwargs)
+
+    return EndpointResult(**values)
+
+
+@pytest.mark.parametrize(
+    ("values", "q", "expected"),
+    [
+        ([], 50, 0.0),
+        ([3.0], 99, 3.0),
+        ([4.0, 1.0, 3.0, 2.0], 50, 2.0),
+        ([4.0, 1.0, 3.0, 2.0], 99, 4.0),
+        (list(range(1, 101)), 95, 95),
+    ],
+)
+def test_percentile(values, q, expected):
+    assert percentile(values, q) == expected
+
+
+@pytest.mark.parametrize(
+    ("current", "expected"),
+    [
+        (_result(), []),
+        (_result(latency_p99_ms=1000.0, cpu_ms_per_request=4.5), []),
+        (
+            _result(latency_p99_ms=1200.0),
+            ["code_completions: latency_p99_ms increased from 900.00 to 1200.00"],
+        ),
+        (
+            _result(rps=30.0, cpu_ms_per_request=6.0),
+            [
+                "code_completions: rps dropped from 50.0 to 30.0",
+                "code_completions: cpu_ms_per_request increased from 4.00 to 6.00",
+            ],
+        ),
+        (
+            _result(errors=2),
+            ["code_completions: errors increased from 0 to 2"],
+        ),
+        (_result(name="unknown", latency_p50_ms=1000.0), []),
+    ],
+)
+def test_compare_results(current, expected):
+    assert compare_results([current], [_result()], tolerance=0.2) == expected
+
+
+def test_save_and_load_results(tmp_path):
+    path = tmp_path / "baselines" / "local.json"
+    results = [_result(), _result(name="chat_v2_react_agent")]
+
+    save_results(path, results)
+
+    assert load_results(path) == results
+
+
+def test_load_default_corpus():
+    corpus = load_corpus(_CORPUS)
+    names = [request.name for request in corpus]
+
+    assert len(names) == len(set(names))
+    assert all(request.path.startswith("/v") for request in corpus)
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_monitor():
+    monitor = LoopLagMonitor(interval_s=0.001)
+
+    async with monitor.watch():
+        await asyncio.sleep(0.01)
+
+    assert monitor.lags
+    assert all(lag >= 0 for lag in monitor.lags)
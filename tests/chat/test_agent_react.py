@@ -10,6 +10,8 @@ from ai_gateway.chat.agents.react import (
     ReActAgent,
     ReActAgentInputs,
     ReActPlainTextParser,
+    ReActPromptTemplate,
+    _render_system_prompt,
 )
 from ai_gateway.chat.agents.typing import (
     AdditionalContext,
@@ -363,3 +365,32 @@ class TestReActAgent:
 
         assert actual_events == expected_events
         assert str(exc_info.value) == error_message
+
+
+class TestReActPromptTemplate:
+    def test_system_prompt_cache(self):
+        template = ReActPromptTemplate(
+            {
+                "system": "{% for tool in tools %}{{ tool.name }} {% endfor %}{{ unavailable_resources }}",
+                "user": "{{ message.content }}",
+                "assistant": "",
+            }
+        )
+        inputs = ReActAgentInputs(
+            messages=[Message(role=Role.USER, content="Hi")],
+            tools=[IssueReader(), MergeRequestReader()],
+            unavailable_resources=["Pipelines"],
+        )
+
+        _render_system_prompt.cache_clear()
+        first = template.invoke(inputs)
+        second = template.invoke(inputs.model_copy(update={"tools": [IssueReader()]}))
+        third = template.invoke(inputs)
+
+        assert (
+            first.messages[0].content
+            == "issue_reader merge_request_reader ['Pipelines']"
+        )
+        assert second.messages[0].content == "issue_reader ['Pipelines']"
+        assert third.messages[0].content == first.messages[0].content
+        assert _render_system_prompt.cache_info().hits == 1
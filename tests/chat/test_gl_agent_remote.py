@@ -1,4 +1,4 @@
-from unittest.mock import AsyncMock, Mock, call
+from unittest.mock import AsyncMock, Mock, call, patch
 
 import pytest
 from gitlab_cloud_connector import CloudConnectorUser, UserClaims
@@ -117,9 +117,14 @@ class TestGLAgentRemoteExecutor:
         )
 
         gl_version = "17.2.0"
-        executor.on_behalf(user, gl_version)
 
-        with request_cycle_context({}):
+        with (
+            patch(
+                "ai_gateway.chat.executor.AGENT_SETUP_DURATION_HISTOGRAM"
+            ) as mock_setup_duration,
+            request_cycle_context({}),
+        ):
+            executor.on_behalf(user, gl_version)
             actual_actions = [action async for action in executor.stream(inputs=inputs)]
 
             if user.is_debug:
@@ -137,6 +142,11 @@ class TestGLAgentRemoteExecutor:
         agent.astream.assert_called_once_with(inputs)
         assert actual_actions == agent_events
 
+        expected_stages = ["agent"] if user.is_debug else ["tools", "agent"]
+        assert [
+            c.kwargs["stage"] for c in mock_setup_duration.labels.call_args_list
+        ] == expected_stages
+
 
 class TestGLAgentRemoteExecutorToolAction:
     @pytest.mark.asyncio
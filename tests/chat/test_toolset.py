@@ -160,3 +160,34 @@ class TestDuoChatToolRegistry:
         actual_tools = {type(tool) for tool in tools}
 
         assert actual_tools == {GitlabDocumentation}
+
+    def test_get_on_behalf_cache(self):
+        def _user(unit_primitives: list[GitLabUnitPrimitive]) -> StarletteUser:
+            return StarletteUser(
+                CloudConnectorUser(
+                    authenticated=True,
+                    claims=UserClaims(scopes=[u.value for u in unit_primitives]),
+                )
+            )
+
+        registry = DuoChatToolsRegistry()
+        issue_tools = registry.get_on_behalf(
+            _user([GitLabUnitPrimitive.ASK_ISSUE]), "17.5.0"
+        )
+        other_issue_tools = DuoChatToolsRegistry().get_on_behalf(
+            _user([GitLabUnitPrimitive.ASK_ISSUE, GitLabUnitPrimitive.COMPLETE_CODE]),
+            "17.5.0",
+        )
+        epic_tools = registry.get_on_behalf(
+            _user([GitLabUnitPrimitive.ASK_EPIC]), "17.5.0"
+        )
+
+        # Users with access to the same tools share them
+        assert issue_tools == other_issue_tools
+        assert issue_tools[0] is other_issue_tools[0]
+        assert [type(tool) for tool in epic_tools] == [EpicReader]
+        assert registry.get_all()[2] is issue_tools[0]
+
+        # The lists can be modified by the callers without affecting the cache
+        issue_tools.clear()
+        assert registry.get_on_behalf(_user([GitLabUnitPrimitive.ASK_ISSUE]), "17.5.0")
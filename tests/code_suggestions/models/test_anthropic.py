@@ -36,6 +36,7 @@ from ai_gateway.models import (
     Message,
     Role,
 )
+from ai_gateway.models.base import TokensConsumptionMetadata
 from ai_gateway.models.base_text import TextGenModelOutput
 from ai_gateway.safety_attributes import SafetyAttributes
 
@@ -696,6 +697,82 @@ class TestAnthropicChatModel:
 
         model.client.messages.create.assert_called_with(**expected_opts_model)
         assert actual_output.text == expected_output.text
+        assert actual_output.metadata == TokensConsumptionMetadata(
+            input_tokens=21, output_tokens=81
+        )
+
+    @pytest.mark.asyncio
+    async def test_anthropic_model_generate_cache_prompt(self):
+        model = AnthropicChatModel(
+            model_name=KindAnthropicModel.CLAUDE_3_HAIKU.value,
+            client=Mock(spec=AsyncAnthropic),
+        )
+        model.client.messages.create = AsyncMock(
+            return_value=AMessage(
+                id="msg_01PE3CarfxWEG2taV9AygzH9",
+                content=[TextBlock(text="random_text", type="text")],
+                model=KindAnthropicModel.CLAUDE_3_HAIKU.value,
+                role="assistant",
+                stop_reason="end_turn",
+                stop_sequence=None,
+                type="message",
+                usage=Usage(
+                    input_tokens=21,
+                    output_tokens=81,
+                    cache_read_input_tokens=2048,
+                    cache_creation_input_tokens=0,
+                ),
+            )
+        )
+
+        with patch(
+            "ai_gateway.instrumentators.model_requests.ModelRequestInstrumentator.register_token_usage"
+        ) as mock_register_token_usage:
+            actual_output = await model.generate(
+                [
+                    Message(role=Role.SYSTEM, content="nice human"),
+                    Message(role=Role.USER, content="write code"),
+                    Message(role=Role.ASSISTANT, content="def hello_world():"),
+                    Message(role=Role.USER, content="add a docstring"),
+                ],
+                cache_prompt=True,
+            )
+
+        cache_control = {"type": "ephemeral"}
+        model.client.messages.create.assert_called_with(
+            **AnthropicChatModel.OPTS_MODEL,
+            model=KindAnthropicModel.CLAUDE_3_HAIKU.value,
+            stream=False,
+            system=[
+                {"type": "text", "text": "nice human", "cache_control": cache_control}
+            ],
+            messages=[
+                {"role": Role.USER, "content": "write code"},
+                {"role": Role.ASSISTANT, "content": "def hello_world():"},
+                {
+                    "role": Role.USER,
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": "add a docstring",
+                            "cache_control": cache_control,
+                        }
+                    ],
+                },
+            ],
+        )
+        assert actual_output.metadata == TokensConsumptionMetadata(
+            input_tokens=21,
+            output_tokens=81,
+            cache_read_input_tokens=2048,
+            cache_creation_input_tokens=0,
+        )
+        mock_register_token_usage.assert_called_once_with(
+            input_tokens=21,
+            output_tokens=81,
+            cache_read_input_tokens=2048,
+            cache_creation_input_tokens=0,
+        )
 
     @pytest.mark.asyncio
     async def test_anthropic_model_generate_instrumented(self):
@@ -703,7 +780,18 @@ class TestAnthropicChatModel:
             model_name=KindAnthropicModel.CLAUDE_3_HAIKU.value,
             client=Mock(spec=AsyncAnthropic),
         )
-        model.client.messages.create = AsyncMock()
+        model.client.messages.create = AsyncMock(
+            return_value=AMessage(
+                id="msg_01PE3CarfxWEG2taV9AygzH9",
+                content=[TextBlock(text="random_text", type="text")],
+                model=KindAnthropicModel.CLAUDE_3_HAIKU.value,
+                role="assistant",
+                stop_reason="end_turn",
+                stop_sequence=None,
+                type="message",
+                usage=Usage(input_tokens=21, output_tokens=81),
+            )
+        )
 
         with patch(
             "ai_gateway.instrumentators.model_requests.ModelRequestInstrumentator.watch"
@@ -872,9 +960,18 @@ class TestAnthropicChatModel:
         }
 
         chunks = []
-        async for content in actual_output:
-            chunks += content
+        with patch(
+            "ai_gateway.instrumentators.model_requests.ModelRequestInstrumentator.register_token_usage"
+        ) as mock_register_token_usage:
+            async for content in actual_output:
+                chunks += content
 
         assert chunks == expected_chunks
+        mock_register_token_usage.assert_called_once_with(
+            input_tokens=21,
+            output_tokens=57,
+            cache_read_input_tokens=None,
+            cache_creation_input_tokens=None,
+        )
 
         model.client.messages.create.assert_called_with(**expected_opts_model)
@@ -3,7 +3,11 @@ from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 from google.api_core.exceptions import InvalidArgument, RetryError
-from google.cloud.aiplatform.gapic import PredictionServiceAsyncClient, PredictResponse
+from google.cloud.aiplatform.gapic import (
+    PredictionServiceAsyncClient,
+    PredictRequest,
+    PredictResponse,
+)
 from google.protobuf import json_format
 
 from ai_gateway.models.base_text import TextGenModelOutput
@@ -271,8 +275,8 @@ async def test_palm_model_stop_sequences(
 
     client.predict.assert_called_once()
 
-    parameters = client.predict.call_args[1]["parameters"]
-    params_dict = json_format.MessageToDict(parameters)
+    request = client.predict.call_args[1]["request"]
+    params_dict = json_format.MessageToDict(PredictRequest.pb(request).parameters)
     assert params_dict.get("stopSequences", None) == expected_stop_sequences
 
 
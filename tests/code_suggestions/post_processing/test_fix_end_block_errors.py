@@ -5,6 +5,7 @@ from ai_gateway.code_suggestions.processing.post.ops import (
     fix_end_block_errors,
     fix_end_block_errors_with_comparison,
 )
+from ai_gateway.code_suggestions.prompts.parsers import ParserExecutor
 
 PYTHON_SAMPLE_1 = (
     # prefix
@@ -135,11 +136,14 @@ RUBY_SAMPLE_3 = (
 )
 @pytest.mark.asyncio
 async def test_fix_end_block_errors(
-    code_sample: tuple, lang_id: LanguageId, expected_completion: str
+    code_sample: tuple,
+    lang_id: LanguageId,
+    expected_completion: str,
+    parser_executor: ParserExecutor,
 ):
     prefix, completion, suffix = code_sample
     actual_completion = await fix_end_block_errors(
-        prefix, completion, suffix, lang_id=lang_id
+        prefix, completion, suffix, lang_id=lang_id, parser_executor=parser_executor
     )
 
     assert actual_completion == expected_completion
@@ -175,11 +179,14 @@ async def test_fix_end_block_errors(
 )
 @pytest.mark.asyncio
 async def test_fix_end_block_errors_with_comparison(
-    code_sample: tuple, lang_id: LanguageId, expected_completion: str
+    code_sample: tuple,
+    lang_id: LanguageId,
+    expected_completion: str,
+    parser_executor: ParserExecutor,
 ):
     prefix, completion, suffix = code_sample
     actual_completion = await fix_end_block_errors_with_comparison(
-        prefix, completion, suffix, lang_id=lang_id
+        prefix, completion, suffix, lang_id=lang_id, parser_executor=parser_executor
     )
 
     assert actual_completion == expected_completion
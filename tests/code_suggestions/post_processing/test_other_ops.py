@@ -5,6 +5,7 @@ from ai_gateway.code_suggestions.processing.post.ops import (
     remove_comment_only_completion,
 )
 from ai_gateway.code_suggestions.processing.typing import LanguageId
+from ai_gateway.code_suggestions.prompts.parsers import ParserExecutor
 
 
 @pytest.mark.parametrize(
@@ -70,8 +71,10 @@ def test_prepend_new_line(code_context: str, completion: str, expected_value: st
 )
 @pytest.mark.asyncio
 async def test_remove_comment_only_completion(
-    completion: str, lang_id: LanguageId, expected: str
+    completion: str, lang_id: LanguageId, expected: str, parser_executor: ParserExecutor
 ):
-    actual = await remove_comment_only_completion(completion, lang_id)
+    actual = await remove_comment_only_completion(
+        completion, lang_id, parser_executor=parser_executor
+    )
 
     assert actual == expected
@@ -9,6 +9,7 @@ from ai_gateway.code_suggestions.processing.post.completions import (
 from ai_gateway.code_suggestions.processing.post.completions import (
     PostProcessorOperation,
 )
+from ai_gateway.code_suggestions.prompts.parsers import ParserExecutor
 
 
 @pytest.fixture
@@ -91,13 +92,16 @@ class TestPostProcessorCompletions:
         mock_fix_end_block_errors_with_comparison: Mock,
         mock_clean_model_reflection: Mock,
         mock_strip_whitespaces: Mock,
+        parser_executor: ParserExecutor,
     ):
         code_context = "test code context"
         lang_id = LanguageId.RUBY
         suffix = "suffix"
         completion = "test completion"
 
-        post_processor = PostProcessorCompletions(code_context, lang_id, suffix)
+        post_processor = PostProcessorCompletions(
+            code_context, lang_id, suffix, parser_executor=parser_executor
+        )
         await post_processor.process(completion)
 
         mock_remove_comment_only_completion.assert_called_once()
@@ -118,6 +122,7 @@ class TestPostProcessorCompletions:
         mock_clean_model_reflection: Mock,
         mock_strip_whitespaces: Mock,
         mock_strip_asterisks: Mock,
+        parser_executor: ParserExecutor,
     ):
         code_context = "test code context"
         lang_id = LanguageId.RUBY
@@ -134,6 +139,7 @@ class TestPostProcessorCompletions:
             extras=[
                 PostProcessorOperation.STRIP_ASTERISKS,
             ],
+            parser_executor=parser_executor,
         )
         await post_processor.process(completion)
 
@@ -156,6 +162,7 @@ class TestPostProcessorCompletions:
         mock_fix_end_block_errors_with_comparison: Mock,
         mock_clean_model_reflection: Mock,
         mock_strip_whitespaces: Mock,
+        parser_executor: ParserExecutor,
     ):
         code_context = "test code context"
         lang_id = LanguageId.RUBY
@@ -163,7 +170,11 @@ class TestPostProcessorCompletions:
         completion = "test completion"
 
         post_processor = PostProcessorCompletions(
-            code_context, lang_id, suffix, exclude=["strip_whitespaces"]
+            code_context,
+            lang_id,
+            suffix,
+            exclude=["strip_whitespaces"],
+            parser_executor=parser_executor,
         )
         await post_processor.process(completion)
 
@@ -2,6 +2,7 @@ import pytest
 
 from ai_gateway.code_suggestions.processing.ops import LanguageId, find_cursor_position
 from ai_gateway.code_suggestions.processing.post.ops import trim_by_min_allowed_context
+from ai_gateway.code_suggestions.prompts.parsers import ParserExecutor
 
 PYTHON_SAMPLE_1 = """
 class LineBasedCodeSnippets(BaseCodeSnippetsIterator):
@@ -98,7 +99,11 @@ const reverseString = (inpStr) => {
 )
 @pytest.mark.asyncio
 async def test_trim_by_min_allowed_context(
-    code_sample: str, point: tuple[int, int], lang_id: LanguageId, expected_range: list
+    code_sample: str,
+    point: tuple[int, int],
+    lang_id: LanguageId,
+    expected_range: list,
+    parser_executor: ParserExecutor,
 ):
     code_sample = code_sample.strip("\n")
     pos = find_cursor_position(code_sample, point)
@@ -109,7 +114,9 @@ async def test_trim_by_min_allowed_context(
     expected_start = find_cursor_position(code_sample, expected_range[0])
     expected_end = find_cursor_position(code_sample, expected_range[1])
 
-    actual_string = await trim_by_min_allowed_context(prefix, completion, lang_id)
+    actual_string = await trim_by_min_allowed_context(
+        prefix, completion, lang_id, parser_executor=parser_executor
+    )
     expected_string = code_sample[expected_start:expected_end]
 
     assert actual_string == expected_string
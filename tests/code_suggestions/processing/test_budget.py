@@ -0,0 +1,136 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from starlette_context import context, request_cycle_context
+
+from ai_gateway.code_suggestions.processing import (
+    BudgetModel,
+    PressureSignal,
+    PromptBudget,
+)
+
+MODEL = BudgetModel("vertex-ai", "code-gecko@002")
+
+
+@pytest.fixture
+def budget_params():
+    return {}
+
+
+@pytest.fixture
+def prompt_budget(budget_params):
+    return PromptBudget(enabled=True, smoothing=1.0, **budget_params)
+
+
+def test_observe_disabled():
+    prompt_budget = PromptBudget(enabled=False)
+
+    prompt_budget.observe_latency(MODEL, 10.0)
+
+    assert prompt_budget.adjust() == 1.0
+    assert prompt_budget.model_ratio(MODEL) == 1.0
+
+
+def test_observe_smoothing():
+    prompt_budget = PromptBudget(enabled=True, smoothing=0.5)
+
+    prompt_budget.observe_latency(MODEL, 4.0)
+    prompt_budget.observe_latency(MODEL, 4.0)
+
+    assert prompt_budget.model_latencies[MODEL] == 3.0
+
+
+@pytest.mark.parametrize(
+    ("budget_params", "latencies", "expected_ratios"),
+    [
+        (
+            {"decrease_factor": 0.5, "increase_step": 0.25, "min_ratio": 0.2},
+            [3.0, 3.0, 3.0, 0.5, 0.5, 0.5, 0.5],
+            [0.5, 0.25, 0.2, 0.45, 0.7, 0.95, 1.0],
+        ),
+    ],
+)
+def test_adjust(prompt_budget, latencies, expected_ratios):
+    ratios = []
+
+    with patch(
+        "ai_gateway.code_suggestions.processing.budget.PROMPT_BUDGET_MODEL_RATIO_GAUGE"
+    ) as mock_gauge:
+        for latency in latencies:
+            prompt_budget.observe_latency(MODEL, latency)
+            prompt_budget.adjust()
+            ratios.append(round(prompt_budget.model_ratio(MODEL), 2))
+
+    assert ratios == expected_ratios
+    mock_gauge.labels.assert_called_with(
+        model_engine="vertex-ai", model_name="code-gecko@002"
+    )
+    assert mock_gauge.labels.return_value.set.call_count == len(expected_ratios)
+
+
+def test_adjust_slow_model(prompt_budget):
+    other_model = BudgetModel("anthropic", "claude-3-haiku")
+
+    prompt_budget.observe_latency(MODEL, 10.0)
+    prompt_budget.observe_latency(other_model, 0.5)
+
+    # Only the prompts of the slow model are shrunk
+    assert prompt_budget.adjust() == 1.0
+    assert prompt_budget.model_ratio(MODEL) == pytest.approx(0.7)
+    assert prompt_budget.model_ratio(other_model) == 1.0
+
+
+def test_adjust_gateway_pressure(prompt_budget):
+    prompt_budget.model_ratios[MODEL] = 0.5
+    prompt_budget.observe(PressureSignal.LOOP_LAG, 1.0)
+
+    # The gateway pressure shrinks the prompts of all the models
+    assert prompt_budget.adjust() == pytest.approx(0.7)
+    assert prompt_budget.model_ratio(MODEL) == 0.5
+    assert prompt_budget.model_ratio(BudgetModel("anthropic", "claude")) == (
+        pytest.approx(0.7)
+    )
+
+
+def test_adjust_signals_fade_away(prompt_budget):
+    prompt_budget.smoothing = 0.5
+    prompt_budget.observe(PressureSignal.QUEUE_WAIT, 0.16)
+
+    assert prompt_budget.adjust() == pytest.approx(0.7)
+
+    # No parses since the last adjustment, the queue wait is halved
+    assert prompt_budget.adjust() == pytest.approx(0.75)
+    assert prompt_budget.signals[PressureSignal.QUEUE_WAIT] == 0.04
+
+
+def test_max_tokens(prompt_budget):
+    prompt_budget.model_ratios[MODEL] = 0.4
+
+    with request_cycle_context({}):
+        assert prompt_budget.max_tokens(MODEL, 2_048) == 819
+
+        assert context["prompt_budget_ratio"] == 0.4
+        assert context["prompt_budget_tokens"] == 819
+
+    assert not prompt_budget.include_code_context(MODEL)
+
+
+def test_max_tokens_outside_request(prompt_budget):
+    assert prompt_budget.max_tokens(MODEL, 2_048) == 2_048
+    assert prompt_budget.include_code_context(MODEL)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("budget_params", [{"interval_s": 0.01}])
+async def test_start_stop(prompt_budget):
+    with patch.object(prompt_budget, "adjust") as mock_adjust:
+        prompt_budget.start()
+
+        while mock_adjust.call_count < 2:
+            await asyncio.sleep(0.01)
+
+        await prompt_budget.stop()
+
+    assert prompt_budget._task is None
+    assert PressureSignal.LOOP_LAG in prompt_budget._observed
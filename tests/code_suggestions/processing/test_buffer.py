@@ -0,0 +1,93 @@
+import pytest
+
+from ai_gateway.code_suggestions.processing import ops
+from ai_gateway.code_suggestions.processing.buffer import TextBuffer
+
+CODE_SAMPLE = 'def héllo():\n    return "wörld"\n'
+
+
+class TestTextBuffer:
+    @pytest.mark.parametrize(
+        ("text", "expected_line_starts"),
+        [
+            ("", [0]),
+            ("one line", [0]),
+            ("one line\n", [0, 9]),
+            ("first\nsecond\nthird", [0, 6, 13]),
+        ],
+    )
+    def test_line_starts(self, text: str, expected_line_starts: list[int]):
+        assert TextBuffer(text).line_starts == expected_line_starts
+
+    @pytest.mark.parametrize(
+        ("point", "expected_offset"),
+        [
+            ((0, 0), 0),
+            ((0, 12), 12),
+            ((1, 4), 17),
+            ((2, 0), 32),
+            ((0, 13), -1),
+            ((3, 0), -1),
+            ((-1, 0), -1),
+        ],
+    )
+    def test_point_to_offset(self, point: tuple[int, int], expected_offset: int):
+        buffer = TextBuffer(CODE_SAMPLE)
+
+        assert buffer.point_to_offset(point) == expected_offset
+
+        if expected_offset != -1:
+            assert buffer.offset_to_point(expected_offset) == point
+
+    @pytest.mark.parametrize("offset", range(len(CODE_SAMPLE) + 1))
+    def test_byte_conversions(self, offset: int):
+        buffer = TextBuffer(CODE_SAMPLE)
+        byte = len(CODE_SAMPLE[:offset].encode("utf-8"))
+
+        assert buffer.offset_to_byte(offset) == byte
+        assert buffer.byte_to_offset(byte) == offset
+
+        byte_point = buffer.offset_to_byte_point(offset)
+        assert buffer.byte_point_to_offset(byte_point) == offset
+
+    def test_byte_point(self):
+        buffer = TextBuffer(CODE_SAMPLE)
+
+        # "é" and "ö" are encoded as 2 bytes
+        assert buffer.offset_to_byte_point(12) == (0, 13)
+        assert buffer.offset_to_byte_point(30) == (1, 18)
+        assert buffer.byte_point_to_offset((0, 14)) == -1
+        assert buffer.byte_point_to_offset((1, 18)) == 30
+
+    def test_ascii(self):
+        buffer = TextBuffer("first\nsecond")
+
+        assert buffer.byte_line_starts is buffer.line_starts
+        assert buffer.offset_to_byte(8) == 8
+        assert buffer.byte_to_offset(8) == 8
+
+
+@pytest.mark.parametrize(
+    ("value", "point", "expected_position"),
+    [
+        ("first\nsecond\n", (1, 6), 12),
+        ("first\nsecond\n", (2, 0), -1),
+        ("first\r\nsecond", (1, 6), 12),
+        ("first\u2028second", (1, 6), 12),
+    ],
+)
+def test_find_cursor_position_with_buffer(
+    value: str, point: tuple[int, int], expected_position: int
+):
+    assert ops.find_cursor_position(value, point) == expected_position
+    assert ops.find_cursor_position(TextBuffer(value), point) == expected_position
+
+
+def test_find_non_whitespace_point_with_buffer():
+    buffer = TextBuffer(CODE_SAMPLE)
+
+    assert ops.find_non_whitespace_point(buffer, start_index=13) == (1, 4)
+    assert ops.split_on_point(buffer, (1, 4)) == (
+        "def héllo():\n    ",
+        'return "wörld"\n',
+    )
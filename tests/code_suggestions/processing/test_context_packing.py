@@ -0,0 +1,143 @@
+import pytest
+
+from ai_gateway.code_suggestions.processing import (
+    CodeContent,
+    TokenStrategyBase,
+    pack_code_context,
+)
+
+
+class _WordTokenStrategy(TokenStrategyBase):
+    """Counts every word as a token."""
+
+    def __init__(self):
+        self.estimated: list[list[str]] = []
+
+    def truncate_content(
+        self, text: str, max_length: int, truncation_side: str = "left"
+    ) -> CodeContent:
+        words = text.split()
+        words = (
+            words[:max_length] if truncation_side == "right" else words[-max_length:]
+        )
+
+        return CodeContent(text=" ".join(words), length_tokens=len(words))
+
+    def estimate_length(self, text: str | list[str]) -> list[int]:
+        texts = [text] if isinstance(text, str) else text
+        self.estimated.append(texts)
+
+        return [len(value.split()) for value in texts]
+
+
+@pytest.fixture
+def tkn_strategy():
+    return _WordTokenStrategy()
+
+
+def test_pack_all_snippets(tkn_strategy):
+    packed = pack_code_context(["a b", "c d e"], tkn_strategy, 10)
+
+    assert packed.content == CodeContent(text="a b\nc d e", length_tokens=5)
+    assert packed.length == 9
+    assert packed.length_tokens == 5
+
+
+def test_pack_duplicates(tkn_strategy):
+    packed = pack_code_context(
+        ["def foo(): pass", "def  foo():\n  pass", "x y", "def foo(): pass"],
+        tkn_strategy,
+        10,
+    )
+
+    # Each unique snippet is tokenized once
+    assert tkn_strategy.estimated == [["def foo(): pass", "x y"]]
+    assert packed.content.text == "def foo(): pass\nx y"
+    assert packed.length_tokens == 11
+
+
+@pytest.mark.parametrize(
+    ("prefix", "expected_text"),
+    [
+        # Without identifiers to match, the earliest snippets are preferred
+        ("", "class Unrelated: pass"),
+        ("order = build_order(", "def build_order(items): pass"),
+    ],
+)
+def test_pack_relevance(tkn_strategy, prefix: str, expected_text: str):
+    packed = pack_code_context(
+        ["class Unrelated: pass", "def build_order(items): pass"],
+        tkn_strategy,
+        4,
+        prefix=prefix,
+    )
+
+    assert packed.content.text == expected_text
+
+
+def test_pack_keeps_order(tkn_strategy):
+    packed = pack_code_context(
+        ["first", "def build_order(items): pass", "last"],
+        tkn_strategy,
+        10,
+        prefix="build_order(",
+    )
+
+    assert [snippet.position for snippet in packed.snippets] == [0, 1, 2]
+    assert packed.snippets[1].score > packed.snippets[0].score
+
+
+def test_pack_fills_with_truncated_snippet(tkn_strategy):
+    packed = pack_code_context(
+        ["one two three four five six seven", "eight", "nine ten"], tkn_strategy, 6
+    )
+
+    # The separators take one token each
+    assert packed.content == CodeContent(text="one\neight\nnine ten", length_tokens=4)
+
+
+@pytest.mark.parametrize(
+    ("code_context", "expected_text"),
+    [
+        # The small snippets score less each but more per token, and more together
+        (
+            [
+                "alpha beta gamma one two three four five six seven",
+                "delta beta",
+                "delta gamma",
+                "alpha delta",
+            ],
+            "alpha\ndelta beta\ndelta gamma\nalpha delta",
+        ),
+        # The large snippet scores more alone than the denser small snippet
+        (
+            [
+                "alpha beta gamma delta one two three four five six",
+                "alpha other",
+            ],
+            "alpha beta gamma delta one two three four five six",
+        ),
+    ],
+)
+def test_pack_by_density(tkn_strategy, code_context: list[str], expected_text: str):
+    packed = pack_code_context(
+        code_context, tkn_strategy, 10, prefix="alpha + beta + gamma + delta"
+    )
+
+    assert packed.content.text == expected_text
+
+
+@pytest.mark.parametrize("max_length", [0, -5])
+def test_pack_no_room(tkn_strategy, max_length: int):
+    packed = pack_code_context(["a b"], tkn_strategy, max_length)
+
+    assert packed.content == CodeContent(text="", length_tokens=0)
+    assert not packed.snippets
+    assert packed.length_tokens == 2
+
+
+def test_pack_empty(tkn_strategy):
+    packed = pack_code_context([], tkn_strategy, 10)
+
+    assert packed.content == CodeContent(text="", length_tokens=0)
+    assert tkn_strategy.estimated == []
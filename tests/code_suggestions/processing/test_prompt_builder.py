@@ -3,6 +3,7 @@ import pytest
 from ai_gateway.code_suggestions.processing import CodeContent
 from ai_gateway.code_suggestions.processing.completions import (
     MetadataPromptBuilder,
+    _CodeInfo,
     _PromptBuilder,
 )
 from ai_gateway.code_suggestions.processing.ops import LanguageId
@@ -58,3 +59,34 @@ def test_completions_prompt_builder(
     assert prompt.prefix == expected_prefix
     assert prompt.suffix == expected_suffix
     assert isinstance(prompt.metadata, MetadataPromptBuilder)
+
+
+def test_completions_prompt_builder_extra_info():
+    prompt_builder = _PromptBuilder(
+        CodeContent("import os\nos.path", length_tokens=4),
+        CodeContent("", length_tokens=0),
+        "test.py",
+        lang_id=None,
+    )
+
+    prompt_builder.add_extra_info(
+        _CodeInfo(
+            content=[
+                CodeContent("import os", length_tokens=2),
+                CodeContent("import sys", length_tokens=2),
+                CodeContent("import re", length_tokens=2),
+                CodeContent("import sys", length_tokens=2),
+                CodeContent("import json", length_tokens=2),
+            ]
+        ),
+        4,
+        extra_info_name="imports",
+    )
+
+    prompt = prompt_builder.build()
+
+    assert prompt.prefix == (
+        "This code has a filename of test.py\nimport re\nimport sys\nimport os\nos.path"
+    )
+    assert prompt.metadata.imports.post.length_tokens == 4
+    assert prompt.metadata.imports.post.length == 30
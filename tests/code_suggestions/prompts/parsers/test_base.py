@@ -1,19 +1,25 @@
 import pytest
 
 from ai_gateway.code_suggestions.processing.base import LanguageId
-from ai_gateway.code_suggestions.prompts.parsers import CodeParser
+from ai_gateway.code_suggestions.prompts.parsers import CodeParser, ParserExecutor
 
 
 @pytest.mark.parametrize("lang_id", [None])
 @pytest.mark.asyncio
-async def test_unsupported_languages(lang_id: LanguageId):
+async def test_unsupported_languages(
+    lang_id: LanguageId, parser_executor: ParserExecutor
+):
     with pytest.raises(ValueError):
-        await CodeParser.from_language_id("import Foundation", lang_id)
+        await CodeParser.from_language_id(
+            "import Foundation", lang_id, parser_executor=parser_executor
+        )
 
 
 @pytest.mark.asyncio
-async def test_non_utf8():
+async def test_non_utf8(parser_executor: ParserExecutor):
     value = b"\xc3\x28"  # Invalid UTF-8 byte sequence
 
     with pytest.raises(ValueError):
-        await CodeParser.from_language_id(value, LanguageId.JS)
+        await CodeParser.from_language_id(
+            value, LanguageId.JS, parser_executor=parser_executor
+        )
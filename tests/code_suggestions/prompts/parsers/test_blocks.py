@@ -5,6 +5,7 @@ from ai_gateway.code_suggestions.prompts.parsers import (
     CodeParser,
     ErrorBlocksVisitor,
     MinAllowedBlockVisitor,
+    ParserExecutor,
     Point,
 )
 from ai_gateway.code_suggestions.prompts.parsers.treetraversal import tree_dfs
@@ -142,12 +143,14 @@ async def test_min_allowed_block_visitor(
     source_code: str,
     target_point: Point,
     expected_context_type: str,
+    parser_executor: ParserExecutor,
 ):
     source_code = source_code.strip("\n")
 
     parser = await CodeParser.from_language_id(
         source_code,
         lang_id,
+        parser_executor=parser_executor,
     )
     visitor = MinAllowedBlockVisitor(target_point)
     tree_dfs(parser.tree, visitor)
@@ -185,12 +188,14 @@ async def test_error_blocks_visitor(
     lang_id: LanguageId,
     source_code: str,
     expected_points: list,
+    parser_executor: ParserExecutor,
 ):
     source_code = source_code.strip("\n")
 
     parser = await CodeParser.from_language_id(
         source_code,
         lang_id,
+        parser_executor=parser_executor,
     )
     visitor = ErrorBlocksVisitor()
     tree_dfs(parser.tree, visitor)
@@ -1,7 +1,7 @@
 import pytest
 
 from ai_gateway.code_suggestions.processing.base import LanguageId
-from ai_gateway.code_suggestions.prompts.parsers import CodeParser
+from ai_gateway.code_suggestions.prompts.parsers import CodeParser, ParserExecutor
 
 EMPTY_SOURCE_FILE = ""
 
@@ -230,8 +230,15 @@ echo "Hello World!";
     ],
 )
 @pytest.mark.asyncio
-async def test_comments_only(lang_id: LanguageId, source_code: str, expected: bool):
-    parser = await CodeParser.from_language_id(source_code, lang_id)
+async def test_comments_only(
+    lang_id: LanguageId,
+    source_code: str,
+    expected: bool,
+    parser_executor: ParserExecutor,
+):
+    parser = await CodeParser.from_language_id(
+        source_code, lang_id, parser_executor=parser_executor
+    )
     output = parser.comments_only()
 
     assert output == expected
@@ -5,7 +5,7 @@ from ai_gateway.code_suggestions.processing.ops import (
     find_cursor_position,
     split_on_point,
 )
-from ai_gateway.code_suggestions.prompts.parsers import CodeParser
+from ai_gateway.code_suggestions.prompts.parsers import CodeParser, ParserExecutor
 from ai_gateway.code_suggestions.prompts.parsers.context_extractors import (
     BaseContextVisitor,
 )
@@ -117,8 +117,11 @@ async def test_base_context_visitor(
     target_point: tuple[int, int],
     expected_context: str,
     priority_list: list[str],
+    parser_executor: ParserExecutor,
 ):
-    parser = await CodeParser.from_language_id(source_code, lang_id)
+    parser = await CodeParser.from_language_id(
+        source_code, lang_id, parser_executor=parser_executor
+    )
     visitor = BaseContextVisitor(target_point)
     tree_dfs(parser.tree, visitor)
 
@@ -646,8 +649,11 @@ async def test_suffix_near_cursor(
     target_point: tuple[int, int],
     expected_prefix: str,
     expected_suffix: str,
+    parser_executor: ParserExecutor,
 ):
-    parser = await CodeParser.from_language_id(source_code, lang_id)
+    parser = await CodeParser.from_language_id(
+        source_code, lang_id, parser_executor=parser_executor
+    )
     actual_prefix, _ = split_on_point(source_code, target_point)
 
     print(f"{target_point=}")
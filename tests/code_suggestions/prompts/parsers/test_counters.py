@@ -1,7 +1,7 @@
 import pytest
 
 from ai_gateway.code_suggestions.processing.ops import LanguageId
-from ai_gateway.code_suggestions.prompts.parsers import CodeParser
+from ai_gateway.code_suggestions.prompts.parsers import CodeParser, ParserExecutor
 
 PYTHON_SOURCE_SAMPLE = """
 import os
@@ -491,8 +491,11 @@ async def test_symbol_counter(
     lang_id: LanguageId,
     source_code: str,
     target_symbols_counts: dict[str],
+    parser_executor: ParserExecutor,
 ):
-    parser = await CodeParser.from_language_id(source_code, lang_id)
+    parser = await CodeParser.from_language_id(
+        source_code, lang_id, parser_executor=parser_executor
+    )
     output = parser.count_symbols()
 
     assert len(output) == len(target_symbols_counts)
@@ -0,0 +1,107 @@
+import threading
+from unittest import mock
+
+import pytest
+
+from ai_gateway.code_suggestions.processing import PressureSignal, PromptBudget
+from ai_gateway.code_suggestions.processing.typing import LanguageId
+from ai_gateway.code_suggestions.prompts.parsers import CodeParser, ParserExecutor
+from ai_gateway.scheduling import WorkloadClass
+
+
+@pytest.fixture
+def prompt_budget():
+    return PromptBudget(enabled=True)
+
+
+@pytest.fixture
+def parser_executor(prompt_budget: PromptBudget):
+    parser_executor = ParserExecutor(max_workers=1, prompt_budget=prompt_budget)
+    yield parser_executor
+    parser_executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_run(parser_executor: ParserExecutor, prompt_budget: PromptBudget):
+    def _parse(source: bytes):
+        return (
+            threading.current_thread().name,
+            parser_executor._parser("python"),
+            parser_executor.parse(source, "python"),
+        )
+
+    observing_threads = []
+    observe = prompt_budget.observe
+
+    def _observe(*args):
+        observing_threads.append(threading.current_thread())
+        observe(*args)
+
+    with mock.patch(
+        "ai_gateway.code_suggestions.prompts.parsers.executor.PARSE_QUEUE_WAIT_HISTOGRAM"
+    ) as mock_queue_wait, mock.patch.object(prompt_budget, "observe", _observe):
+        thread_name, parser, tree = await parser_executor.run(_parse, b"import os")
+        _, other_parser, _ = await parser_executor.run(_parse, b"import sys")
+
+    assert thread_name.startswith("tree-sitter")
+    assert tree.root_node.type == "module"
+    # Parsers are created when the thread starts and reused by the next parses
+    assert parser is other_parser
+    assert mock_queue_wait.observe.call_count == 2
+    assert PressureSignal.QUEUE_WAIT in prompt_budget._observed
+    # The prompt budget is adjusted on the event loop, it's observed there too
+    assert observing_threads == [threading.current_thread()] * 2
+
+
+def test_parse_timeout():
+    parser_executor = ParserExecutor(timeout_micros=1)
+    source = ("x = [" + "(x + 1) * " * 20_000 + "1]\n").encode()
+
+    with mock.patch(
+        "ai_gateway.code_suggestions.prompts.parsers.executor.PARSE_TIMEOUTS_COUNTER"
+    ) as mock_timeouts:
+        with pytest.raises(ValueError, match="timed out"):
+            parser_executor.parse(source, "python")
+
+    mock_timeouts.labels.assert_called_once_with(lang="python")
+
+    # The next parse starts from scratch instead of resuming the one that timed out
+    parser_executor.timeout_micros = 0
+    parser_executor._parser("python").set_timeout_micros(0)
+    tree = parser_executor.parse(b"import os", "python")
+
+    assert tree.root_node.sexp() == (
+        "(module (import_statement name: (dotted_name (identifier))))"
+    )
+
+
+@pytest.mark.asyncio
+async def test_parse_encoded_content(parser_executor: ParserExecutor):
+    source = "name = 'héllo'".encode("utf-8")
+
+    parser = await CodeParser.from_language_id(
+        source, LanguageId.PYTHON, parser_executor=parser_executor
+    )
+
+    assert parser.buffer.text == "name = 'héllo'"
+    assert parser.buffer.encoded is source
+
+
+@pytest.mark.asyncio
+async def test_run_prioritized():
+    parser_executor = ParserExecutor(
+        max_workers=1, max_shares={WorkloadClass.BACKGROUND: 0.5}
+    )
+
+    with mock.patch(
+        "ai_gateway.scheduling.WORKLOAD_QUEUE_WAIT_HISTOGRAM"
+    ) as mock_queue_wait:
+        tree = await parser_executor.run(parser_executor.parse, b"import os", "python")
+
+    parser_executor.shutdown()
+
+    assert tree.root_node.type == "module"
+    assert parser_executor.limiter.enabled
+    mock_queue_wait.labels.assert_called_once_with(
+        workload="standard", resource="tree_sitter"
+    )
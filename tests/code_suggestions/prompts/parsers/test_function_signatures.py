@@ -1,7 +1,7 @@
 import pytest
 
 from ai_gateway.code_suggestions.processing.base import LanguageId
-from ai_gateway.code_suggestions.prompts.parsers import CodeParser
+from ai_gateway.code_suggestions.prompts.parsers import CodeParser, ParserExecutor
 
 GO_SOURCE_SAMPLE = """package main
 
@@ -177,9 +177,14 @@ def addInt( a:Int, b:Int ) : Int = {
 )
 @pytest.mark.asyncio
 async def test_import_extractor(
-    lang_id: LanguageId, source_code: str, expected_outputs: str
+    lang_id: LanguageId,
+    source_code: str,
+    expected_outputs: str,
+    parser_executor: ParserExecutor,
 ):
-    parser = await CodeParser.from_language_id(source_code, lang_id)
+    parser = await CodeParser.from_language_id(
+        source_code, lang_id, parser_executor=parser_executor
+    )
 
     outputs = parser.function_signatures()
 
@@ -205,8 +210,12 @@ async def test_import_extractor(
     ],
 )
 @pytest.mark.asyncio
-async def test_unparseable(lang_id: LanguageId, source_code: str):
-    parser = await CodeParser.from_language_id(source_code, lang_id)
+async def test_unparseable(
+    lang_id: LanguageId, source_code: str, parser_executor: ParserExecutor
+):
+    parser = await CodeParser.from_language_id(
+        source_code, lang_id, parser_executor=parser_executor
+    )
     output = parser.function_signatures()
 
     assert len(output) == 0
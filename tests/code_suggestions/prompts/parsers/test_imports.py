@@ -1,7 +1,7 @@
 import pytest
 
 from ai_gateway.code_suggestions.processing.base import LanguageId
-from ai_gateway.code_suggestions.prompts.parsers import CodeParser
+from ai_gateway.code_suggestions.prompts.parsers import CodeParser, ParserExecutor
 
 GO_SOURCE_SAMPLE = """package main
 
@@ -100,9 +100,14 @@ import java.util.Random
 )
 @pytest.mark.asyncio
 async def test_import_extractor(
-    lang_id: LanguageId, source_code: str, expected_output: str
+    lang_id: LanguageId,
+    source_code: str,
+    expected_output: str,
+    parser_executor: ParserExecutor,
 ):
-    parser = await CodeParser.from_language_id(source_code, lang_id)
+    parser = await CodeParser.from_language_id(
+        source_code, lang_id, parser_executor=parser_executor
+    )
 
     output = parser.imports()
 
@@ -127,8 +132,12 @@ async def test_import_extractor(
     ],
 )
 @pytest.mark.asyncio
-async def test_unparseable(lang_id: LanguageId, source_code: str):
-    parser = await CodeParser.from_language_id(source_code, lang_id)
+async def test_unparseable(
+    lang_id: LanguageId, source_code: str, parser_executor: ParserExecutor
+):
+    parser = await CodeParser.from_language_id(
+        source_code, lang_id, parser_executor=parser_executor
+    )
     output = parser.imports()
 
     assert len(output) == 0
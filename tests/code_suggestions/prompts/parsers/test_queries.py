@@ -0,0 +1,112 @@
+import pytest
+from tree_sitter import Query
+
+from ai_gateway.code_suggestions.processing.ops import LanguageId, ProgramLanguage
+from ai_gateway.code_suggestions.prompts.parsers import (
+    CodeParser,
+    ParserExecutor,
+    tree_dfs,
+)
+from ai_gateway.code_suggestions.prompts.parsers.comments import CommentVisitorFactory
+from ai_gateway.code_suggestions.prompts.parsers.context_extractors import (
+    ContextVisitorFactory,
+)
+from ai_gateway.code_suggestions.prompts.parsers.counters import CounterVisitorFactory
+from ai_gateway.code_suggestions.prompts.parsers.function_signatures import (
+    FunctionSignatureVisitorFactory,
+)
+from ai_gateway.code_suggestions.prompts.parsers.imports import ImportVisitorFactory
+from ai_gateway.code_suggestions.prompts.parsers.queries import compile_query
+
+# Each block is made of dozens of nodes, so the samples exceed the visit cap of `tree_dfs`
+PYTHON_LARGE_SAMPLE = "".join(
+    f"import mod{i}\n# comment {i}\ndef func{i}(a, b):\n    return a + b\n\n"
+    for i in range(500)
+)
+
+RUBY_LARGE_SAMPLE = "".join(
+    f"require 'lib{i}'\n# comment {i}\ndef method{i}(a)\n  puts a\nend\n\n"
+    for i in range(500)
+)
+
+JS_LARGE_SAMPLE = "".join(
+    f"import {{ fn{i} }} from './mod{i}';\n// comment {i}\nfunction func{i}(a) {{\n  return a;\n}}\n\n"
+    for i in range(500)
+)
+
+
+@pytest.mark.parametrize(
+    "factory",
+    [
+        CommentVisitorFactory,
+        ContextVisitorFactory,
+        CounterVisitorFactory,
+        FunctionSignatureVisitorFactory,
+        ImportVisitorFactory,
+    ],
+)
+def test_compile_query(factory):
+    for lang_id, klass in factory._LANG_ID_VISITORS.items():
+        grammar_name = ProgramLanguage.from_language_id(lang_id).grammar_name
+
+        assert isinstance(compile_query(grammar_name, klass), Query)
+
+
+@pytest.mark.parametrize(
+    ("lang_id", "source_code"),
+    [
+        (LanguageId.PYTHON, PYTHON_LARGE_SAMPLE),
+        (LanguageId.RUBY, RUBY_LARGE_SAMPLE),
+        (LanguageId.JS, JS_LARGE_SAMPLE),
+    ],
+)
+@pytest.mark.asyncio
+async def test_large_file(
+    lang_id: LanguageId, source_code: str, parser_executor: ParserExecutor
+):
+    parser = await CodeParser.from_language_id(
+        source_code, lang_id, parser_executor=parser_executor
+    )
+
+    imports = ImportVisitorFactory.from_language_id(lang_id)
+    tree_dfs(parser.tree, imports, max_visit_count=1_000_000)
+    signatures = FunctionSignatureVisitorFactory.from_language_id(lang_id)
+    tree_dfs(parser.tree, signatures, max_visit_count=1_000_000)
+    counter = CounterVisitorFactory.from_language_id(lang_id)
+    tree_dfs(parser.tree, counter, max_visit_count=1_000_000)
+
+    assert len(parser.imports()) == 500
+    assert parser.imports() == imports.imports
+    assert len(parser.function_signatures()) == 500
+    assert parser.function_signatures() == signatures.function_signatures
+    assert parser.count_symbols() == counter.counts
+
+
+@pytest.mark.parametrize(
+    ("source_code", "expected"),
+    [
+        ("# comment\n" * 2_000, True),
+        ("# comment\n" * 2_000 + "import os\n", False),
+    ],
+)
+@pytest.mark.asyncio
+async def test_comments_only_large_file(
+    source_code: str, expected: bool, parser_executor: ParserExecutor
+):
+    parser = await CodeParser.from_language_id(
+        source_code, LanguageId.PYTHON, parser_executor=parser_executor
+    )
+
+    assert parser.comments_only() == expected
+
+
+@pytest.mark.asyncio
+async def test_suffix_near_cursor_large_file(parser_executor: ParserExecutor):
+    parser = await CodeParser.from_language_id(
+        PYTHON_LARGE_SAMPLE, LanguageId.PYTHON, parser_executor=parser_executor
+    )
+
+    # The cursor is inside the last function of the file
+    suffix = parser.suffix_near_cursor((2498, 4))
+
+    assert suffix == "return a + b"
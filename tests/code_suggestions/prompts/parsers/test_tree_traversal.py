@@ -4,7 +4,12 @@ import pytest
 from tree_sitter import Node
 
 from ai_gateway.code_suggestions.processing.ops import LanguageId
-from ai_gateway.code_suggestions.prompts.parsers import CodeParser, tree_bfs, tree_dfs
+from ai_gateway.code_suggestions.prompts.parsers import (
+    CodeParser,
+    ParserExecutor,
+    tree_bfs,
+    tree_dfs,
+)
 from ai_gateway.code_suggestions.prompts.parsers.base import BaseVisitor
 
 JAVA_SAMPLE_SOURCE = """
@@ -49,9 +54,17 @@ PYTHON_SAMPLE_SOURCE = """import os"""
 )
 @pytest.mark.asyncio
 async def test_level_order_traversal(
-    lang_id: LanguageId, source_code: str, max_depth: int, expected_node_count: int
+    lang_id: LanguageId,
+    source_code: str,
+    max_depth: int,
+    expected_node_count: int,
+    parser_executor: ParserExecutor,
 ):
-    root_node = (await CodeParser.from_language_id(source_code, lang_id)).tree.root_node
+    root_node = (
+        await CodeParser.from_language_id(
+            source_code, lang_id, parser_executor=parser_executor
+        )
+    ).tree.root_node
 
     visited_nodes = []
 
@@ -133,8 +146,13 @@ async def test_preorder_traversal(
     source_code: str,
     visitor: StubLimitedDepthVisitor,
     expected_node_count: int,
+    parser_executor: ParserExecutor,
 ):
-    tree = (await CodeParser.from_language_id(source_code, lang_id)).tree
+    tree = (
+        await CodeParser.from_language_id(
+            source_code, lang_id, parser_executor=parser_executor
+        )
+    ).tree
 
     tree_dfs(tree, visitor)
 
@@ -155,8 +173,13 @@ async def test_tree_dfs_max_visit_count(
     visitor: StubSimpleVisitor,
     max_visit_count: int,
     expected_node_count: int,
+    parser_executor: ParserExecutor,
 ):
-    tree = (await CodeParser.from_language_id(source_code, lang_id)).tree
+    tree = (
+        await CodeParser.from_language_id(
+            source_code, lang_id, parser_executor=parser_executor
+        )
+    ).tree
 
     tree_dfs(tree, visitor, max_visit_count=max_visit_count)
 
@@ -6,8 +6,10 @@ import pytest
 
 from ai_gateway.code_suggestions import CodeCompletions, CodeCompletionsLegacy
 from ai_gateway.code_suggestions.processing import (
+    BudgetModel,
     ModelEngineCompletions,
     ModelEngineOutput,
+    PromptBudget,
 )
 from ai_gateway.code_suggestions.processing.post.completions import PostProcessor
 from ai_gateway.code_suggestions.processing.pre import PromptBuilderPrefixBased
@@ -23,9 +25,13 @@ from ai_gateway.instrumentators import KnownMetrics, TextGenModelInstrumentator
 from ai_gateway.models import (
     AnthropicAPIConnectionError,
     AnthropicAPIStatusError,
+    ChatModelBase,
+    CircuitBreakerOpenError,
+    Message,
     ModelAPIError,
     ModelMetadata,
     PalmCodeGeckoModel,
+    Role,
 )
 from ai_gateway.models.base import TokensConsumptionMetadata
 from ai_gateway.models.base_text import (
@@ -476,6 +482,51 @@ class TestCodeCompletions:
             stream,
         )
 
+    async def test_execute_prompt_budget(self):
+        model = Mock(spec=TextGenModelBase)
+        model.input_token_limit = 2_048
+        model.metadata = ModelMetadata(name="claude-3-haiku", engine="anthropic")
+        model.generate = AsyncMock(
+            return_value=TextGenModelOutput(
+                text="random_suggestion",
+                score=0,
+                safety_attributes=SafetyAttributes(),
+            )
+        )
+        budget_model = BudgetModel("anthropic", "claude-3-haiku")
+
+        prompt_budget = PromptBudget(enabled=True)
+        prompt_budget.model_ratios[budget_model] = 0.4
+
+        use_case = CodeCompletions(
+            model, Mock(spec=TokenStrategyBase), prompt_budget=prompt_budget
+        )
+        use_case.instrumentator = InstrumentorMock(spec=TextGenModelInstrumentator)
+        use_case.prompt_builder = Mock(spec=PromptBuilderPrefixBased)
+        use_case.prompt_builder.build.return_value = Prompt(
+            prefix="test_prefix",
+            suffix="test_suffix",
+            metadata=MetadataPromptBuilder(components={}),
+        )
+
+        await use_case.execute(
+            prefix="random_prefix",
+            suffix="random_suffix",
+            file_name="file_name.py",
+            code_context=["some context"],
+        )
+
+        # The prompt is shrunk and the code context dropped
+        use_case.prompt_builder.build.assert_called_once_with(819)
+        use_case.prompt_builder.add_content.assert_called_with(
+            "random_prefix",
+            suffix="random_suffix",
+            suffix_reserved_percent=CodeCompletions.SUFFIX_RESERVED_PERCENT,
+            context_max_percent=1.0,
+            code_context=None,
+        )
+        assert prompt_budget.model_latencies[budget_model] > 0
+
     @pytest.mark.parametrize(
         (
             "model_chunks",
@@ -663,6 +714,256 @@ class TestCodeCompletions:
             str(exception), code
         )
 
+    @pytest.mark.parametrize("with_fallback", [True, False])
+    async def test_execute_circuit_breaker_open(self, with_fallback: bool):
+        model = Mock(spec=TextGenModelBase)
+        type(model).input_token_limit = PropertyMock(return_value=2_048)
+        model.generate = AsyncMock(
+            side_effect=CircuitBreakerOpenError("anthropic", "claude")
+        )
+
+        fallback_model = None
+        if with_fallback:
+            fallback_model = Mock(spec=TextGenModelBase)
+            fallback_model.input_token_limit = 1_024
+            fallback_model.metadata = ModelMetadata(name="code-gecko", engine="vertex")
+            fallback_model.generate = AsyncMock(
+                return_value=TextGenModelOutput(
+                    text="fallback completion",
+                    score=0,
+                    safety_attributes=SafetyAttributes(),
+                )
+            )
+
+        use_case = CodeCompletions(
+            model, Mock(spec=TokenStrategyBase), fallback_model=fallback_model
+        )
+        use_case.instrumentator = InstrumentorMock(spec=TextGenModelInstrumentator)
+        use_case.prompt_builder = Mock(spec=PromptBuilderPrefixBased)
+        use_case.prompt_builder.build.return_value = Prompt(
+            prefix="test_prefix",
+            suffix="test_suffix",
+            metadata=MetadataPromptBuilder(components={}),
+        )
+        use_case.fallback_prompt_builder = Mock(spec=PromptBuilderPrefixBased)
+        use_case.fallback_prompt_builder.build.return_value = Prompt(
+            prefix="fallback_prefix",
+            suffix="fallback_suffix",
+            metadata=MetadataPromptBuilder(components={}),
+        )
+
+        if not with_fallback:
+            with pytest.raises(CircuitBreakerOpenError):
+                await use_case.execute("prefix", "suffix", "file_name.py")
+
+            return
+
+        actual = await use_case.execute(
+            "prefix", "suffix", "file_name.py", max_output_tokens=64
+        )
+
+        assert actual.text == "fallback completion"
+        assert actual.model == fallback_model.metadata
+        # The prompt is built for the fallback model, without the parameters of the
+        # requested model
+        use_case.fallback_prompt_builder.add_content.assert_called_once()
+        use_case.fallback_prompt_builder.build.assert_called_once_with(1_024)
+        fallback_model.generate.assert_called_once_with(
+            "fallback_prefix", "fallback_suffix", False
+        )
+
+    @pytest.mark.parametrize(
+        ("model_spec", "expected_fallback"),
+        [(ChatModelBase, True), (TextGenModelBase, False)],
+    )
+    async def test_execute_circuit_breaker_open_chat_fallback(
+        self, model_spec, expected_fallback: bool
+    ):
+        model = Mock(spec=model_spec)
+        model.input_token_limit = 2_048
+        model.generate = AsyncMock(
+            side_effect=CircuitBreakerOpenError("anthropic", "claude")
+        )
+
+        fallback_model = Mock(spec=ChatModelBase)
+        fallback_model.input_token_limit = 2_048
+        fallback_model.metadata = ModelMetadata(name="claude", engine="anthropic")
+        fallback_model.generate = AsyncMock(
+            return_value=TextGenModelOutput(
+                text="fallback completion",
+                score=0,
+                safety_attributes=SafetyAttributes(),
+            )
+        )
+
+        use_case = CodeCompletions(
+            model, Mock(spec=TokenStrategyBase), fallback_model=fallback_model
+        )
+        use_case.instrumentator = InstrumentorMock(spec=TextGenModelInstrumentator)
+
+        messages = [Message(role=Role.USER, content="complete this")]
+        use_case.prompt_builder = Mock(spec=PromptBuilderPrefixBased)
+        use_case.prompt_builder.wrap.return_value = Prompt(
+            prefix=messages,
+            metadata=MetadataPromptBuilder(components={}),
+        )
+
+        if not expected_fallback:
+            with pytest.raises(CircuitBreakerOpenError):
+                await use_case.execute(
+                    "prefix", "suffix", "file_name.py", raw_prompt=messages
+                )
+
+            fallback_model.generate.assert_not_called()
+            return
+
+        actual = await use_case.execute(
+            "prefix", "suffix", "file_name.py", raw_prompt=messages
+        )
+
+        assert actual.text == "fallback completion"
+        fallback_model.generate.assert_called_once_with(messages, stream=False)
+
+    @pytest.mark.parametrize(
+        ("stream", "hedged"),
+        [(False, True), (True, False)],
+    )
+    async def test_execute_hedged(self, stream: bool, hedged: bool):
+        model = Mock(spec=TextGenModelBase)
+        type(model).input_token_limit = PropertyMock(return_value=2_048)
+        model.metadata = ModelMetadata(name="claude", engine="anthropic")
+        model.generate = AsyncMock(
+            return_value=TextGenModelOutput(
+                text="completion",
+                score=0,
+                safety_attributes=SafetyAttributes(),
+            )
+        )
+
+        async def _run(call, hedge_call, instrumentator):
+            return await call()
+
+        policy = Mock()
+        policy.run = AsyncMock(side_effect=_run)
+        hedging_policies = Mock(use_fallback_model=False)
+        hedging_policies.for_model.return_value = policy
+
+        use_case = CodeCompletions(
+            model, Mock(spec=TokenStrategyBase), hedging_policies=hedging_policies
+        )
+        use_case.instrumentator = InstrumentorMock(spec=TextGenModelInstrumentator)
+        use_case.prompt_builder = Mock(spec=PromptBuilderPrefixBased)
+        use_case.prompt_builder.build.return_value = Prompt(
+            prefix="test_prefix",
+            suffix="test_suffix",
+            metadata=MetadataPromptBuilder(components={}),
+        )
+
+        await use_case.execute("prefix", "suffix", "file_name.py", stream=stream)
+
+        model.generate.assert_called_once_with("test_prefix", "test_suffix", stream)
+
+        if hedged:
+            hedging_policies.for_model.assert_called_once_with("anthropic", "claude")
+            policy.run.assert_called_once()
+        else:
+            policy.run.assert_not_called()
+
+    @pytest.mark.parametrize(
+        ("fallback_spec", "expected_hedge_args"),
+        [
+            (TextGenModelBase, ("fallback_prefix", "fallback_suffix", False)),
+            (ChatModelBase, None),
+        ],
+    )
+    async def test_execute_hedged_with_fallback_model(
+        self, fallback_spec, expected_hedge_args
+    ):
+        model = Mock(spec=TextGenModelBase)
+        type(model).input_token_limit = PropertyMock(return_value=2_048)
+        model.metadata = ModelMetadata(name="codestral", engine="litellm")
+        model.generate = AsyncMock(
+            return_value=TextGenModelOutput(
+                text="completion", score=0, safety_attributes=SafetyAttributes()
+            )
+        )
+
+        fallback_model = Mock(spec=fallback_spec)
+        fallback_model.input_token_limit = 1_024
+        fallback_model.metadata = ModelMetadata(
+            name="claude-3-haiku", engine="anthropic"
+        )
+        fallback_model.generate = AsyncMock(
+            return_value=TextGenModelOutput(
+                text="hedge", score=0, safety_attributes=SafetyAttributes()
+            )
+        )
+
+        post_processor = Mock(spec=PostProcessor)
+        post_processor.process = AsyncMock(side_effect=lambda text: text)
+        post_processor_factory = Mock(return_value=post_processor)
+
+        async def _run(call, hedge_call, instrumentator):
+            return await hedge_call()
+
+        policy = Mock()
+        policy.run = AsyncMock(side_effect=_run)
+        hedging_policies = Mock(use_fallback_model=True)
+        hedging_policies.for_model.return_value = policy
+
+        use_case = CodeCompletions(
+            model,
+            Mock(spec=TokenStrategyBase),
+            fallback_model=fallback_model,
+            hedging_policies=hedging_policies,
+            post_processor=post_processor_factory,
+            prompt_budget=PromptBudget(enabled=True),
+        )
+        use_case.instrumentator = InstrumentorMock(spec=TextGenModelInstrumentator)
+        use_case.prompt_builder = Mock(spec=PromptBuilderPrefixBased)
+        use_case.prompt_builder.build.return_value = Prompt(
+            prefix="test_prefix",
+            suffix="test_suffix",
+            metadata=MetadataPromptBuilder(components={}),
+        )
+        use_case.fallback_prompt_builder = Mock(spec=PromptBuilderPrefixBased)
+        use_case.fallback_prompt_builder.build.return_value = Prompt(
+            prefix="fallback_prefix",
+            suffix="fallback_suffix",
+            metadata=MetadataPromptBuilder(components={}),
+        )
+
+        actual = await use_case.execute(
+            "prefix", "suffix", "file_name.py", max_output_tokens=64
+        )
+
+        if expected_hedge_args:
+            fallback_model.generate.assert_called_once_with(*expected_hedge_args)
+            model.generate.assert_not_called()
+
+            # The completion of the fallback model is reported and processed as such
+            winner, winner_prefix, winner_suffix = (
+                fallback_model,
+                "fallback_prefix",
+                "fallback_suffix",
+            )
+        else:
+            # The chat model can't take the prompt of the text model
+            fallback_model.generate.assert_not_called()
+            model.generate.assert_called_once_with(
+                "test_prefix", "test_suffix", False, max_output_tokens=64
+            )
+
+            winner, winner_prefix, winner_suffix = model, "test_prefix", "test_suffix"
+
+        assert actual.model == winner.metadata
+        post_processor_factory.assert_called_once_with(
+            winner_prefix, suffix=winner_suffix, lang_id=LanguageId.PYTHON
+        )
+        assert list(use_case.prompt_budget.model_latencies) == [
+            BudgetModel(winner.metadata.engine, winner.metadata.name)
+        ]
+
     async def test_execute_with_post_processor(
         self, completions_with_post_processing: Mock
     ):
@@ -1,3 +1,6 @@
+from unittest import mock
+
+import pytest
 from dependency_injector import containers
 
 from ai_gateway.code_suggestions.completions import (
@@ -5,8 +8,11 @@ from ai_gateway.code_suggestions.completions import (
     CodeCompletionsLegacy,
 )
 from ai_gateway.code_suggestions.generations import CodeGenerations
+from ai_gateway.code_suggestions.processing import PromptBudget
+from ai_gateway.code_suggestions.prompts.parsers import ParserExecutor
 from ai_gateway.models.anthropic import KindAnthropicModel
 from ai_gateway.models.litellm import KindLiteLlmModel
+from ai_gateway.token_estimation import TokenEstimator
 
 
 def test_container(mock_container: containers.DeclarativeContainer):
@@ -40,3 +46,52 @@ def test_container(mock_container: containers.DeclarativeContainer):
         CodeGenerations,
     )
     assert isinstance(generations.anthropic_default(), CodeGenerations)
+
+
+def test_parser_executor(mock_container: containers.DeclarativeContainer):
+    code_suggestions = mock_container.code_suggestions
+
+    parser_executor = code_suggestions.parser_executor()
+
+    assert isinstance(parser_executor, ParserExecutor)
+    assert parser_executor.max_workers == 4
+    assert parser_executor.timeout_micros == 1_000_000
+    assert not parser_executor.limiter.enabled
+    assert code_suggestions.completions.parser_executor() is parser_executor
+    assert parser_executor.prompt_budget is code_suggestions.prompt_budget()
+
+    with mock.patch.object(parser_executor, "shutdown") as mock_shutdown:
+        code_suggestions.parser_executor.shutdown()
+
+    mock_shutdown.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_prompt_budget(mock_container: containers.DeclarativeContainer):
+    code_suggestions = mock_container.code_suggestions
+
+    prompt_budget = code_suggestions.prompt_budget()
+
+    assert isinstance(prompt_budget, PromptBudget)
+    assert not prompt_budget.enabled
+    assert prompt_budget.min_ratio == 0.25
+    assert code_suggestions.completions.prompt_budget() is prompt_budget
+
+    with (
+        mock.patch.object(prompt_budget, "start") as mock_start,
+        mock.patch.object(prompt_budget, "stop") as mock_stop,
+    ):
+        await code_suggestions.prompt_budget_adjuster.init()
+        await code_suggestions.prompt_budget_adjuster.shutdown()
+
+    mock_start.assert_called_once()
+    mock_stop.assert_awaited_once()
+
+
+def test_token_estimator(mock_container: containers.DeclarativeContainer):
+    code_suggestions = mock_container.code_suggestions
+    token_estimator = mock_container.token_estimator()
+
+    assert isinstance(token_estimator, TokenEstimator)
+    assert code_suggestions.completions.token_estimator() is token_estimator
+    assert code_suggestions.generations.token_estimator() is token_estimator
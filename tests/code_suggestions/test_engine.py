@@ -13,6 +13,7 @@ from ai_gateway.code_suggestions.processing import (
     ops,
 )
 from ai_gateway.code_suggestions.processing.pre import TokenizerTokenStrategy
+from ai_gateway.code_suggestions.prompts.parsers import ParserExecutor
 from ai_gateway.experimentation import ExperimentRegistry
 from ai_gateway.models import (
     ModelAPIError,
@@ -23,6 +24,7 @@ from ai_gateway.models import (
 from ai_gateway.models.base import TokensConsumptionMetadata
 from ai_gateway.models.base_text import TextGenModelOutput
 from ai_gateway.safety_attributes import SafetyAttributes
+from ai_gateway.token_estimation import TokenEstimator, tokenizer_family
 
 tokenization_strategy = TokenizerTokenStrategy(
     tokenizer=AutoTokenizer.from_pretrained("Salesforce/codegen2-16B")
@@ -583,6 +585,7 @@ async def test_model_engine_palm(
     expected_input_tokens,
     expected_output_tokens,
     estimate_tokens_consumption,
+    parser_executor: ParserExecutor,
 ):
     model_name = "palm-model"
     model_engine = "vertex-ai"
@@ -598,6 +601,7 @@ async def test_model_engine_palm(
         model=text_gen_base_model,
         tokenization_strategy=tokenization_strategy,
         experiment_registry=ExperimentRegistry(),
+        parser_executor=parser_executor,
     )
     engine.instrumentator = MockInstrumentor()
 
@@ -633,7 +637,9 @@ async def test_model_engine_palm(
 
     if estimate_tokens_consumption:
         assert completion.tokens_consumption_metadata.output_tokens == (
-            tokenization_strategy.estimate_length(model_output)[0]
+            TokenEstimator().estimate(
+                model_output, tokenizer_family(_model_metadata.name)
+            )
         )
         assert completion.tokens_consumption_metadata.input_tokens == (
             completion.metadata.components["prefix"].length_tokens
@@ -793,11 +799,13 @@ async def test_prompt_building_model_engine_palm(
     expected_imports: list[str],
     expected_functions: list[str],
     expected_contexts: list[str],
+    parser_executor: ParserExecutor,
 ):
     engine = ModelEngineCompletions(
         model=text_gen_base_model,
         tokenization_strategy=tokenization_strategy,
         experiment_registry=ExperimentRegistry(),
+        parser_executor=parser_executor,
     )
     prompt = await engine._build_prompt(
         prefix=prefix,
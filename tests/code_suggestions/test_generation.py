@@ -18,12 +18,20 @@ from ai_gateway.code_suggestions.processing.typing import (
     Prompt,
 )
 from ai_gateway.instrumentators import TextGenModelInstrumentator
+from ai_gateway.models import (
+    ChatModelBase,
+    CircuitBreakerOpenError,
+    Message,
+    ModelMetadata,
+    Role,
+)
 from ai_gateway.models.base_text import (
     TextGenModelBase,
     TextGenModelChunk,
     TextGenModelOutput,
 )
 from ai_gateway.safety_attributes import SafetyAttributes
+from ai_gateway.token_estimation import TokenEstimator
 from ai_gateway.tracking.instrumentator import SnowplowInstrumentator
 from ai_gateway.tracking.snowplow import SnowplowEvent, SnowplowEventContext
 
@@ -155,8 +163,8 @@ class TestCodeGeneration:
     @pytest.mark.parametrize(
         ("stream", "response_token_length"),
         [
-            (True, 9),
-            (False, 4),
+            (True, TokenEstimator().estimate("hello world!")),
+            (False, TokenEstimator().estimate("output")),
         ],
     )
     async def test_snowplow_instrumentation(
@@ -190,11 +198,7 @@ class TestCodeGeneration:
             value=response_token_length,
         )
 
-        with patch.object(use_case, "tokenization_strategy") as mock, patch.object(
-            use_case, "snowplow_instrumentator"
-        ) as snowplow_mock:
-            mock.estimate_length = Mock(return_value=[4, 5])
-
+        with patch.object(use_case, "snowplow_instrumentator") as snowplow_mock:
             if stream:
                 use_case.model.generate = AsyncMock(side_effect=_stream_generator)
             else:
@@ -217,8 +221,54 @@ class TestCodeGeneration:
                 async for _ in actual:
                     pass
 
-            mock.estimate_length.assert_called()
-
             snowplow_mock.watch.assert_has_calls(
                 [call(expected_event_1), call(expected_event_2)]
             )
+
+    @pytest.mark.parametrize(
+        ("fallback_spec", "expected_args"),
+        [
+            (TextGenModelBase, ("fallback prompt", "")),
+            (ChatModelBase, ([Message(role=Role.USER, content="instruction")],)),
+        ],
+    )
+    async def test_execute_circuit_breaker_open(self, fallback_spec, expected_args):
+        model = Mock(spec=ChatModelBase)
+        model.input_token_limit = 2_048
+        model.generate = AsyncMock(
+            side_effect=CircuitBreakerOpenError("anthropic", "claude")
+        )
+
+        fallback_model = Mock(spec=fallback_spec)
+        fallback_model.input_token_limit = 1_024
+        fallback_model.metadata = ModelMetadata(name="code-bison", engine="vertex")
+        fallback_model.generate = AsyncMock(
+            return_value=TextGenModelOutput(
+                text="output", score=0, safety_attributes=SafetyAttributes()
+            )
+        )
+
+        use_case = CodeGenerations(
+            model,
+            Mock(spec=TokenStrategyBase),
+            Mock(spec=SnowplowInstrumentator),
+            fallback_model=fallback_model,
+        )
+        use_case.instrumentator = InstrumentorMock(spec=TextGenModelInstrumentator)
+        use_case.prompt = Prompt(
+            prefix=[Message(role=Role.USER, content="instruction")],
+            metadata=MetadataPromptBuilder(components={}),
+        )
+        use_case.fallback_prompt_builder = Mock(spec=PromptBuilderBase)
+        use_case.fallback_prompt_builder.build.return_value = Prompt(
+            prefix="fallback prompt",
+            metadata=MetadataPromptBuilder(components={}),
+        )
+
+        actual = await use_case.execute(
+            "prefix", "test.py", editor_lang=LanguageId.PYTHON, max_output_tokens=64
+        )
+
+        assert actual.model == fallback_model.metadata
+        # The parameters of the requested model aren't passed to the fallback model
+        fallback_model.generate.assert_called_once_with(*expected_args, stream=False)
@@ -9,10 +9,22 @@ from ai_gateway.code_suggestions.processing import (
     MetadataPromptBuilder,
 )
 from ai_gateway.code_suggestions.processing.completions import Prompt
-from ai_gateway.instrumentators.base import TextGenModelInstrumentator
+from ai_gateway.instrumentators.base import (
+    TextGenModelInstrumentator,
+    metric_children,
+    remove_whitespace,
+    stripped_length,
+)
+from ai_gateway.models.base_chat import Message, Role
 from ai_gateway.safety_attributes import SafetyAttributes
 
 
+@pytest.fixture(autouse=True)
+def clear_metric_children():
+    # The children of the mocked metrics must not be shared between tests
+    metric_children.cache_clear()
+
+
 class TestTextGenModelInstrumentator:
     @mock.patch("prometheus_client.Counter.labels")
     def test_cost_metric_counts_stripped_model_input_output(self, mock_labels):
@@ -70,6 +82,29 @@ class TestTextGenModelInstrumentator:
             ]
         )
 
+    def test_chat_messages_prompt(self):
+        messages = [
+            Message(role=Role.SYSTEM, content="You are a coder"),  # stripped len: 12
+            Message(role=Role.USER, content="def f():\n"),  # stripped len: 7
+        ]
+        metadata = MetadataPromptBuilder(
+            components={
+                "prompt": MetadataCodeContent(length=23, length_tokens=6),
+            },
+        )
+        prompt = Prompt(prefix=messages, metadata=metadata)
+
+        instrumentator = TextGenModelInstrumentator(
+            model_engine="anthropic", model_name="claude-3-haiku"
+        )
+
+        with request_cycle_context({}):
+            with instrumentator.watch(prompt) as watch_container:
+                watch_container.register_model_output_length("return 1")
+
+            assert context.get("prompt_length") == 24
+            assert context.get("prompt_length_stripped") == 19
+
     @pytest.mark.parametrize(
         ("safety_attributes", "blocked", "safety_categories", "error_codes"),
         [
@@ -117,3 +152,11 @@ class TestTextGenModelInstrumentator:
             assert context.get("blocked") == blocked
             assert context.get("safety_categories") == safety_categories
             assert context.get("error_codes") == error_codes
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["", "def f():\n\treturn 1\n", "a\x0bb\x0cc\x1cd  ", "x = 'é'  　y\n"],
+)
+def test_stripped_length(text: str):
+    assert stripped_length(text) == len(remove_whitespace(text))
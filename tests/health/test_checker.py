@@ -0,0 +1,176 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from ai_gateway.health import HealthChecker, ProviderProbe
+from ai_gateway.models import KindModelProvider
+
+
+@pytest.fixture
+def mock_check():
+    return AsyncMock()
+
+
+@pytest.fixture
+def probe(mock_check):
+    return ProviderProbe(provider=KindModelProvider.VERTEX_AI, check=mock_check)
+
+
+@pytest.fixture
+def checker_params():
+    return {}
+
+
+@pytest.fixture
+def health_checker(probe, checker_params):
+    return HealthChecker(probes=[probe], **checker_params)
+
+
+@pytest.mark.asyncio
+async def test_probe(health_checker, probe):
+    with patch("ai_gateway.health.checker.PROVIDER_UP_GAUGE") as mock_gauge:
+        status = await health_checker.probe(probe)
+
+    assert status.healthy
+    assert status.consecutive_successes == 1
+    assert health_checker.statuses[KindModelProvider.VERTEX_AI] == status
+    assert health_checker.ready()
+    mock_gauge.labels.assert_called_once_with(provider="vertex-ai")
+    mock_gauge.labels.return_value.set.assert_called_once_with(True)
+
+
+@pytest.mark.asyncio
+async def test_probe_failure(health_checker, probe, mock_check):
+    mock_check.side_effect = ValueError("unreachable")
+
+    status = await health_checker.probe(probe)
+
+    assert not status.healthy
+    assert status.error == "ValueError: unreachable"
+    assert not health_checker.ready()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("checker_params", [{"timeout_s": 0.01}])
+async def test_probe_timeout(health_checker, probe, mock_check):
+    async def _slow_check():
+        await asyncio.sleep(1)
+
+    mock_check.side_effect = _slow_check
+
+    status = await health_checker.probe(probe)
+
+    assert not status.healthy
+    assert status.error.startswith("TimeoutError")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("checker_params", "results", "expected_healthy"),
+    [
+        # A healthy provider stays healthy until the failures reach the threshold
+        (
+            {"failure_threshold": 3},
+            [True, False, False, True, False, False, False],
+            [True, True, True, True, True, True, False],
+        ),
+        # An unhealthy provider needs enough successes in a row to recover
+        (
+            {"success_threshold": 2, "failure_threshold": 1},
+            [True, True, False, True, False, True, True],
+            [False, True, False, False, False, False, True],
+        ),
+    ],
+)
+async def test_probe_grace(
+    health_checker, probe, mock_check, results, expected_healthy
+):
+    healthy = []
+
+    for result in results:
+        mock_check.side_effect = None if result else ValueError("unreachable")
+        status = await health_checker.probe(probe)
+        healthy.append(status.healthy)
+
+    assert healthy == expected_healthy
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "checker_params", [{"interval_s": 10, "unhealthy_interval_s": 0.01}]
+)
+async def test_start_stop(health_checker, mock_check):
+    mock_check.side_effect = [ValueError("unreachable"), None, None]
+
+    health_checker.start()
+
+    # Unhealthy providers are probed again sooner
+    while mock_check.await_count < 2:
+        await asyncio.sleep(0.01)
+
+    assert health_checker.ready()
+    assert health_checker.alive()
+
+    await health_checker.stop()
+
+    assert mock_check.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_alive(health_checker):
+    with patch.object(health_checker, "_run", AsyncMock()):
+        health_checker.start()
+        await asyncio.sleep(0)
+
+    assert not health_checker.alive()
+
+
+@pytest.mark.asyncio
+async def test_shared_state(tmp_path, probe, mock_check):
+    state_file = str(tmp_path / "health.json")
+    leader = HealthChecker(probes=[probe], state_file=state_file)
+    follower = HealthChecker(probes=[probe], state_file=state_file)
+
+    assert leader.is_leader()
+    assert not follower.is_leader()
+
+    # The follower has nothing to read until the leader probes the providers
+    follower.load_statuses()
+    assert not follower.ready()
+
+    status = await leader.probe(probe)
+    follower.load_statuses()
+
+    assert follower.statuses == {KindModelProvider.VERTEX_AI: status}
+    assert follower.ready()
+    assert mock_check.await_count == 1
+
+    # The follower takes over once the leader stops
+    await leader.stop()
+
+    assert follower.is_leader()
+
+    await follower.stop()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("checker_params", [{"unhealthy_interval_s": 0.01}])
+async def test_start_follower(tmp_path, probe, mock_check, checker_params):
+    state_file = str(tmp_path / "health.json")
+    leader = HealthChecker(probes=[probe], state_file=state_file)
+    follower = HealthChecker(probes=[probe], state_file=state_file, **checker_params)
+
+    assert leader.is_leader()
+    await leader.probe(probe)
+
+    follower.start()
+
+    while not follower.ready():
+        await asyncio.sleep(0.01)
+
+    await follower.stop()
+    await leader.stop()
+
+    # Only the leader probed the provider
+    assert mock_check.await_count == 1
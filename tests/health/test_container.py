@@ -0,0 +1,34 @@
+from unittest import mock
+
+import pytest
+from dependency_injector import containers
+
+from ai_gateway.health import HealthChecker
+from ai_gateway.models import KindModelProvider
+
+
+@pytest.mark.asyncio
+async def test_health_checker(mock_container: containers.DeclarativeContainer):
+    health = mock_container.health
+
+    health_checker = health.health_checker()
+
+    assert isinstance(health_checker, HealthChecker)
+    assert health_checker.interval_s == 300.0
+    assert health_checker.failure_threshold == 3
+    assert health_checker.state_file.endswith("ai_gateway_health.json")
+    assert [probe.provider for probe in health_checker.probes] == [
+        KindModelProvider.VERTEX_AI,
+        KindModelProvider.ANTHROPIC,
+        KindModelProvider.FIREWORKS,
+    ]
+
+    with (
+        mock.patch.object(health_checker, "start") as mock_start,
+        mock.patch.object(health_checker, "stop") as mock_stop,
+    ):
+        await health.health_checker_probes.init()
+        await health.health_checker_probes.shutdown()
+
+    mock_start.assert_called_once()
+    mock_stop.assert_awaited_once()
@@ -0,0 +1,116 @@
+from unittest.mock import AsyncMock, MagicMock, Mock
+
+import pytest
+
+from ai_gateway.health import (
+    build_provider_probes,
+    check_anthropic_available,
+    check_fireworks_available,
+    check_vertex_available,
+)
+from ai_gateway.models import KindModelProvider
+
+
+@pytest.fixture
+def mock_client():
+    client = MagicMock()
+    client.predict = AsyncMock()
+    client.messages.create = AsyncMock()
+    client.completions.create = AsyncMock()
+    return client
+
+
+@pytest.mark.asyncio
+async def test_check_vertex_available(mock_client: MagicMock):
+    await check_vertex_available(
+        Mock(return_value=mock_client), project="gcp", location="us", timeout_s=5
+    )
+
+    mock_client.predict.assert_awaited_once()
+    request = mock_client.predict.call_args.kwargs["request"]
+    assert (
+        request.endpoint
+        == "projects/gcp/locations/us/publishers/google/models/code-gecko@002"
+    )
+    assert request.parameters["maxOutputTokens"] == 1
+    assert mock_client.predict.call_args.kwargs["timeout"] == 5
+
+
+@pytest.mark.asyncio
+async def test_check_anthropic_available(mock_client: MagicMock):
+    await check_anthropic_available(Mock(return_value=mock_client), timeout_s=5)
+
+    mock_client.messages.create.assert_awaited_once_with(
+        model="claude-3-haiku-20240307",
+        messages=[
+            {"role": "user", "content": "Complete this code: def hello_world():"}
+        ],
+        max_tokens=1,
+        timeout=5,
+    )
+
+
+@pytest.mark.asyncio
+async def test_check_fireworks_available(mock_client: MagicMock):
+    await check_fireworks_available(
+        Mock(return_value=mock_client), model="qwen", timeout_s=5
+    )
+
+    mock_client.completions.create.assert_awaited_once_with(
+        model="qwen", prompt="def hello_world():", max_tokens=1, timeout=5
+    )
+
+
+@pytest.mark.asyncio
+async def test_check_client_not_configured():
+    with pytest.raises(ValueError, match="the anthropic client isn't configured"):
+        await check_anthropic_available(Mock(return_value=None), timeout_s=5)
+
+
+@pytest.fixture
+def probe_params(mock_client: MagicMock):
+    return {
+        "grpc_client_vertex": Mock(return_value=mock_client),
+        "http_client_anthropic": Mock(return_value=mock_client),
+        "async_fireworks_client": Mock(return_value=mock_client),
+        "vertex_project": "gcp",
+        "vertex_location": "us",
+        "model_endpoints": {
+            "fireworks_current_region_endpoint": {
+                "endpoint": "https://fireworks",
+                "identifier": "qwen",
+            }
+        },
+        "timeout_s": 5,
+    }
+
+
+@pytest.mark.asyncio
+async def test_build_provider_probes(probe_params: dict, mock_client: MagicMock):
+    probes = build_provider_probes(mock_model_responses=False, **probe_params)
+
+    assert [probe.provider for probe in probes] == [
+        KindModelProvider.VERTEX_AI,
+        KindModelProvider.ANTHROPIC,
+        KindModelProvider.FIREWORKS,
+    ]
+
+    for probe in probes:
+        await probe.check()
+
+    mock_client.predict.assert_awaited_once()
+    mock_client.messages.create.assert_awaited_once()
+    assert mock_client.completions.create.call_args.kwargs["model"] == "qwen"
+
+
+@pytest.mark.asyncio
+async def test_build_provider_probes_mocked(probe_params: dict):
+    probes = build_provider_probes(mock_model_responses=True, **probe_params)
+
+    for probe in probes:
+        await probe.check()
+
+    # The providers aren't called when the model responses are mocked
+    probe_params["grpc_client_vertex"].assert_not_called()
+    probe_params["http_client_anthropic"].assert_not_called()
+    probe_params["async_fireworks_client"].assert_not_called()
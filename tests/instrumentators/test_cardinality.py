@@ -0,0 +1,79 @@
+from unittest import mock
+
+import pytest
+from prometheus_client import CollectorRegistry, Counter, Gauge
+
+from ai_gateway.instrumentators.cardinality import BoundedMetric
+
+
+@pytest.fixture
+def registry():
+    return CollectorRegistry()
+
+
+@pytest.fixture
+def counter(registry):
+    return Counter(
+        "test_requests", "Test requests", ["lang", "user_id"], registry=registry
+    )
+
+
+def _samples(registry, name) -> dict[tuple, float]:
+    return {
+        tuple(sorted(sample.labels.items())): sample.value
+        for metric in registry.collect()
+        for sample in metric.samples
+        if sample.name == name
+    }
+
+
+class TestBoundedMetric:
+    @mock.patch("ai_gateway.instrumentators.cardinality.METRIC_LABEL_VALUES_DROPPED")
+    def test_allowed_values(self, mock_dropped, registry, counter):
+        metric = BoundedMetric(counter, allowed_values={"lang": ["python", "ruby"]})
+
+        metric.labels(lang="python", user_id="1").inc()
+        metric.labels(lang="cobol", user_id="1").inc()
+        metric.labels(lang=None, user_id="1").inc()
+
+        assert _samples(registry, "test_requests_total") == {
+            (("lang", "python"), ("user_id", "1")): 1.0,
+            (("lang", "other"), ("user_id", "1")): 1.0,
+            (("lang", "None"), ("user_id", "1")): 1.0,
+        }
+        assert mock_dropped.mock_calls == [
+            mock.call.labels(metric="test_requests", label="lang"),
+            mock.call.labels().inc(),
+        ]
+
+    @mock.patch("ai_gateway.instrumentators.cardinality.METRIC_LABEL_VALUES_DROPPED")
+    def test_capped_labels(self, mock_dropped, registry, counter):
+        metric = BoundedMetric(counter, capped_labels=["user_id"], max_values=2)
+
+        for user_id in ["1", "2", "3", "1", "4"]:
+            metric.labels(lang="python", user_id=user_id).inc()
+
+        assert _samples(registry, "test_requests_total") == {
+            (("lang", "python"), ("user_id", "1")): 2.0,
+            (("lang", "python"), ("user_id", "2")): 1.0,
+            (("lang", "python"), ("user_id", "other")): 2.0,
+        }
+        assert mock_dropped.labels.call_count == 2
+        mock_dropped.labels.assert_called_with(metric="test_requests", label="user_id")
+
+    def test_capped_labels_gauge(self, registry):
+        metric = BoundedMetric(
+            Gauge("test_in_flight", "In flight", ["model_name"], registry=registry),
+            capped_labels=["model_name"],
+            max_values=1,
+        )
+
+        metric.labels(model_name="first").inc()
+        metric.labels(model_name="second").inc()
+        metric.labels(model_name="first").dec()
+        metric.labels(model_name="second").dec()
+
+        assert _samples(registry, "test_in_flight") == {
+            (("model_name", "first"),): 0.0,
+            (("model_name", "other"),): 0.0,
+        }
@@ -0,0 +1,132 @@
+from unittest import mock
+
+import pytest
+from prometheus_client import CollectorRegistry, Counter, Gauge
+
+from ai_gateway.code_suggestions.processing.typing import CodeContent, Prompt
+from ai_gateway.instrumentators.memory import (
+    KEY_TYPES,
+    MemoryProfiler,
+    metric_series_counts,
+    object_counts,
+    process_memory,
+)
+
+SMAPS_ROLLUP = """561ae2cd0000-7ffde2ed4000 ---p 00000000 00:00 0    [rollup]
+Rss:                1408 kB
+Pss:                 482 kB
+Shared_Clean:       1268 kB
+Shared_Dirty:          4 kB
+Private_Clean:        40 kB
+Private_Dirty:       100 kB
+Swap:                  0 kB
+"""
+
+
+@mock.patch("ai_gateway.instrumentators.memory.Path.read_text")
+def test_process_memory(mock_read_text):
+    mock_read_text.return_value = SMAPS_ROLLUP
+
+    assert process_memory(123) == {
+        "rss_bytes": 1408 * 1024,
+        "pss_bytes": 482 * 1024,
+        "shared_bytes": 1272 * 1024,
+        "private_bytes": 140 * 1024,
+        "swap_bytes": 0,
+    }
+
+
+@mock.patch(
+    "ai_gateway.instrumentators.memory.Path.read_text",
+    side_effect=FileNotFoundError,
+)
+def test_process_memory_unavailable(mock_read_text):
+    assert not process_memory(123)
+
+
+@pytest.fixture
+def profiler():
+    profiler = MemoryProfiler(enabled=True, max_snapshots=2, route_sample_rate=1.0)
+    yield profiler
+    profiler.clear()
+
+
+def test_object_counts():
+    contents = [CodeContent(text="a", length_tokens=1) for _ in range(3)]
+    prompt = Prompt(prefix="prefix", metadata=None)
+
+    counts = object_counts(
+        [
+            "ai_gateway.code_suggestions.processing.typing.CodeContent",
+            "ai_gateway.code_suggestions.processing.typing.Prompt",
+            "not_loaded.Type",
+        ]
+    )
+
+    assert counts["ai_gateway.code_suggestions.processing.typing.CodeContent"] >= 3
+    assert counts["ai_gateway.code_suggestions.processing.typing.Prompt"] >= 1
+    assert counts["not_loaded.Type"] == 0
+    assert contents and prompt
+
+
+def test_metric_series_counts():
+    registry = CollectorRegistry()
+    counter = Counter("test_requests", "Requests", ["route"], registry=registry)
+    for route in ["a", "b", "c"]:
+        counter.labels(route=route).inc()
+    Gauge("test_in_flight", "In flight", registry=registry).set(1)
+
+    assert metric_series_counts(registry, limit=1) == {"test_requests": 6}
+
+
+def test_profiler_snapshots(profiler):
+    assert not profiler.tracing
+
+    base_id, _ = profiler.take_snapshot()
+    assert profiler.tracing
+
+    retained = [bytearray(100_000) for _ in range(10)]
+    target_id, _ = profiler.take_snapshot()
+
+    diff = profiler.diff(base_id, target_id, limit=1)
+    assert diff[0]["size_diff_bytes"] >= 1_000_000
+    assert diff[0]["traceback"][0].startswith(__file__)
+    assert profiler.top(target_id, limit=1)[0]["size_bytes"] >= 1_000_000
+
+    # Only the last snapshots are kept
+    profiler.take_snapshot()
+    assert list(profiler.snapshots) == [target_id, target_id + 1]
+
+    profiler.clear()
+    assert not profiler.tracing
+    assert not profiler.snapshots
+    assert retained
+
+
+def test_profiler_routes(profiler):
+    assert not profiler.should_sample()
+
+    profiler.take_snapshot()
+    assert profiler.should_sample()
+
+    profiler.record_route("/v2/code/completions", 100)
+    profiler.record_route("/v2/code/completions", 300)
+
+    summary = profiler.summary()
+
+    assert summary["routes"] == {
+        "/v2/code/completions": {"samples": 2, "total_bytes": 400, "max_bytes": 300}
+    }
+    assert summary["tracemalloc"]["tracing"]
+    assert len(summary["tracemalloc"]["snapshots"]) == 1
+    assert set(summary["objects"]) == set(KEY_TYPES)
+
+
+def test_profiler_disabled():
+    profiler = MemoryProfiler(route_sample_rate=1.0)
+
+    try:
+        profiler.take_snapshot()
+        assert not profiler.should_sample()
+    finally:
+        profiler.clear()
@@ -1,8 +1,17 @@
+import asyncio
 from unittest import mock
 
 import pytest
 
+from ai_gateway.instrumentators.base import metric_children
 from ai_gateway.instrumentators.model_requests import ModelRequestInstrumentator
+from ai_gateway.models.circuit_breaker import CircuitBreakerOpenError
+
+
+@pytest.fixture(autouse=True)
+def clear_metric_children():
+    # The children of the mocked metrics must not be shared between tests
+    metric_children.cache_clear()
 
 
 class TestWatchContainer:
@@ -29,10 +38,8 @@ class TestWatchContainer:
 
         container.finish()
 
-        assert mock_gauges.mock_calls == [
-            mock.call(model_engine="anthropic", model_name="claude"),
-            mock.call().dec(),
-        ]
+        # The gauge child resolved by `start` is reused
+        assert mock_gauges.mock_calls == [mock.call().dec()]
 
         assert mock_counters.mock_calls == [
             mock.call(
@@ -122,10 +129,7 @@ class TestModelRequestInstrumentator:
 
                 raise ValueError("broken")
 
-        assert mock_gauges.mock_calls == [
-            mock.call(model_engine="anthropic", model_name="claude"),
-            mock.call().dec(),
-        ]
+        assert mock_gauges.mock_calls == [mock.call().dec()]
         assert mock_counters.mock_calls == [
             mock.call(
                 model_engine="anthropic",
@@ -147,6 +151,142 @@ class TestModelRequestInstrumentator:
             mock.call().observe(1),
         ]
 
+    @mock.patch("prometheus_client.Gauge.labels")
+    @mock.patch("prometheus_client.Counter.labels")
+    @mock.patch("prometheus_client.Histogram.labels")
+    @mock.patch("time.perf_counter")
+    def test_watch_with_cancellation(
+        self, time_counter, mock_histograms, mock_counters, mock_gauges
+    ):
+        time_counter.side_effect = [1, 2]
+
+        instrumentator = ModelRequestInstrumentator(
+            model_engine="anthropic", model_name="claude", concurrency_limit=None
+        )
+
+        with pytest.raises(asyncio.CancelledError):
+            with instrumentator.watch(stream=True):
+                mock_gauges.reset_mock()
+
+                raise asyncio.CancelledError()
+
+        assert mock_gauges.mock_calls == [mock.call().dec()]
+        assert mock_counters.mock_calls == [
+            mock.call(
+                model_engine="anthropic",
+                model_name="claude",
+                error="cancelled",
+                streaming="yes",
+                feature_category="unknown",
+            ),
+            mock.call().inc(),
+        ]
+        assert mock_histograms.mock_calls == [
+            mock.call(
+                model_engine="anthropic",
+                model_name="claude",
+                error="cancelled",
+                streaming="yes",
+                feature_category="unknown",
+            ),
+            mock.call().observe(1),
+        ]
+
+    @mock.patch("prometheus_client.Gauge.labels")
+    @mock.patch("time.perf_counter")
+    def test_watch_with_circuit_breaker(self, time_counter, mock_gauges):
+        time_counter.side_effect = [1, 2]
+        circuit_breaker = mock.Mock()
+
+        instrumentator = ModelRequestInstrumentator(
+            model_engine="anthropic",
+            model_name="claude",
+            concurrency_limit=None,
+            circuit_breaker=circuit_breaker,
+        )
+
+        with instrumentator.watch():
+            circuit_breaker.before_request.assert_called_once()
+
+        circuit_breaker.record_success.assert_called_once_with(
+            1, probe=circuit_breaker.before_request.return_value
+        )
+
+    @mock.patch("prometheus_client.Gauge.labels")
+    def test_watch_with_circuit_breaker_error(self, mock_gauges):
+        circuit_breaker = mock.Mock()
+        error = ValueError("broken")
+
+        instrumentator = ModelRequestInstrumentator(
+            model_engine="anthropic",
+            model_name="claude",
+            concurrency_limit=None,
+            circuit_breaker=circuit_breaker,
+        )
+
+        with pytest.raises(ValueError):
+            with instrumentator.watch():
+                raise error
+
+        circuit_breaker.record_failure.assert_called_once_with(
+            error, probe=circuit_breaker.before_request.return_value
+        )
+
+    @mock.patch("prometheus_client.Gauge.labels")
+    def test_watch_with_circuit_breaker_open(self, mock_gauges):
+        circuit_breaker = mock.Mock()
+        circuit_breaker.before_request.side_effect = CircuitBreakerOpenError(
+            "anthropic", "claude"
+        )
+
+        instrumentator = ModelRequestInstrumentator(
+            model_engine="anthropic",
+            model_name="claude",
+            concurrency_limit=None,
+            circuit_breaker=circuit_breaker,
+        )
+
+        with pytest.raises(CircuitBreakerOpenError):
+            with instrumentator.watch():
+                pass
+
+        mock_gauges.assert_not_called()
+
+    @mock.patch("prometheus_client.Counter.labels")
+    def test_register_hedged_request(self, mock_counters):
+        instrumentator = ModelRequestInstrumentator(
+            model_engine="anthropic", model_name="claude", concurrency_limit=None
+        )
+
+        instrumentator.register_hedged_request(winner="hedge")
+
+        assert mock_counters.mock_calls == [
+            mock.call(model_engine="anthropic", model_name="claude", winner="hedge"),
+            mock.call().inc(),
+        ]
+
+    @mock.patch("prometheus_client.Counter.labels")
+    def test_register_token_usage(self, mock_counters):
+        instrumentator = ModelRequestInstrumentator(
+            model_engine="anthropic", model_name="claude", concurrency_limit=None
+        )
+
+        instrumentator.register_token_usage(
+            input_tokens=10,
+            output_tokens=20,
+            cache_read_input_tokens=1000,
+            cache_creation_input_tokens=0,
+        )
+
+        assert mock_counters.mock_calls == [
+            mock.call(model_engine="anthropic", model_name="claude", type="input"),
+            mock.call().inc(10),
+            mock.call(model_engine="anthropic", model_name="claude", type="output"),
+            mock.call().inc(20),
+            mock.call(model_engine="anthropic", model_name="claude", type="cache_read"),
+            mock.call().inc(1000),
+        ]
+
     @mock.patch("prometheus_client.Gauge.labels")
     def test_watch_with_limit(self, mock_gauges):
         instrumentator = ModelRequestInstrumentator(
@@ -183,10 +323,7 @@ class TestModelRequestInstrumentator:
 
             watcher.finish()
 
-            assert mock_gauges.mock_calls == [
-                mock.call(model_engine="anthropic", model_name="claude"),
-                mock.call().dec(),
-            ]
+            assert mock_gauges.mock_calls == [mock.call().dec()]
             assert mock_counters.mock_calls == [
                 mock.call(
                     model_engine="anthropic",
@@ -207,3 +344,17 @@ class TestModelRequestInstrumentator:
                 ),
                 mock.call().observe(1),
             ]
+
+    @mock.patch("prometheus_client.Counter.labels")
+    def test_label_children_are_shared(self, mock_counters):
+        for _ in range(2):
+            instrumentator = ModelRequestInstrumentator(
+                model_engine="anthropic", model_name="claude", concurrency_limit=None
+            )
+            instrumentator.register_hedged_request(winner="hedge")
+
+        assert mock_counters.mock_calls == [
+            mock.call(model_engine="anthropic", model_name="claude", winner="hedge"),
+            mock.call().inc(),
+            mock.call().inc(),
+        ]
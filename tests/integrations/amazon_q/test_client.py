@@ -215,7 +215,7 @@ class TestAmazonQClient:
     @pytest.fixture
     def mock_q_client(self):
         with patch(
-            "ai_gateway.integrations.amazon_q.client.q_boto3.client"
+            "ai_gateway.integrations.amazon_q.client.q_developer_boto3.boto3.client"
         ) as mock_client:
             yield mock_client.return_value
 
@@ -238,7 +238,7 @@ class TestAmazonQClient:
 
     def test_init_creates_client_with_correct_params(self, mock_credentials):
         with patch(
-            "ai_gateway.integrations.amazon_q.client.q_boto3.client"
+            "ai_gateway.integrations.amazon_q.client.q_developer_boto3.boto3.client"
         ) as mock_client:
             AmazonQClient(
                 url="https://q-api.example.com",
@@ -0,0 +1,177 @@
+from unittest.mock import patch
+
+import pytest
+
+from ai_gateway.config import ConfigCircuitBreaker
+from ai_gateway.models import AnthropicAPIStatusError
+from ai_gateway.models.circuit_breaker import (
+    CIRCUIT_BREAKER_STATE,
+    CircuitBreaker,
+    CircuitBreakerOpenError,
+    CircuitBreakerRegistry,
+    CircuitState,
+)
+
+
+@pytest.fixture
+def config():
+    return ConfigCircuitBreaker(
+        enabled=True,
+        window_size=4,
+        minimum_requests=2,
+        failure_rate_threshold=0.5,
+        slow_request_duration_s=5.0,
+        slow_request_rate_threshold=1.0,
+        open_duration_s=30.0,
+        half_open_max_requests=1,
+        probe_timeout_s=60.0,
+    )
+
+
+@pytest.fixture
+def breaker(config):
+    return CircuitBreaker("anthropic", "claude", config)
+
+
+def _state_gauge_value() -> float:
+    return CIRCUIT_BREAKER_STATE.labels(
+        model_engine="anthropic", model_name="claude"
+    )._value.get()
+
+
+class TestCircuitBreaker:
+    def test_closed_below_minimum_requests(self, breaker):
+        breaker.before_request()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitState.CLOSED
+        breaker.before_request()
+
+    def test_open_on_failure_rate(self, breaker):
+        breaker.record_success(1.0)
+        breaker.record_failure()
+
+        assert breaker.state == CircuitState.OPEN
+        assert _state_gauge_value() == CircuitState.OPEN
+
+        with pytest.raises(CircuitBreakerOpenError):
+            breaker.before_request()
+
+    def test_open_on_slow_request_rate(self, breaker):
+        breaker.record_success(6.0)
+        breaker.record_success(7.0)
+
+        assert breaker.state == CircuitState.OPEN
+
+    def test_client_errors_are_not_failures(self, breaker):
+        AnthropicAPIStatusError.code = 400
+        breaker.record_failure(AnthropicAPIStatusError("bad request"))
+        breaker.record_failure(AnthropicAPIStatusError("bad request"))
+
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_rate_limiting_is_failure(self, breaker):
+        AnthropicAPIStatusError.code = 429
+        breaker.record_failure(AnthropicAPIStatusError("rate limited"))
+        breaker.record_failure(AnthropicAPIStatusError("rate limited"))
+
+        assert breaker.state == CircuitState.OPEN
+
+    @pytest.mark.parametrize(
+        ("probe_failed", "expected_state"),
+        [(False, CircuitState.CLOSED), (True, CircuitState.OPEN)],
+    )
+    def test_half_open_probe(self, breaker, probe_failed, expected_state):
+        with patch("time.monotonic", return_value=100.0):
+            breaker.record_failure()
+            breaker.record_failure()
+
+        with patch("time.monotonic", return_value=131.0):
+            probe = breaker.before_request()
+
+            assert probe is not None
+            assert breaker.state == CircuitState.HALF_OPEN
+            assert _state_gauge_value() == CircuitState.HALF_OPEN
+
+            # Only one probe is allowed at a time
+            with pytest.raises(CircuitBreakerOpenError):
+                breaker.before_request()
+
+            if probe_failed:
+                breaker.record_failure(probe=probe)
+            else:
+                breaker.record_success(1.0, probe=probe)
+
+        assert breaker.state == expected_state
+
+    def test_half_open_ignores_requests_that_are_not_probes(self, breaker):
+        with patch("time.monotonic", return_value=100.0):
+            breaker.record_failure()
+            breaker.record_failure()
+
+        with patch("time.monotonic", return_value=131.0):
+            breaker.before_request()
+            # Started before the circuit opened
+            breaker.record_failure()
+
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.probes_in_flight == 1
+
+    def test_release_frees_probe(self, breaker):
+        with patch("time.monotonic", return_value=100.0):
+            breaker.record_failure()
+            breaker.record_failure()
+
+        with patch("time.monotonic", return_value=131.0):
+            probe = breaker.before_request()
+            breaker.release(probe)
+            breaker.before_request()
+
+        assert breaker.state == CircuitState.HALF_OPEN
+
+    def test_probe_expires(self, breaker):
+        with patch("time.monotonic", return_value=100.0):
+            breaker.record_failure()
+            breaker.record_failure()
+
+        with patch("time.monotonic", return_value=131.0):
+            expired_probe = breaker.before_request()
+
+        with patch("time.monotonic", return_value=190.0):
+            with pytest.raises(CircuitBreakerOpenError):
+                breaker.before_request()
+
+        with patch("time.monotonic", return_value=191.0):
+            probe = breaker.before_request()
+
+            # The outcome of the expired probe comes too late to count
+            breaker.record_failure(probe=expired_probe)
+            assert breaker.state == CircuitState.HALF_OPEN
+
+            breaker.record_success(1.0, probe=probe)
+
+        assert breaker.state == CircuitState.CLOSED
+
+
+class TestCircuitBreakerRegistry:
+    def test_disabled(self, config):
+        config.enabled = False
+        registry = CircuitBreakerRegistry(config)
+
+        assert registry.for_model("anthropic", "claude") is None
+
+    def test_for_model(self, config):
+        registry = CircuitBreakerRegistry(config)
+
+        breaker = registry.for_model("anthropic", "claude")
+
+        assert breaker is registry.for_model("anthropic", "claude")
+        assert breaker is not registry.for_model("anthropic", "claude-2.1")
+
+    def test_max_breakers(self, config):
+        registry = CircuitBreakerRegistry(config, max_breakers=1)
+
+        breaker = registry.for_model("litellm", "model-1")
+
+        assert registry.for_model("litellm", "model-2") is None
+        assert registry.for_model("litellm", "model-1") is breaker
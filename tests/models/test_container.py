@@ -7,6 +7,7 @@ from dependency_injector import containers, providers
 
 from ai_gateway.models.container import (
     _init_anthropic_proxy_client,
+    _init_fallback_model,
     _init_vertex_ai_proxy_client,
     _init_vertex_grpc_client,
 )
@@ -149,3 +150,22 @@ async def test_container(mock_container: containers.DeclarativeContainer):
 
     assert isinstance(models.anthropic_proxy_client(), AnthropicProxyClient)
     assert isinstance(models.vertex_ai_proxy_client(), VertexAIProxyClient)
+
+
+@pytest.mark.parametrize(
+    ("engine", "name", "expected_name"),
+    [
+        (None, None, None),
+        ("vertex-ai", None, None),
+        ("vertex-ai", "code-gecko@002", "code-gecko@002"),
+    ],
+)
+def test_init_fallback_model(engine, name, expected_name):
+    models = {"vertex-ai": lambda name: name}
+
+    assert _init_fallback_model(engine, name, models) == expected_name
+
+
+def test_init_fallback_model_unsupported_engine():
+    with pytest.raises(ValueError, match="unsupported fallback model engine"):
+        _init_fallback_model("unknown", "model", {})
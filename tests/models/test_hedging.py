@@ -0,0 +1,158 @@
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from ai_gateway.instrumentators.model_requests import ModelRequestInstrumentator
+from ai_gateway.models.hedging import HedgingPolicy, HedgingPolicyRegistry
+
+
+@pytest.fixture
+def policy():
+    policy = HedgingPolicy(
+        percentile=0.5,
+        min_delay_s=0.01,
+        max_delay_s=1.0,
+        max_extra_rate=1.0,
+        window_size=10,
+        min_samples=2,
+    )
+    policy.record_latency(0.02)
+    policy.record_latency(0.02)
+
+    return policy
+
+
+async def _respond(text: str, delay: float) -> str:
+    await asyncio.sleep(delay)
+    return text
+
+
+async def _fail(ex: Exception, delay: float):
+    await asyncio.sleep(delay)
+    raise ex
+
+
+class TestHedgingPolicy:
+    @pytest.mark.parametrize(
+        ("latencies", "expected_delay"),
+        [
+            ([], None),
+            ([0.5], None),
+            ([0.2, 0.4, 0.6], 0.4),
+            ([0.001, 0.002], 0.01),
+            ([5.0, 6.0], 1.0),
+        ],
+    )
+    def test_delay(self, latencies, expected_delay):
+        policy = HedgingPolicy(
+            percentile=0.5,
+            min_delay_s=0.01,
+            max_delay_s=1.0,
+            max_extra_rate=0.05,
+            window_size=10,
+            min_samples=2,
+        )
+        for latency in latencies:
+            policy.record_latency(latency)
+
+        assert policy.delay() == expected_delay
+
+    @pytest.mark.asyncio
+    async def test_run_without_hedging(self, policy):
+        instrumentator = Mock(spec=ModelRequestInstrumentator)
+        hedge_call = Mock()
+
+        result = await policy.run(
+            lambda: _respond("primary", 0),
+            hedge_call=hedge_call,
+            instrumentator=instrumentator,
+        )
+
+        assert result == "primary"
+        hedge_call.assert_not_called()
+        instrumentator.register_hedged_request.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_run_hedge_wins(self, policy):
+        instrumentator = Mock(spec=ModelRequestInstrumentator)
+        primary = asyncio.Event()
+
+        async def _primary():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                primary.set()
+                raise
+
+        result = await policy.run(
+            _primary,
+            hedge_call=lambda: _respond("hedge", 0),
+            instrumentator=instrumentator,
+        )
+        await asyncio.sleep(0)
+
+        assert result == "hedge"
+        assert primary.is_set()
+        instrumentator.register_hedged_request.assert_called_once_with(winner="hedge")
+
+    @pytest.mark.asyncio
+    async def test_run_hedge_fails(self, policy):
+        instrumentator = Mock(spec=ModelRequestInstrumentator)
+
+        result = await policy.run(
+            lambda: _respond("primary", 0.05),
+            hedge_call=lambda: _fail(ValueError("hedge"), 0),
+            instrumentator=instrumentator,
+        )
+
+        assert result == "primary"
+        instrumentator.register_hedged_request.assert_called_once_with(winner="primary")
+
+    @pytest.mark.asyncio
+    async def test_run_both_fail(self, policy):
+        instrumentator = Mock(spec=ModelRequestInstrumentator)
+
+        with pytest.raises(ValueError, match="primary"):
+            await policy.run(
+                lambda: _fail(ValueError("primary"), 0.05),
+                hedge_call=lambda: _fail(KeyError("hedge"), 0),
+                instrumentator=instrumentator,
+            )
+
+        instrumentator.register_hedged_request.assert_called_once_with(winner="none")
+
+    @pytest.mark.asyncio
+    async def test_run_rate_limited(self, policy):
+        policy.max_extra_rate = 0.0
+        policy.tokens = 0.0
+        hedge_call = Mock()
+
+        result = await policy.run(
+            lambda: _respond("primary", 0.05), hedge_call=hedge_call
+        )
+
+        assert result == "primary"
+        hedge_call.assert_not_called()
+
+
+class TestHedgingPolicyRegistry:
+    @pytest.mark.parametrize("enabled", [True, False])
+    def test_for_model(self, enabled):
+        registry = HedgingPolicyRegistry(
+            enabled=enabled,
+            percentile=0.95,
+            min_delay_s=0.1,
+            max_delay_s=2.0,
+            max_extra_rate=0.05,
+            window_size=100,
+            min_samples=20,
+        )
+
+        policy = registry.for_model("anthropic", "claude")
+
+        if enabled:
+            assert isinstance(policy, HedgingPolicy)
+            assert policy is registry.for_model("anthropic", "claude")
+        else:
+            assert policy is None
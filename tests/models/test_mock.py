@@ -0,0 +1,42 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from ai_gateway.models.mock import AsyncStream, LatencyProfile
+
+
+class TestLatencyProfile:
+    def test_sample_disabled(self):
+        assert LatencyProfile().sample() == 0.0
+
+    def test_sample_deterministic(self):
+        first = LatencyProfile(median_s=0.2, p99_s=1.0, seed=42)
+        second = LatencyProfile(median_s=0.2, p99_s=1.0, seed=42)
+
+        assert [first.sample() for _ in range(10)] == [
+            second.sample() for _ in range(10)
+        ]
+
+    def test_sample_distribution(self):
+        profile = LatencyProfile(median_s=0.2, p99_s=1.0, seed=42)
+        samples = sorted(profile.sample() for _ in range(10_000))
+
+        assert samples[5_000] == pytest.approx(0.2, rel=0.1)
+        assert samples[9_900] == pytest.approx(1.0, rel=0.1)
+
+    @pytest.mark.asyncio
+    @patch("asyncio.sleep", new_callable=AsyncMock)
+    async def test_wait_first_token(self, mock_sleep):
+        profile = LatencyProfile(median_s=0.2, p99_s=0.2, seed=42)
+
+        await profile.wait_first_token()
+
+        mock_sleep.assert_awaited_once_with(pytest.approx(0.2))
+
+    @pytest.mark.asyncio
+    @patch("asyncio.sleep", new_callable=AsyncMock)
+    async def test_stream_chunk_delay(self, mock_sleep):
+        stream = AsyncStream(["a", "b"], latency=LatencyProfile(chunk_delay_s=0.01))
+
+        assert [chunk async for chunk in stream] == ["a", "b"]
+        assert mock_sleep.await_count == 2
@@ -0,0 +1,115 @@
+from typing import Optional
+
+import pytest
+from google.cloud.aiplatform.gapic import PredictRequest, PredictResponse
+
+from ai_gateway.models.vertex_predict import (
+    Prediction,
+    PredictParameters,
+    PredictResult,
+    build_predict_request,
+    parse_predict_response,
+)
+from benchmarks.vertex_predict import (
+    build_predict_request_from_dict,
+    parse_predict_response_from_dict,
+)
+
+ENDPOINT = "projects/test/locations/some-location/publishers/google/models/code-gecko"
+
+
+@pytest.mark.parametrize(
+    ("instance", "parameters"),
+    [
+        (
+            {"prefix": "def hello", "suffix": "\n"},
+            PredictParameters.from_args(0.2, 64, 0.95, 40, 1, ["\n\n"]),
+        ),
+        (
+            {"prefix": "déf héllo", "suffix": None},
+            PredictParameters.from_args(0.5, 32, 0.9, 10, 8),
+        ),
+        ({"content": "def hello"}, PredictParameters.from_args(0.2, 2048, 0.95, 40, 1)),
+    ],
+)
+def test_build_predict_request(
+    instance: dict[str, Optional[str]], parameters: PredictParameters
+):
+    request = build_predict_request(ENDPOINT, instance, parameters)
+    expected_request = build_predict_request_from_dict(ENDPOINT, instance, parameters)
+
+    assert PredictRequest.pb(request) == PredictRequest.pb(expected_request)
+
+
+def test_build_predict_request_parameters():
+    parameters = PredictParameters.from_args(0.2, 64, 0.95, 40, 10, ["\n\n"])
+
+    first = build_predict_request(ENDPOINT, {"prefix": "a"}, parameters)
+    second = build_predict_request(ENDPOINT, {"prefix": "b"}, parameters)
+
+    assert parameters.candidate_count == 4
+    assert PredictRequest.pb(first).parameters == PredictRequest.pb(second).parameters
+
+    # Requests get a copy of the shared parameters
+    PredictRequest.pb(first).parameters.struct_value.fields["topK"].number_value = 1
+    assert (
+        PredictRequest.pb(second).parameters.struct_value.fields["topK"].number_value
+        == 40
+    )
+
+
+@pytest.mark.parametrize(
+    ("predictions", "metadata", "expected_result"),
+    [
+        ([], None, PredictResult(predictions=[])),
+        (
+            [
+                {
+                    "content": "def awesome_func",
+                    "score": -1.5,
+                    "safetyAttributes": {
+                        "blocked": True,
+                        "categories": ["Violent"],
+                        "errors": [234],
+                        "scores": [1.0],
+                    },
+                },
+                {"content": ""},
+            ],
+            {
+                "tokenMetadata": {
+                    "inputTokenCount": {"totalTokens": 12},
+                    "outputTokenCount": {"totalTokens": 3},
+                }
+            },
+            PredictResult(
+                predictions=[
+                    Prediction(
+                        content="def awesome_func",
+                        score=-1.5,
+                        safety_attributes={
+                            "blocked": True,
+                            "categories": ["Violent"],
+                            "errors": [234.0],
+                            "scores": [1.0],
+                        },
+                    ),
+                    Prediction(content="", score=None, safety_attributes={}),
+                ],
+                input_tokens=12,
+                output_tokens=3,
+            ),
+        ),
+    ],
+)
+def test_parse_predict_response(
+    predictions: list[dict], metadata: Optional[dict], expected_result: PredictResult
+):
+    response = PredictResponse()
+    for prediction in predictions:
+        response.predictions.append(prediction)
+    if metadata:
+        response.metadata = metadata
+
+    assert parse_predict_response(response) == expected_result
+    assert parse_predict_response_from_dict(response) == expected_result
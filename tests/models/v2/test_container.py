@@ -8,7 +8,7 @@ from ai_gateway.models.v2.container import _litellm_factory
 
 
 @mock.patch("ai_gateway.models.v2.container.ChatLiteLLM")
-@mock.patch("ai_gateway.models.v2.container.AsyncHTTPHandler")
+@mock.patch("litellm.llms.custom_httpx.http_handler.AsyncHTTPHandler")
 @pytest.mark.parametrize(
     ("kwargs", "bound"),
     [
@@ -6,14 +6,23 @@ import pytest
 from anthropic import APITimeoutError, AsyncAnthropic
 from gitlab_cloud_connector import GitLabUnitPrimitive
 from langchain_community.chat_models import ChatLiteLLM
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from langchain_core.prompt_values import ChatPromptValue
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import Runnable
+from langchain_core.runnables import Runnable, RunnableLambda
 from litellm.exceptions import Timeout
 from pydantic import HttpUrl
 
 from ai_gateway.models.v2.anthropic_claude import ChatAnthropic
-from ai_gateway.prompts.base import Prompt, model_metadata_to_params
-from ai_gateway.prompts.config.base import PromptParams
+from ai_gateway.prompts.base import (
+    Prompt,
+    _mark_cacheable_prefix,
+    _TokenUsageCallbackHandler,
+    model_metadata_to_params,
+)
+from ai_gateway.prompts.config.base import PromptCaching, PromptConfig, PromptParams
+from ai_gateway.prompts.config.models import ChatAnthropicParams
 from ai_gateway.prompts.typing import Model, ModelMetadata
 
 
@@ -75,6 +84,97 @@ class TestPrompt:
         mock_watcher.afinish.assert_awaited_once()
 
 
+class TestPromptCaching:
+    @pytest.fixture
+    def model_params(self):
+        yield ChatAnthropicParams(model_class_provider="anthropic")
+
+    @pytest.fixture
+    def prompt_config(self, prompt_config: PromptConfig):
+        yield prompt_config.model_copy(
+            update={"prompt_caching": PromptCaching(system=True, history=True)}
+        )
+
+    def test_initialize(self, prompt: Prompt):
+        assert isinstance(prompt.bound.middle[0], RunnableLambda)  # type: ignore[attr-defined]
+
+    @pytest.mark.parametrize(
+        ("caching", "expected_cached"),
+        [
+            (PromptCaching(), []),
+            (PromptCaching(system=True), [0]),
+            (PromptCaching(history=True), [3]),
+            (PromptCaching(system=True, history=True), [0, 3]),
+        ],
+    )
+    def test_mark_cacheable_prefix(
+        self, caching: PromptCaching, expected_cached: list[int]
+    ):
+        prompt_value = ChatPromptValue(
+            messages=[
+                SystemMessage("You are Duo"),
+                HumanMessage("Hi"),
+                AIMessage("Hello"),
+                HumanMessage("What's up?"),
+                AIMessage("Thought:"),
+            ]
+        )
+
+        messages = _mark_cacheable_prefix(caching, prompt_value)
+
+        for i, (actual, expected) in enumerate(
+            zip(messages, prompt_value.to_messages())
+        ):
+            if i in expected_cached:
+                assert actual.content == [
+                    {
+                        "type": "text",
+                        "text": expected.content,
+                        "cache_control": {"type": "ephemeral"},
+                    }
+                ]
+            else:
+                assert actual == expected
+
+
+class TestPromptCachingLiteLLM:
+    @pytest.fixture
+    def prompt_config(self, prompt_config: PromptConfig):
+        yield prompt_config.model_copy(
+            update={"prompt_caching": PromptCaching(system=True, history=True)}
+        )
+
+    def test_initialize(self, prompt: Prompt):
+        # Cache breakpoints are only supported by the Anthropic API
+        assert not prompt.bound.middle  # type: ignore[attr-defined]
+
+
+class TestTokenUsageCallbackHandler:
+    @mock.patch(
+        "ai_gateway.instrumentators.model_requests.ModelRequestInstrumentator.register_token_usage"
+    )
+    def test_on_llm_end(self, mock_register_token_usage: mock.Mock, model: Model):
+        handler = _TokenUsageCallbackHandler(model)
+        message = AIMessage(
+            "Hello",
+            usage_metadata={
+                "input_tokens": 2100,
+                "output_tokens": 20,
+                "total_tokens": 2120,
+                "input_token_details": {"cache_read": 2048, "cache_creation": 0},
+            },
+        )
+
+        handler.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]))
+
+        mock_register_token_usage.assert_called_once_with(
+            input_tokens=52,
+            output_tokens=20,
+            cache_read_input_tokens=2048,
+            cache_creation_input_tokens=0,
+        )
+
+
 @pytest.mark.skipif(
     # pylint: disable=direct-environment-variable-reference
     os.getenv("REAL_AI_REQUEST") is None,
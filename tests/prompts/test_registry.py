@@ -287,6 +287,35 @@ class TestLocalPromptRegistry:
 
         assert registry.prompts_registered == prompts_registered
 
+    def test_from_snapshot(
+        self,
+        mock_fs: FakeFilesystem,
+        model_factories: dict[ModelClassProvider, TypeModelFactory],
+        prompts_registered: dict[str, PromptRegistered],
+    ):
+        LocalPromptRegistry.dump_snapshot("/prompts.json")
+
+        # Only the snapshot is read
+        mock_fs.remove_object(
+            str(
+                Path(__file__).parent.parent.parent
+                / "ai_gateway"
+                / "prompts"
+                / "definitions"
+            )
+        )
+
+        registry_from_snapshot = LocalPromptRegistry.from_local_yaml(
+            class_overrides={
+                "chat/react": MockPromptClass,
+            },
+            model_factories=model_factories,
+            default_prompts={},
+            snapshot_path="/prompts.json",
+        )
+
+        assert registry_from_snapshot.prompts_registered == prompts_registered
+
     @pytest.mark.parametrize(
         (
             "prompt_id",
@@ -0,0 +1,72 @@
+from unittest.mock import patch
+
+import pytest
+
+from ai_gateway.rate_limiting import InMemoryRateLimitBackend
+
+
+@pytest.fixture
+def clock():
+    with patch("ai_gateway.rate_limiting.backend.time.monotonic") as mock_monotonic:
+        mock_monotonic.return_value = 100.0
+        yield mock_monotonic
+
+
+@pytest.mark.asyncio
+async def test_consume_refills(clock):
+    backend = InMemoryRateLimitBackend()
+
+    assert await backend.consume("key", rate_per_s=2, burst=2) == 0
+    assert await backend.consume("key", rate_per_s=2, burst=2) == 0
+    assert await backend.consume("key", rate_per_s=2, burst=2) == 0.5
+
+    clock.return_value = 100.25
+    assert await backend.consume("key", rate_per_s=2, burst=2) == 0.25
+
+    clock.return_value = 100.5
+    assert await backend.consume("key", rate_per_s=2, burst=2) == 0
+
+    # The bucket doesn't hold more than the burst after being idle
+    clock.return_value = 200.0
+    assert await backend.consume("key", rate_per_s=2, burst=2, tokens=2) == 0
+    assert await backend.consume("key", rate_per_s=2, burst=2) == 0.5
+
+
+@pytest.mark.asyncio
+async def test_consume_more_than_burst(clock):
+    backend = InMemoryRateLimitBackend()
+
+    assert await backend.consume("key", rate_per_s=2, burst=2, tokens=3) == float("inf")
+
+
+@pytest.mark.asyncio
+async def test_consume_evicts_least_recently_used(clock):
+    backend = InMemoryRateLimitBackend(max_keys=2)
+
+    await backend.consume("a", rate_per_s=1, burst=1)
+    await backend.consume("b", rate_per_s=1, burst=1)
+    await backend.consume("a", rate_per_s=1, burst=1)
+
+    clock.return_value = 101.0
+    await backend.consume("c", rate_per_s=1, burst=1)
+
+    assert list(backend._buckets) == ["a", "c"]
+
+    # The evicted bucket starts again full
+    clock.return_value = 102.0
+    assert await backend.consume("b", rate_per_s=1, burst=1) == 0
+
+
+@pytest.mark.asyncio
+async def test_consume_keeps_refilling_buckets(clock):
+    backend = InMemoryRateLimitBackend(max_keys=2)
+
+    await backend.consume("a", rate_per_s=1, burst=1)
+    await backend.consume("b", rate_per_s=2, burst=1)
+
+    # New keys wait for the least recently used bucket to refill
+    clock.return_value = 100.25
+    assert await backend.consume("c", rate_per_s=1, burst=1) == 0.75
+    assert list(backend._buckets) == ["a", "b"]
+
+    assert await backend.consume("a", rate_per_s=1, burst=1) == 0.75
@@ -0,0 +1,112 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from ai_gateway.rate_limiting import (
+    RateLimiter,
+    RateLimitExceeded,
+    RateLimitRule,
+    RateLimitScope,
+)
+from ai_gateway.scheduling import Tenant
+
+TENANT = Tenant(instance_id="instance-1", global_user_id="user-1")
+
+
+@pytest.fixture
+def backend():
+    backend = AsyncMock()
+    backend.consume.return_value = 0.0
+    return backend
+
+
+@pytest.mark.asyncio
+async def test_check_rules(backend):
+    limiter = RateLimiter(
+        backend=backend,
+        instance_limits={"default": RateLimitRule(rate_per_s=10, burst=20)},
+        user_limits={
+            "default": RateLimitRule(rate_per_s=1, burst=5),
+            "complete_code": RateLimitRule(rate_per_s=3, burst=10),
+        },
+    )
+
+    await limiter.check("complete_code", TENANT)
+    await limiter.check("duo_chat", TENANT)
+
+    assert [call.args for call in backend.consume.call_args_list] == [
+        ("user:complete_code:user-1", 3, 10),
+        ("instance:complete_code:instance-1", 10, 20),
+        ("user:duo_chat:user-1", 1, 5),
+        ("instance:duo_chat:instance-1", 10, 20),
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("tenant", "user_limits", "expected_keys"),
+    [
+        (TENANT, {"duo_chat": RateLimitRule(1, 1)}, []),
+        (TENANT, {"default": RateLimitRule(1, 1)}, ["user:complete_code:user-1"]),
+        (
+            Tenant(instance_id="instance-1", client_id="subject-1"),
+            {"default": RateLimitRule(1, 1)},
+            ["user:complete_code:client:subject-1"],
+        ),
+        (
+            Tenant(client_id="127.0.0.1"),
+            {"default": RateLimitRule(1, 1)},
+            ["user:complete_code:client:127.0.0.1"],
+        ),
+        (
+            Tenant(),
+            {"default": RateLimitRule(1, 1)},
+            ["user:complete_code:client:unknown"],
+        ),
+    ],
+)
+async def test_check_keys(backend, tenant, user_limits, expected_keys):
+    limiter = RateLimiter(backend=backend, user_limits=user_limits)
+
+    await limiter.check("complete_code", tenant)
+
+    assert [call.args[0] for call in backend.consume.call_args_list] == expected_keys
+
+
+@pytest.mark.asyncio
+async def test_check_exceeded(backend):
+    backend.consume.side_effect = [0.0, 1.2]
+    limiter = RateLimiter(
+        backend=backend,
+        instance_limits={"default": RateLimitRule(rate_per_s=1, burst=1)},
+        user_limits={"default": RateLimitRule(rate_per_s=1, burst=1)},
+    )
+
+    with pytest.raises(RateLimitExceeded) as ex:
+        await limiter.check("complete_code", TENANT)
+
+    assert ex.value.scope == RateLimitScope.INSTANCE
+    assert ex.value.retry_after == "2"
+
+
+@pytest.mark.asyncio
+async def test_check_disabled(backend):
+    limiter = RateLimiter(
+        backend=backend,
+        user_limits={"default": RateLimitRule(rate_per_s=1, burst=1)},
+        enabled=False,
+    )
+
+    await limiter.check("complete_code", TENANT)
+
+    backend.consume.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    ("retry_after_s", "expected_retry_after"),
+    [(0.1, "1"), (2.0, "2"), (2.5, "3"), (float("inf"), None)],
+)
+def test_retry_after(retry_after_s, expected_retry_after):
+    ex = RateLimitExceeded(RateLimitScope.USER, retry_after_s)
+
+    assert ex.retry_after == expected_retry_after
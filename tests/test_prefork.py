@@ -0,0 +1,96 @@
+import os
+import signal
+from unittest import mock
+
+import pytest
+
+from ai_gateway.code_suggestions.processing.typing import LanguageId
+from ai_gateway.prefork import PreforkSupervisor, warm_up
+from ai_gateway.prompts.config import PromptConfig
+from ai_gateway.prompts.registry import PromptRegistered
+
+
+@pytest.fixture
+def mock_container_application():
+    container_application = mock.Mock()
+    container_application.pkg_prompts.prompt_registry.return_value.prompts_registered = {
+        "test/base": PromptRegistered(
+            klass=mock.Mock(),
+            versions={
+                "1.0.0": PromptConfig.model_construct(
+                    prompt_template={"system": "{{ a }}", "user": "{{ b }}"}
+                )
+            },
+        )
+    }
+
+    with mock.patch(
+        "ai_gateway.prefork.setup_container", return_value=container_application
+    ):
+        yield container_application
+
+
+@mock.patch("ai_gateway.prefork.compile_template")
+@mock.patch("ai_gateway.prefork.compile_queries")
+@mock.patch("ai_gateway.prefork.get_parser")
+def test_warm_up(
+    mock_get_parser,
+    mock_compile_queries,
+    mock_compile_template,
+    mock_container_application,
+):
+    warm_up(mock.Mock())
+
+    mock_container_application.code_suggestions.tokenizer.assert_called_once()
+    mock_container_application.pkg_prompts.prompt_registry.assert_called_once()
+    assert mock_get_parser.call_count == len(LanguageId)
+    mock_compile_queries.assert_called_once()
+    mock_compile_template.assert_has_calls([mock.call("{{ a }}"), mock.call("{{ b }}")])
+
+
+class TestPreforkSupervisor:
+    @mock.patch("ai_gateway.prefork.log")
+    @mock.patch("ai_gateway.prefork.process_memory", return_value={"rss_bytes": 1})
+    def test_report_memory(self, mock_process_memory, mock_log):
+        supervisor = PreforkSupervisor(mock.Mock(), memory_report_interval_s=60)
+        supervisor.workers = {2, 1}
+
+        supervisor.report_memory()
+
+        mock_log.info.assert_has_calls(
+            [
+                mock.call("Worker memory", pid=1, rss_bytes=1),
+                mock.call("Worker memory", pid=2, rss_bytes=1),
+            ]
+        )
+
+    @mock.patch("ai_gateway.prefork.os.waitpid", return_value=(1, 256))
+    @mock.patch("ai_gateway.prefork.log")
+    def test_reap(self, mock_log, mock_waitpid):
+        supervisor = PreforkSupervisor(mock.Mock(), memory_report_interval_s=60)
+        supervisor.workers = {1}
+
+        with mock.patch.dict(os.environ, {"PROMETHEUS_MULTIPROC_DIR": "/tmp"}):
+            with mock.patch(
+                "ai_gateway.prefork.multiprocess.mark_process_dead"
+            ) as mock_mark_process_dead:
+                supervisor._reap()
+
+        assert not supervisor.workers
+        mock_waitpid.assert_called_once_with(1, os.WNOHANG)
+        mock_mark_process_dead.assert_called_once_with(1)
+        mock_log.warning.assert_called_once_with(
+            "Pre-fork worker exited", pid=1, exit_code=1
+        )
+
+    @mock.patch("ai_gateway.prefork.os.waitpid", return_value=(1, 0))
+    @mock.patch("ai_gateway.prefork.os.kill")
+    def test_stop(self, mock_kill, mock_waitpid):
+        supervisor = PreforkSupervisor(mock.Mock(), memory_report_interval_s=60)
+        supervisor.workers = {1}
+        supervisor.should_exit.set()
+
+        supervisor._stop()
+
+        mock_kill.assert_called_once_with(1, signal.SIGTERM)
+        assert not supervisor.workers
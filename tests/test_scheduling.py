@@ -0,0 +1,232 @@
+import asyncio
+from typing import Optional
+from unittest.mock import patch
+
+import pytest
+from gitlab_cloud_connector import GitLabFeatureCategory
+from starlette_context import context, request_cycle_context
+
+from ai_gateway.scheduling import (
+    PriorityLimiter,
+    Tenant,
+    WorkloadClass,
+    classify_workload,
+    current_workload,
+)
+
+
+@pytest.mark.parametrize(
+    ("feature_category", "generation", "expected_workload"),
+    [
+        (GitLabFeatureCategory.CODE_SUGGESTIONS, False, WorkloadClass.INTERACTIVE),
+        ("code_suggestions", False, WorkloadClass.INTERACTIVE),
+        (GitLabFeatureCategory.CODE_SUGGESTIONS, True, WorkloadClass.STANDARD),
+        (GitLabFeatureCategory.DUO_CHAT, False, WorkloadClass.STANDARD),
+        ("unknown", False, WorkloadClass.STANDARD),
+    ],
+)
+def test_classify_workload(feature_category, generation, expected_workload):
+    assert classify_workload(feature_category, generation) == expected_workload
+
+
+async def _hold(
+    limiter: PriorityLimiter,
+    workload: WorkloadClass,
+    order: list,
+    release: asyncio.Event,
+):
+    async with limiter.slot(workload):
+        order.append(workload)
+        await release.wait()
+
+
+async def _until(condition):
+    while not condition():
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_slot_priority():
+    limiter = PriorityLimiter("requests", capacity=1)
+    order: list[WorkloadClass] = []
+    release = asyncio.Event()
+
+    holder = asyncio.create_task(_hold(limiter, WorkloadClass.STANDARD, order, release))
+    await _until(lambda: order)
+
+    waiters = [
+        asyncio.create_task(_hold(limiter, workload, order, release))
+        for workload in [
+            WorkloadClass.BACKGROUND,
+            WorkloadClass.STANDARD,
+            WorkloadClass.INTERACTIVE,
+        ]
+    ]
+    await _until(lambda: len(limiter._waiters) == 3)
+
+    release.set()
+    await asyncio.gather(holder, *waiters)
+
+    assert order == [
+        WorkloadClass.STANDARD,
+        WorkloadClass.INTERACTIVE,
+        WorkloadClass.STANDARD,
+        WorkloadClass.BACKGROUND,
+    ]
+    assert limiter.in_use.total() == 0
+
+
+@pytest.mark.asyncio
+async def test_slot_max_shares():
+    limiter = PriorityLimiter(
+        "requests", capacity=4, max_shares={WorkloadClass.BACKGROUND: 0.25}
+    )
+    order: list[WorkloadClass] = []
+    release = asyncio.Event()
+
+    tasks = [
+        asyncio.create_task(_hold(limiter, workload, order, release))
+        for workload in [
+            WorkloadClass.BACKGROUND,
+            WorkloadClass.BACKGROUND,
+            WorkloadClass.INTERACTIVE,
+        ]
+    ]
+    await _until(lambda: len(order) == 2)
+
+    # The second background workload waits while slots are left for the other classes
+    assert order == [WorkloadClass.BACKGROUND, WorkloadClass.INTERACTIVE]
+    assert limiter.in_use.total() == 2
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert order[-1] == WorkloadClass.BACKGROUND
+
+
+async def _fair_queuing_order(
+    limiter: PriorityLimiter, requests: list[tuple[Tenant, Optional[str]]]
+) -> list[Tenant]:
+    order: list[Tenant] = []
+    release = asyncio.Event()
+
+    async def hold(tenant: Tenant, unit_primitive: Optional[str] = None):
+        async with limiter.slot(
+            WorkloadClass.STANDARD, tenant=tenant, unit_primitive=unit_primitive
+        ):
+            order.append(tenant)
+            await release.wait()
+
+    holder = asyncio.create_task(hold(Tenant(instance_id="holder")))
+    await _until(lambda: order)
+
+    waiters = [asyncio.create_task(hold(*request)) for request in requests]
+    await _until(lambda: len(limiter._waiters) == len(requests))
+
+    release.set()
+    await asyncio.gather(holder, *waiters)
+
+    return order[1:]
+
+
+_A = Tenant(instance_id="a", global_user_id="1")
+_B = Tenant(instance_id="b", global_user_id="2")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("tenant_weights", "unit_primitive_weights", "expected_order"),
+    [
+        ({}, {}, [_A, _B, _A, _B, _A, _A]),
+        ({"a": 2.0}, {}, [_A, _B, _A, _A, _B, _A]),
+        ({}, {"duo_chat": 2.0}, [_A, _B, _A, _A, _B, _A]),
+    ],
+)
+async def test_slot_fair_queuing(
+    tenant_weights, unit_primitive_weights, expected_order
+):
+    limiter = PriorityLimiter(
+        "requests",
+        capacity=1,
+        tenant_weights=tenant_weights,
+        unit_primitive_weights=unit_primitive_weights,
+    )
+
+    # Instance a sends its requests before instance b
+    order = await _fair_queuing_order(
+        limiter, [(_A, "duo_chat")] * 4 + [(_B, "explain_code")] * 2
+    )
+
+    assert order == expected_order
+
+
+@pytest.mark.asyncio
+async def test_slot_fair_queuing_by_user():
+    limiter = PriorityLimiter("requests", capacity=1)
+    user_1 = Tenant(instance_id="a", global_user_id="1")
+    user_2 = Tenant(instance_id="a", global_user_id="2")
+    client = Tenant(client_id="127.0.0.1")
+    anonymous = Tenant()
+
+    # The users of the same instance, and the requests without a user, are told apart
+    order = await _fair_queuing_order(
+        limiter,
+        [(user_1, None)] * 3 + [(user_2, None), (client, None), (anonymous, None)],
+    )
+
+    assert order == [user_1, user_2, client, anonymous, user_1, user_1]
+
+
+@pytest.mark.asyncio
+async def test_slot_cancelled():
+    limiter = PriorityLimiter("requests", capacity=1)
+    order: list[WorkloadClass] = []
+    release = asyncio.Event()
+
+    holder = asyncio.create_task(_hold(limiter, WorkloadClass.STANDARD, order, release))
+    await _until(lambda: order)
+
+    waiter = asyncio.create_task(
+        _hold(limiter, WorkloadClass.INTERACTIVE, order, release)
+    )
+    await _until(lambda: limiter._waiters)
+
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+
+    assert not limiter._waiters
+
+    release.set()
+    await holder
+
+    assert limiter.in_use.total() == 0
+
+
+@pytest.mark.asyncio
+async def test_slot_metrics_and_context():
+    limiter = PriorityLimiter("requests", capacity=1)
+
+    with patch(
+        "ai_gateway.scheduling.WORKLOAD_QUEUE_WAIT_HISTOGRAM"
+    ) as mock_histogram, request_cycle_context({}):
+        async with limiter.slot(WorkloadClass.INTERACTIVE):
+            assert current_workload.get() == WorkloadClass.INTERACTIVE
+
+        assert "requests_queue_wait_s" in context.data
+
+    assert current_workload.get() == WorkloadClass.STANDARD
+    mock_histogram.labels.assert_called_once_with(
+        workload="interactive", resource="requests"
+    )
+
+
+@pytest.mark.asyncio
+async def test_slot_disabled():
+    limiter = PriorityLimiter("requests", capacity=1, enabled=False)
+
+    async with limiter.slot(WorkloadClass.BACKGROUND):
+        async with limiter.slot():
+            # Nested slots inherit the workload of the request
+            assert current_workload.get() == WorkloadClass.BACKGROUND
+
+    assert limiter.in_use.total() == 0
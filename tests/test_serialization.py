@@ -0,0 +1,50 @@
+import json
+
+import pytest
+from starlette.responses import JSONResponse as StarletteJSONResponse
+
+from ai_gateway.serialization import JSONResponse, json_dumps, json_dumps_bytes
+
+
+@pytest.mark.parametrize(
+    "obj",
+    [
+        {"choices": [{"text": "def hello_world():", "index": 0}], "score": 0.5},
+        {"unicode": "héllo 世界", "escaped": 'a "quote"\n'},
+        {"big_int": 2**70},
+        {1: "non-str key"},
+        None,
+    ],
+)
+def test_json_dumps(obj):
+    dumped = json_dumps(obj)
+
+    assert json.loads(dumped) == json.loads(json.dumps(obj))
+    assert json_dumps_bytes(obj) == dumped.encode("utf-8")
+    assert " " not in json_dumps({"compact": [1, 2]})
+
+
+@pytest.mark.parametrize(
+    "obj",
+    [
+        {"choices": [{"text": "def hello_world():", "index": 0}], "score": 0.5},
+        {"unicode": "héllo 世界", "escaped": 'a "quote"\n', "emoji": "😀"},
+    ],
+)
+def test_json_dumps_same_as_starlette(obj):
+    assert json_dumps_bytes(obj) == StarletteJSONResponse(obj).body
+
+
+def test_json_dumps_default():
+    class Unknown:
+        def __repr__(self):
+            return "unknown"
+
+    assert json_dumps({"value": Unknown()}, default=repr) == '{"value":"unknown"}'
+
+
+def test_json_response():
+    response = JSONResponse({"message": "héllo"})
+
+    assert response.body == '{"message":"héllo"}'.encode("utf-8")
+    assert response.headers["content-type"] == "application/json"
@@ -0,0 +1,107 @@
+import importlib
+import sys
+from unittest import mock
+
+import pytest
+
+from ai_gateway.startup import StartupTimings, lazy_import, load_lazy_imports
+
+
+@pytest.fixture
+def marker(tmp_path):
+    return tmp_path / "executed"
+
+
+@pytest.fixture
+def module_name(tmp_path, marker, monkeypatch):
+    name = "ai_gateway_lazy_module"
+    (tmp_path / f"{name}.py").write_text(
+        f"open({str(marker)!r}, 'a').write('1')\nsetting = 'default'\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr("ai_gateway.startup._LAZY_MODULES", {})
+
+    yield name
+
+    sys.modules.pop(name, None)
+
+
+@pytest.fixture
+def package_name(tmp_path, marker, monkeypatch):
+    name = "ai_gateway_lazy_package"
+    package = tmp_path / name
+    package.mkdir()
+    (package / "__init__.py").write_text("from .errors import Error\n")
+    (package / "errors.py").write_text(
+        f"open({str(marker)!r}, 'a').write('1')\nclass Error(Exception): pass\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr("ai_gateway.startup._LAZY_MODULES", {})
+
+    yield name
+
+    sys.modules.pop(name, None)
+    sys.modules.pop(f"{name}.errors", None)
+
+
+class TestLazyImport:
+    def test_executed_on_first_access(self, module_name, marker):
+        module = lazy_import(module_name)
+
+        assert module_name not in sys.modules
+        assert lazy_import(module_name) is module
+        assert not marker.exists()
+
+        assert module.setting == "default"
+        assert sys.modules[module_name].setting == "default"
+        assert marker.read_text() == "1"
+
+    def test_attributes_set_before_execution(self, module_name, marker):
+        module = lazy_import(module_name)
+        module.setting = "configured"
+
+        assert not marker.exists()
+        assert module.setting == "configured"
+        assert sys.modules[module_name].setting == "configured"
+        assert marker.exists()
+
+    def test_patched_attributes(self, module_name):
+        module = lazy_import(module_name)
+
+        with mock.patch.object(module, "setting", "patched"):
+            assert module.setting == "patched"
+
+        assert module.setting == "default"
+
+    def test_load_lazy_imports(self, module_name, marker):
+        lazy_import(module_name)
+
+        load_lazy_imports()
+
+        assert marker.exists()
+
+    def test_submodule_imported_by_package(self, package_name, marker):
+        package = lazy_import(package_name)
+
+        errors = importlib.import_module(f"{package_name}.errors")
+
+        assert package.Error is errors.Error
+        assert marker.read_text() == "1"
+
+    def test_not_found(self):
+        with pytest.raises(ModuleNotFoundError):
+            lazy_import("ai_gateway_missing_module")
+
+
+@mock.patch("ai_gateway.startup.log")
+def test_startup_timings(mock_log):
+    timings = StartupTimings()
+
+    with timings.measure("container"):
+        pass
+
+    timings.log()
+
+    assert list(timings.durations) == ["container"]
+    _, kwargs = mock_log.info.call_args
+    assert set(kwargs) == {"process_time_s", "total_s", "container_s"}
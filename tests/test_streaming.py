@@ -0,0 +1,148 @@
+import asyncio
+from typing import AsyncIterator
+from unittest import mock
+
+import pytest
+
+from ai_gateway.streaming import StreamCoalescer
+
+
+async def _stream(*chunks: str, delay_s: float = 0.0) -> AsyncIterator[str]:
+    for chunk in chunks:
+        await asyncio.sleep(delay_s)
+        yield chunk
+
+
+async def _collect(stream: AsyncIterator[str]) -> list[str]:
+    return [chunk async for chunk in stream]
+
+
+@pytest.fixture
+def mock_counters():
+    with (
+        mock.patch("ai_gateway.streaming.STREAM_CHUNKS_COUNTER") as chunks,
+        mock.patch("ai_gateway.streaming.STREAM_WRITES_COUNTER") as writes,
+    ):
+        yield chunks, writes
+
+
+class TestStreamCoalescer:
+    @pytest.mark.asyncio
+    async def test_disabled(self, mock_counters):
+        coalescer = StreamCoalescer(enabled=False, window_ms=15, max_bytes=4096)
+
+        chunks = await _collect(coalescer.coalesce(_stream("a", "b", "c"), "/route"))
+
+        assert chunks == ["a", "b", "c"]
+
+        mock_chunks, mock_writes = mock_counters
+        mock_chunks.labels.assert_called_once_with(route="/route")
+        assert mock_chunks.labels.return_value.inc.call_count == 3
+        assert mock_writes.labels.return_value.inc.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_coalesce(self, mock_counters):
+        coalescer = StreamCoalescer(enabled=True, window_ms=1_000, max_bytes=4096)
+
+        chunks = await _collect(coalescer.coalesce(_stream("a", "b", "c"), "/route"))
+
+        # The first chunk is written immediately
+        assert chunks == ["a", "bc"]
+
+        mock_chunks, mock_writes = mock_counters
+        assert mock_chunks.labels.return_value.inc.call_count == 3
+        assert mock_writes.labels.return_value.inc.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_coalesce_window(self, mock_counters):
+        coalescer = StreamCoalescer(enabled=True, window_ms=10, max_bytes=4096)
+
+        chunks = await _collect(
+            coalescer.coalesce(_stream("a", "b", "c", delay_s=0.05), "/route")
+        )
+
+        # Chunks slower than the window are not delayed by the next ones
+        assert chunks == ["a", "b", "c"]
+
+    @pytest.mark.asyncio
+    async def test_coalesce_max_bytes(self, mock_counters):
+        coalescer = StreamCoalescer(enabled=True, window_ms=1_000, max_bytes=4)
+
+        chunks = await _collect(
+            coalescer.coalesce(_stream("a", "bb", "cc", "d"), "/route")
+        )
+
+        assert chunks == ["a", "bbcc", "d"]
+
+    @pytest.mark.asyncio
+    async def test_route_window(self, mock_counters):
+        coalescer = StreamCoalescer(
+            enabled=True, window_ms=1_000, max_bytes=4096, route_window_ms={"/": 0}
+        )
+
+        chunks = await _collect(coalescer.coalesce(_stream("a", "b", "c"), "/"))
+        assert chunks == ["a", "b", "c"]
+
+        chunks = await _collect(coalescer.coalesce(_stream("a", "b", "c"), "/other"))
+        assert chunks == ["a", "bc"]
+
+    @pytest.mark.asyncio
+    async def test_error(self, mock_counters):
+        async def _failing_stream():
+            yield "a"
+            yield "b"
+            raise ValueError("broken")
+
+        coalescer = StreamCoalescer(enabled=True, window_ms=1_000, max_bytes=4096)
+        chunks = []
+
+        with pytest.raises(ValueError, match="broken"):
+            async for chunk in coalescer.coalesce(_failing_stream(), "/route"):
+                chunks.append(chunk)
+
+        # The buffered chunks are written before the error is raised
+        assert chunks == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_close(self, mock_counters):
+        closed = asyncio.Event()
+
+        async def _endless_stream():
+            try:
+                while True:
+                    yield "a"
+                    await asyncio.sleep(0.01)
+            finally:
+                closed.set()
+
+        coalescer = StreamCoalescer(enabled=True, window_ms=10, max_bytes=4096)
+        stream = coalescer.coalesce(_endless_stream(), "/route")
+
+        assert await anext(stream) == "a"
+        await stream.aclose()
+
+        assert closed.is_set()
+
+    @pytest.mark.asyncio
+    async def test_backpressure(self, mock_counters):
+        produced = 0
+
+        async def _endless_stream():
+            nonlocal produced
+            while True:
+                produced += 1
+                yield "a"
+
+        coalescer = StreamCoalescer(
+            enabled=True, window_ms=1_000, max_bytes=4096, max_queued_chunks=2
+        )
+        stream = coalescer.coalesce(_endless_stream(), "/route")
+
+        assert await anext(stream) == "a"
+        # The client doesn't receive the next writes
+        await asyncio.sleep(0.05)
+
+        # The first chunk, the queued ones and the one waiting for room
+        assert produced == 4
+
+        await stream.aclose()
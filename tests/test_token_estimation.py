@@ -0,0 +1,81 @@
+import pytest
+
+from ai_gateway.config import Config, ConfigTokenCalibration, ConfigTokenEstimation
+from ai_gateway.token_estimation import (
+    Calibration,
+    TextFeatures,
+    TokenEstimator,
+    TokenizerFamily,
+    text_features,
+    tokenizer_family,
+)
+
+
+@pytest.mark.parametrize(
+    ("text", "expected_features"),
+    [
+        ("", TextFeatures(0, 0, 0, 0, 0, 0)),
+        ("hello world", TextFeatures(2, 10, 0, 0, 0, 0)),
+        (
+            "def add(a, b):\n    return a + 12\n",
+            TextFeatures(
+                words=6, letters=15, digits=2, symbols=5, breaks=2, non_ascii_bytes=0
+            ),
+        ),
+        ("héllo 世界", TextFeatures(2, 4, 0, 0, 0, 8)),
+    ],
+)
+def test_text_features(text, expected_features):
+    assert text_features(text) == expected_features
+
+
+@pytest.mark.parametrize(
+    ("model_name", "expected_family"),
+    [
+        ("claude-3-5-sonnet-20240620", TokenizerFamily.ANTHROPIC),
+        ("code-gecko@002", TokenizerFamily.VERTEX),
+        ("gemini-1.5-pro", TokenizerFamily.VERTEX),
+        ("codestral", TokenizerFamily.DEFAULT),
+        (None, TokenizerFamily.DEFAULT),
+    ],
+)
+def test_tokenizer_family(model_name, expected_family):
+    assert tokenizer_family(model_name) == expected_family
+
+
+def test_estimate():
+    estimator = TokenEstimator(
+        {
+            TokenizerFamily.VERTEX: Calibration(
+                words=1, letters=0, digits=1, symbols=1, breaks=0, non_ascii_bytes=0
+            )
+        }
+    )
+
+    assert estimator.estimate("") == 0
+    assert estimator.estimate("!") == 1
+    # 2 words, 3 digits and 3 symbols
+    assert estimator.estimate("x = f(123)", TokenizerFamily.VERTEX) == 8
+    # The calibrations not overridden are kept
+    assert estimator.estimate("hello world", TokenizerFamily.ANTHROPIC) == 2
+
+
+@pytest.fixture
+def mock_config():
+    calibration = ConfigTokenCalibration(
+        words=1, letters=0, digits=0, symbols=0, breaks=0, non_ascii_bytes=0
+    )
+
+    yield Config(
+        token_estimation=ConfigTokenEstimation(calibrations={"default": calibration})
+    )
+
+
+def test_container(mock_container):
+    token_estimator = mock_container.token_estimator()
+
+    assert token_estimator.calibrations[TokenizerFamily.DEFAULT] == Calibration(
+        1, 0, 0, 0, 0, 0
+    )
+    assert token_estimator.estimate("one two three") == 3
+    assert mock_container.token_estimator() is token_estimator